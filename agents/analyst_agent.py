@@ -5,12 +5,16 @@ Implements transparent multi-step reasoning with timing and token logging.
 import time
 import logging
 import json
+import re
 from datetime import datetime
 from pathlib import Path
+from typing import List
 
-from langchain_ollama import OllamaLLM
 from core.vector_store import query_faiss
 from core.config_loader import get_model
+from core.llm_gateway import get_llm
+from core.cancellation import check_cancelled
+from core.session_context import current_session
 from core.analytical_frameworks import get_framework_prompt
 
 # Configure logging
@@ -24,13 +28,23 @@ logging.basicConfig(
 )
 
 
+def relevance_scores(context: str) -> List[float]:
+    """
+    Relevance scores of the documents in a query_faiss() context string.
+    
+    Scores are 1 - L2 distance and go negative for poor matches; those must
+    count, or the mean overstates the retrieval quality.
+    """
+    return [float(score) for score in re.findall(r"Relevance: (-?\d+(?:\.\d+)?)", context)]
+
+
 class AnalystAgent:
     """Agent that performs transparent multi-step analytical reasoning."""
     
     def __init__(self):
         """Initialize AnalystAgent with model and logging."""
         self.model = get_model("analyst")
-        self.llm = OllamaLLM(model=self.model, base_url="http://127.0.0.1:11434")
+        self.llm = get_llm(self.model, agent="analyst")
         self.logger = logging.getLogger("AnalystAgent")
         self.logger.info(f"AnalystAgent initialized with model: {self.model}")
 
@@ -86,6 +100,24 @@ class AnalystAgent:
         prompt = f"Review this draft analysis for missing variables or logical gaps:\n{draft}"
         return self.llm.invoke(prompt)
 
+    def _retrieve(self, query: str, source: str, top_k: int) -> str:
+        """
+        Query the vector store, reusing the session's retrieval for the same query.
+        
+        Args:
+            query: The analytical query
+            source: Source filter for query_faiss
+            top_k: Number of documents
+            
+        Returns:
+            Formatted context string
+        """
+        session = current_session()
+        if session is None:
+            return query_faiss(query, source=source, top_k=top_k)
+        key = (source, " ".join(query.lower().split()), top_k)
+        return session.remember("docs", key, lambda: query_faiss(query, source=source, top_k=top_k))
+
     def analyze_query(self, query: str, framework: str = None):
         """
         Analyze a query using transparent multi-step reasoning.
@@ -100,27 +132,38 @@ class AnalystAgent:
         start = time.time()
         
         # Retrieve context from FAISS
-        acled_context = query_faiss(query, source="ACLED", top_k=5)
-        cia_context = query_faiss(query, source="CIA_FACTS", top_k=3)
+        acled_context = self._retrieve(query, "ACLED", 5)
+        cia_context = self._retrieve(query, "CIA_FACTS", 3)
         full_context = acled_context + cia_context
+        # Follow-ups extend the session's earlier retrievals; fresh context comes first
+        session = current_session()
+        if session is not None:
+            for key, docs in session.values("docs"):
+                if key[1] != " ".join(query.lower().split()) and docs not in full_context:
+                    full_context += docs
         context_text = json.dumps(full_context)[:8000]
+        relevance = relevance_scores(full_context)
 
         # Step 1: Pattern extraction
+        check_cancelled()
         t1 = time.time()
         patterns = self.extract_patterns(context_text)
         self.logger.info(f"Patterns extracted in {round(time.time()-t1,2)}s")
 
         # Step 2: Hypothesis generation
+        check_cancelled()
         t2 = time.time()
         hypos = self.generate_hypotheses(patterns)
         self.logger.info(f"Hypotheses generated in {round(time.time()-t2,2)}s")
 
         # Step 3: Hypothesis evaluation
+        check_cancelled()
         t3 = time.time()
         evaluation = self.evaluate_hypotheses(hypos)
         self.logger.info(f"Hypotheses evaluated in {round(time.time()-t3,2)}s")
 
         # Step 4: Framework synthesis (optional)
+        check_cancelled()
         if framework:
             framework_prompt = get_framework_prompt(framework, evaluation)
             synthesis = self.llm.invoke(framework_prompt)
@@ -129,6 +172,7 @@ class AnalystAgent:
             synthesis = self.llm.invoke(synth_prompt)
 
         # Step 5: Critical review
+        check_cancelled()
         review = self.critical_review(synthesis)
 
         end = time.time()
@@ -142,6 +186,10 @@ class AnalystAgent:
             "evaluation": evaluation,
             "synthesis": synthesis,
             "review": review,
+            "retrieval": {
+                "documents": len(relevance),
+                "mean_relevance": round(sum(relevance) / len(relevance), 3) if relevance else None
+            },
             "runtime_s": total,
             "model": self.model,
             "timestamp": datetime.now().isoformat()
@@ -7,11 +7,10 @@ clustering algorithms, and interactive map generation.
 import argparse
 import logging
 import sys
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, Optional
 
-from langchain_ollama import OllamaLLM
-
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
@@ -21,6 +20,9 @@ from core.tools_geospatial import (
     make_hotspot_map
 )
 from core.config_loader import get_model
+from core.llm_gateway import get_llm
+from core.cancellation import check_cancelled
+from core.session_context import current_session
 
 
 class GeoAgent:
@@ -34,7 +36,6 @@ class GeoAgent:
     def __init__(
         self,
         model: str = None,
-        base_url: str = "http://127.0.0.1:11434",
         log_file: str = "logs/geo_agent.log"
     ):
         """
@@ -42,7 +43,6 @@ class GeoAgent:
         
         Args:
             model: Ollama model name for spatial reasoning (overrides config)
-            base_url: Base URL for Ollama API
             log_file: Path to log file
         """
         # Load model from config or use provided model
@@ -50,7 +50,7 @@ class GeoAgent:
         
         # Initialize LLM with error handling
         try:
-            self.llm = OllamaLLM(model=self.model, base_url=base_url)
+            self.llm = get_llm(self.model, agent="geo")
         except Exception as e:
             logging.error(f"Model {self.model} not found. Run: ollama pull {self.model}")
             raise
@@ -128,7 +128,7 @@ class GeoAgent:
         try:
             # Step 1: Load ACLED data
             self.logger.info(f"Loading ACLED data for {country}...")
-            df = load_acled_subset(country=country, years_back=years_back)
+            df = self._load_events(country, years_back)
             
             if len(df) == 0:
                 raise ValueError(
@@ -136,10 +136,11 @@ class GeoAgent:
                 )
             
             # Step 2: Cluster events
-            self.logger.info(f"Clustering {len(df)} events...")
-            df = cluster_events(df, eps_km=eps_km, min_samples=min_samples)
+            check_cancelled()
+            df = self._cluster_events(df, country, years_back, eps_km, min_samples)
             
             # Step 3: Generate LLM summary
+            check_cancelled()
             self.logger.info("Generating spatial reasoning summary...")
             
             # Calculate statistics for the prompt
@@ -173,6 +174,7 @@ Keep the analysis brief (3-4 sentences) and actionable."""
                 )
             
             # Step 4: Generate hotspot map
+            check_cancelled()
             self.logger.info("Generating interactive map...")
             output_path = f"{output_dir}/{country.replace(' ', '_')}_hotspot.html"
             map_info = make_hotspot_map(
@@ -206,6 +208,53 @@ Keep the analysis brief (3-4 sentences) and actionable."""
             self.logger.error(f"Unexpected error during analysis: {e}", exc_info=True)
             raise
     
+    def _load_events(self, country: str, years_back: int):
+        """
+        Load ACLED events, reusing the session's DataFrame for the country.
+        
+        A session that already loaded the country for at least years_back
+        years is filtered in memory instead of re-reading the regional CSV.
+        
+        Args:
+            country: Country name
+            years_back: Number of years to load
+            
+        Returns:
+            DataFrame of events (a copy the caller may modify)
+        """
+        session = current_session()
+        if session is None:
+            return load_acled_subset(country=country, years_back=years_back)
+        
+        cached = session.get("acled", country.lower())
+        if cached is not None and cached[0] >= years_back:
+            loaded_years, df = cached
+            if loaded_years > years_back:
+                df = df[df['WEEK'] >= datetime.now() - timedelta(days=365 * years_back)]
+            self.logger.info(f"Reusing {len(df)} ACLED events for {country} from session {session.session_id}")
+            return df.copy()
+        
+        df = load_acled_subset(country=country, years_back=years_back)
+        session.put("acled", country.lower(), (years_back, df))
+        return df.copy()
+    
+    def _cluster_events(self, df, country: str, years_back: int, eps_km: float, min_samples: int):
+        """Cluster events, reusing the session's clustering for identical parameters."""
+        session = current_session()
+        key = (country.lower(), years_back, eps_km, min_samples)
+        if session is not None:
+            cached = session.get("clusters", key)
+            if cached is not None:
+                self.logger.info(f"Reusing clustered events for {country} from session {session.session_id}")
+                return cached.copy()
+        
+        self.logger.info(f"Clustering {len(df)} events...")
+        df = cluster_events(df, eps_km=eps_km, min_samples=min_samples)
+        if session is not None:
+            session.put("clusters", key, df)
+            df = df.copy()
+        return df
+    
     def batch_analyze(
         self,
         countries: list,
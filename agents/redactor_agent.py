@@ -68,7 +68,7 @@ Content to summarize:
 
 Summary:"""
             
-            summary = self.ollama_client.generate(prompt)
+            summary = self.ollama_client.generate(prompt, agent="redactor")
             
             # Log the summarization
             self.tracker.log_tool_call(
@@ -122,7 +122,7 @@ Content:
 
 Executive Brief:"""
             
-            brief = self.ollama_client.generate(prompt)
+            brief = self.ollama_client.generate(prompt, agent="redactor")
             
             # Format as report if title provided
             if title:
@@ -164,7 +164,7 @@ Text:
 
 Key Points:"""
             
-            key_points = self.ollama_client.generate(prompt)
+            key_points = self.ollama_client.generate(prompt, agent="redactor")
             
             self.tracker.log_tool_call(
                 "redactor",
@@ -280,7 +280,7 @@ Text:
 
 Bullet Summary:"""
             
-            summary = self.ollama_client.generate(prompt)
+            summary = self.ollama_client.generate(prompt, agent="redactor")
             
             return summary
             
@@ -3,11 +3,113 @@ ReflectionAgent: Meta-reasoning agent for evaluating coherence,
 completeness, and contradictions between other agents' outputs.
 """
 
+import contextvars
 import json
 import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from langchain_ollama import OllamaLLM
-from core.config_loader import get_model
+from core.config_loader import get_model, get_settings
+from core.llm_gateway import get_llm
+from core.cancellation import check_cancelled
+
+DEFAULT_SETTINGS = {
+    "prompt_chars": 8000,         # budget of the serialized results shared by both reflection prompts
+    "concurrent": True,           # run the main evaluation and the consistency check at the same time
+    "consistency_model": None,    # smaller model for the consistency check (None = reflection model)
+    "cascade": True,              # settle clear cases before invoking the reflection model
+    "cascade_model": None,        # small model for the first pass (None = deterministic scorer)
+    "cascade_low": 0.45,          # first-pass confidence in [cascade_low, cascade_high) escalates
+    "cascade_high": 0.8,
+    "evidence_targets": {"search": 3, "geo": 50, "analyst": 5},   # evidence counted as sufficient
+    "relevance_target": 0.5,      # mean retrieval relevance counted as sufficient
+}
+
+AGENT_NAMES = ("search", "analyst", "geo")
+
+
+class CascadeMetrics:
+    """Escalation rate of the reflection cascade and reflection-model time it saved."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.evaluations = 0
+        self.escalated = 0
+        self.first_pass_s = 0.0
+        self.saved_s = 0.0
+        self.overhead_s = 0.0
+        self.large_s = None   # moving average of reflection-model evaluations (seconds)
+
+    def record_large(self, seconds: float):
+        """Record the duration of a reflection-model evaluation."""
+        with self._lock:
+            self.large_s = seconds if self.large_s is None else 0.8 * self.large_s + 0.2 * seconds
+
+    def record(self, escalated: bool, first_pass_s: float):
+        """
+        Record a cascade first pass.
+
+        Args:
+            escalated: Whether the reflection model had to decide
+            first_pass_s: Duration of the first pass
+        """
+        with self._lock:
+            self.evaluations += 1
+            self.first_pass_s += first_pass_s
+            if escalated:
+                self.escalated += 1
+                self.overhead_s += first_pass_s
+            elif self.large_s is not None:
+                self.saved_s += max(0.0, self.large_s - first_pass_s)
+
+    def stats(self) -> dict:
+        """Evaluations, escalation rate and latency saved."""
+        with self._lock:
+            return {
+                "evaluations": self.evaluations,
+                "escalated": self.escalated,
+                "escalation_rate": round(self.escalated / self.evaluations, 3) if self.evaluations else 0.0,
+                "first_pass_avg_s": round(self.first_pass_s / self.evaluations, 3) if self.evaluations else 0.0,
+                "large_model_avg_s": round(self.large_s, 2) if self.large_s is not None else None,
+                "saved_s": round(self.saved_s, 2),
+                "overhead_s": round(self.overhead_s, 2),
+            }
+
+
+# Global cascade metrics
+_cascade_metrics = None
+_cascade_metrics_lock = threading.Lock()
+
+
+def get_cascade_metrics() -> CascadeMetrics:
+    """Get or create the shared reflection cascade metrics."""
+    global _cascade_metrics
+    with _cascade_metrics_lock:
+        if _cascade_metrics is None:
+            _cascade_metrics = CascadeMetrics()
+        return _cascade_metrics
+
+
+def _compact(value, limit: int, depth: int = 0):
+    """Copy of value with strings cut to limit chars, lists to 20 items and nesting to 4 levels."""
+    if isinstance(value, str):
+        return value if len(value) <= limit else value[:limit] + "…"
+    if isinstance(value, dict):
+        if depth >= 4:
+            return f"<{len(value)} keys>"
+        return {str(k): _compact(v, limit, depth + 1) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        if depth >= 4:
+            return f"<{len(value)} items>"
+        items = [_compact(v, limit, depth + 1) for v in value[:20]]
+        if len(value) > 20:
+            items.append(f"<{len(value) - 20} more>")
+        return items
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    return _compact(str(value), limit, depth)
 
 
 class ReflectionAgent:
@@ -35,92 +137,111 @@ class ReflectionAgent:
         
         # Initialize LLM with error handling
         try:
-            self.llm = OllamaLLM(model=self.model, base_url="http://127.0.0.1:11434")
+            self.llm = get_llm(self.model, agent="reflection")
         except Exception as e:
             self.logger.error(f"Model {self.model} not found. Run: ollama pull {self.model}")
             raise
         
-        self.logger.info(f"🧩 ReflectionAgent initialized with model: {self.model}")
+        self.settings = get_settings("reflection", DEFAULT_SETTINGS)
+        self.consistency_model = self.settings["consistency_model"] or self.model
+        self.consistency_llm = self.llm
+        if self.consistency_model != self.model:
+            self.consistency_llm = get_llm(self.consistency_model, agent="reflection")
+        
+        self.cascade_model = self.settings["cascade_model"]
+        self.cascade_llm = get_llm(self.cascade_model, agent="reflection") if self.cascade_model else None
+        
+        self.logger.info(f"🧩 ReflectionAgent initialized with model: {self.model}"
+                         + (f" (consistency: {self.consistency_model})" if self.consistency_model != self.model else ""))
+    
+    @staticmethod
+    def serialize_results(results: dict, budget: int = None) -> str:
+        """
+        Compact serialization of agent results shared by the reflection prompts.
+        
+        Each entry gets an equal share of the budget, so one verbose agent
+        cannot crowd out the others, and long texts are cut before they are
+        serialized rather than after.
+        
+        Args:
+            results: Dictionary containing outputs from various agents
+            budget: Characters for all entries (defaults to reflection.prompt_chars)
+            
+        Returns:
+            One line per agent: "<name>: <compact JSON>"
+        """
+        budget = budget or get_settings("reflection", DEFAULT_SETTINGS)["prompt_chars"]
+        entries = [(name, result) for name, result in results.items() if name != "reflection"]
+        share = max(200, budget // max(1, len(entries)))
+        lines = []
+        for name, result in entries:
+            text = json.dumps(_compact(result, share), separators=(",", ":"), ensure_ascii=False)
+            lines.append(f"{name}: {text[:share]}")
+        return "\n".join(lines)
     
-    def evaluate_results(self, results: dict) -> dict:
+    def evaluate_results(self, results: dict, consistency: bool = True, checks: list = None,
+                         serialized: str = None) -> dict:
         """
         Evaluate the coherence and completeness of agent outputs.
         
         Args:
             results: Dictionary containing outputs from various agents
+            consistency: Also run evaluate_consistency (the pipelined supervisor
+                         runs it concurrently instead)
+            checks: Optional per-agent check_agent() outcomes to include in the prompt
+            serialized: Optional serialize_results() output, if the caller already has it
             
         Returns:
             Dictionary with confidence score, contradictions, rerun recommendations, and summary
         """
-        import time
         start = time.time()
+        check_cancelled()
         self.logger.info("Starting evaluation of agent results")
         
+        # One compact serialization for both prompts; the consistency check runs alongside
+        results_str = serialized if serialized is not None else self.serialize_results(results,
+                                                                                     self.settings["prompt_chars"])
+        consistency_future = None
+        if consistency and self.settings["concurrent"]:
+            executor = ThreadPoolExecutor(max_workers=1)
+            consistency_future = executor.submit(contextvars.copy_context().run,
+                                                 self.evaluate_consistency, results, results_str)
+            executor.shutdown(wait=False)
+        
         try:
-            # Truncate results to avoid overwhelming the model
-            results_str = json.dumps(results, indent=2)[:8000]
-            
-            prompt = f"""
-You are a reflection layer analyzing outputs from multiple agents.
-Evaluate factual consistency, completeness, and contradictions.
-Suggest which agents (if any) need to re-run, and compute an overall confidence (0-1).
-Provide a structured JSON:
-{{
-  "confidence": <float>,
-  "contradictions": ["..."],
-  "rerun": ["analyst", "geo"],
-  "summary": "..."
-}}
-
-Results to analyze:
-{results_str}
-"""
-            
-            self.logger.info("Invoking LLM for reflection analysis")
-            response = self.llm.invoke(prompt)
-            
-            # Parse the JSON response
-            # Try to extract JSON from the response if it contains additional text
-            response_text = response.strip()
-            
-            # Find JSON block in response
-            json_start = response_text.find('{')
-            json_end = response_text.rfind('}') + 1
-            
-            if json_start >= 0 and json_end > json_start:
-                json_str = response_text[json_start:json_end]
-                reflection_result = json.loads(json_str)
-            else:
-                # If no JSON found, create a structured response
-                reflection_result = {
-                    "confidence": 0.5,
-                    "contradictions": ["Unable to parse model response"],
-                    "rerun": [],
-                    "summary": response_text
-                }
-            
-            # Validate structure
-            if "confidence" not in reflection_result:
-                reflection_result["confidence"] = 0.5
-            if "contradictions" not in reflection_result:
-                reflection_result["contradictions"] = []
-            if "rerun" not in reflection_result:
-                reflection_result["rerun"] = []
-            if "summary" not in reflection_result:
-                reflection_result["summary"] = "No summary provided"
+            checks_str = ""
+            if checks:
+                checks_str = "\nAutomatic checks per agent:\n" + "\n".join(
+                    f"- {c['agent']}: {'ok' if c['ok'] else '; '.join(c['issues'])} "
+                    f"({c['evidence']} evidence items)"
+                    for c in checks
+                ) + "\n"
             
-            # Ensure confidence is between 0 and 1
-            reflection_result["confidence"] = max(0.0, min(1.0, float(reflection_result["confidence"])))
+            # Cascade: a cheap first pass settles clear cases; the reflection model
+            # only sees results whose first-pass confidence is uncertain
+            reflection_result, cascade = None, None
+            if self.settings["cascade"]:
+                reflection_result, cascade = self._first_pass(results, checks, results_str, checks_str)
+            if reflection_result is None:
+                large_start = time.time()
+                reflection_result = self._evaluate_with(self.llm, results_str, checks_str)
+                get_cascade_metrics().record_large(time.time() - large_start)
+            if cascade is not None:
+                reflection_result["cascade"] = cascade
             
-            duration = round(time.time() - start, 2)
-            self.logger.info(f"🧩 ReflectionAgent finished in {duration}s using {self.model}")
             self.logger.info(f"Evaluation complete. Confidence: {reflection_result['confidence']}")
             
             # Add consistency check between structural and event data
-            consistency = self.evaluate_consistency(results)
-            reflection_result["consistency_check"] = consistency
-            self.logger.info(f"Added consistency analysis: {consistency.get('overall_stability')}")
+            if consistency:
+                if consistency_future is not None:
+                    consistency_check = consistency_future.result()
+                else:
+                    consistency_check = self.evaluate_consistency(results, results_str)
+                reflection_result["consistency_check"] = consistency_check
+                self.logger.info(f"Added consistency analysis: {consistency_check.get('overall_stability')}")
             
+            duration = round(time.time() - start, 2)
+            self.logger.info(f"🧩 ReflectionAgent finished in {duration}s using {self.model}")
             return reflection_result
             
         except json.JSONDecodeError as e:
@@ -143,18 +264,210 @@ Results to analyze:
                 "summary": "Critical error occurred during reflection analysis"
             }
     
-    def evaluate_consistency(self, results: dict) -> dict:
+    def _first_pass(self, results: dict, checks: list, results_str: str, checks_str: str):
+        """
+        Cheap first pass of the reflection cascade.
+        
+        Args:
+            results: Dictionary containing outputs from various agents
+            checks: Optional per-agent check_agent() outcomes
+            results_str: serialize_results() output
+            checks_str: Formatted per-agent checks
+            
+        Returns:
+            (result, cascade): result is None when the first-pass confidence lies in
+            [cascade_low, cascade_high) and the reflection model has to decide;
+            cascade describes the first pass for the report
+        """
+        start = time.time()
+        if self.cascade_llm is not None:
+            scorer = self.cascade_model
+            try:
+                first = self._evaluate_with(self.cascade_llm, results_str, checks_str)
+            except Exception as e:
+                self.logger.warning(f"Cascade model {scorer} gave no usable answer, escalating: {e}")
+                first = None
+        else:
+            scorer = "deterministic"
+            first = self.score_results(results, checks)
+        first_s = time.time() - start
+        
+        confidence = first["confidence"] if first else None
+        escalated = confidence is None or \
+            self.settings["cascade_low"] <= confidence < self.settings["cascade_high"]
+        get_cascade_metrics().record(escalated, first_s)
+        self.logger.info(f"Cascade first pass ({scorer}): confidence {confidence} in {first_s:.2f}s, "
+                         + ("escalating to " + self.model if escalated else "settled"))
+        cascade = {"scorer": scorer, "confidence": confidence, "escalated": escalated,
+                   "first_pass_s": round(first_s, 3)}
+        return (None if escalated else first), cascade
+    
+    def score_results(self, results: dict, checks: list = None) -> dict:
+        """
+        Deterministic reflection from agent status, evidence counts and retrieval relevance.
+        
+        A failed agent scores 0; a successful one 0.5 plus up to 0.5 for
+        sufficient evidence (and retrieval relevance, where reported).
+        
+        Args:
+            results: Dictionary containing outputs from various agents
+            checks: Optional per-agent check_agent() outcomes (computed if omitted)
+            
+        Returns:
+            Dictionary with confidence, contradictions, rerun (the failed agents) and summary
+        """
+        if not checks:
+            checks = [self.check_agent(name, result) for name, result in results.items()
+                      if name in AGENT_NAMES and isinstance(result, dict)]
+        targets = self.settings["evidence_targets"]
+        scores = {}
+        for check in checks:
+            if not check["ok"]:
+                scores[check["agent"]] = 0.0
+                continue
+            evidence = min(1.0, check["evidence"] / max(1, targets.get(check["agent"], 1)))
+            if check.get("relevance") is not None:
+                relevance = max(0.0, min(1.0, check["relevance"] / self.settings["relevance_target"]))
+                scores[check["agent"]] = 0.5 + 0.25 * evidence + 0.25 * relevance
+            else:
+                scores[check["agent"]] = 0.5 + 0.5 * evidence
+        confidence = sum(scores.values()) / len(scores) if scores else 0.5
+        issues = [f"{c['agent']}: {'; '.join(c['issues'])}" for c in checks if not c["ok"]]
+        return {
+            "confidence": round(confidence, 3),
+            "contradictions": [],
+            "rerun": [c["agent"] for c in checks if not c["ok"] and c["agent"] in AGENT_NAMES],
+            "summary": "Deterministic check: " + ", ".join(f"{name} {score:.2f}" for name, score in scores.items())
+                       + (f" ({'; '.join(issues)})" if issues else ""),
+        }
+    
+    def _evaluate_with(self, llm, results_str: str, checks_str: str) -> dict:
+        """
+        Main reflection prompt on one model.
+        
+        Args:
+            llm: Model client to invoke
+            results_str: serialize_results() output
+            checks_str: Formatted per-agent checks (may be empty)
+            
+        Returns:
+            Validated dictionary with confidence, contradictions, rerun and summary
+            
+        Raises:
+            json.JSONDecodeError: If the model's JSON cannot be parsed
+        """
+        prompt = f"""
+You are a reflection layer analyzing outputs from multiple agents.
+Evaluate factual consistency, completeness, and contradictions.
+Suggest which agents (if any) need to re-run, and compute an overall confidence (0-1).
+Provide a structured JSON:
+{{
+  "confidence": <float>,
+  "contradictions": ["..."],
+  "rerun": ["analyst", "geo"],
+  "summary": "..."
+}}
+
+Results to analyze:
+{results_str}
+{checks_str}"""
+        
+        self.logger.info("Invoking LLM for reflection analysis")
+        response = llm.invoke(prompt)
+        
+        # Parse the JSON response
+        # Try to extract JSON from the response if it contains additional text
+        response_text = response.strip()
+        
+        # Find JSON block in response
+        json_start = response_text.find('{')
+        json_end = response_text.rfind('}') + 1
+        
+        if json_start >= 0 and json_end > json_start:
+            json_str = response_text[json_start:json_end]
+            reflection_result = json.loads(json_str)
+        else:
+            # If no JSON found, create a structured response
+            reflection_result = {
+                "confidence": 0.5,
+                "contradictions": ["Unable to parse model response"],
+                "rerun": [],
+                "summary": response_text
+            }
+        
+        # Validate structure
+        if "confidence" not in reflection_result:
+            reflection_result["confidence"] = 0.5
+        if "contradictions" not in reflection_result:
+            reflection_result["contradictions"] = []
+        if "rerun" not in reflection_result:
+            reflection_result["rerun"] = []
+        if "summary" not in reflection_result:
+            reflection_result["summary"] = "No summary provided"
+        
+        # Ensure confidence is between 0 and 1
+        reflection_result["confidence"] = max(0.0, min(1.0, float(reflection_result["confidence"])))
+        
+        return reflection_result
+    
+    @staticmethod
+    def check_agent(name: str, result: dict) -> dict:
+        """
+        Deterministic check of one agent's output, cheap enough to run as soon
+        as the agent finishes.
+        
+        Args:
+            name: Agent name ("search", "analyst", "geo")
+            result: The agent's result entry (status, content or error)
+            
+        Returns:
+            Dictionary with agent, ok, evidence (count of sources, events or
+            reasoning steps), relevance (mean retrieval relevance, analyst only) and issues
+        """
+        issues = []
+        evidence = 0
+        relevance = None
+        status = result.get("status", "failed" if result.get("error") else "success")
+        content = result.get("content")
+        if status != "success":
+            issues.append(f"{status}: {str(result.get('error', ''))[:200]}")
+        elif not content:
+            issues.append("empty output")
+        elif name == "search":
+            evidence = len(set(re.findall(r"URL: (\S+)", str(content))))
+            if not evidence:
+                issues.append("no sources")
+        elif name == "geo" and isinstance(content, dict):
+            evidence = int(content.get("n_events") or 0)
+            if not evidence:
+                issues.append("no events")
+            elif not content.get("summary"):
+                issues.append("no spatial summary")
+        elif name == "analyst" and isinstance(content, dict):
+            steps = ["patterns", "hypotheses", "evaluation", "synthesis", "review"]
+            evidence = sum(1 for step in steps if content.get(step))
+            relevance = (content.get("retrieval") or {}).get("mean_relevance")
+            if not content.get("synthesis"):
+                issues.append("no synthesis")
+        else:
+            evidence = 1
+        return {"agent": name, "ok": not issues, "evidence": evidence, "relevance": relevance, "issues": issues}
+    
+    def evaluate_consistency(self, results: dict, serialized: str = None) -> dict:
         """
         Evaluate alignment between CIA Factbook (structural data) and ACLED (event data).
         Identifies contradictions and assesses stability coherence.
         
         Args:
             results: Dictionary containing agent outputs with both structural and event data
+            serialized: Optional serialize_results() output shared with the main evaluation
             
         Returns:
             Dictionary with contradictions, alignment summary, and overall stability assessment
         """
         self.logger.info("Starting consistency evaluation between structural and event data")
+        if serialized is None:
+            serialized = self.serialize_results(results, self.settings["prompt_chars"])
         
         prompt = f"""
 Evaluate the following combined analytical results for consistency between structural and event data.
@@ -166,11 +479,11 @@ Provide structured JSON output:
   "overall_stability": "Stable / Fragile / Deteriorating"
 }}
 Data:
-{json.dumps(results)[:8000]}
+{serialized}
 """
         
         try:
-            response = self.llm.invoke(prompt)
+            response = self.consistency_llm.invoke(prompt)
             
             # Parse the JSON response
             response_text = response.strip() if isinstance(response, str) else str(response)
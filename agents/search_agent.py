@@ -2,22 +2,48 @@
 Search Agent for HAWK-AI.
 Performs web searches and retrieves online information.
 """
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+from collections import OrderedDict
+import contextvars
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, TimeoutError as FuturesTimeout, wait
 from datetime import datetime
 import logging
+import threading
+import time
 from rich.console import Console
 
 from core.tools_websearch import get_websearch_tool
+from core.web_cache import normalize_query
+from core.web_index import DEFAULT_SETTINGS as WEB_INDEX_DEFAULTS, get_web_index
+from core.prefetch import get_prefetch_worker
 from core.local_tracking import get_tracker
 from core.ollama_client import get_ollama_client
-from core.config_loader import get_model
+from core.config_loader import get_model, get_settings
+from core.cancellation import check_cancelled
 
 console = Console()
 
+SEARCH_DEFAULTS = {
+    "fanout_workers": 4,
+    "per_call_timeout": 15,
+    "include_news": False,
+    "speculative": True,
+    "reformulation_timeout": 20,
+    "reformulation_cache_ttl": 3600,
+    "reformulation_cache_size": 256,
+}
+
 
 class SearchAgent:
     """Agent for web search operations."""
     
+    # Reformulations are shared across instances: query -> (timestamp, queries)
+    _reformulation_cache: "OrderedDict[str, Tuple[float, List[str]]]" = OrderedDict()
+    _reformulation_lock = threading.Lock()
+    
+    # Search results are appended to the web knowledge index off the request path
+    _index_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search-index")
+    
     def __init__(self, config_path: str = "config/settings.yaml"):
         """Initialize search agent."""
         self.config_path = config_path
@@ -25,6 +51,8 @@ class SearchAgent:
         self.search_tool = get_websearch_tool(config_path)
         self.tracker = get_tracker(config_path)
         self.ollama_client = get_ollama_client(config_path)
+        self.settings = get_settings("search", SEARCH_DEFAULTS)
+        self.index_settings = get_settings("web_index", WEB_INDEX_DEFAULTS)
         
         # Setup logging
         self.logger = logging.getLogger("SearchAgent")
@@ -161,13 +189,14 @@ class SearchAgent:
             console.print(f"[red]Scraping error: {e}[/red]")
             return f"Error scraping URL: {str(e)}"
     
-    def _format_search_results(self, query: str, results: List[Dict[str, Any]]) -> str:
+    def _format_search_results(self, query: str, results: List[Dict[str, Any]], note: Optional[str] = None) -> str:
         """
         Format search results into a readable report.
         
         Args:
             query: Original query
             results: List of search results
+            note: Optional line shown under the header (e.g. result provenance)
             
         Returns:
             Formatted report
@@ -177,6 +206,8 @@ class SearchAgent:
             f"Found {len(results)} results\n",
             "=" * 80
         ]
+        if note:
+            report_parts.insert(2, f"{note}\n")
         
         for i, result in enumerate(results, 1):
             report_parts.append(f"\n{i}. {result['title']}")
@@ -215,46 +246,76 @@ class SearchAgent:
         
         return "\n".join(report_parts)
     
-    def intelligent_search(self, query: str) -> str:
+    def intelligent_search(self, query: str, session_id: Optional[str] = None) -> str:
         """
         Perform an intelligent search with LLM-enhanced query reformulation.
         
+        Repeat topics are answered from the local web knowledge index when it
+        holds enough fresh, relevant documents; otherwise the web is searched
+        and the results are appended to the index in the background. When
+        prefetch is enabled, the top result pages are also scraped, chunked
+        and indexed in the background so follow-ups in the session can be
+        answered locally.
+        
+        In speculative mode (search.speculative) the raw query is searched
+        while the reformulation LLM call is still running, so its results are
+        available even if reformulation is slow or times out.
+        
         Args:
             query: Original query
+            session_id: Session used for prefetch budgets and cancellation
             
         Returns:
             Search results with intelligent analysis
         """
-        import time
         start = time.time()
         
         try:
             console.print("[cyan]Performing intelligent search...[/cyan]")
             self.logger.info(f"Starting intelligent search for: {query}")
             
-            # Reformulate query for better results
-            reformulation_prompt = f"""Given this user query: "{query}"
-            
-Generate 2-3 optimized search queries that would find the most relevant information. Return only the queries, one per line."""
-            
-            reformulated = self.ollama_client.generate(reformulation_prompt)
-            search_queries = [q.strip() for q in reformulated.split('\n') if q.strip()][:3]
-            
-            console.print(f"[cyan]Generated {len(search_queries)} search variations[/cyan]")
-            
-            # Perform multiple searches
-            all_results = []
-            for sq in search_queries:
-                results = self.search_tool.search(sq, max_results=3)
-                all_results.extend(results)
-            
-            # Deduplicate by URL
-            seen_urls = set()
-            unique_results = []
-            for result in all_results:
-                if result['url'] not in seen_urls:
-                    seen_urls.add(result['url'])
-                    unique_results.append(result)
+            local_results = self._search_local_index(query)
+            if local_results:
+                duration = round(time.time() - start, 2)
+                self.logger.info(
+                    f"🔎 SearchAgent answered from local web index ({len(local_results)} documents) in {duration}s"
+                )
+                return self._format_search_results(
+                    query, local_results, note="Source: local web index (no network search)"
+                )
+            
+            speculative = None
+            if self.settings.get("speculative"):
+                # Fire the raw query immediately; reformulation runs in parallel
+                speculative = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search-speculative")
+                speculative_future = speculative.submit(self.search_tool.search, query, 3)
+            
+            try:
+                search_queries = self._reformulate(query)
+                check_cancelled()
+                
+                pending = {}
+                if speculative:
+                    pending[speculative_future] = ("web", query)
+                    # The raw query is already running; skip an identical reformulation
+                    search_queries = [
+                        sq for sq in search_queries
+                        if normalize_query(sq) != normalize_query(query)
+                    ]
+                elif not search_queries:
+                    search_queries = [query]
+                
+                console.print(f"[cyan]Generated {len(search_queries)} search variations[/cyan]")
+                
+                # Run the reformulated searches concurrently
+                unique_results = self._fan_out(query, search_queries, max_results=3, pending=pending)
+            finally:
+                if speculative:
+                    speculative.shutdown(wait=False)
+            
+            check_cancelled()
+            self._index_results(query, unique_results)
+            self._prefetch_pages(query, unique_results, session_id)
             
             duration = round(time.time() - start, 2)
             self.logger.info(f"🔎 SearchAgent finished in {duration}s using {self.model}")
@@ -268,4 +329,226 @@ Generate 2-3 optimized search queries that would find the most relevant informat
             self.logger.error(f"Search failed after {duration}s: {e}")
             # Fallback to regular search
             return self.search_and_report(query)
-
+    
+    def _search_local_index(self, query: str) -> List[Dict[str, Any]]:
+        """
+        Look the query up in the persistent web knowledge index.
+        
+        Returns results only when at least web_index.local_min_results
+        documents seen within web_index.local_max_age score above
+        web_index.local_min_score; otherwise an empty list.
+        
+        Args:
+            query: Original query
+            
+        Returns:
+            Results in the url/title/snippet shape used by the search tool
+        """
+        if not self.index_settings.get("enabled"):
+            return []
+        try:
+            hits = get_web_index(self.index_settings["name"]).search(
+                query,
+                top_k=10,
+                max_age=self.index_settings["local_max_age"],
+                min_score=self.index_settings["local_min_score"]
+            )
+        except Exception as e:
+            self.logger.warning(f"Local web index lookup failed: {e}")
+            return []
+        
+        if len(hits) < self.index_settings["local_min_results"]:
+            return []
+        return [
+            {'url': hit['url'], 'title': hit['title'], 'snippet': hit['body']}
+            for hit in hits
+        ]
+    
+    def _index_results(self, query: str, results: List[Dict[str, Any]]):
+        """Append search results to the web knowledge index in the background."""
+        if not results or not self.index_settings.get("enabled"):
+            return
+        docs = [
+            {'href': r.get('url', ''), 'title': r.get('title', ''), 'body': r.get('snippet', '')}
+            for r in results
+        ]
+        
+        def add():
+            try:
+                get_web_index(self.index_settings["name"]).add_documents(docs, query=query)
+            except Exception as e:
+                self.logger.warning(f"Failed to index search results: {e}")
+        
+        self._index_executor.submit(add)
+    
+    def _prefetch_pages(self, query: str, results: List[Dict[str, Any]], session_id: Optional[str]):
+        """Queue the top result pages for background scraping and indexing."""
+        worker = get_prefetch_worker()
+        if worker is None or not results:
+            return
+        if worker.submit(session_id or "default", query, [r.get('url', '') for r in results]):
+            self.logger.info(f"Queued top result pages for prefetch (session: {session_id or 'default'})")
+    
+    def _reformulate(self, query: str) -> List[str]:
+        """
+        Generate optimized search queries with the LLM, using a per-query cache.
+        
+        Returns an empty list if the LLM does not answer within
+        search.reformulation_timeout, so the caller can proceed with
+        speculative results instead of blocking. The late answer is still
+        cached when it arrives, so a repeat of the query does not time out
+        again.
+        
+        Args:
+            query: Original query
+            
+        Returns:
+            Up to three reformulated queries
+        """
+        key = normalize_query(query)
+        ttl = self.settings["reformulation_cache_ttl"]
+        with self._reformulation_lock:
+            cached = self._reformulation_cache.get(key)
+            if cached and time.time() - cached[0] < ttl:
+                self._reformulation_cache.move_to_end(key)
+                self.logger.info(f"Using cached reformulations for: {query}")
+                return list(cached[1])
+        
+        reformulation_prompt = f"""Given this user query: "{query}"
+            
+Generate 2-3 optimized search queries that would find the most relevant information. Return only the queries, one per line."""
+        
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search-reformulate")
+        future = executor.submit(
+            contextvars.copy_context().run, self.ollama_client.generate, reformulation_prompt, agent="search"
+        )
+        try:
+            reformulated = future.result(timeout=self.settings["reformulation_timeout"])
+        except FuturesTimeout:
+            self.logger.warning(
+                f"Reformulation timed out after {self.settings['reformulation_timeout']}s; "
+                "continuing with speculative results"
+            )
+            
+            def cache_late(late: Future):
+                if not late.cancelled() and late.exception() is None:
+                    self._cache_reformulations(key, late.result())
+                    self.logger.info(f"Cached late reformulations for: {query}")
+            
+            future.add_done_callback(cache_late)
+            return []
+        except Exception as e:
+            self.logger.warning(f"Reformulation failed ({e}); continuing with the original query")
+            return []
+        finally:
+            executor.shutdown(wait=False)
+        
+        return self._cache_reformulations(key, reformulated)
+    
+    def _cache_reformulations(self, key: str, reformulated: str) -> List[str]:
+        """Parse an LLM reformulation answer and store it under the normalized query."""
+        search_queries = [q.strip() for q in reformulated.split('\n') if q.strip()][:3]
+        
+        with self._reformulation_lock:
+            self._reformulation_cache[key] = (time.time(), search_queries)
+            self._reformulation_cache.move_to_end(key)
+            while len(self._reformulation_cache) > self.settings["reformulation_cache_size"]:
+                self._reformulation_cache.popitem(last=False)
+        
+        return search_queries
+    
+    def _fan_out(
+        self,
+        query: str,
+        search_queries: List[str],
+        max_results: int = 3,
+        pending: Optional[Dict[Future, Tuple[str, str]]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Execute several searches concurrently and merge them as they arrive.
+        
+        Each call gets search.per_call_timeout seconds from the moment it
+        starts (calls queued behind fanout_workers get their full budget);
+        searches still running when their time is up are abandoned so a slow
+        backend cannot hold up the agent. Calls that never get a worker are
+        dropped once every queued round could have run.
+        
+        Args:
+            query: Original user query (used for the optional news search)
+            search_queries: Reformulated queries to run
+            max_results: Results per query
+            pending: Already-running searches (e.g. the speculative raw query)
+                     mapped to (kind, query); their time counts from now
+            
+        Returns:
+            De-duplicated results in arrival order
+        """
+        calls: List[Tuple[str, str]] = [("web", sq) for sq in search_queries]
+        if self.settings.get("include_news"):
+            calls.append(("news", query))
+        
+        timeout = self.settings["per_call_timeout"]
+        workers = max(1, min(len(calls), self.settings["fanout_workers"]))
+        begin = time.time()
+        # Unstarted calls wait at most for every round of queued calls to have run
+        give_up_at = begin + timeout * max(1, -(-len(calls) // workers))
+        
+        seen_urls = set()
+        unique_results = []
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="search-fanout")
+        futures = dict(pending or {})
+        # Start time per call, keyed by position (pending calls count from now)
+        slots: Dict[Future, int] = {future: i for i, future in enumerate(futures)}
+        starts: Dict[int, float] = {i: begin for i in slots.values()}
+        
+        def timed(slot: int, fn, *args):
+            starts[slot] = time.time()
+            return fn(*args)
+        
+        for kind, sq in calls:
+            fn = self.search_tool.get_news if kind == "news" else self.search_tool.search
+            slot = len(slots)
+            future = executor.submit(timed, slot, fn, sq, max_results)
+            slots[future] = slot
+            futures[future] = (kind, sq)
+        
+        remaining = set(futures)
+        try:
+            while remaining:
+                now = time.time()
+                expired = {f for f in remaining
+                           if not f.done() and slots[f] in starts and now - starts[slots[f]] >= timeout}
+                if now >= give_up_at:
+                    expired = set(remaining)
+                if expired:
+                    remaining -= expired
+                    self.logger.warning(
+                        f"Search call(s) exceeded {timeout}s; skipping: {[futures[f][1] for f in expired]}"
+                    )
+                    continue
+                deadlines = [starts[slots[f]] + timeout for f in remaining if slots[f] in starts]
+                wait_s = max(0.0, min(deadlines + [give_up_at]) - now)
+                done, _ = wait(remaining, timeout=wait_s, return_when=FIRST_COMPLETED)
+                for future in done:
+                    remaining.discard(future)
+                    kind, sq = futures[future]
+                    try:
+                        results = future.result()
+                    except Exception as e:
+                        self.logger.warning(f"{kind} search failed for '{sq}': {e}")
+                        continue
+                    
+                    for result in results:
+                        if kind == "news":
+                            result = {
+                                'url': result.get('url', ''),
+                                'title': result.get('title', ''),
+                                'snippet': result.get('body', '')
+                            }
+                        if result['url'] not in seen_urls:
+                            seen_urls.add(result['url'])
+                            unique_results.append(result)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        return unique_results
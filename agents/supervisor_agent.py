@@ -4,26 +4,36 @@ Central coordinator between specialized sub-agents: SearchAgent, AnalystAgent, G
 Implements semantic routing, parallel execution, and unified report generation.
 """
 
+import contextvars
 import json
 import logging
 import os
+import re
 import sys
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout, as_completed
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from langchain_ollama import OllamaLLM
-
 from agents.search_agent import SearchAgent
 from agents.analyst_agent import AnalystAgent
 from agents.geo_agent import GeoAgent
 from agents.reflection_agent import ReflectionAgent
 from core.memory_manager import append_entry
-from core.config_loader import get_model
+from core.cancellation import CancellationToken, OperationCancelled, cancel_scope, check_cancelled, current_token
+from core.prefetch import get_prefetch_worker
+from core.config_loader import get_model, get_settings
+from core.deadline import Deadline
+from core.llm_cache import refresh_scope
+from core.llm_gateway import get_gateway, get_llm
+from core.model_scheduler import track_request
+from core.report_cache import get_report_cache
+from core.session_context import current_session, session_scope
+from core.timeline import Timeline
 
 try:
     from agents.redactor_agent import RedactorAgent
@@ -35,6 +45,12 @@ except ImportError:
             return text[:4000] if len(text) > 4000 else text
 
 
+DEFAULT_SETTINGS = {
+    "pipelined": True,        # overlap evidence packing, reflection checks, consistency check and synthesis
+    "evidence_chars": 3000,   # per-agent evidence passed to synthesis
+}
+
+
 class SupervisorAgent:
     """
     Central orchestration agent that coordinates specialized sub-agents.
@@ -46,6 +62,13 @@ class SupervisorAgent:
     - Comprehensive logging
     """
     
+    # Common countries in ACLED data
+    COMMON_COUNTRIES = [
+        "Sudan", "South Sudan", "Nigeria", "Somalia", "Ethiopia",
+        "Kenya", "Yemen", "Syria", "Iraq", "Afghanistan",
+        "Myanmar", "Ukraine", "Mali", "Burkina Faso"
+    ]
+    
     def __init__(self, model: str = None):
         """
         Initialize SupervisorAgent.
@@ -58,7 +81,7 @@ class SupervisorAgent:
         
         # Initialize LLM with error handling
         try:
-            self.llm = OllamaLLM(model=self.model, base_url="http://127.0.0.1:11434")
+            self.llm = get_llm(self.model, agent="supervisor")
         except Exception as e:
             logging.error(f"Model {self.model} not found. Run: ollama pull {self.model}")
             raise
@@ -94,6 +117,12 @@ class SupervisorAgent:
             print(f"⚠️  Warning: ReflectionAgent initialization failed: {e}")
             self.reflection_agent = None
         
+        try:
+            self.report_cache = get_report_cache()
+        except Exception as e:
+            print(f"⚠️  Warning: Report cache unavailable: {e}")
+            self.report_cache = None
+        
         # Setup logging
         self.logger = logging.getLogger("SupervisorAgent")
         self._setup_logging()
@@ -185,7 +214,8 @@ class SupervisorAgent:
         
         return agents
     
-    def _extract_country_from_query(self, query: str) -> str:
+    @staticmethod
+    def _extract_country_from_query(query: str) -> str:
         """
         Extract country name from query for GeoAgent.
         Simple heuristic: last capitalized word or common country names.
@@ -196,15 +226,8 @@ class SupervisorAgent:
         Returns:
             Extracted country name or "Sudan" as default
         """
-        # Common countries in ACLED data
-        common_countries = [
-            "Sudan", "South Sudan", "Nigeria", "Somalia", "Ethiopia",
-            "Kenya", "Yemen", "Syria", "Iraq", "Afghanistan",
-            "Myanmar", "Ukraine", "Mali", "Burkina Faso"
-        ]
-        
         # Check for exact country matches
-        for country in common_countries:
+        for country in SupervisorAgent.COMMON_COUNTRIES:
             if country.lower() in query.lower():
                 return country
         
@@ -217,7 +240,19 @@ class SupervisorAgent:
         # Default fallback
         return "Sudan"
     
-    def run(self, query: str, progress_callback=None) -> Dict[str, Any]:
+    @staticmethod
+    def _mentions_country(query: str) -> bool:
+        """Whether the query names one of the common ACLED countries."""
+        return any(country.lower() in query.lower() for country in SupervisorAgent.COMMON_COUNTRIES)
+    
+    def run(
+        self,
+        query: str,
+        progress_callback=None,
+        session_id: Optional[str] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        deadline_s: Optional[float] = None
+    ) -> Dict[str, Any]:
         """
         Execute the supervisor workflow.
         
@@ -232,13 +267,41 @@ class SupervisorAgent:
             query: User query
             progress_callback: Optional callback function for progress updates
                               Called with (event_type: str, data: dict)
+            session_id: Optional session identifier; follow-ups in a session reuse
+                        its working set (ACLED data, retrievals, searches, prior turns)
+            cancel_token: Optional token; when cancelled, agents stop at their next
+                          step and in-flight LLM calls are aborted
+            deadline_s: Optional time limit in seconds (defaults to deadline.default_s);
+                        stages that run out of budget are skipped or shortened and
+                        the report lists them under deadline.degraded
             
         Returns:
             Complete report dictionary
+            
+        Raises:
+            OperationCancelled: If cancel_token is cancelled before the report is built
         """
-        import time
+        with track_request(query) as llm_usage, cancel_scope(cancel_token), session_scope(session_id):
+            try:
+                return self._run(query, progress_callback, session_id, llm_usage, Deadline(deadline_s))
+            except OperationCancelled as e:
+                self.logger.warning(f"Supervisor run cancelled: {e}")
+                prefetch = get_prefetch_worker()
+                if session_id and prefetch:
+                    prefetch.cancel(session_id)
+                raise
+    
+    def _run(self, query: str, progress_callback, session_id: Optional[str], llm_usage,
+             deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """Supervisor workflow body; LLM calls are attributed to llm_usage, stages are bounded by deadline."""
+        deadline = deadline or Deadline()
         start_time = datetime.utcnow()
         perf_start = time.time()
+        settings = get_settings("supervisor", DEFAULT_SETTINGS)
+        pipelined = bool(settings["pipelined"])
+        timeline = Timeline(perf_start)
+        evidence: Dict[str, str] = {}
+        checks: Dict[str, Dict[str, Any]] = {}
         self.logger.info(f"Supervisor received query: {query}")
         print(f"\n{'='*80}")
         print(f"HAWK-AI Supervisor Agent")
@@ -247,10 +310,53 @@ class SupervisorAgent:
         
         # Detect which agents to use
         agents_to_use = self._detect_intent(query)
+        country = self._extract_country_from_query(query)
+        
+        # A follow-up without a country of its own continues the session's country
+        session = current_session()
+        agent_query = query
+        if session is not None and session.country and not self._mentions_country(query):
+            country = session.country
+            agent_query = f"{query} ({country})"
+            self.logger.info(f"Follow-up in session {session.session_id}: continuing with {country}")
+        session_usage = session.usage() if session is not None else None
+        
+        # Near-duplicate of a recent query: answer from its report
+        cached = None
+        if self.report_cache:
+            with deadline.stage("retrieval") as stage, timeline.span("retrieval"):
+                cached = self.report_cache.lookup(query, country, agents_to_use)
+            if stage.timed_out:
+                deadline.degrade("retrieval", "skipped report cache lookup", f"budget {stage.seconds:.1f}s")
+        if cached is not None:
+            report = self._serve_cached_report(query, cached, progress_callback, session_id, llm_usage, perf_start)
+            if session is not None:
+                session.record_turn(query, country, agents_to_use, report.get("results", {}),
+                                    report.get("summary", ""))
+            return report
+        
+        scheduler = get_gateway().scheduler
+        scheduler.plan(self._planned_models(agents_to_use))
         
         # Execute agents in parallel
+        check_cancelled()
         print(f"🕵️  Running {len(agents_to_use)} agent(s) in parallel...\n")
-        results = self._execute_agents_parallel(query, agents_to_use, progress_callback)
+        agents_budget = deadline.budget("agents") if deadline.bounded else deadline.settings["agents_timeout"]
+        agents_start = time.time()
+        
+        def on_result(agent_name: str, result: Dict[str, Any]):
+            # Called as each agent finishes, while the others are still running
+            timeline.add(f"agent:{agent_name}", agents_start)
+            if pipelined:
+                self._prepare_agent(agent_name, result, evidence, checks, timeline, settings["evidence_chars"])
+        
+        with deadline.stage("agents", agents_budget):
+            results = self._execute_agents_parallel(agent_query, agents_to_use, progress_callback, session_id,
+                                                    country, timeout=agents_budget, on_result=on_result)
+        check_cancelled()
+        for agent_name, result in results.items():
+            if result.get("status") == "timeout":
+                deadline.degrade("agents", f"dropped {agent_name}", result["error"])
         
         # Extract fusion details from AnalystAgent results
         if "analyst" in results:
@@ -261,55 +367,125 @@ class SupervisorAgent:
                     results["fusion_ratio"] = fusion_info or {"acled": "N/A", "cia": "N/A"}
                     self.logger.info(f"Fusion ratio (ACLED/CIA): {results.get('fusion_ratio')}")
         
-        # Reflection and quality assessment
+        # Reflection and quality assessment; when pipelined, the consistency check
+        # runs alongside it and synthesis starts as soon as no rerun is needed
         reflection = {}
-        if self.reflection_agent:
-            reflection = self.reflection_agent.evaluate_results(results)
-            self.logger.info(f"Reflection output: {reflection}")
-            
-            confidence = reflection.get("confidence", 1)
-            rerun_agents = reflection.get("rerun", [])
-            
-            if confidence < 0.7 and rerun_agents:
-                self.logger.warning(f"Re-running low-confidence agents: {rerun_agents}")
-                print(f"⚠️  Low confidence ({confidence:.2f}), re-running: {rerun_agents}\n")
+        consistency = None
+        scheduler.plan(self._planned_models([]))
+        reflection_budget = deadline.budget("reflection")
+        if self.reflection_agent and reflection_budget is not None \
+                and reflection_budget < deadline.settings["min_reflection_s"]:
+            deadline.degrade("reflection", "skipped reflection", f"{reflection_budget:.0f}s left in its budget")
+        elif self.reflection_agent:
+            serialized = None
+            if pipelined:
+                with timeline.span("serialize"):
+                    serialized = ReflectionAgent.serialize_results(results)
+                consistency = self._start_consistency(results, serialized, deadline, timeline)
+            with deadline.stage("reflection") as stage:
+                reflection_start = time.time()
+                with timeline.span("reflection"):
+                    reflection = self._reflect(results, pipelined, checks, serialized)
+                reflection_s = time.time() - reflection_start
+                self.logger.info(f"Reflection output: {reflection}")
                 
-                for agent_name in rerun_agents:
-                    if agent_name == "analyst" and self.analyst_agent:
-                        self.logger.info(f"Re-running analyst agent")
-                        results["analyst"] = self._run_analyst_agent(query)
-                        print(f"✓ Re-run: AnalystAgent completed")
+                confidence = reflection.get("confidence", 1)
+                rerun_agents = reflection.get("rerun", [])
+                
+                # Reruns (and the re-evaluation) must fit in what is left of the stage
+                rerun_s = sum(results.get(name, {}).get("duration_s", 0) for name in rerun_agents)
+                remaining = stage.remaining()
+                if confidence < 0.7 and rerun_agents and remaining is not None \
+                        and remaining < rerun_s + reflection_s:
+                    deadline.degrade("reflection", f"skipped rerun of {', '.join(rerun_agents)}",
+                                     f"needs ~{rerun_s + reflection_s:.0f}s, {remaining:.0f}s left")
+                elif confidence < 0.7 and rerun_agents:
+                    self.logger.warning(f"Re-running low-confidence agents: {rerun_agents}")
+                    print(f"⚠️  Low confidence ({confidence:.2f}), re-running: {rerun_agents}\n")
                     
-                    if agent_name == "geo" and self.geo_agent:
-                        country = self._extract_country_from_query(query)
-                        self.logger.info(f"Re-running geo agent for {country}")
-                        results["geo"] = self._run_geo_agent(country)
-                        print(f"✓ Re-run: GeoAgent completed")
+                    # The same prompts again would replay the cached low-confidence answers:
+                    # reruns and the re-evaluation skip cache lookups (fresh answers are stored)
+                    with refresh_scope():
+                        for agent_name in rerun_agents:
+                            check_cancelled()
+                            with timeline.span(f"rerun:{agent_name}"):
+                                if agent_name == "analyst" and self.analyst_agent:
+                                    self.logger.info(f"Re-running analyst agent")
+                                    results["analyst"] = self._run_analyst_agent(agent_query)
+                                    print(f"✓ Re-run: AnalystAgent completed")
+                            
+                                if agent_name == "geo" and self.geo_agent:
+                                    self.logger.info(f"Re-running geo agent for {country}")
+                                    results["geo"] = self._run_geo_agent(country)
+                                    print(f"✓ Re-run: GeoAgent completed")
+                            
+                                if agent_name == "search" and self.search_agent:
+                                    self.logger.info(f"Re-running search agent")
+                                    results["search"] = self._run_search_agent(agent_query, session_id)
+                                    print(f"✓ Re-run: SearchAgent completed")
+                            if pipelined and agent_name in results:
+                                self._prepare_agent(agent_name, results[agent_name], evidence, checks, timeline,
+                                                    settings["evidence_chars"])
                     
-                    if agent_name == "search" and self.search_agent:
-                        self.logger.info(f"Re-running search agent")
-                        results["search"] = self._run_search_agent(query)
-                        print(f"✓ Re-run: SearchAgent completed")
+                        # Re-evaluate after re-runs; the earlier consistency check is superseded
+                        if consistency is not None:
+                            consistency[1].cancel("superseded by rerun")
+                            with timeline.span("serialize"):
+                                serialized = ReflectionAgent.serialize_results(results)
+                            consistency = self._start_consistency(results, serialized, deadline, timeline)
+                        with timeline.span("reflection"):
+                            reflection = self._reflect(results, pipelined, checks, serialized)
+                    self.logger.info(f"Post-rerun reflection: {reflection}")
+                    confidence = reflection.get("confidence", 1)
                 
-                # Re-evaluate after re-runs
-                reflection = self.reflection_agent.evaluate_results(results)
-                self.logger.info(f"Post-rerun reflection: {reflection}")
-                confidence = reflection.get("confidence", 1)
-            
-            print(f"🧠 Reflection confidence: {confidence:.2f} (no reruns)\n")
+                print(f"🧠 Reflection confidence: {confidence:.2f} (no reruns)\n")
+            if stage.timed_out:
+                deadline.degrade("reflection", "cut short", f"budget {stage.seconds:.0f}s")
             results["reflection"] = reflection
         
         # Synthesize results
+        check_cancelled()
+        synthesis_budget = deadline.budget("synthesis")
+        synthesis_model = self.model
+        if synthesis_budget is not None and synthesis_budget < deadline.settings["fallback_below_s"] \
+                and deadline.settings["fallback_model"]:
+            synthesis_model = deadline.settings["fallback_model"]
+            if synthesis_model != self.model:
+                deadline.degrade("synthesis", f"used {synthesis_model}", f"{synthesis_budget:.0f}s left")
+        scheduler.plan([synthesis_model])
         print("🧠 Synthesizing results with LLM...\n")
         if progress_callback:
-            progress_callback("synthesis_start", {"query": query})
+            progress_callback("synthesis_start", {"query": query, "results": results})
         synth_start = time.time()
-        synthesis = self._synthesize_results(query, results)
+        synthesis = None
+        if synthesis_budget is not None and synthesis_budget < deadline.settings["min_synthesis_s"]:
+            deadline.degrade("synthesis", "extractive brief", f"{synthesis_budget:.0f}s left")
+        else:
+            with deadline.stage("synthesis") as stage:
+                synthesis = self._synthesize_results(query, results, progress_callback,
+                                                     session.prior_turns() if session is not None else None,
+                                                     model=synthesis_model, evidence=evidence if pipelined else None)
+            if stage.timed_out:
+                deadline.degrade("synthesis", "extractive brief", f"LLM synthesis exceeded {stage.seconds:.0f}s")
+        if synthesis is None:
+            synthesis = self._extractive_brief(results)
+            if progress_callback:
+                progress_callback("synthesis_revised", {"text": synthesis, "reason": "deadline"})
+        timeline.add("synthesis", synth_start)
         synth_duration = round(time.time() - synth_start, 2)
-        self.logger.info(f"SupervisorAgent synthesis finished in {synth_duration}s using {self.model}")
+        self.logger.info(f"SupervisorAgent synthesis finished in {synth_duration}s using {synthesis_model}")
         if progress_callback:
             progress_callback("synthesis_complete", {"duration": synth_duration})
         
+        # The consistency check ran alongside reflection and synthesis
+        if consistency is not None:
+            consistency_check = consistency[0].result()
+            if consistency_check is None:
+                deadline.degrade("reflection", "dropped consistency check", "no result within the deadline")
+            else:
+                reflection["consistency_check"] = consistency_check
+                self.logger.info(f"Added consistency analysis: {consistency_check.get('overall_stability')}")
+        
         # Create final report
         timestamp = start_time.isoformat()
         duration = (datetime.utcnow() - start_time).total_seconds()
@@ -317,13 +493,25 @@ class SupervisorAgent:
         report = {
             "timestamp": timestamp,
             "query": query,
+            "country": country,
             "agents": agents_to_use,
             "results": results,
             "reflection": reflection,
             "fusion_ratio": results.get("fusion_ratio", {"acled": "N/A", "cia": "N/A"}),
             "summary": synthesis,
-            "duration_seconds": round(duration, 2)
+            "duration_seconds": round(duration, 2),
+            "llm_usage": llm_usage.summary(),
+            "deadline": deadline.summary(),
+            "timeline": timeline.summary()
         }
+        if session is not None:
+            report["session"] = self._session_summary(session, session_usage, agent_query != query)
+            session.record_turn(query, country, agents_to_use, results, synthesis)
+        self.logger.info(f"Stage timeline ({report['timeline']['overlap_s']}s overlapped):\n{timeline.render()}")
+        self.logger.info(
+            f"LLM usage: {report['llm_usage']['calls']} calls, {report['llm_usage']['swaps']} model swaps, "
+            f"{report['llm_usage']['load_s']}s loading, {report['llm_usage']['cache']['hits']} cached responses"
+        )
         
         # Memory integration - log this execution
         try:
@@ -340,9 +528,12 @@ class SupervisorAgent:
         
         # Save report
         report_path = self._save_report(report)
+        if self.report_cache and self._cacheable(report):
+            self.report_cache.store(query, country, agents_to_use, str(Path(report_path).resolve()))
         
         print(f"✅ Intelligence report saved → {report_path}")
-        print(f"⏱️  Total duration: {duration:.2f}s")
+        print(f"⏱️  Total duration: {duration:.2f}s "
+              f"({report['llm_usage']['swaps']} model swaps, {report['llm_usage']['load_s']}s loading)")
         print(f"{'='*80}\n")
         
         total_perf_time = round(time.time() - perf_start, 2)
@@ -351,7 +542,179 @@ class SupervisorAgent:
         
         return report
     
-    def _execute_agents_parallel(self, query: str, agents: List[str], progress_callback=None) -> Dict[str, Any]:
+    def _session_summary(self, session, before: Dict[str, Any], inherited_country: bool) -> Dict[str, Any]:
+        """Working-set reuse during this turn, for the report."""
+        after = session.usage()
+        return {
+            "session_id": session.session_id,
+            "turn": after["turns"] + 1,
+            "inherited_country": inherited_country,
+            "reused": after["hits"] - before["hits"],
+            "loaded": after["misses"] - before["misses"],
+            "working_set_mb": after["mb"],
+        }
+    
+    def _cacheable(self, report: Dict[str, Any]) -> bool:
+        """Only complete reports are reused: every agent succeeded, the synthesis ran and nothing was degraded."""
+        if report["summary"].startswith("Synthesis unavailable") or report.get("deadline", {}).get("degraded"):
+            return False
+        return all(
+            not (isinstance(result, dict) and result.get("error"))
+            for name, result in report["results"].items() if name in report["agents"]
+        )
+    
+    def _serve_cached_report(self, query: str, report: Dict[str, Any], progress_callback,
+                             session_id: Optional[str], llm_usage, perf_start: float) -> Dict[str, Any]:
+        """
+        Return a cached report, optionally refreshing its search component.
+        
+        Args:
+            query: Current query
+            report: Report from the report cache (with its "cache" entry)
+            progress_callback: Optional progress callback
+            session_id: Optional session identifier
+            llm_usage: Usage tracker of this run
+            perf_start: Run start time
+            
+        Returns:
+            The cached report marked as a cache hit
+        """
+        cache = report["cache"]
+        print(f"♻️  Answering from cached report ({cache['age_s'] / 60:.0f} min old, "
+              f"similarity {cache['similarity']:.2f}): {cache['source_query']}\n")
+        if progress_callback:
+            progress_callback("report_cache_hit", cache)
+        
+        results = report.get("results", {})
+        if (self.report_cache.settings["delta_refresh"] and cache["intent"] == "news"
+                and "search" in report.get("agents", []) and self.search_agent):
+            # Cheap delta: only the news component goes stale quickly
+            check_cancelled()
+            if progress_callback:
+                progress_callback("agent_start", {"agent": "search"})
+            fresh = self._run_search_agent(query, session_id)
+            if fresh.get("status") == "success":
+                seen = set(re.findall(r"URL: (\S+)", str(results.get("search", {}).get("content", ""))))
+                cache["new_sources"] = [url for url in re.findall(r"URL: (\S+)", str(fresh["content"]))
+                                        if url not in seen]
+                cache["refreshed"] = ["search"]
+                results["search"] = fresh
+            if progress_callback:
+                progress_callback("agent_complete", {"agent": "search", "status": fresh.get("status"),
+                                                     "result": fresh})
+        
+        cache["original_duration_seconds"] = report.get("duration_seconds")
+        report["query"] = query
+        report["duration_seconds"] = round(time.time() - perf_start, 2)
+        report["llm_usage"] = llm_usage.summary()
+        self.logger.info(f"Served cached report for '{query}' in {report['duration_seconds']}s "
+                         f"(source: '{cache['source_query']}', refreshed: {cache.get('refreshed', [])})")
+        return report
+    
+    def _prepare_agent(self, agent_name: str, result: Dict[str, Any], evidence: Dict[str, str],
+                       checks: Dict[str, Dict[str, Any]], timeline: Timeline, limit: int):
+        """
+        Pack an agent's evidence for synthesis and run its reflection check, as soon as it finishes.
+        
+        Args:
+            agent_name: Agent that finished
+            result: Its result entry
+            evidence: Packed evidence per agent, updated in place
+            checks: ReflectionAgent.check_agent() outcomes per agent, updated in place
+            timeline: Timeline of the run
+            limit: Characters of evidence kept per agent
+        """
+        with timeline.span(f"pack:{agent_name}"):
+            packed = self._pack_evidence(result, limit)
+        if packed is None:
+            evidence.pop(agent_name, None)
+        else:
+            evidence[agent_name] = packed
+        with timeline.span(f"check:{agent_name}"):
+            checks[agent_name] = ReflectionAgent.check_agent(agent_name, result)
+        if not checks[agent_name]["ok"]:
+            self.logger.info(f"{agent_name.capitalize()}Agent check: {'; '.join(checks[agent_name]['issues'])}")
+    
+    @staticmethod
+    def _pack_evidence(result: Dict[str, Any], limit: int = 3000) -> Optional[str]:
+        """Agent content as passed to synthesis (None unless the agent succeeded)."""
+        if not isinstance(result, dict) or result.get("status") != "success":
+            return None
+        content = result.get("content", {})
+        if isinstance(content, dict):
+            # Truncate for LLM context window
+            return json.dumps(content, indent=2)[:limit]
+        return str(content)[:limit]
+    
+    def _reflect(self, results: Dict[str, Any], pipelined: bool, checks: Dict[str, Dict[str, Any]],
+                 serialized: Optional[str] = None) -> Dict[str, Any]:
+        """Main reflection; when pipelined, informed by the per-agent checks and without the consistency check."""
+        if pipelined:
+            return self.reflection_agent.evaluate_results(results, consistency=False, checks=list(checks.values()),
+                                                          serialized=serialized)
+        return self.reflection_agent.evaluate_results(results)
+    
+    def _start_consistency(self, results: Dict[str, Any], serialized: str, deadline: Deadline, timeline: Timeline):
+        """
+        Start the reflection consistency check in the background.
+        
+        It may run until the deadline's reserve, overlapping reflection and synthesis.
+        
+        Args:
+            results: Agent results (a snapshot is evaluated)
+            serialized: ReflectionAgent.serialize_results() output shared with the main reflection
+            deadline: Deadline of the run
+            timeline: Timeline of the run
+            
+        Returns:
+            (future, token): the future yields the check, or None if it ran out of time;
+            cancelling the token abandons it
+        """
+        token = CancellationToken()
+        parent = current_token()
+        unregister = parent.register(lambda: token.cancel(parent.reason or "cancelled")) if parent else None
+        remaining = deadline.remaining()
+        seconds = max(0.0, remaining - deadline.settings["reserve_s"]) if remaining is not None else None
+        snapshot = dict(results)
+        
+        def check():
+            try:
+                with cancel_scope(token), timeline.span("consistency"), \
+                        deadline.stage("consistency", seconds):
+                    return self.reflection_agent.evaluate_consistency(snapshot, serialized)
+            finally:
+                if unregister is not None:
+                    unregister()
+        
+        executor = ThreadPoolExecutor(max_workers=1)
+        future = executor.submit(contextvars.copy_context().run, check)
+        executor.shutdown(wait=False)
+        return future, token
+    
+    def _planned_models(self, agents: List[str]) -> List[str]:
+        """Models the rest of the run will call, in order: sub-agents, reflection, synthesis."""
+        models = []
+        if "search" in agents and self.search_agent:
+            models.append(get_gateway().default_model)
+        if "analyst" in agents and self.analyst_agent:
+            models.append(self.analyst_agent.model)
+        if "geo" in agents and self.geo_agent:
+            models.append(self.geo_agent.model)
+        if self.reflection_agent:
+            models.append(self.reflection_agent.model)
+        models.append(self.model)
+        return models
+    
+    def _execute_agents_parallel(
+        self,
+        query: str,
+        agents: List[str],
+        progress_callback=None,
+        session_id: Optional[str] = None,
+        country: Optional[str] = None,
+        timeout: Optional[float] = None,
+        on_result=None
+    ) -> Dict[str, Any]:
         """
         Execute multiple agents in parallel using ThreadPoolExecutor.
         
@@ -359,59 +722,106 @@ class SupervisorAgent:
             query: User query
             agents: List of agent names to execute
             progress_callback: Optional callback for progress updates
+            session_id: Optional session identifier passed to SearchAgent
+            country: Country for GeoAgent (extracted from the query if omitted)
+            timeout: Optional time limit for all agents; agents still running are
+                     reported with status "timeout" and left to stop on cancellation
+            on_result: Optional callback (agent_name, result), called as each agent finishes
             
         Returns:
-            Dictionary of agent results
+            Dictionary of agent results, each with its duration_s
         """
         results = {}
+        start = time.time()
         
-        with ThreadPoolExecutor(max_workers=3) as executor:
+        executor = ThreadPoolExecutor(max_workers=3)
+        try:
             futures = {}
             
             # Submit tasks
             if "search" in agents and self.search_agent:
                 if progress_callback:
                     progress_callback("agent_start", {"agent": "search"})
-                future = executor.submit(self._run_search_agent, query)
+                future = executor.submit(contextvars.copy_context().run, self._run_search_agent, query, session_id, True)
                 futures[future] = "search"
             
             if "analyst" in agents and self.analyst_agent:
                 if progress_callback:
                     progress_callback("agent_start", {"agent": "analyst"})
-                future = executor.submit(self._run_analyst_agent, query)
+                future = executor.submit(contextvars.copy_context().run, self._run_analyst_agent, query)
                 futures[future] = "analyst"
             
             if "geo" in agents and self.geo_agent:
                 if progress_callback:
                     progress_callback("agent_start", {"agent": "geo"})
-                country = self._extract_country_from_query(query)
-                future = executor.submit(self._run_geo_agent, country)
+                country = country or self._extract_country_from_query(query)
+                future = executor.submit(contextvars.copy_context().run, self._run_geo_agent, country)
                 futures[future] = "geo"
             
-            # Collect results
-            for future in as_completed(futures):
-                agent_name = futures[future]
-                try:
-                    result = future.result(timeout=120)
-                    results[agent_name] = result
-                    print(f"✓ {agent_name.capitalize()}Agent completed")
-                    self.logger.info(f"{agent_name.capitalize()}Agent completed successfully")
-                    if progress_callback:
-                        progress_callback("agent_complete", {"agent": agent_name, "status": "success"})
-                except Exception as e:
-                    error_msg = f"Error in {agent_name}Agent: {str(e)}"
-                    results[agent_name] = {"error": error_msg}
-                    print(f"✗ {agent_name.capitalize()}Agent failed: {e}")
-                    self.logger.error(error_msg, exc_info=True)
-                    if progress_callback:
-                        progress_callback("agent_complete", {"agent": agent_name, "status": "error", "error": str(e)})
+            # Collect results as they finish, within the time limit
+            try:
+                for future in as_completed(futures, timeout=timeout):
+                    agent_name = futures[future]
+                    try:
+                        result = future.result()
+                        result["duration_s"] = round(time.time() - start, 2)
+                        results[agent_name] = result
+                        print(f"✓ {agent_name.capitalize()}Agent completed")
+                        self.logger.info(f"{agent_name.capitalize()}Agent completed successfully")
+                        if progress_callback:
+                            progress_callback("agent_complete", {"agent": agent_name, "status": "success", "result": result})
+                    except OperationCancelled as e:
+                        # The stage budget ran out while this agent was working
+                        results[agent_name] = self._timed_out(agent_name, time.time() - start, str(e))
+                        if progress_callback:
+                            progress_callback("agent_complete", {"agent": agent_name, "status": "timeout", "error": str(e)})
+                    except Exception as e:
+                        error_msg = f"Error in {agent_name}Agent: {str(e)}"
+                        results[agent_name] = {"error": error_msg, "duration_s": round(time.time() - start, 2)}
+                        print(f"✗ {agent_name.capitalize()}Agent failed: {e}")
+                        self.logger.error(error_msg, exc_info=True)
+                        if progress_callback:
+                            progress_callback("agent_complete", {"agent": agent_name, "status": "error", "error": str(e)})
+                    if on_result:
+                        on_result(agent_name, results[agent_name])
+            except FuturesTimeout:
+                for future, agent_name in futures.items():
+                    if agent_name not in results:
+                        results[agent_name] = self._timed_out(agent_name, timeout, f"no result within {timeout:.0f}s")
+                        if progress_callback:
+                            progress_callback("agent_complete", {"agent": agent_name, "status": "timeout",
+                                                                 "error": results[agent_name]["error"]})
+                        if on_result:
+                            on_result(agent_name, results[agent_name])
+        finally:
+            # Timed-out agents are not waited for; their stage token stops them
+            executor.shutdown(wait=False, cancel_futures=True)
         
         return results
     
-    def _run_search_agent(self, query: str) -> Dict[str, Any]:
-        """Run SearchAgent and format results."""
+    def _timed_out(self, agent_name: str, elapsed: float, reason: str) -> Dict[str, Any]:
+        """Result entry for an agent that did not finish within its time limit."""
+        print(f"⏱️  {agent_name.capitalize()}Agent stopped: {reason}")
+        self.logger.warning(f"{agent_name.capitalize()}Agent stopped after {elapsed:.1f}s: {reason}")
+        return {
+            "type": agent_name,
+            "error": f"{agent_name.capitalize()}Agent stopped after {elapsed:.0f}s: {reason}",
+            "status": "timeout",
+            "duration_s": round(elapsed, 2)
+        }
+    
+    def _run_search_agent(self, query: str, session_id: Optional[str] = None, reuse: bool = False) -> Dict[str, Any]:
+        """Run SearchAgent and format results; with reuse, recent identical searches of the session are reused."""
         try:
-            search_results = self.search_agent.intelligent_search(query)
+            session = current_session() if reuse else None
+            if session is not None:
+                search_results = session.remember(
+                    "search", " ".join(query.lower().split()),
+                    lambda: self.search_agent.intelligent_search(query, session_id=session_id),
+                    max_age=session.store.settings["search_ttl"]
+                )
+            else:
+                search_results = self.search_agent.intelligent_search(query, session_id=session_id)
             return {
                 "type": "search",
                 "content": search_results,
@@ -459,17 +869,34 @@ class SupervisorAgent:
                 "status": "failed"
             }
     
-    def _synthesize_results(self, query: str, results: Dict[str, Any]) -> str:
+    def _synthesize_results(self, query: str, results: Dict[str, Any], progress_callback=None,
+                            prior_turns: Optional[List[Dict[str, Any]]] = None, model: Optional[str] = None,
+                            evidence: Optional[Dict[str, str]] = None) -> str:
         """
         Synthesize multi-agent results into cohesive intelligence brief.
         
+        With a progress callback, the brief is streamed as it is generated:
+        each token is sent as a "synthesis_token" event, and a
+        "synthesis_revised" event follows if the streamed text is later
+        condensed by the RedactorAgent or cut short by an error.
+        
         Args:
             query: Original query
             results: Dictionary of agent results
+            progress_callback: Optional callback for synthesis token events
+            prior_turns: Earlier turns of the session, for follow-up questions
+            model: Optional synthesis model overriding the supervisor's own
+            evidence: Optional per-agent evidence already packed with _pack_evidence()
             
         Returns:
             Synthesized intelligence brief
         """
+        streamed = []
+        
+        def on_token(token: str):
+            streamed.append(token)
+            progress_callback("synthesis_token", {"text": token})
+        
         try:
             # Prepare context for LLM
             context_parts = []
@@ -477,23 +904,25 @@ class SupervisorAgent:
             for agent_name, result in results.items():
                 if result.get("status") == "success":
                     context_parts.append(f"\n--- {agent_name.upper()} RESULTS ---")
-                    
-                    content = result.get("content", {})
-                    if isinstance(content, dict):
-                        # Truncate for LLM context window
-                        content_str = json.dumps(content, indent=2)[:3000]
-                        context_parts.append(content_str)
-                    else:
-                        context_parts.append(str(content)[:3000])
+                    packed = (evidence or {}).get(agent_name)
+                    context_parts.append(packed if packed is not None else self._pack_evidence(result))
             
             combined_context = "\n".join(context_parts)
             
+            # Follow-ups build on what the session already established
+            earlier = ""
+            if prior_turns:
+                earlier = "\nEarlier in this session:\n" + "\n".join(
+                    f"- Q: {turn['query']} ({turn['country']})\n  A: {turn['summary'][:600]}"
+                    for turn in prior_turns[-3:]
+                ) + "\n"
+            
             # Create synthesis prompt
             synthesis_prompt = f"""You are an intelligence analyst synthesizing information from multiple sources.
 Note the balance between short-term (ACLED) and structural (CIA_FACTS) data.
 
 Query: {query}
-
+{earlier}
 Multi-source intelligence data:
 {combined_context[:8000]}
 
@@ -525,18 +954,47 @@ Create a comprehensive intelligence brief with the following structure:
 
 Keep the brief clear, actionable, and evidence-based. Focus on synthesis, not repetition."""
             
-            # Generate synthesis
-            synthesis = self.llm.invoke(synthesis_prompt)
+            # Generate synthesis (streamed token by token when a callback is given)
+            llm = get_llm(model, agent="supervisor") if model and model != self.model else self.llm
+            synthesis = llm.invoke(synthesis_prompt, on_token=on_token if progress_callback else None)
             
             # Apply redaction/summarization if needed
             if self.redactor_agent and len(synthesis) > 5000:
                 synthesis = self.redactor_agent.create_summary(synthesis, style="professional")
+                if streamed:
+                    progress_callback("synthesis_revised", {"text": synthesis, "reason": "condensed"})
             
             return synthesis
             
         except Exception as e:
             self.logger.error(f"Synthesis failed: {e}", exc_info=True)
-            return f"Synthesis unavailable due to error: {str(e)}"
+            message = f"Synthesis unavailable due to error: {str(e)}"
+            if streamed:
+                progress_callback("synthesis_revised", {"text": message, "reason": "error"})
+            return message
+    
+    def _extractive_brief(self, results: Dict[str, Any]) -> str:
+        """
+        Brief assembled from the agents' own summaries, for when no time is left for LLM synthesis.
+        
+        Args:
+            results: Dictionary of agent results
+            
+        Returns:
+            Markdown brief
+        """
+        parts = ["Time budget exhausted before synthesis; findings as reported by each agent:"]
+        for agent_name, result in results.items():
+            if not isinstance(result, dict) or result.get("status") != "success":
+                continue
+            content = result.get("content", {})
+            if isinstance(content, dict):
+                text = content.get("synthesis") or content.get("summary") or ""
+            else:
+                text = str(content)
+            if text:
+                parts.append(f"**{agent_name.capitalize()}Agent**\n{text.strip()[:1500]}")
+        return "\n\n".join(parts)
     
     def _save_report(self, report: Dict[str, Any]) -> str:
         """
@@ -589,12 +1047,19 @@ def main():
         help="Ollama model for synthesis"
     )
     
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        default=None,
+        help="Time limit in seconds; stages that run out of budget are skipped or shortened"
+    )
+    
     args = parser.parse_args()
     
     try:
         # Initialize and run supervisor
         supervisor = SupervisorAgent(model=args.model)
-        report = supervisor.run(args.query)
+        report = supervisor.run(args.query, deadline_s=args.deadline)
         
         # Display summary
         print("\n" + "="*80)
@@ -602,6 +1067,8 @@ def main():
         print("="*80)
         print(report.get("summary", "No summary available"))
         print("="*80 + "\n")
+        for item in report.get("deadline", {}).get("degraded", []):
+            print(f"⏱️  Degraded {item['stage']}: {item['action']} ({item['detail']})")
         
     except Exception as e:
         print(f"\n❌ ERROR: {e}", file=sys.stderr)
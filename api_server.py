@@ -8,12 +8,14 @@ from pathlib import Path
 from typing import Optional
 from datetime import datetime
 import asyncio
+import functools
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
+from starlette.background import BackgroundTask
+from pydantic import BaseModel, Field
 import uvicorn
 
 # Add project root to path
@@ -21,10 +23,20 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from core.orchestrator import get_orchestrator
 from agents import register_all_agents
+from core.progress_bridge import ProgressBridge
+from core.cancellation import CancellationToken
+from core.admission import AdmissionRejected, get_admission_controller
+from core.jobs import JobManager
 from core.streaming_formatter import (
     format_progress_chunk,
     format_agent_result,
-    stream_supervisor_result,
+    format_synthesis_chunk,
+    format_synthesis_revision,
+    format_done_chunk,
+    format_job_event,
+    describe_cache_hit,
+    describe_degradation,
+    stream_agent_summaries,
     extract_synthesis_from_result
 )
 
@@ -60,6 +72,10 @@ app.mount("/static", StaticFiles(directory=str(Path(__file__).parent)), name="st
 
 # Global orchestrator instance
 orchestrator = None
+# Background analysis jobs (POST /jobs)
+job_manager = None
+# Global concurrency limit and priority queue for analyses
+admission = None
 
 
 class ChatRequest(BaseModel):
@@ -67,6 +83,7 @@ class ChatRequest(BaseModel):
     query: str
     session_id: Optional[str] = None
     stream: Optional[bool] = False
+    deadline_s: Optional[float] = Field(None, gt=0)  # answer within this many seconds, degrading if needed
 
 
 class ChatResponse(BaseModel):
@@ -79,6 +96,13 @@ class ChatResponse(BaseModel):
     timestamp: str
 
 
+class JobRequest(BaseModel):
+    """Request model for background analysis jobs."""
+    query: str
+    session_id: Optional[str] = None
+    deadline_s: Optional[float] = Field(None, gt=0)
+
+
 class StatusResponse(BaseModel):
     """System status response."""
     status: str
@@ -90,12 +114,14 @@ class StatusResponse(BaseModel):
 @app.on_event("startup")
 async def startup_event():
     """Initialize HAWK-AI on startup."""
-    global orchestrator
+    global orchestrator, job_manager, admission
     print("🚀 Starting HAWK-AI API Server...")
     print("📋 Registering agents...")
     register_all_agents()
     print("🔧 Initializing orchestrator...")
     orchestrator = get_orchestrator()
+    admission = get_admission_controller()
+    job_manager = JobManager(orchestrator.execute_task_streaming, admission=admission)
     print("✅ HAWK-AI ready!")
 
 
@@ -148,7 +174,7 @@ async def chat(request: ChatRequest):
     Process a chat query through HAWK-AI with streaming support.
     
     Args:
-        request: ChatRequest with query, optional session_id, and stream flag
+        request: ChatRequest with query, optional session_id, stream flag and deadline_s
         
     Returns:
         ChatResponse (non-streaming) or StreamingResponse (streaming)
@@ -164,22 +190,21 @@ async def chat(request: ChatRequest):
         if request.stream:
             print(f"🔄 Streaming mode enabled for query: {request.query[:50]}...")
             # Return streaming response in OpenAI format
-            return StreamingResponse(
-                stream_chat_response(request.query, "hawk-ai-supervisor"),
-                media_type="text/event-stream",
-                headers={
-                    "Cache-Control": "no-cache",
-                    "Connection": "keep-alive",
-                    "X-Accel-Buffering": "no"
-                }
-            )
+            return _admitted_stream(request.query, "hawk-ai-supervisor", request.session_id, request.deadline_s)
         
         # Non-streaming mode (original behavior)
-        # Execute query through orchestrator
-        result = await asyncio.to_thread(
-            orchestrator.execute_task,
-            request.query
-        )
+        # Execute query through orchestrator once admitted
+        ticket = admission.reserve("interactive")
+        try:
+            result = await _run_on_admission_pool(
+                ticket,
+                orchestrator.execute_task,
+                request.query,
+                {"session_id": request.session_id, "deadline_s": request.deadline_s}
+            )
+        finally:
+            # Cancelled before the worker thread started: don't leave the ticket queued
+            admission.abandon(ticket)
         
         # Prepare response
         if result['status'] == 'success':
@@ -201,6 +226,10 @@ async def chat(request: ChatRequest):
                 detail=result.get('error', 'Unknown error occurred')
             )
     
+    except AdmissionRejected as e:
+        raise _busy(e)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -227,90 +256,331 @@ async def get_history():
         raise HTTPException(status_code=500, detail=str(e))
 
 
-async def stream_chat_response(query: str, model: str):
+def _busy(e: AdmissionRejected) -> HTTPException:
+    """429/503 response with a Retry-After estimate for a rejected request."""
+    return HTTPException(status_code=e.status_code, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+
+def _run_admitted(ticket, fn, *args, **kwargs):
+    """
+    Wait for an admission slot, then run fn (blocking; call from a worker thread).
+    
+    Queue positions are reported through the progress_callback keyword, and
+    the wait is abandoned when the cancel_token keyword is cancelled.
+    
+    Args:
+        ticket: Ticket from admission.reserve()
+        fn: Orchestrator method to run
+        *args, **kwargs: Passed to fn
+        
+    Returns:
+        fn's result
+    """
+    progress_callback = kwargs.get("progress_callback")
+    
+    def queued(position: int, eta_s: int):
+        if progress_callback:
+            progress_callback("queue_position", {"position": position, "eta_s": eta_s})
+    
+    with admission.slot(ticket, on_position=queued, cancel_token=kwargs.get("cancel_token")):
+        return fn(*args, **kwargs)
+
+
+async def _run_on_admission_pool(ticket, fn, *args):
+    """
+    Run _run_admitted on the admission controller's worker pool.
+    
+    Analyses hold their thread for minutes, so they stay off asyncio's
+    default executor that other endpoints use for quick blocking calls.
+    
+    Args:
+        ticket: Ticket from admission.reserve()
+        fn: Orchestrator method to run
+        *args: Passed to fn
+        
+    Returns:
+        fn's result
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(admission.executor(), functools.partial(_run_admitted, ticket, fn, *args))
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """Admission queue, background job, LLM gateway, session working set and reflection cascade metrics."""
+    if not orchestrator:
+        raise HTTPException(status_code=503, detail="System not initialized")
+    from agents.reflection_agent import get_cascade_metrics
+    from core.llm_gateway import get_gateway
+    from core.session_context import get_session_store
+    
+    return {
+        "admission": admission.stats(),
+        "jobs": job_manager.stats(),
+        "llm_gateway": get_gateway().metrics(),
+        "session_context": get_session_store().stats(),
+        "reflection_cascade": get_cascade_metrics().stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Cancel running jobs; they are reported as interrupted on the next start."""
+    if job_manager:
+        job_manager.shutdown()
+    if admission:
+        admission.shutdown()
+
+
+@app.post("/jobs", status_code=202)
+async def create_job(request: JobRequest):
+    """
+    Start an analysis in the background and return its id immediately.
+    
+    Args:
+        request: JobRequest with query and optional session_id
+        
+    Returns:
+        Job id and URLs for status and events
+    """
+    if not job_manager:
+        raise HTTPException(status_code=503, detail="System not initialized")
+    if not request.query.strip():
+        raise HTTPException(status_code=400, detail="Query cannot be empty")
+    
+    try:
+        job_id = job_manager.submit(request.query, request.session_id, deadline_s=request.deadline_s)
+    except AdmissionRejected as e:
+        raise _busy(e)
+    return {
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": f"/jobs/{job_id}",
+        "events_url": f"/jobs/{job_id}/events"
+    }
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Job status, partial results so far and the final result once finished.
+    
+    Args:
+        job_id: Job id from POST /jobs
+    """
+    if not job_manager:
+        raise HTTPException(status_code=503, detail="System not initialized")
+    job = await asyncio.to_thread(job_manager.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return {"job_id": job.pop("id"), **job}
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """
+    Cancel a queued or running job.
+    
+    Args:
+        job_id: Job id from POST /jobs
+    """
+    if not job_manager:
+        raise HTTPException(status_code=503, detail="System not initialized")
+    job = await asyncio.to_thread(job_manager.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    cancelled = job_manager.cancel(job_id)
+    return {"job_id": job_id, "cancelled": cancelled, "status": job["status"]}
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(
+    job_id: str,
+    last_event_id: Optional[str] = Header(default=None),
+    after: Optional[int] = Query(default=None, description="Resume after this event id")
+):
+    """
+    Resumable SSE stream of a job's progress events.
+    
+    Replays the stored log after Last-Event-ID (header) or ?after=, then
+    follows new events until the job ends. Reconnecting never re-runs the job.
+    
+    Args:
+        job_id: Job id from POST /jobs
+        last_event_id: Last-Event-ID header sent by reconnecting EventSource clients
+        after: Query-parameter alternative to Last-Event-ID
+    """
+    if not job_manager:
+        raise HTTPException(status_code=503, detail="System not initialized")
+    if await asyncio.to_thread(job_manager.store.get, job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    
+    try:
+        resume_after = int(last_event_id) if last_event_id else (after or 0)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Last-Event-ID must be an integer")
+    
+    async def stream():
+        yield format_job_event(retry_ms=3000)
+        async for event in job_manager.follow(job_id, resume_after):
+            yield format_job_event(event)
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
+def _admitted_stream(query: str, model: str, session_id: Optional[str],
+                     deadline_s: Optional[float]) -> StreamingResponse:
+    """
+    Reserve an admission ticket and stream the analysis for it.
+    
+    The queue-full check (429) happens here, before the response starts.
+    The ticket is abandoned in a background task that runs once the response
+    is over, even if Starlette cancelled it before the generator started.
+    
+    Args:
+        query: User query
+        model: Model name
+        session_id: Optional session identifier
+        deadline_s: Optional analysis deadline in seconds
+        
+    Returns:
+        SSE StreamingResponse
+    
+    Raises:
+        AdmissionRejected: The admission queue is full
+    """
+    ticket = admission.reserve("interactive")
+    return StreamingResponse(
+        stream_chat_response(query, model, session_id, ticket, deadline_s),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"
+        },
+        background=BackgroundTask(admission.abandon, ticket)
+    )
+
+
+async def stream_chat_response(query: str, model: str, session_id: Optional[str] = None, ticket=None,
+                               deadline_s: Optional[float] = None):
     """
     Async generator for streaming chat responses.
     
     Args:
         query: User query
         model: Model name
+        session_id: Optional session identifier
+        ticket: Admission ticket reserved by the endpoint
+        deadline_s: Optional analysis deadline in seconds
         
     Yields:
         SSE-formatted chunks
     """
-    import queue
-    import threading
+    # Progress events are handed from the worker thread to this coroutine
+    # through the event loop, so waiting never blocks other connections
+    bridge = ProgressBridge(executor=admission.executor())
+    # Cancelled if the client disconnects, so agents and Ollama stop working for nobody
+    cancel_token = CancellationToken()
+    task = bridge.run_in_thread(
+        _run_admitted,
+        ticket or admission.reserve("interactive"),
+        orchestrator.execute_task_streaming,
+        query,
+        progress_callback=bridge.callback,
+        context={"session_id": session_id, "deadline_s": deadline_s},
+        cancel_token=cancel_token
+    )
     
-    # Create a queue for progress updates
-    progress_queue = queue.Queue()
-    result_container = {}
+    chunk_id = f"chatcmpl-{int(datetime.now().timestamp())}"
+    try:
+        async for chunk in _stream_events(bridge, task, chunk_id):
+            yield chunk
+    finally:
+        # Starlette closes this generator when the client goes away
+        if not task.done():
+            cancel_token.cancel("client disconnected")
+
+
+async def _stream_events(bridge: ProgressBridge, task: "asyncio.Future", chunk_id: str):
+    """
+    Translate bridge events into SSE chunks until the task finishes.
     
-    def execute_with_callback():
-        """Execute orchestrator in background thread with progress callback."""
-        def progress_callback(event_type: str, data: dict):
-            progress_queue.put({"type": event_type, "data": data})
+    Args:
+        bridge: Progress bridge fed by the orchestrator thread
+        task: Future for the orchestrator result
+        chunk_id: Chunk ID for SSE
         
-        try:
-            # Execute with streaming support
-            result = orchestrator.execute_task_streaming(query, progress_callback=progress_callback)
-            result_container['result'] = result
-            progress_queue.put({"type": "done", "data": {}})
-        except Exception as e:
-            result_container['error'] = str(e)
-            progress_queue.put({"type": "error", "data": {"error": str(e)}})
-    
-    # Start background execution
-    thread = threading.Thread(target=execute_with_callback, daemon=True)
-    thread.start()
-    
-    chunk_id = f"chatcmpl-{int(datetime.now().timestamp())}"
+    Yields:
+        SSE chunks
+    """
+    synthesis_streamed = False
     
     # Stream progress updates
-    while True:
-        try:
-            event = progress_queue.get(timeout=0.5)
-            
-            if event["type"] == "agent_start":
-                agent_name = event["data"].get("agent", "unknown")
-                yield format_progress_chunk(agent_name, "starting", chunk_id)
-            
-            elif event["type"] == "agent_complete":
-                agent_name = event["data"].get("agent", "unknown")
-                yield format_progress_chunk(agent_name, "completed", chunk_id)
-            
-            elif event["type"] == "synthesis_start":
-                yield format_progress_chunk("supervisor", "Synthesizing results...", chunk_id)
-            
-            elif event["type"] == "done":
-                # Stream the final result
-                if 'result' in result_container:
-                    result = result_container['result']
-                    async for chunk in async_stream_result(result, chunk_id):
-                        yield chunk
-                break
-            
-            elif event["type"] == "error":
-                error_msg = event["data"].get("error", "Unknown error")
-                yield format_progress_chunk("error", f"Error: {error_msg}", chunk_id)
-                break
-        
-        except queue.Empty:
-            # Check if thread is still alive
-            if not thread.is_alive() and 'result' in result_container:
-                # Thread finished, stream the result
-                result = result_container['result']
-                async for chunk in async_stream_result(result, chunk_id):
+    async for event in bridge:
+        if event["type"] == "agent_start":
+            agent_name = event["data"].get("agent", "unknown")
+            yield format_progress_chunk(agent_name, "starting", chunk_id)
+        
+        elif event["type"] == "queue_position":
+            data = event["data"]
+            yield format_progress_chunk(
+                "queue", f"Waiting for a free slot (position {data['position']}, ~{data['eta_s']}s)", chunk_id
+            )
+        
+        elif event["type"] == "report_cache_hit":
+            yield format_progress_chunk("supervisor", "Reusing a recent report for a similar query", chunk_id)
+        
+        elif event["type"] == "agent_complete":
+            agent_name = event["data"].get("agent", "unknown")
+            yield format_progress_chunk(agent_name, "completed", chunk_id)
+        
+        elif event["type"] == "synthesis_start":
+            yield format_progress_chunk("supervisor", "Synthesizing results...", chunk_id)
+            if event["data"].get("results"):
+                for chunk in stream_agent_summaries(event["data"]["results"], chunk_id,
+                                                    header="\n**Analysis Complete**\n\n"):
                     yield chunk
-                break
-            elif not thread.is_alive() and 'error' in result_container:
-                error_msg = result_container['error']
-                yield format_progress_chunk("error", f"Error: {error_msg}", chunk_id)
-                break
+        
+        elif event["type"] == "synthesis_token":
+            # Tokens are forwarded as Ollama produces them (coalesced if the client lags)
+            synthesis_streamed = True
+            yield format_synthesis_chunk(event["data"]["text"], chunk_id)
+        
+        elif event["type"] == "synthesis_revised":
+            yield format_synthesis_revision(event["data"]["text"], event["data"].get("reason"), chunk_id)
+        
+        elif event["type"] == "done":
+            # Stream the final result
+            if synthesis_streamed:
+                yield format_synthesis_chunk("\n", chunk_id)
+                report = task.result().get("result")
+                if isinstance(report, dict) and report.get("deadline", {}).get("degraded"):
+                    yield format_synthesis_chunk("\n" + describe_degradation(report["deadline"]), chunk_id)
+                yield format_done_chunk(chunk_id)
+            else:
+                async for chunk in async_stream_result(task.result(), chunk_id):
+                    yield chunk
+            break
+        
+        elif event["type"] == "error":
+            error_msg = event["data"].get("error", "Unknown error")
+            yield format_progress_chunk("error", f"Error: {error_msg}", chunk_id)
+            break
 
 
 async def async_stream_result(result: dict, chunk_id: str):
     """
-    Async wrapper for streaming supervisor result.
+    Stream a completed result whose synthesis was not streamed token by token.
     
     Args:
         result: Supervisor result dictionary
@@ -319,33 +589,24 @@ async def async_stream_result(result: dict, chunk_id: str):
     Yields:
         SSE chunks
     """
-    from core.streaming_formatter import format_synthesis_chunk, format_done_chunk
-    
     # Extract agent results and format them
     if result.get('status') == 'success' and 'result' in result:
         supervisor_result = result['result']
         
-        # Stream agent summaries
-        if isinstance(supervisor_result, dict) and 'results' in supervisor_result:
-            yield format_synthesis_chunk("\n**Analysis Complete**\n\n", chunk_id)
-            
-            for agent_name, agent_result in supervisor_result['results'].items():
-                if agent_name not in ["reflection", "fusion_ratio"]:
-                    agent_summary = format_agent_result(agent_name, agent_result)
-                    yield format_synthesis_chunk(agent_summary, chunk_id)
-            
-            yield format_synthesis_chunk("---\n\n**Synthesis**\n\n", chunk_id)
+        if isinstance(supervisor_result, dict) and supervisor_result.get('cache'):
+            yield format_synthesis_chunk("\n" + describe_cache_hit(supervisor_result['cache']), chunk_id)
         
-        # Stream synthesis
-        synthesis = extract_synthesis_from_result(supervisor_result)
+        if isinstance(supervisor_result, dict) and supervisor_result.get('deadline', {}).get('degraded'):
+            yield format_synthesis_chunk("\n" + describe_degradation(supervisor_result['deadline']), chunk_id)
         
-        # Stream word by word for smooth effect
-        words = synthesis.split()
-        for i in range(0, len(words), 3):
-            chunk_text = " ".join(words[i:i+3]) + " "
-            yield format_synthesis_chunk(chunk_text, chunk_id)
-            await asyncio.sleep(0.01)  # Small delay for smooth streaming
+        # Stream agent summaries
+        if isinstance(supervisor_result, dict) and 'results' in supervisor_result:
+            for chunk in stream_agent_summaries(supervisor_result['results'], chunk_id,
+                                                header="\n**Analysis Complete**\n\n"):
+                yield chunk
         
+        # The synthesis is already complete: send it as one chunk
+        yield format_synthesis_chunk(extract_synthesis_from_result(supervisor_result), chunk_id)
         yield format_synthesis_chunk("\n", chunk_id)
     else:
         # Error case
@@ -397,6 +658,9 @@ async def chat_completions(request: dict):
         # Get model and other parameters
         model = request.get('model', 'hawk-ai-supervisor')
         session_id = request.get('session_id') or request.get('chat_id', 'default')
+        deadline_s = request.get('deadline_s')
+        if deadline_s is not None and (not isinstance(deadline_s, (int, float)) or deadline_s <= 0):
+            raise HTTPException(status_code=400, detail="deadline_s must be a positive number of seconds")
         # DEFAULT TO STREAMING for Open WebUI compatibility
         stream = request.get('stream', True)
         
@@ -404,22 +668,21 @@ async def chat_completions(request: dict):
         if stream:
             print(f"🔄 Streaming mode enabled (OpenAI endpoint) for query: {query[:50]}...")
             # Return streaming response
-            return StreamingResponse(
-                stream_chat_response(query, model),
-                media_type="text/event-stream",
-                headers={
-                    "Cache-Control": "no-cache",
-                    "Connection": "keep-alive",
-                    "X-Accel-Buffering": "no"
-                }
-            )
+            return _admitted_stream(query, model, session_id, deadline_s)
         
         # Non-streaming mode (backward compatible)
-        # Execute query through orchestrator
-        result = await asyncio.to_thread(
-            orchestrator.execute_task,
-            query
-        )
+        # Execute query through orchestrator once admitted
+        ticket = admission.reserve("interactive")
+        try:
+            result = await _run_on_admission_pool(
+                ticket,
+                orchestrator.execute_task,
+                query,
+                {"session_id": session_id, "deadline_s": deadline_s}
+            )
+        finally:
+            # Cancelled before the worker thread started: don't leave the ticket queued
+            admission.abandon(ticket)
         
         # Prepare OpenAI-compatible response
         if result['status'] == 'success':
@@ -454,6 +717,8 @@ async def chat_completions(request: dict):
                 detail=result.get('error', 'Unknown error occurred')
             )
     
+    except AdmissionRejected as e:
+        raise _busy(e)
     except HTTPException:
         raise
     except Exception as e:
@@ -481,6 +746,12 @@ def extract_response_with_agents(result: dict) -> str:
     # Extract supervisor result
     supervisor_result = result.get('result', {})
     
+    if isinstance(supervisor_result, dict) and supervisor_result.get('cache'):
+        response_parts.append(describe_cache_hit(supervisor_result['cache']))
+    
+    if isinstance(supervisor_result, dict) and supervisor_result.get('deadline', {}).get('degraded'):
+        response_parts.append(describe_degradation(supervisor_result['deadline']))
+    
     # Add agent results if available
     if isinstance(supervisor_result, dict) and 'results' in supervisor_result:
         response_parts.append("**Multi-Agent Analysis**\n")
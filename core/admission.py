@@ -0,0 +1,366 @@
+"""
+HAWK-AI Admission Control
+=========================
+Global limit on concurrently running analyses, with a bounded priority queue.
+
+Every supervisor run fans out to several agents and LLM calls. Starting all
+incoming queries at once piles them onto Ollama, so each gets slower and
+eventually times out. The admission controller lets at most max_concurrent
+runs proceed; the rest wait in a bounded queue:
+
+- Priority classes: interactive chat is admitted before batch jobs; waiting
+  tickets age (one class per aging_s) so batch work is not starved
+- Queue position and estimated wait are reported while waiting, so the
+  progress stream can show them ("queue_position" events)
+- When the queue is full, reserve() raises AdmissionRejected (HTTP 429);
+  a ticket that waits longer than max_wait is rejected with HTTP 503.
+  Both carry a Retry-After estimate from recent run durations
+- Ordering, aging and max_wait count from when wait() starts: a ticket
+  reserved ahead of time (e.g. a job waiting for a worker) holds a queue
+  place but never blocks the head while nobody waits on it
+- executor() is a dedicated worker pool with one thread per admitted or
+  queued run, so waiting runs never occupy asyncio's shared default
+  executor and every queued stream can still report its position
+- A ticket whose waiter never arrived is dropped by abandon() when the
+  request ends, so it cannot block the queue head
+- Queue depth, wait times and run times are exported through stats()
+
+Usage:
+    controller = get_admission_controller()
+    ticket = controller.reserve("interactive")      # may raise AdmissionRejected
+    with controller.slot(ticket, on_position=report, cancel_token=token):
+        run_analysis()
+    controller.abandon(ticket)   # when the request ends; no-op once admitted
+"""
+
+import logging
+import math
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.cancellation import CancellationToken
+from core.config_loader import get_settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    "enabled": True,
+    "max_concurrent": 2,       # analyses running at once
+    "max_queue": 16,           # waiting analyses before new ones get 429
+    "max_wait": 300,           # seconds a ticket may wait before it gets 503
+    "aging_s": 120,            # waiting this long raises a ticket by one priority class
+    "position_interval_s": 5,  # re-report queue position at least this often
+    "priorities": {"interactive": 0, "batch": 1},   # lower runs first
+    "default_run_s": 60,       # run time assumed for Retry-After before any run finished
+}
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be queued (429) or waited too long (503)."""
+
+    def __init__(self, message: str, status_code: int = 429, retry_after: int = 1):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """A reserved place in the admission queue."""
+
+    def __init__(self, priority: str, rank: int, exempt: bool = False):
+        self.priority = priority
+        self.rank = rank
+        self.exempt = exempt
+        self.enqueued_at = time.time()
+        self.waiting_since: Optional[float] = None
+        self.admitted_at: Optional[float] = None
+        self.released = False
+
+    def effective_rank(self, now: float, aging_s: float) -> float:
+        waited = now - (self.waiting_since or self.enqueued_at)
+        return self.rank - (waited / aging_s if aging_s else 0.0)
+
+
+class AdmissionController:
+    """Concurrency limit plus bounded priority queue for analysis runs."""
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
+        """
+        Initialize from the admission section of settings.yaml.
+
+        Args:
+            settings: Optional settings override
+        """
+        self.settings = {**DEFAULT_SETTINGS, **(settings or get_settings("admission", DEFAULT_SETTINGS))}
+        self.priorities: Dict[str, int] = dict(self.settings["priorities"])
+        self._cond = threading.Condition()
+        self._waiting: List[Ticket] = []
+        self._active = 0
+        self._waits: Deque[float] = deque(maxlen=500)
+        self._run_s: Optional[float] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self.counters = {"admitted": 0, "rejected_full": 0, "rejected_timeout": 0,
+                         "cancelled": 0, "max_queue_depth": 0}
+
+    # ------------------------------------------------------------- queueing
+
+    def reserve(self, priority: str = "interactive") -> Ticket:
+        """
+        Reserve a place in the queue without blocking.
+
+        Args:
+            priority: Priority class ("interactive", "batch", ...)
+
+        Returns:
+            Ticket to pass to slot()
+
+        Raises:
+            AdmissionRejected: The queue is full (status 429)
+        """
+        if not self.settings["enabled"]:
+            return Ticket(priority, 0, exempt=True)
+        rank = self.priorities.get(priority, max(self.priorities.values(), default=0))
+        with self._cond:
+            if len(self._waiting) >= self.settings["max_queue"]:
+                self.counters["rejected_full"] += 1
+                retry_after = self._estimate_wait(len(self._waiting) + 1)
+                logger.warning(f"Admission queue full ({len(self._waiting)} waiting); rejecting {priority} request")
+                raise AdmissionRejected("Server busy: analysis queue is full", 429, retry_after)
+            ticket = Ticket(priority, rank)
+            self._waiting.append(ticket)
+            self.counters["max_queue_depth"] = max(self.counters["max_queue_depth"], len(self._waiting))
+            self._cond.notify_all()
+        return ticket
+
+    def _ordered(self) -> List[Ticket]:
+        """
+        Tickets whose waiter has arrived, in admission order. Caller holds the lock.
+
+        A reserved ticket nobody waits on yet (a job still queued for a worker
+        thread) keeps its queue place but cannot hold up the head of the queue.
+        """
+        now = time.time()
+        aging_s = self.settings["aging_s"]
+        return sorted((t for t in self._waiting if t.waiting_since is not None),
+                      key=lambda t: (t.effective_rank(now, aging_s), t.enqueued_at))
+
+    def _estimate_wait(self, position: int) -> int:
+        """Seconds until a ticket at position is likely admitted. Caller holds the lock."""
+        run_s = self._run_s if self._run_s is not None else self.settings["default_run_s"]
+        rounds = math.ceil(position / max(1, self.settings["max_concurrent"]))
+        return max(1, int(rounds * run_s))
+
+    def wait(
+        self,
+        ticket: Ticket,
+        on_position: Optional[Callable[[int, int], None]] = None,
+        cancel_token: Optional[CancellationToken] = None,
+    ):
+        """
+        Block until the ticket is admitted.
+
+        Args:
+            ticket: Ticket from reserve()
+            on_position: Called with (position, estimated_wait_s) while queued
+            cancel_token: Optional token; cancelling it abandons the wait
+
+        Raises:
+            AdmissionRejected: Waited longer than max_wait (status 503)
+            OperationCancelled: The token was cancelled while waiting
+        """
+        if ticket.exempt:
+            ticket.admitted_at = time.time()
+            return
+        unregister = cancel_token.register(self._wake) if cancel_token is not None else None
+        reported = (None, 0.0)
+        try:
+            with self._cond:
+                if ticket.waiting_since is None:
+                    ticket.waiting_since = time.time()
+                    self._cond.notify_all()
+                while True:
+                    if ticket.released:
+                        raise AdmissionRejected("Request abandoned before it was admitted", 503, 1)
+                    order = self._ordered()
+                    position = order.index(ticket) + 1
+                    if position == 1 and self._active < self.settings["max_concurrent"]:
+                        break
+                    if cancel_token is not None and cancel_token.cancelled:
+                        self._leave(ticket)
+                        self.counters["cancelled"] += 1
+                        cancel_token.raise_if_cancelled()
+                    waited = time.time() - ticket.waiting_since
+                    if waited >= self.settings["max_wait"]:
+                        self._leave(ticket)
+                        self.counters["rejected_timeout"] += 1
+                        raise AdmissionRejected(
+                            f"Server busy: waited {waited:.0f}s for an analysis slot", 503,
+                            self._estimate_wait(position)
+                        )
+                    now = time.time()
+                    if on_position and (position != reported[0]
+                                        or now - reported[1] >= self.settings["position_interval_s"]):
+                        reported = (position, now)
+                        on_position(position, self._estimate_wait(position))
+                    self._cond.wait(timeout=min(self.settings["position_interval_s"],
+                                                self.settings["max_wait"] - waited))
+                self._waiting.remove(ticket)
+                self._active += 1
+                ticket.admitted_at = time.time()
+                self._waits.append(ticket.admitted_at - ticket.enqueued_at)
+                self.counters["admitted"] += 1
+                self._cond.notify_all()
+        finally:
+            if unregister is not None:
+                unregister()
+        if reported[0] is not None:
+            logger.info(f"Admitted {ticket.priority} request after {ticket.admitted_at - ticket.enqueued_at:.1f}s")
+
+    def release(self, ticket: Ticket):
+        """
+        Free the ticket's slot, or its queue place if it was never admitted.
+
+        Args:
+            ticket: Ticket from reserve()
+        """
+        if ticket.exempt or ticket.released:
+            return
+        with self._cond:
+            ticket.released = True
+            if ticket.admitted_at is None:
+                self._leave(ticket)
+                return
+            self._active -= 1
+            run_s = time.time() - ticket.admitted_at
+            self._run_s = run_s if self._run_s is None else 0.8 * self._run_s + 0.2 * run_s
+            self._cond.notify_all()
+
+    def abandon(self, ticket: Ticket):
+        """
+        Give up a ticket's queue place if it was never admitted.
+
+        Endpoints call this once the request is over. A ticket whose waiter
+        never started (e.g. the stream was cancelled before iterating) would
+        otherwise stay at the head of the queue and block every later
+        request; an admitted ticket is left to its slot() to release.
+
+        Args:
+            ticket: Ticket from reserve()
+        """
+        if ticket.exempt:
+            return
+        with self._cond:
+            if ticket.admitted_at is None and not ticket.released:
+                self._leave(ticket)
+                logger.info(f"Abandoned {ticket.priority} ticket that was never admitted")
+
+    @contextmanager
+    def slot(
+        self,
+        ticket: Ticket,
+        on_position: Optional[Callable[[int, int], None]] = None,
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> Iterator[Ticket]:
+        """
+        Wait for admission, hold the slot for the block and release it afterwards.
+
+        Args:
+            ticket: Ticket from reserve()
+            on_position: Called with (position, estimated_wait_s) while queued
+            cancel_token: Optional token; cancelling it abandons the wait
+
+        Yields:
+            The admitted ticket
+        """
+        try:
+            self.wait(ticket, on_position, cancel_token)
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def _leave(self, ticket: Ticket):
+        """Drop a ticket from the queue. Caller holds the lock."""
+        if ticket in self._waiting:
+            self._waiting.remove(ticket)
+        ticket.released = True
+        self._cond.notify_all()
+
+    def _wake(self):
+        with self._cond:
+            self._cond.notify_all()
+
+    # ---------------------------------------------------------------- workers
+
+    def executor(self) -> ThreadPoolExecutor:
+        """
+        Worker pool for runs that go through this controller.
+
+        Sized to max_concurrent + max_queue: every admitted or queued run
+        gets its own thread (further requests are rejected with 429), so a
+        queued run can report its position right away.
+
+        Returns:
+            Shared ThreadPoolExecutor, created on first use
+        """
+        with self._executor_lock:
+            if self._executor is None:
+                workers = self.settings["max_concurrent"] + self.settings["max_queue"]
+                self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hawk-analysis")
+            return self._executor
+
+    def shutdown(self):
+        """Stop the worker pool without waiting for running analyses."""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    # --------------------------------------------------------------- metrics
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth per priority, active runs, wait and run time statistics."""
+        with self._cond:
+            waits = sorted(self._waits)
+            depth: Dict[str, int] = {}
+            for ticket in self._waiting:
+                depth[ticket.priority] = depth.get(ticket.priority, 0) + 1
+            oldest = min((t.enqueued_at for t in self._waiting), default=None)
+            return {
+                "enabled": self.settings["enabled"],
+                "max_concurrent": self.settings["max_concurrent"],
+                "max_queue": self.settings["max_queue"],
+                "active": self._active,
+                "queue_depth": len(self._waiting),
+                "queue_depth_by_priority": depth,
+                "oldest_wait_s": round(time.time() - oldest, 2) if oldest else 0.0,
+                "wait_s": {
+                    "p50": round(waits[len(waits) // 2], 3) if waits else 0.0,
+                    "p95": round(waits[int(len(waits) * 0.95)], 3) if waits else 0.0,
+                    "max": round(waits[-1], 3) if waits else 0.0,
+                },
+                "avg_run_s": round(self._run_s, 2) if self._run_s is not None else None,
+                **self.counters,
+            }
+
+
+# Global admission controller
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController:
+    """Get or create the shared admission controller."""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = AdmissionController()
+        return _controller
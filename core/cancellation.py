@@ -0,0 +1,131 @@
+"""
+HAWK-AI Cooperative Cancellation
+================================
+Cancellation tokens for aborting a request's agent work, e.g. when the
+SSE client disconnects.
+
+A CancellationToken is passed to Orchestrator.execute_task_streaming and
+SupervisorAgent.run, which install it for the request with cancel_scope().
+Sub-agents inherit it through the context (the supervisor runs them in
+copied contexts) and call check_cancelled() between steps. The LLM gateway
+registers an abort callback on each in-flight Ollama request, so
+cancelling shuts the connection and Ollama stops generating.
+
+OperationCancelled derives from BaseException, like asyncio.CancelledError,
+so the agents' broad `except Exception` handlers do not swallow it.
+"""
+
+import contextvars
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class OperationCancelled(BaseException):
+    """Raised inside agent work once its cancellation token is cancelled."""
+
+
+class CancellationToken:
+    """Thread-safe, one-shot cancellation flag with abort callbacks."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+        self.reason: Optional[str] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "cancelled"):
+        """
+        Cancel the token and run registered abort callbacks (idempotent).
+
+        Args:
+            reason: Why the work was cancelled (logged and reported)
+        """
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        logger.info(f"Cancellation requested: {reason}")
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.debug(f"Abort callback failed: {e}")
+
+    def register(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        Run callback on cancellation (immediately if already cancelled).
+
+        Args:
+            callback: Abort action, e.g. closing an HTTP response
+
+        Returns:
+            Function that unregisters the callback
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+
+                def unregister():
+                    with self._lock:
+                        if callback in self._callbacks:
+                            self._callbacks.remove(callback)
+                return unregister
+        callback()
+        return lambda: None
+
+    def raise_if_cancelled(self):
+        """Raise OperationCancelled if the token was cancelled."""
+        if self._event.is_set():
+            raise OperationCancelled(self.reason or "cancelled")
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until cancelled or timeout; returns True if cancelled."""
+        return self._event.wait(timeout)
+
+
+_current_token: contextvars.ContextVar[Optional[CancellationToken]] = contextvars.ContextVar(
+    "hawk_cancel_token", default=None
+)
+
+
+@contextmanager
+def cancel_scope(token: Optional[CancellationToken]) -> Iterator[Optional[CancellationToken]]:
+    """
+    Install a token for the work done in this context (no-op for None).
+
+    Args:
+        token: Token to install
+
+    Yields:
+        The token
+    """
+    if token is None:
+        yield None
+        return
+    reset = _current_token.set(token)
+    try:
+        yield token
+    finally:
+        _current_token.reset(reset)
+
+
+def current_token() -> Optional[CancellationToken]:
+    """Token installed in the calling context, if any."""
+    return _current_token.get()
+
+
+def check_cancelled():
+    """Raise OperationCancelled if the current context's token was cancelled."""
+    token = _current_token.get()
+    if token is not None:
+        token.raise_if_cancelled()
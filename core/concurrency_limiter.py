@@ -0,0 +1,293 @@
+"""
+HAWK-AI Adaptive Concurrency Limiter
+====================================
+Per-model limit on concurrent Ollama generations, adjusted at runtime from
+observed latency, throughput and errors.
+
+A fixed worker count is wrong for a mix of 7B and 34B models on varying
+hardware: a 7B model may decode several requests in parallel at almost no
+cost, while extra 34B requests only queue inside Ollama and time out.
+
+For each model the limiter collects one sample per completed call:
+wall-clock seconds per generated token (model load time excluded), plus
+the number of calls in flight when it started. Every `window` samples it
+decides (hill climbing with AIMD-style backoff):
+
+- Errors (transport failures, timeouts, 5xx) -> multiplicative decrease,
+  at most once per generation of in-flight calls: a burst of failures
+  among calls admitted before the last cut counts as one overload signal
+- Per-token latency above max_slowdown x baseline -> multiplicative decrease
+- Throughput (concurrency / per-token latency) not at least min_gain better
+  than at the limit below -> step down: the extra slot only added queueing
+- Limit fully used and the next level not recently measured as worse
+  -> probe one higher
+- Otherwise hold
+
+so each model settles near the concurrency that maximizes its token
+throughput. Calls beyond the limit wait (bounded by max_wait) instead of
+piling onto Ollama. Every change is logged with its reason and kept in
+stats()["decisions"] for tuning.
+"""
+
+import logging
+import statistics
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from core.cancellation import current_token
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    "enabled": True,
+    "initial_limit": 2,
+    "min_limit": 1,
+    "max_limit": 8,
+    "window": 6,             # completed calls per decision
+    "min_tokens": 8,         # shorter completions are too noisy to sample
+    "min_gain": 0.1,         # an extra slot must add 10% throughput to be kept
+    "max_slowdown": 4.0,     # per-token latency vs baseline that forces a cut
+    "backoff": 0.5,          # multiplicative decrease on errors or excess latency
+    "reprobe_s": 300,        # retry a level measured as worse after this long
+    "baseline_drift": 0.05,  # how fast the baseline follows slower hardware/models
+    "max_wait": 120,         # admit anyway after waiting this long
+    "models": {},            # per-model overrides, e.g. {"model:34b": {"max_limit": 2}}
+}
+
+
+class Permit:
+    """Admission to run one call for a model."""
+
+    def __init__(self, model: str, concurrency: int, wait_s: float, exempt: bool = False,
+                 generation: int = 0):
+        self.model = model
+        self.concurrency = concurrency
+        self.wait_s = wait_s
+        self.exempt = exempt
+        self.generation = generation
+
+
+class _ModelLimit:
+    """Limit state and sample window for one model."""
+
+    def __init__(self, settings: Dict[str, Any]):
+        self.settings = settings
+        self.limit = float(settings["initial_limit"])
+        self.in_flight = 0
+        self.waiting = 0
+        self.baseline: Optional[float] = None
+        self.samples: List[tuple] = []          # (seconds per token, concurrency)
+        self.errors = 0
+        self.peak = 0
+        self.generation = 0                     # bumped by every multiplicative decrease
+        # limit level -> (throughput estimate, measured at)
+        self.levels: Dict[int, tuple] = {}
+        self.counters = {"calls": 0, "errors": 0, "forced": 0, "wait_s": 0.0}
+
+    @property
+    def slots(self) -> int:
+        return max(1, int(self.limit))
+
+
+class AdaptiveConcurrencyLimiter:
+    """Per-model adaptive concurrency limits for Ollama generations."""
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the limiter.
+
+        Args:
+            settings: adaptive_concurrency section of settings.yaml
+        """
+        self.settings = {**DEFAULT_SETTINGS, **(settings or {})}
+        self._cond = threading.Condition()
+        self._models: Dict[str, _ModelLimit] = {}
+        self.decisions: Deque[Dict[str, Any]] = deque(maxlen=100)
+
+    def _state(self, model: str) -> _ModelLimit:
+        """Limit state for a model. Caller holds the lock."""
+        state = self._models.get(model)
+        if state is None:
+            overrides = (self.settings.get("models") or {}).get(model) or {}
+            state = _ModelLimit({**self.settings, **overrides})
+            self._models[model] = state
+        return state
+
+    # ------------------------------------------------------------- admission
+
+    def acquire(self, model: str) -> Permit:
+        """
+        Wait until the model is below its concurrency limit.
+
+        Args:
+            model: Model the call will use
+
+        Returns:
+            Permit to pass to release()
+        """
+        if not self.settings["enabled"]:
+            return Permit(model, 0, 0.0, exempt=True)
+        token = current_token()
+        unregister = token.register(self._wake) if token is not None else None
+        start = time.time()
+        try:
+            with self._cond:
+                state = self._state(model)
+                state.waiting += 1
+                try:
+                    while state.in_flight >= state.slots:
+                        if token is not None:
+                            token.raise_if_cancelled()
+                        remaining = state.settings["max_wait"] - (time.time() - start)
+                        if remaining <= 0:
+                            state.counters["forced"] += 1
+                            logger.warning(f"Concurrency limit for {model} ({state.slots}) exceeded "
+                                           f"after {state.settings['max_wait']}s wait")
+                            break
+                        self._cond.wait(timeout=remaining)
+                finally:
+                    state.waiting -= 1
+                state.in_flight += 1
+                state.peak = max(state.peak, state.in_flight)
+                state.counters["calls"] += 1
+                wait_s = time.time() - start
+                state.counters["wait_s"] += wait_s
+                return Permit(model, state.in_flight, wait_s, generation=state.generation)
+        finally:
+            if unregister is not None:
+                unregister()
+
+    def release(self, permit: Permit, elapsed_s: float, final: Optional[Dict[str, Any]] = None,
+                overloaded: bool = False):
+        """
+        Return a permit and record the call's outcome.
+
+        Calls that were aborted early (no final chunk, no overload error)
+        free their slot without contributing a sample.
+
+        Args:
+            permit: Permit from acquire()
+            elapsed_s: Wall-clock duration of the call
+            final: Ollama's final response chunk, if the call completed
+            overloaded: The call failed in a way that signals overload
+                (transport error, timeout, HTTP 5xx)
+        """
+        if permit.exempt:
+            return
+        with self._cond:
+            state = self._state(permit.model)
+            state.in_flight -= 1
+            if overloaded:
+                state.counters["errors"] += 1
+                # Calls admitted before the last cut already ran at the old
+                # limit; their failures belong to the overload that caused it
+                if permit.generation == state.generation:
+                    state.errors += 1
+                    self._decide(permit.model, state, force=True)
+            elif final:
+                tokens = final.get("eval_count", 0)
+                if tokens >= state.settings["min_tokens"]:
+                    busy_s = max(elapsed_s - final.get("load_duration", 0) / 1e9, 1e-6)
+                    state.samples.append((busy_s / tokens, permit.concurrency))
+                    if len(state.samples) >= state.settings["window"]:
+                        self._decide(permit.model, state)
+            self._cond.notify_all()
+
+    def _wake(self):
+        with self._cond:
+            self._cond.notify_all()
+
+    # -------------------------------------------------------------- decisions
+
+    def _decide(self, model: str, state: _ModelLimit, force: bool = False):
+        """Adjust the limit from the current window. Caller holds the lock."""
+        settings = state.settings
+        old = state.limit
+        latency = statistics.median(s[0] for s in state.samples) if state.samples else None
+        concurrency = statistics.mean(s[1] for s in state.samples) if state.samples else None
+        level = state.slots
+        now = time.time()
+
+        if latency is not None:
+            if state.baseline is None or latency < state.baseline:
+                state.baseline = latency
+            elif concurrency <= 1.5:
+                # Unloaded samples track the model's current speed
+                state.baseline += settings["baseline_drift"] * (latency - state.baseline)
+            state.levels[level] = (concurrency / latency, now)
+
+        if force or state.errors:
+            new, reason = old * settings["backoff"], "errors"
+        elif latency > settings["max_slowdown"] * state.baseline:
+            new, reason = old * settings["backoff"], "latency"
+        else:
+            below = state.levels.get(level - 1)
+            above = state.levels.get(level + 1)
+            throughput = concurrency / latency
+            if below and now - below[1] < settings["reprobe_s"] \
+                    and throughput < below[0] * (1 + settings["min_gain"]):
+                new, reason = level - 1, "plateau"
+            elif state.peak >= level and not (
+                    above and now - above[1] < settings["reprobe_s"]
+                    and above[0] < throughput * (1 + settings["min_gain"])):
+                new, reason = level + 1, "probe"
+            else:
+                new, reason = old, "hold"
+
+        state.limit = min(float(settings["max_limit"]), max(float(settings["min_limit"]), new))
+        if reason in ("errors", "latency"):
+            state.generation += 1
+        decision = {
+            "model": model,
+            "at": now,
+            "from": round(old, 2),
+            "to": round(state.limit, 2),
+            "reason": reason,
+            "s_per_token": round(latency, 4) if latency is not None else None,
+            "baseline": round(state.baseline, 4) if state.baseline is not None else None,
+            "concurrency": round(concurrency, 2) if concurrency is not None else None,
+            "errors": state.errors,
+        }
+        self.decisions.append(decision)
+        if state.limit != old:
+            logger.info(
+                f"Concurrency for {model}: {old:.2f} -> {state.limit:.2f} ({reason}; "
+                f"{decision['s_per_token']} s/token vs baseline {decision['baseline']}, "
+                f"concurrency {decision['concurrency']}, errors {state.errors})"
+            )
+        else:
+            logger.debug(f"Concurrency for {model} held at {old:.2f} ({reason})")
+        state.samples = []
+        state.errors = 0
+        state.peak = state.in_flight
+
+    # ---------------------------------------------------------------- metrics
+
+    def limit(self, model: str) -> int:
+        """Current number of concurrent calls allowed for a model."""
+        with self._cond:
+            return self._state(model).slots
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-model limits, load and the most recent decisions."""
+        with self._cond:
+            return {
+                "enabled": self.settings["enabled"],
+                "models": {
+                    model: {
+                        "limit": round(state.limit, 2),
+                        "in_flight": state.in_flight,
+                        "waiting": state.waiting,
+                        "baseline_s_per_token": round(state.baseline, 4) if state.baseline else None,
+                        "calls": state.counters["calls"],
+                        "errors": state.counters["errors"],
+                        "forced": state.counters["forced"],
+                        "avg_wait_s": round(state.counters["wait_s"] / state.counters["calls"], 3)
+                        if state.counters["calls"] else 0.0,
+                    }
+                    for model, state in self._models.items()
+                },
+                "decisions": list(self.decisions)[-20:],
+            }
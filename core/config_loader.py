@@ -7,6 +7,7 @@ import os
 import logging
 
 CONFIG_PATH = "config/agents.yaml"
+SETTINGS_PATH = "config/settings.yaml"
 
 
 def get_model(agent_name: str, default: str = "magistral:latest") -> str:
@@ -64,3 +65,27 @@ def load_thinking_modes() -> dict:
     cfg = yaml.safe_load(open(CONFIG_PATH))
     return cfg.get("thinking_modes", {})
 
+
+def get_settings(section: str, default: dict = None, path: str = SETTINGS_PATH) -> dict:
+    """
+    Load a section of config/settings.yaml, falling back to defaults.
+    
+    Args:
+        section: Top-level section name (e.g., 'web_cache')
+        default: Default values; keys missing from the file are taken from here
+        path: YAML file to read (e.g., 'config/sources.yaml')
+        
+    Returns:
+        Dictionary of settings for the section
+    """
+    merged = dict(default or {})
+    if not os.path.exists(path):
+        return merged
+    
+    try:
+        with open(path, "r") as f:
+            cfg = yaml.safe_load(f) or {}
+        merged.update(cfg.get(section) or {})
+    except Exception as e:
+        logging.error(f"Error loading settings section '{section}': {e}")
+    return merged
@@ -0,0 +1,192 @@
+"""
+HAWK-AI Request Deadlines
+=========================
+Splits a request deadline into per-stage time budgets for the supervisor
+and enforces them.
+
+A supervisor run has four stages: retrieval (report cache lookup and other
+pre-agent work), agents, reflection (including reruns) and synthesis. Each
+stage's budget is a share of the time still remaining, so time an earlier
+stage leaves unused rolls over to the later ones:
+
+    budget(stage) = (remaining - reserve_s) * share(stage) / sum(share of this and later stages)
+
+Deadline.stage() runs a block under a child cancellation token that is
+cancelled when the stage budget runs out. In-flight Ollama calls are aborted
+and agents stop at their next check_cancelled(); the block's
+OperationCancelled is absorbed and stage.timed_out is set, so the caller can
+degrade (skip a rerun, switch to a smaller synthesis model, fall back to an
+extractive brief) instead of failing. Cancelling the request itself still
+propagates. Every degradation is recorded for the report.
+
+Without a deadline, stages run unbounded except those given explicit
+seconds (the agent stage is bounded by agents_timeout).
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from core.cancellation import CancellationToken, OperationCancelled, cancel_scope, current_token
+from core.config_loader import get_settings
+
+logger = logging.getLogger(__name__)
+
+STAGES = ["retrieval", "agents", "reflection", "synthesis"]
+
+DEFAULT_SETTINGS = {
+    "default_s": None,          # deadline for requests that set none (None = no deadline)
+    "budgets": {"retrieval": 0.05, "agents": 0.5, "reflection": 0.15, "synthesis": 0.3},
+    "reserve_s": 2.0,           # kept back for building and saving the report
+    "agents_timeout": 300,      # bound on the agent stage when there is no deadline
+    "min_reflection_s": 15,     # skip reflection with less time than this
+    "fallback_below_s": 60,     # synthesize with fallback_model with less time than this
+    "fallback_model": "qwen2.5:7b",
+    "min_synthesis_s": 8,       # below this, an extractive brief replaces LLM synthesis
+}
+
+
+class StageBudget:
+    """Time budget and outcome of one stage."""
+
+    def __init__(self, name: str, seconds: Optional[float]):
+        self.name = name
+        self.seconds = seconds
+        self.started = time.time()
+        self.elapsed = 0.0
+        self.timed_out = False
+        self.token: Optional[CancellationToken] = None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left in this stage (None if unbounded)."""
+        if self.seconds is None:
+            return None
+        return max(0.0, self.seconds - (time.time() - self.started))
+
+
+class Deadline:
+    """Deadline of one supervisor run and its stage budgets."""
+
+    def __init__(self, seconds: Optional[float] = None, settings: Optional[Dict[str, Any]] = None):
+        """
+        Start the deadline clock.
+
+        Args:
+            seconds: Request deadline (None uses deadline.default_s; 0 or None there means no deadline)
+            settings: Optional settings override (deadline section of settings.yaml)
+        """
+        self.settings = {**DEFAULT_SETTINGS, **(settings or get_settings("deadline", DEFAULT_SETTINGS))}
+        if seconds is None:
+            seconds = self.settings["default_s"]
+        self.seconds = float(seconds) if seconds else None
+        self.start = time.time()
+        self.stages: Dict[str, StageBudget] = {}
+        self.degraded: List[Dict[str, Any]] = []
+
+    @property
+    def bounded(self) -> bool:
+        return self.seconds is not None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds until the deadline (None without a deadline)."""
+        if self.seconds is None:
+            return None
+        return max(0.0, self.seconds - (time.time() - self.start))
+
+    def budget(self, stage: str) -> Optional[float]:
+        """
+        Budget for a stage from the time remaining now.
+
+        Args:
+            stage: One of STAGES
+
+        Returns:
+            Seconds, or None without a deadline
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return None
+        shares = self.settings["budgets"]
+        later = sum(shares.get(s, 0) for s in STAGES[STAGES.index(stage):])
+        if later <= 0:
+            return 0.0
+        return max(0.0, remaining - self.settings["reserve_s"]) * shares.get(stage, 0) / later
+
+    @contextmanager
+    def stage(self, name: str, seconds: Optional[float] = None) -> Iterator[StageBudget]:
+        """
+        Run a block within a stage budget.
+
+        Args:
+            name: Stage name (one of STAGES, or a sub-stage label)
+            seconds: Explicit budget (defaults to budget(name))
+
+        Yields:
+            StageBudget; timed_out is set if the budget ran out before the block ended
+        """
+        if seconds is None and name in STAGES:
+            seconds = self.budget(name)
+        stage = StageBudget(name, seconds)
+        self.stages[name] = stage
+        if seconds is None:
+            try:
+                yield stage
+            finally:
+                stage.elapsed = time.time() - stage.started
+            return
+
+        parent = current_token()
+        stage.token = CancellationToken()
+        unregister = parent.register(lambda: stage.token.cancel(parent.reason or "cancelled")) if parent else None
+        timer = threading.Timer(seconds, stage.token.cancel, args=(f"{name} budget of {seconds:.0f}s exhausted",))
+        timer.daemon = True
+        timer.start()
+        try:
+            with cancel_scope(stage.token):
+                yield stage
+        except OperationCancelled:
+            if parent is not None and parent.cancelled:
+                raise
+            logger.warning(f"Stage '{name}' cut short after {time.time() - stage.started:.1f}s "
+                           f"(budget {seconds:.1f}s)")
+        finally:
+            timer.cancel()
+            if unregister is not None:
+                unregister()
+            stage.elapsed = time.time() - stage.started
+            # Also set when the block handled the expiry itself (e.g. abandoned agent futures)
+            stage.timed_out = stage.token.cancelled and not (parent is not None and parent.cancelled)
+
+    def degrade(self, stage: str, action: str, detail: str = ""):
+        """
+        Record that a stage was skipped or shortened.
+
+        Args:
+            stage: Stage name
+            action: What was done instead (e.g. "skipped rerun")
+            detail: Why, for the report
+        """
+        entry = {"stage": stage, "action": action, "detail": detail,
+                 "at_s": round(time.time() - self.start, 2)}
+        self.degraded.append(entry)
+        logger.warning(f"Degraded {stage}: {action}" + (f" ({detail})" if detail else ""))
+
+    def summary(self) -> Dict[str, Any]:
+        """Deadline, per-stage budgets and usage, and degradations for the report."""
+        elapsed = time.time() - self.start
+        return {
+            "deadline_s": self.seconds,
+            "elapsed_s": round(elapsed, 2),
+            "met": self.seconds is None or elapsed <= self.seconds,
+            "stages": {
+                name: {
+                    "budget_s": round(stage.seconds, 2) if stage.seconds is not None else None,
+                    "used_s": round(stage.elapsed, 2),
+                    "timed_out": stage.timed_out,
+                }
+                for name, stage in list(self.stages.items())
+            },
+            "degraded": list(self.degraded),
+        }
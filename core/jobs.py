@@ -0,0 +1,579 @@
+"""
+HAWK-AI Analysis Jobs
+=====================
+Asynchronous, persisted jobs for long-running supervisor analyses.
+
+A full run takes minutes, longer than many proxies keep a request open.
+Jobs decouple the analysis from the HTTP connection:
+
+- POST /jobs submits a query and returns a job id immediately
+- The run executes in a worker thread; every progress event is appended
+  to the job's event log with an increasing sequence number
+- GET /jobs/{id} returns status, partial results (completed agents and
+  the synthesis so far) and the final result
+- GET /jobs/{id}/events replays the event log after Last-Event-ID and then
+  follows it live, so reconnecting clients resume where they left off
+
+Jobs and events are stored in SQLite (data/jobs/jobs.sqlite), so results
+survive client reconnects and proxy timeouts. Reading a job never
+re-runs it. Jobs still running when the server stops are marked
+"interrupted" on the next start.
+
+With an admission controller, jobs wait in its "batch" priority class
+(after interactive chat) and report "queue_position" events meanwhile.
+
+Synthesis tokens are coalesced before being written (every token_flush_s)
+to keep the event log compact.
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.admission import AdmissionController, Ticket
+from core.cancellation import CancellationToken, OperationCancelled
+from core.config_loader import get_settings
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).parent.parent
+
+DEFAULT_SETTINGS = {
+    "path": "data/jobs/jobs.sqlite",
+    "max_workers": 2,          # concurrent analyses
+    "retention_hours": 72,     # finished jobs older than this are purged on start
+    "heartbeat_s": 15,         # SSE keep-alive interval while a job is quiet
+    "token_flush_s": 0.25,     # synthesis token coalescing window
+}
+
+TERMINAL_STATUSES = {"succeeded", "failed", "cancelled", "interrupted"}
+TERMINAL_EVENTS = {"done", "error"}
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, default=str)
+
+
+class JobStore:
+    """Thread-safe SQLite store for jobs and their event logs."""
+
+    def __init__(self, path: str):
+        """
+        Open (or create) the store.
+
+        Args:
+            path: SQLite file path
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                query TEXT NOT NULL,
+                session_id TEXT,
+                status TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                partial TEXT,
+                result TEXT,
+                error TEXT
+            )"""
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS events (
+                job_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                type TEXT NOT NULL,
+                data TEXT NOT NULL,
+                ts REAL NOT NULL,
+                PRIMARY KEY (job_id, seq)
+            )"""
+        )
+
+    def create(self, query: str, session_id: Optional[str] = None) -> str:
+        """
+        Insert a queued job.
+
+        Args:
+            query: User query
+            session_id: Optional session identifier
+
+        Returns:
+            New job id
+        """
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, query, session_id, status, created_at) VALUES (?, ?, ?, 'queued', ?)",
+                (job_id, query, session_id, time.time()),
+            )
+        return job_id
+
+    def update(self, job_id: str, **fields):
+        """
+        Update job columns; partial and result are JSON-encoded.
+
+        Args:
+            job_id: Job id
+            **fields: Column values (status, started_at, finished_at, partial, result, error)
+        """
+        if not fields:
+            return
+        values = {k: _dumps(v) if k in ("partial", "result") and v is not None else v for k, v in fields.items()}
+        assignments = ", ".join(f"{column} = ?" for column in values)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*values.values(), job_id))
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Load a job.
+
+        Args:
+            job_id: Job id
+
+        Returns:
+            Job dictionary (with last_event_id), or None if unknown
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            last = self._conn.execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM events WHERE job_id = ?", (job_id,)
+            ).fetchone()[0]
+        job = dict(row)
+        for column in ("partial", "result"):
+            job[column] = json.loads(job[column]) if job[column] else None
+        job["last_event_id"] = last
+        return job
+
+    def append_event(self, job_id: str, seq: int, event_type: str, data: Dict[str, Any]):
+        """
+        Append an event to a job's log.
+
+        Args:
+            job_id: Job id
+            seq: Sequence number (strictly increasing per job)
+            event_type: Event type
+            data: Event payload
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO events (job_id, seq, type, data, ts) VALUES (?, ?, ?, ?, ?)",
+                (job_id, seq, event_type, _dumps(data), time.time()),
+            )
+
+    def finish(self, job_id: str, seq: int, event_type: str, data: Dict[str, Any], **fields):
+        """
+        Write a job's final columns and its terminal event together.
+
+        Readers that see the terminal status can rely on the event being there.
+
+        Args:
+            job_id: Job id
+            seq: Sequence number of the terminal event
+            event_type: Terminal event type ("done" or "error")
+            data: Event payload
+            **fields: Column values, as for update()
+        """
+        values = {k: _dumps(v) if k in ("partial", "result") and v is not None else v for k, v in fields.items()}
+        assignments = ", ".join(f"{column} = ?" for column in values)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "INSERT INTO events (job_id, seq, type, data, ts) VALUES (?, ?, ?, ?, ?)",
+                    (job_id, seq, event_type, _dumps(data), time.time()),
+                )
+                if values:
+                    self._conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*values.values(), job_id))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def events(self, job_id: str, after: int = 0, limit: int = 500) -> List[Dict[str, Any]]:
+        """
+        Read events after a sequence number.
+
+        Args:
+            job_id: Job id
+            after: Last sequence number the client has seen
+            limit: Maximum events to return
+
+        Returns:
+            Events as {"id", "type", "data", "ts"} in order
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, type, data, ts FROM events WHERE job_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+                (job_id, after, limit),
+            ).fetchall()
+        return [{"id": r["seq"], "type": r["type"], "data": json.loads(r["data"]), "ts": r["ts"]} for r in rows]
+
+    def mark_interrupted(self) -> int:
+        """
+        Close jobs left unfinished by a previous server process.
+
+        Returns:
+            Number of jobs marked interrupted
+        """
+        now = time.time()
+        message = "Server stopped before the job finished"
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM jobs WHERE status NOT IN (?, ?, ?, ?)", tuple(TERMINAL_STATUSES)
+            ).fetchall()
+            for row in rows:
+                last = self._conn.execute(
+                    "SELECT COALESCE(MAX(seq), 0) FROM events WHERE job_id = ?", (row["id"],)
+                ).fetchone()[0]
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'interrupted', finished_at = ?, error = ? WHERE id = ?",
+                    (now, message, row["id"]),
+                )
+                self._conn.execute(
+                    "INSERT INTO events (job_id, seq, type, data, ts) VALUES (?, ?, 'error', ?, ?)",
+                    (row["id"], last + 1, _dumps({"status": "interrupted", "error": message}), now),
+                )
+        return len(rows)
+
+    def purge(self, older_than: float) -> int:
+        """
+        Delete finished jobs (and their events) that ended before a timestamp.
+
+        Args:
+            older_than: Unix timestamp
+
+        Returns:
+            Number of jobs deleted
+        """
+        with self._lock:
+            ids = [r["id"] for r in self._conn.execute(
+                "SELECT id FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?", (older_than,)
+            ).fetchall()]
+            for job_id in ids:
+                self._conn.execute("DELETE FROM events WHERE job_id = ?", (job_id,))
+                self._conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        return len(ids)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class _ActiveJob:
+    """In-memory state of a job running in this process."""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.seq = 0
+        self.lock = threading.Lock()
+        self.token = CancellationToken()
+        self.future: Optional[Future] = None
+        self.ticket: Optional[Ticket] = None
+        self.agents: Dict[str, Any] = {}
+        self.synthesis = ""
+        self.pending_text = ""
+        self.last_flush = time.time()
+        self.finished = False
+
+    def partial(self) -> Dict[str, Any]:
+        return {"agents": dict(self.agents), "synthesis": self.synthesis}
+
+
+class JobManager:
+    """Runs analyses as persisted jobs and serves their event logs."""
+
+    def __init__(
+        self,
+        runner: Callable[..., Dict[str, Any]],
+        settings: Optional[Dict[str, Any]] = None,
+        admission: Optional[AdmissionController] = None,
+    ):
+        """
+        Initialize the manager and recover the store.
+
+        Args:
+            runner: Blocking analysis function with the signature of
+                Orchestrator.execute_task_streaming(query, progress_callback, context, cancel_token)
+            settings: Optional settings override (jobs section of settings.yaml)
+            admission: Optional admission controller; jobs queue in its "batch" class
+        """
+        self.runner = runner
+        self.admission = admission
+        self.settings = {**DEFAULT_SETTINGS, **(settings or get_settings("jobs", DEFAULT_SETTINGS))}
+        path = Path(self.settings["path"])
+        if not path.is_absolute():
+            path = BASE_DIR / path
+        self.store = JobStore(str(path))
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.settings["max_workers"], thread_name_prefix="hawk-job"
+        )
+        self._active: Dict[str, _ActiveJob] = {}
+        self._lock = threading.Lock()
+        self._listeners: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
+
+        interrupted = self.store.mark_interrupted()
+        purged = self.store.purge(time.time() - self.settings["retention_hours"] * 3600)
+        if interrupted or purged:
+            logger.info(f"Job store recovered: {interrupted} interrupted, {purged} purged")
+
+    # ------------------------------------------------------------- lifecycle
+
+    def submit(self, query: str, session_id: Optional[str] = None, priority: str = "batch",
+               deadline_s: Optional[float] = None) -> str:
+        """
+        Queue an analysis.
+
+        Args:
+            query: User query
+            session_id: Optional session identifier
+            priority: Admission priority class
+            deadline_s: Optional analysis deadline in seconds, counted from the start of the run
+
+        Returns:
+            Job id
+
+        Raises:
+            AdmissionRejected: The admission queue is full
+        """
+        ticket = self.admission.reserve(priority) if self.admission else None
+        try:
+            job_id = self.store.create(query, session_id)
+        except Exception:
+            if ticket is not None:
+                self.admission.release(ticket)
+            raise
+        active = _ActiveJob(job_id)
+        active.ticket = ticket
+        with self._lock:
+            self._active[job_id] = active
+        active.future = self._executor.submit(self._run, active, query, session_id, deadline_s)
+        logger.info(f"Job {job_id} queued: {query[:80]}")
+        return job_id
+
+    def _run(self, active: _ActiveJob, query: str, session_id: Optional[str], deadline_s: Optional[float] = None):
+        job_id = active.job_id
+
+        def progress(event_type: str, data: Dict[str, Any]):
+            self._record(active, event_type, data)
+
+        def queued(position: int, eta_s: int):
+            progress("queue_position", {"position": position, "eta_s": eta_s})
+
+        slot = self.admission.slot(active.ticket, queued, active.token) if active.ticket else nullcontext()
+        try:
+            with slot:
+                self.store.update(job_id, status="running", started_at=time.time())
+                result = self.runner(
+                    query,
+                    progress_callback=progress,
+                    context={"session_id": session_id, "deadline_s": deadline_s},
+                    cancel_token=active.token,
+                )
+            status = {"success": "succeeded", "cancelled": "cancelled"}.get(result.get("status"), "failed")
+            self._finish(active, status, result=result, error=result.get("error"))
+        except OperationCancelled as e:
+            self._finish(active, "cancelled", error=f"Cancelled: {e}")
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}", exc_info=True)
+            self._finish(active, "failed", error=str(e))
+
+    def _finish(self, active: _ActiveJob, status: str, result: Optional[Dict[str, Any]] = None,
+                error: Optional[str] = None):
+        with active.lock:
+            active.finished = True
+            self._flush_tokens(active)
+            terminal = {"status": status} if status == "succeeded" else {"status": status, "error": error}
+            active.seq += 1
+            self.store.finish(active.job_id, active.seq, "done" if status == "succeeded" else "error", terminal,
+                              status=status, finished_at=time.time(), partial=active.partial(),
+                              result=result, error=error)
+        with self._lock:
+            self._active.pop(active.job_id, None)
+        self._notify(active.job_id)
+        logger.info(f"Job {active.job_id} {status}")
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a queued or running job.
+
+        Args:
+            job_id: Job id
+
+        Returns:
+            True if the job was active in this process
+        """
+        with self._lock:
+            active = self._active.get(job_id)
+        if active is None:
+            return False
+        if active.future is not None and active.future.cancel():
+            # Never started: close it here since _run will not
+            if active.ticket is not None:
+                self.admission.release(active.ticket)
+            self._finish(active, "cancelled", error="Cancelled before start")
+        else:
+            active.token.cancel("cancelled by client")
+        return True
+
+    def shutdown(self):
+        """Cancel running jobs and stop the worker pool."""
+        with self._lock:
+            active = list(self._active.values())
+        for job in active:
+            job.token.cancel("server shutdown")
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # ---------------------------------------------------------------- events
+
+    def _record(self, active: _ActiveJob, event_type: str, data: Dict[str, Any]):
+        """Append a progress event (called from agent threads)."""
+        with active.lock:
+            if active.finished:
+                return
+            if event_type == "synthesis_token":
+                text = data.get("text", "")
+                active.synthesis += text
+                active.pending_text += text
+                if time.time() - active.last_flush < self.settings["token_flush_s"]:
+                    return
+                self._flush_tokens(active)
+            else:
+                self._flush_tokens(active)
+                if event_type == "agent_complete" and "result" in data:
+                    active.agents[data.get("agent", "unknown")] = data["result"]
+                elif event_type == "synthesis_revised":
+                    active.synthesis = data.get("text", "")
+                elif event_type == "synthesis_start":
+                    # Agent results were already logged with agent_complete
+                    data = {k: v for k, v in data.items() if k != "results"}
+                self._append(active, event_type, data)
+                if event_type in ("agent_complete", "synthesis_revised"):
+                    self.store.update(active.job_id, partial=active.partial())
+        self._notify(active.job_id)
+
+    def _flush_tokens(self, active: _ActiveJob):
+        """Write coalesced synthesis tokens. Caller holds active.lock."""
+        if active.pending_text:
+            self._append(active, "synthesis_token", {"text": active.pending_text})
+            active.pending_text = ""
+        active.last_flush = time.time()
+
+    def _append(self, active: _ActiveJob, event_type: str, data: Dict[str, Any]):
+        """Persist the next event. Caller holds active.lock."""
+        active.seq += 1
+        self.store.append_event(active.job_id, active.seq, event_type, data)
+
+    def _notify(self, job_id: str):
+        with self._lock:
+            listeners = list(self._listeners.get(job_id, ()))
+        for loop, event in listeners:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass
+
+    # ---------------------------------------------------------------- reads
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Job status with partial results; never re-runs anything.
+
+        Args:
+            job_id: Job id
+
+        Returns:
+            Job dictionary, or None if unknown
+        """
+        job = self.store.get(job_id)
+        if job is None:
+            return None
+        with self._lock:
+            active = self._active.get(job_id)
+        if active is not None:
+            with active.lock:
+                job["partial"] = active.partial()
+        end = job["finished_at"] or time.time()
+        job["duration"] = round(end - job["started_at"], 2) if job["started_at"] else 0.0
+        return job
+
+    async def follow(self, job_id: str, after: int = 0) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Replay events after a sequence number, then follow new ones until the job ends.
+
+        Yields None every heartbeat_s while no event arrives, so the caller
+        can keep the connection alive.
+
+        Args:
+            job_id: Job id
+            after: Last event id the client has seen (0 for the full log)
+
+        Yields:
+            Events as {"id", "type", "data", "ts"}, or None for a heartbeat
+        """
+        loop = asyncio.get_running_loop()
+        wakeup = asyncio.Event()
+        listener = (loop, wakeup)
+        with self._lock:
+            self._listeners.setdefault(job_id, []).append(listener)
+        drained = False
+        try:
+            while True:
+                # Clear before reading so a notify during the read is not lost
+                wakeup.clear()
+                batch = await asyncio.to_thread(self.store.events, job_id, after)
+                for event in batch:
+                    after = event["id"]
+                    yield event
+                    if event["type"] in TERMINAL_EVENTS:
+                        return
+                if batch:
+                    continue
+                job = await asyncio.to_thread(self.store.get, job_id)
+                if job is None:
+                    return
+                if job["status"] in TERMINAL_STATUSES:
+                    # The job may have finished after the events read: read once more
+                    if drained:
+                        return
+                    drained = True
+                    continue
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout=self.settings["heartbeat_s"])
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            with self._lock:
+                listeners = self._listeners.get(job_id, [])
+                if listener in listeners:
+                    listeners.remove(listener)
+                if not listeners:
+                    self._listeners.pop(job_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Active jobs and listener counts."""
+        with self._lock:
+            return {
+                "active": len(self._active),
+                "listeners": sum(len(v) for v in self._listeners.values()),
+                "max_workers": self.settings["max_workers"],
+            }
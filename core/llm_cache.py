@@ -0,0 +1,254 @@
+"""
+HAWK-AI LLM Response Cache
+==========================
+Opt-in exact-match cache for LLM completions, used by the LLM gateway.
+
+Repeated GeoAgent calls for the same country and repeated AnalystAgent
+steps on identical context send the same prompts again; each costs tens of
+seconds on a 20B-34B model.
+
+Features:
+- Key: model + SHA-256 of the prompt (or chat messages), system prompt,
+  effective generation options and output format
+- Memory tier (LRU by entry count) in front of a disk tier (SQLiteCache
+  with LRU eviction under a byte budget)
+- TTL per agent, enable/disable per agent
+- Hit counters per tier and per agent; hits are attributed to the
+  running request so reports can flag them
+- refresh_scope(): calls inside it skip lookups but still store their
+  responses. The supervisor uses it for reruns after low reflection
+  confidence, which would otherwise get the same answers back
+
+Responses are replayed verbatim, so only enable it for agents whose
+prompts are deterministic enough that reuse is acceptable.
+
+CLI:
+    python core/llm_cache.py --stats
+    python core/llm_cache.py --clear
+"""
+
+import contextvars
+import hashlib
+import json
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.config_loader import get_settings
+from core.web_cache import SQLiteCache
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).parent.parent
+
+DEFAULT_SETTINGS = {
+    "enabled": False,
+    "path": "data/llm_cache/responses.sqlite",
+    "memory_entries": 256,
+    "max_bytes": 100 * 1024 * 1024,
+    "ttl": 24 * 3600,
+    "default_agent": False,   # agents not listed under agents:
+    "agents": {},             # agent: true/false or {enabled, ttl}
+}
+
+
+def make_key(endpoint: str, model: str, request: Dict[str, Any]) -> str:
+    """
+    Build an exact-match cache key.
+
+    Args:
+        endpoint: "generate" or "chat"
+        model: Model name
+        request: Prompt/messages, system prompt, options and format
+
+    Returns:
+        Hex key prefixed with the model name
+    """
+    digest = hashlib.sha256(
+        json.dumps({"endpoint": endpoint, **request}, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+    return f"{model}:{digest}"
+
+
+_refresh: contextvars.ContextVar[bool] = contextvars.ContextVar("hawk_llm_cache_refresh", default=False)
+
+
+@contextmanager
+def refresh_scope() -> Iterator[None]:
+    """Skip cache lookups for calls made in this context; their responses still replace stored ones."""
+    reset = _refresh.set(True)
+    try:
+        yield
+    finally:
+        _refresh.reset(reset)
+
+
+def refreshing() -> bool:
+    """Whether the calling context is inside refresh_scope()."""
+    return _refresh.get()
+
+
+class LLMResponseCache:
+    """Two-tier (memory, SQLite) cache of complete LLM responses."""
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
+        """
+        Initialize from the llm_cache section of settings.yaml.
+
+        Args:
+            settings: Optional settings override
+        """
+        self.settings = settings or get_settings("llm_cache", DEFAULT_SETTINGS)
+        self.enabled = bool(self.settings.get("enabled"))
+        self._memory: "OrderedDict[str, Tuple[Optional[float], Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk: Optional[SQLiteCache] = None
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "saved_s": 0.0}
+        self.agent_hits: Dict[str, int] = {}
+
+    @property
+    def disk(self) -> SQLiteCache:
+        """Disk tier, opened on first use."""
+        with self._lock:
+            if self._disk is None:
+                path = Path(self.settings["path"])
+                if not path.is_absolute():
+                    path = BASE_DIR / path
+                self._disk = SQLiteCache(str(path), max_bytes=self.settings["max_bytes"])
+            return self._disk
+
+    def _agent_setting(self, agent: Optional[str]) -> Dict[str, Any]:
+        value = (self.settings.get("agents") or {}).get(agent or "unknown", self.settings.get("default_agent"))
+        if isinstance(value, dict):
+            return {"enabled": value.get("enabled", True), "ttl": value.get("ttl", self.settings["ttl"])}
+        return {"enabled": bool(value), "ttl": self.settings["ttl"]}
+
+    def enabled_for(self, agent: Optional[str], override: Optional[bool] = None) -> bool:
+        """
+        Whether calls from an agent use the cache.
+
+        Args:
+            agent: Calling agent
+            override: Per-call True/False; None follows the agent setting
+        """
+        if not self.enabled:
+            return False
+        if override is not None:
+            return override
+        return self._agent_setting(agent)["enabled"]
+
+    def get(self, key: str, agent: Optional[str] = None) -> Optional[Tuple[Dict[str, Any], str]]:
+        """
+        Look up a response.
+
+        Args:
+            key: Key from make_key()
+            agent: Calling agent, for hit counters
+
+        Returns:
+            (entry, tier) with entry = {"text", "elapsed_s", "created_at"}, or None
+        """
+        now = time.time()
+        with self._lock:
+            item = self._memory.get(key)
+            if item is not None:
+                expires_at, entry = item
+                if expires_at is None or expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._hit("memory", agent, entry)
+                    return entry, "memory"
+                del self._memory[key]
+
+        entry = self.disk.get(key, count=False)
+        if entry is None:
+            with self._lock:
+                self.counters["misses"] += 1
+            return None
+
+        ttl = self._agent_setting(agent)["ttl"]
+        with self._lock:
+            self._remember(key, entry, entry.get("created_at", now) + ttl if ttl else None)
+            self._hit("disk", agent, entry)
+        return entry, "disk"
+
+    def _hit(self, tier: str, agent: Optional[str], entry: Dict[str, Any]):
+        """Count a hit. Caller holds the lock."""
+        self.counters[f"{tier}_hits"] += 1
+        self.counters["saved_s"] += entry.get("elapsed_s", 0.0)
+        self.agent_hits[agent or "unknown"] = self.agent_hits.get(agent or "unknown", 0) + 1
+
+    def _remember(self, key: str, entry: Dict[str, Any], expires_at: Optional[float]):
+        """Insert into the memory tier, evicting least recently used. Caller holds the lock."""
+        self._memory[key] = (expires_at, entry)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.settings["memory_entries"]:
+            self._memory.popitem(last=False)
+
+    def put(self, key: str, text: str, agent: Optional[str] = None, elapsed_s: float = 0.0):
+        """
+        Store a complete response in both tiers.
+
+        Args:
+            key: Key from make_key()
+            text: Response text
+            agent: Calling agent (selects the TTL)
+            elapsed_s: Generation time, reported as time saved on later hits
+        """
+        if not text:
+            return
+        ttl = self._agent_setting(agent)["ttl"]
+        now = time.time()
+        entry = {"text": text, "elapsed_s": round(elapsed_s, 3), "created_at": now}
+        with self._lock:
+            self._remember(key, entry, now + ttl if ttl else None)
+            self.counters["writes"] += 1
+        self.disk.set(key, entry, ttl=ttl or None, namespace=key.rsplit(":", 1)[0],
+                      meta={"agent": agent})
+
+    def clear(self):
+        """Drop every cached response."""
+        with self._lock:
+            self._memory.clear()
+        self.disk.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters per tier and agent plus memory tier size."""
+        with self._lock:
+            lookups = self.counters["memory_hits"] + self.counters["disk_hits"] + self.counters["misses"]
+            hits = lookups - self.counters["misses"]
+            return {
+                "enabled": self.enabled,
+                **self.counters,
+                "saved_s": round(self.counters["saved_s"], 2),
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "agents": dict(self.agent_hits),
+            }
+
+
+def main():
+    """CLI for inspecting and clearing the response cache."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="HAWK-AI LLM response cache")
+    parser.add_argument("--stats", action="store_true", help="Show disk tier statistics")
+    parser.add_argument("--clear", action="store_true", help="Delete all cached responses")
+    args = parser.parse_args()
+
+    cache = LLMResponseCache()
+    if args.clear:
+        cache.clear()
+        print("LLM response cache cleared")
+    if args.stats:
+        print(json.dumps(cache.disk.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,751 @@
+"""
+HAWK-AI LLM Gateway
+===================
+Single entry point for every Ollama call made by the agents.
+
+Features:
+- One keep-alive HTTP connection pool (httpx) per process, sync and async
+- Host and per-model configuration (timeout, num_ctx, keep_alive, options)
+  from config/settings.yaml instead of hardcoded URLs
+- Streaming generation under the hood (token callbacks, early abort)
+- In-flight call counts and per-model / per-agent latency and token metrics
+- Residency-aware scheduling of calls to limit model swaps (core/model_scheduler.py)
+- Adaptive per-model concurrency limits from observed latency and errors
+  (core/concurrency_limiter.py)
+- Opt-in exact-match response cache per agent (core/llm_cache.py)
+- Cooperative cancellation: in-flight requests are aborted when the
+  request's CancellationToken is cancelled (core/cancellation.py), also
+  while Ollama is still loading the model or evaluating the prompt
+
+Usage:
+    from core.llm_gateway import get_llm
+    llm = get_llm("gpt-oss:20b", agent="analyst")
+    text = llm.invoke("Summarize ...")          # drop-in for OllamaLLM.invoke
+    text = await llm.ainvoke("Summarize ...")   # async entry point
+
+CLI:
+    python core/llm_gateway.py --models
+    python core/llm_gateway.py --ps
+    python core/llm_gateway.py --model qwen2.5:7b --prompt "Hello"
+"""
+
+import asyncio
+import json
+import logging
+import socket
+import sys
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import closing
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.cancellation import CancellationToken, OperationCancelled, current_token
+from core.concurrency_limiter import DEFAULT_SETTINGS as LIMITER_DEFAULTS, AdaptiveConcurrencyLimiter
+from core.config_loader import SETTINGS_PATH, get_settings
+from core.llm_cache import DEFAULT_SETTINGS as CACHE_DEFAULTS, LLMResponseCache, make_key, refreshing
+from core.model_scheduler import DEFAULT_SETTINGS as SCHEDULER_DEFAULTS, ModelScheduler, current_usage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OLLAMA = {
+    "host": "127.0.0.1",
+    "port": 11434,
+    "model_default": "gpt-oss:20b",
+    "embed_model": "snowflake-arctic-embed2:568m",
+    "timeout": 300,
+}
+
+DEFAULT_SETTINGS = {
+    "max_connections": 16,
+    "connect_timeout": 10,
+    "defaults": {"keep_alive": "10m", "num_ctx": None},
+    "models": {},
+}
+
+TokenCallback = Callable[[str], None]
+
+
+class LLMGatewayError(RuntimeError):
+    """Raised when Ollama returns an error or cannot be reached."""
+
+
+def _abort_response(response: httpx.Response):
+    """Shut down a streaming response's socket so a blocked read returns at once."""
+    try:
+        sock = response.extensions["network_stream"].get_extra_info("socket")
+        if sock is not None:
+            sock.shutdown(socket.SHUT_RDWR)
+            return
+    except Exception:
+        pass
+    response.close()
+
+
+class _ModelStats:
+    """Counters for one model (or agent)."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.total_s = 0.0
+        self.ttft_s = 0.0
+        self.load_s = 0.0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cache_hits = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        done = max(1, self.calls - self.in_flight)
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "avg_latency_s": round(self.total_s / done, 3),
+            "avg_ttft_s": round(self.ttft_s / done, 3),
+            "load_s": round(self.load_s, 3),
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cache_hits": self.cache_hits,
+        }
+
+
+class LLMGateway:
+    """
+    Pooled Ollama client shared by all agents.
+
+    Generation always streams from Ollama; generate() joins the tokens,
+    stream() yields them. Closing a stream early aborts the HTTP request.
+    """
+
+    def __init__(self, config_path: str = SETTINGS_PATH):
+        """
+        Initialize the gateway from settings.yaml (ollama, llm_gateway,
+        model_scheduler, adaptive_concurrency and llm_cache sections).
+
+        Args:
+            config_path: Settings file path
+        """
+        self.ollama = get_settings("ollama", DEFAULT_OLLAMA, path=config_path)
+        self.settings = get_settings("llm_gateway", DEFAULT_SETTINGS, path=config_path)
+        self.base_url = f"http://{self.ollama['host']}:{self.ollama['port']}"
+        self.default_model = self.ollama["model_default"]
+        self.embed_model = self.ollama["embed_model"]
+
+        self._limits = httpx.Limits(
+            max_connections=self.settings["max_connections"],
+            max_keepalive_connections=self.settings["max_connections"]
+        )
+        self._client: Optional[httpx.Client] = None
+        # Sends streaming requests whose caller may give up before the headers arrive
+        self._senders = ThreadPoolExecutor(max_workers=self.settings["max_connections"],
+                                           thread_name_prefix="hawk-llm-send")
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = \
+            weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._models: Dict[str, _ModelStats] = {}
+        self._agents: Dict[str, _ModelStats] = {}
+        self.scheduler = ModelScheduler(
+            self, get_settings("model_scheduler", SCHEDULER_DEFAULTS, path=config_path)
+        )
+        self.limiter = AdaptiveConcurrencyLimiter(
+            get_settings("adaptive_concurrency", LIMITER_DEFAULTS, path=config_path)
+        )
+        self.cache = LLMResponseCache(get_settings("llm_cache", CACHE_DEFAULTS, path=config_path))
+
+        logger.info(f"LLM gateway using {self.base_url} (pool size {self.settings['max_connections']})")
+
+    # ------------------------------------------------------------------ config
+
+    def model_config(self, model: str) -> Dict[str, Any]:
+        """Effective configuration for a model: defaults overlaid with its models entry."""
+        config = {"timeout": self.ollama.get("timeout", 300)}
+        config.update(self.settings.get("defaults") or {})
+        config.update((self.settings.get("models") or {}).get(model) or {})
+        return config
+
+    def _timeout(self, config: Dict[str, Any]) -> httpx.Timeout:
+        return httpx.Timeout(config["timeout"], connect=self.settings["connect_timeout"])
+
+    def _payload(self, model: str, config: Dict[str, Any], options: Optional[Dict[str, Any]],
+                 keep_alive: Optional[str]) -> Dict[str, Any]:
+        merged = dict(config.get("options") or {})
+        if config.get("num_ctx"):
+            merged["num_ctx"] = config["num_ctx"]
+        merged.update(options or {})
+        payload: Dict[str, Any] = {"model": model, "stream": True}
+        if merged:
+            payload["options"] = merged
+        keep_alive = keep_alive if keep_alive is not None else config.get("keep_alive")
+        if keep_alive is not None:
+            payload["keep_alive"] = keep_alive
+        return payload
+
+    # ----------------------------------------------------------------- clients
+
+    @property
+    def client(self) -> httpx.Client:
+        """Shared synchronous client (thread-safe, keep-alive pool)."""
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(base_url=self.base_url, limits=self._limits)
+            return self._client
+
+    def _async_client(self) -> httpx.AsyncClient:
+        """Async client bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._async_clients.get(loop)
+            if client is None:
+                client = httpx.AsyncClient(base_url=self.base_url, limits=self._limits)
+                self._async_clients[loop] = client
+            return client
+
+    def close(self):
+        """Close the synchronous connection pool."""
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    def _send(self, request: httpx.Request, token: Optional[CancellationToken]) -> httpx.Response:
+        """
+        Send a streaming request, giving up as soon as the token is cancelled.
+
+        Ollama sends the response headers with the first token, i.e. only
+        after the model is loaded and the prompt evaluated. Without a token the
+        request is sent inline; with one, the send runs on a helper thread so a
+        cancellation returns at once, and the response is closed (which stops
+        Ollama) as soon as its headers arrive.
+
+        Args:
+            request: Request from client.build_request()
+            token: The caller's cancellation token, if any
+
+        Returns:
+            Streaming response (caller closes it)
+
+        Raises:
+            OperationCancelled: The token was cancelled before the headers arrived
+        """
+        if token is None:
+            return self.client.send(request, stream=True)
+        ready = threading.Event()
+        future = self._senders.submit(self.client.send, request, stream=True)
+        future.add_done_callback(lambda f: ready.set())
+        unregister = token.register(ready.set)
+        try:
+            ready.wait()
+        finally:
+            unregister()
+        if future.done() and not token.cancelled:
+            return future.result()
+
+        def close_abandoned(f: Future):
+            if not f.cancelled() and f.exception() is None:
+                f.result().close()
+
+        if not future.cancel():
+            future.add_done_callback(close_abandoned)
+        raise OperationCancelled(token.reason or "cancelled")
+
+    # ----------------------------------------------------------------- metrics
+
+    def _begin(self, model: str, agent: Optional[str]):
+        with self._lock:
+            for stats in (self._models.setdefault(model, _ModelStats()),
+                          self._agents.setdefault(agent or "unknown", _ModelStats())):
+                stats.calls += 1
+                stats.in_flight += 1
+                stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+
+    def _end(self, model: str, agent: Optional[str], elapsed: float, ttft: Optional[float],
+             final: Optional[Dict[str, Any]], error: bool):
+        final = final or {}
+        with self._lock:
+            for stats in (self._models[model], self._agents[agent or "unknown"]):
+                stats.in_flight -= 1
+                stats.total_s += elapsed
+                stats.ttft_s += ttft or 0.0
+                stats.errors += int(error)
+                stats.load_s += final.get("load_duration", 0) / 1e9
+                stats.prompt_tokens += final.get("prompt_eval_count", 0)
+                stats.completion_tokens += final.get("eval_count", 0)
+
+    def in_flight(self, model: Optional[str] = None) -> int:
+        """Number of calls currently running (for one model, or in total)."""
+        with self._lock:
+            if model is not None:
+                stats = self._models.get(model)
+                return stats.in_flight if stats else 0
+            return sum(s.in_flight for s in self._models.values())
+
+    def metrics(self) -> Dict[str, Any]:
+        """Snapshot of per-model and per-agent metrics."""
+        with self._lock:
+            return {
+                "base_url": self.base_url,
+                "in_flight": sum(s.in_flight for s in self._models.values()),
+                "models": {m: s.snapshot() for m, s in self._models.items()},
+                "agents": {a: s.snapshot() for a, s in self._agents.items()},
+                "scheduler": self.scheduler.stats(),
+                "concurrency": self.limiter.stats(),
+                "cache": self.cache.stats(),
+            }
+
+    # ------------------------------------------------------------------- cache
+
+    def _cache_key(self, endpoint: str, model: str, agent: Optional[str], cache: Optional[bool],
+                   request: Dict[str, Any]) -> Optional[str]:
+        """Cache key for a call, or None when caching does not apply to it."""
+        if not self.cache.enabled_for(agent, cache):
+            return None
+        config = self.model_config(model)
+        options = self._payload(model, config, request.pop("options", None), None).get("options")
+        return make_key(endpoint, model, {**request, "options": options})
+
+    def _cached(self, key: Optional[str], model: str, agent: Optional[str],
+                on_token: Optional[TokenCallback]) -> Optional[str]:
+        """Serve a call from the response cache, recording the hit."""
+        if key is None or refreshing():
+            return None
+        hit = self.cache.get(key, agent)
+        if hit is None:
+            return None
+        entry, tier = hit
+        with self._lock:
+            self._models.setdefault(model, _ModelStats()).cache_hits += 1
+            self._agents.setdefault(agent or "unknown", _ModelStats()).cache_hits += 1
+        usage = current_usage()
+        if usage is not None:
+            usage.record_cache_hit(agent, entry.get("elapsed_s", 0.0))
+        logger.info(f"LLM cache hit ({tier}) for {agent or 'unknown'} on {model}; "
+                    f"saved ~{entry.get('elapsed_s', 0.0):.1f}s")
+        if on_token:
+            on_token(entry["text"])
+        return entry["text"]
+
+    # -------------------------------------------------------------- sync calls
+
+    def _stream(self, path: str, payload: Dict[str, Any], model: str, agent: Optional[str],
+                extract: Callable[[Dict[str, Any]], str]) -> Iterator[str]:
+        config = self.model_config(model)
+        token = current_token()
+        if token is not None:
+            token.raise_if_cancelled()
+        lease = self.scheduler.acquire(model)
+        if lease.keep_alive:
+            payload = {**payload, "keep_alive": lease.keep_alive}
+        try:
+            permit = self.limiter.acquire(model)
+        except BaseException:
+            self.scheduler.release(lease)
+            raise
+        self._begin(model, agent)
+        start = time.time()
+        ttft = None
+        final = None
+        error = False
+        overloaded = False
+        unregister = None
+        try:
+            request = self.client.build_request("POST", path, json=payload, timeout=self._timeout(config))
+            with closing(self._send(request, token)) as response:
+                if token is not None:
+                    # Closing the connection makes Ollama stop generating
+                    unregister = token.register(lambda: _abort_response(response))
+                if response.status_code != 200:
+                    overloaded = response.status_code >= 500
+                    response.read()
+                    raise LLMGatewayError(f"Ollama {path} failed for {model}: "
+                                          f"{response.status_code} {response.text[:200]}")
+                for line in response.iter_lines():
+                    if token is not None:
+                        token.raise_if_cancelled()
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("error"):
+                        raise LLMGatewayError(f"Ollama error for {model}: {chunk['error']}")
+                    text = extract(chunk)
+                    if text:
+                        if ttft is None:
+                            ttft = time.time() - start
+                        yield text
+                    if chunk.get("done"):
+                        final = chunk
+                        break
+        except GeneratorExit:
+            # Consumer stopped reading: leaving the context manager closes the request
+            raise
+        except httpx.HTTPError as e:
+            if token is not None and token.cancelled:
+                raise OperationCancelled(token.reason or "cancelled") from e
+            error = overloaded = True
+            raise LLMGatewayError(f"Ollama request to {self.base_url}{path} failed: {e}") from e
+        except Exception:
+            error = True
+            raise
+        finally:
+            if unregister is not None:
+                unregister()
+            elapsed = time.time() - start
+            self._end(model, agent, elapsed, ttft, final, error)
+            self.limiter.release(permit, elapsed, final, overloaded)
+            self.scheduler.release(lease, final)
+
+    def stream(self, prompt: str, model: Optional[str] = None, agent: Optional[str] = None,
+               system: Optional[str] = None, options: Optional[Dict[str, Any]] = None,
+               keep_alive: Optional[str] = None, format: Optional[str] = None) -> Iterator[str]:
+        """
+        Stream a completion token by token. Closing the iterator aborts the request.
+
+        Args:
+            prompt: Prompt text
+            model: Model name (defaults to ollama.model_default)
+            agent: Calling agent, for metrics
+            system: Optional system prompt
+            options: Ollama generation options (override per-model options)
+            keep_alive: Override the model's keep_alive
+            format: Optional output format (e.g. "json")
+
+        Yields:
+            Response text fragments
+        """
+        model = model or self.default_model
+        payload = self._payload(model, self.model_config(model), options, keep_alive)
+        payload["prompt"] = prompt
+        if system:
+            payload["system"] = system
+        if format:
+            payload["format"] = format
+        return self._stream("/api/generate", payload, model, agent, lambda c: c.get("response", ""))
+
+    def generate(self, prompt: str, model: Optional[str] = None, agent: Optional[str] = None,
+                 on_token: Optional[TokenCallback] = None, cache: Optional[bool] = None, **kwargs) -> str:
+        """
+        Generate a completion.
+
+        Args:
+            prompt: Prompt text
+            model: Model name (defaults to ollama.model_default)
+            agent: Calling agent, for metrics and cache settings
+            on_token: Optional callback receiving each text fragment as it arrives
+                      (a cached response arrives as one fragment)
+            cache: Force the response cache on/off for this call (None = per-agent setting)
+            **kwargs: system, options, keep_alive, format (see stream())
+
+        Returns:
+            Full response text
+        """
+        model = model or self.default_model
+        key = self._cache_key("generate", model, agent, cache, {
+            "prompt": prompt, "system": kwargs.get("system"),
+            "options": kwargs.get("options"), "format": kwargs.get("format")
+        })
+        cached = self._cached(key, model, agent, on_token)
+        if cached is not None:
+            return cached
+
+        start = time.time()
+        parts = []
+        for token in self.stream(prompt, model=model, agent=agent, **kwargs):
+            parts.append(token)
+            if on_token:
+                on_token(token)
+        text = "".join(parts)
+        if key is not None:
+            self.cache.put(key, text, agent, elapsed_s=time.time() - start)
+        return text
+
+    def chat(self, messages: List[Dict[str, str]], model: Optional[str] = None, agent: Optional[str] = None,
+             options: Optional[Dict[str, Any]] = None, keep_alive: Optional[str] = None,
+             on_token: Optional[TokenCallback] = None, cache: Optional[bool] = None) -> str:
+        """
+        Chat completion.
+
+        Args:
+            messages: [{"role": ..., "content": ...}]
+            model: Model name (defaults to ollama.model_default)
+            agent: Calling agent, for metrics
+            options: Ollama generation options
+            keep_alive: Override the model's keep_alive
+            on_token: Optional callback receiving each text fragment
+            cache: Force the response cache on/off for this call (None = per-agent setting)
+
+        Returns:
+            Assistant message content
+        """
+        model = model or self.default_model
+        key = self._cache_key("chat", model, agent, cache, {"messages": messages, "options": options})
+        cached = self._cached(key, model, agent, on_token)
+        if cached is not None:
+            return cached
+
+        start = time.time()
+        payload = self._payload(model, self.model_config(model), options, keep_alive)
+        payload["messages"] = messages
+        parts = []
+        for token in self._stream("/api/chat", payload, model, agent,
+                                  lambda c: (c.get("message") or {}).get("content", "")):
+            parts.append(token)
+            if on_token:
+                on_token(token)
+        text = "".join(parts)
+        if key is not None:
+            self.cache.put(key, text, agent, elapsed_s=time.time() - start)
+        return text
+
+    def embed(self, texts: List[str], model: Optional[str] = None, agent: Optional[str] = None) -> List[List[float]]:
+        """
+        Embed a batch of texts in one request.
+
+        Args:
+            texts: Texts to embed
+            model: Embedding model (defaults to ollama.embed_model)
+            agent: Calling agent, for metrics
+
+        Returns:
+            One vector per text
+        """
+        model = model or self.embed_model
+        config = self.model_config(model)
+        payload = {"model": model, "input": texts}
+        if config.get("keep_alive") is not None:
+            payload["keep_alive"] = config["keep_alive"]
+
+        token = current_token()
+        if token is not None:
+            token.raise_if_cancelled()
+        lease = self.scheduler.acquire(model)
+        self._begin(model, agent)
+        start = time.time()
+        final = None
+        try:
+            response = self.client.post("/api/embed", json=payload, timeout=self._timeout(config))
+            if response.status_code != 200:
+                raise LLMGatewayError(f"Ollama embed failed for {model}: {response.status_code} {response.text[:200]}")
+            final = response.json()
+            return final["embeddings"]
+        except httpx.HTTPError as e:
+            raise LLMGatewayError(f"Ollama embed request failed: {e}") from e
+        finally:
+            self._end(model, agent, time.time() - start, None, final, final is None)
+            self.scheduler.release(lease, final)
+
+    def list_models(self) -> List[str]:
+        """Names of models available locally."""
+        response = self.client.get("/api/tags", timeout=self.settings["connect_timeout"])
+        response.raise_for_status()
+        return [m["name"] for m in response.json().get("models", [])]
+
+    def preload(self, model: str, keep_alive: Optional[str] = None) -> float:
+        """
+        Load a model into memory without generating.
+
+        Args:
+            model: Model to load
+            keep_alive: How long to keep it loaded (defaults to the model's keep_alive)
+
+        Returns:
+            Load time in seconds as reported by Ollama
+        """
+        config = self.model_config(model)
+        payload = {"model": model, "stream": False}
+        keep_alive = keep_alive if keep_alive is not None else config.get("keep_alive")
+        if keep_alive is not None:
+            payload["keep_alive"] = keep_alive
+        response = self.client.post("/api/generate", json=payload, timeout=self._timeout(config))
+        if response.status_code != 200:
+            raise LLMGatewayError(f"Ollama preload failed for {model}: {response.status_code} {response.text[:200]}")
+        return response.json().get("load_duration", 0) / 1e9
+
+    def ps(self) -> List[Dict[str, Any]]:
+        """Models currently loaded in Ollama (name, size, size_vram, expires_at)."""
+        response = self.client.get("/api/ps", timeout=self.settings["connect_timeout"])
+        response.raise_for_status()
+        return response.json().get("models", [])
+
+    # ------------------------------------------------------------- async calls
+
+    async def astream(self, prompt: str, model: Optional[str] = None, agent: Optional[str] = None,
+                      system: Optional[str] = None, options: Optional[Dict[str, Any]] = None,
+                      keep_alive: Optional[str] = None, format: Optional[str] = None) -> AsyncIterator[str]:
+        """Async counterpart of stream()."""
+        model = model or self.default_model
+        config = self.model_config(model)
+        payload = self._payload(model, config, options, keep_alive)
+        payload["prompt"] = prompt
+        if system:
+            payload["system"] = system
+        if format:
+            payload["format"] = format
+
+        token = current_token()
+        if token is not None:
+            token.raise_if_cancelled()
+        lease = await asyncio.to_thread(self.scheduler.acquire, model)
+        if lease.keep_alive:
+            payload["keep_alive"] = lease.keep_alive
+        try:
+            permit = await asyncio.to_thread(self.limiter.acquire, model)
+        except BaseException:
+            self.scheduler.release(lease)
+            raise
+        self._begin(model, agent)
+        start = time.time()
+        ttft = None
+        final = None
+        error = False
+        overloaded = False
+        try:
+            async with self._async_client().stream(
+                "POST", "/api/generate", json=payload, timeout=self._timeout(config)
+            ) as response:
+                if response.status_code != 200:
+                    overloaded = response.status_code >= 500
+                    await response.aread()
+                    raise LLMGatewayError(f"Ollama generate failed for {model}: "
+                                          f"{response.status_code} {response.text[:200]}")
+                async for line in response.aiter_lines():
+                    if token is not None:
+                        token.raise_if_cancelled()
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("error"):
+                        raise LLMGatewayError(f"Ollama error for {model}: {chunk['error']}")
+                    text = chunk.get("response", "")
+                    if text:
+                        if ttft is None:
+                            ttft = time.time() - start
+                        yield text
+                    if chunk.get("done"):
+                        final = chunk
+                        break
+        except (GeneratorExit, asyncio.CancelledError):
+            raise
+        except httpx.HTTPError as e:
+            error = overloaded = True
+            raise LLMGatewayError(f"Ollama request to {self.base_url}/api/generate failed: {e}") from e
+        except Exception:
+            error = True
+            raise
+        finally:
+            elapsed = time.time() - start
+            self._end(model, agent, elapsed, ttft, final, error)
+            self.limiter.release(permit, elapsed, final, overloaded)
+            self.scheduler.release(lease, final)
+
+    async def agenerate(self, prompt: str, model: Optional[str] = None, agent: Optional[str] = None,
+                        on_token: Optional[TokenCallback] = None, cache: Optional[bool] = None,
+                        **kwargs) -> str:
+        """Async counterpart of generate()."""
+        model = model or self.default_model
+        key = self._cache_key("generate", model, agent, cache, {
+            "prompt": prompt, "system": kwargs.get("system"),
+            "options": kwargs.get("options"), "format": kwargs.get("format")
+        })
+        cached = self._cached(key, model, agent, on_token)
+        if cached is not None:
+            return cached
+
+        start = time.time()
+        parts = []
+        async for token in self.astream(prompt, model=model, agent=agent, **kwargs):
+            parts.append(token)
+            if on_token:
+                on_token(token)
+        text = "".join(parts)
+        if key is not None:
+            self.cache.put(key, text, agent, elapsed_s=time.time() - start)
+        return text
+
+
+class GatewayLLM:
+    """
+    Model-bound handle on the gateway with the OllamaLLM calling convention
+    (invoke / ainvoke / stream), so agents can swap it in unchanged.
+    """
+
+    def __init__(self, gateway: LLMGateway, model: str, agent: Optional[str] = None):
+        self.gateway = gateway
+        self.model = model
+        self.agent = agent
+
+    def invoke(self, prompt: str, **kwargs) -> str:
+        """Generate a completion (see LLMGateway.generate)."""
+        return self.gateway.generate(prompt, model=self.model, agent=self.agent, **kwargs)
+
+    async def ainvoke(self, prompt: str, **kwargs) -> str:
+        """Async completion (see LLMGateway.agenerate)."""
+        return await self.gateway.agenerate(prompt, model=self.model, agent=self.agent, **kwargs)
+
+    def stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """Stream tokens (see LLMGateway.stream)."""
+        return self.gateway.stream(prompt, model=self.model, agent=self.agent, **kwargs)
+
+
+# Global gateway instance
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway(config_path: str = SETTINGS_PATH) -> LLMGateway:
+    """Get or create the shared LLM gateway."""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = LLMGateway(config_path)
+        return _gateway
+
+
+def get_llm(model: Optional[str] = None, agent: Optional[str] = None) -> GatewayLLM:
+    """
+    Get a model-bound LLM handle on the shared gateway.
+
+    Args:
+        model: Model name (defaults to ollama.model_default)
+        agent: Calling agent name, used to attribute metrics
+
+    Returns:
+        GatewayLLM with invoke / ainvoke / stream
+    """
+    gateway = get_gateway()
+    return GatewayLLM(gateway, model or gateway.default_model, agent)
+
+
+def main():
+    """CLI for checking connectivity and metrics."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="HAWK-AI LLM gateway")
+    parser.add_argument("--models", action="store_true", help="List available models")
+    parser.add_argument("--ps", action="store_true", help="List loaded models")
+    parser.add_argument("--model", type=str, help="Model for --prompt")
+    parser.add_argument("--prompt", type=str, help="Stream a completion")
+    args = parser.parse_args()
+
+    gateway = get_gateway()
+    if args.models:
+        print("\n".join(gateway.list_models()))
+    if args.ps:
+        print(json.dumps(gateway.ps(), indent=2))
+    if args.prompt:
+        for token in gateway.stream(args.prompt, model=args.model, agent="cli"):
+            print(token, end="", flush=True)
+        print()
+        print(json.dumps(gateway.metrics(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+"""
+HAWK-AI Model Scheduler
+=======================
+Residency-aware admission of LLM calls to minimize Ollama model swapping.
+
+One supervisor run touches four or five large models. On a memory-bound
+box Ollama can only keep a few of them loaded, so calls that arrive in an
+unlucky order spend much of the request unloading and loading weights.
+The scheduler sits in the LLM gateway and:
+
+- Tracks which models are resident (Ollama /api/ps, cached briefly)
+- Admits calls for loaded models first, so queued calls are grouped by
+  model; a call that needs a new model waits while the resident set is
+  busy (bounded by max_wait so nothing starves)
+- Extends keep_alive for models that a running request still plans to use
+- Preloads the next planned model in the background while the current
+  one is generating, when there is room for it
+- Records swaps (calls whose load time exceeds swap_threshold_s), time
+  lost to loading and queue wait per request (see track_request)
+
+Usage:
+    from core.model_scheduler import track_request
+    with track_request() as usage:
+        gateway.scheduler.plan(["gpt-oss:20b", "nous-hermes2:34b"])
+        ...
+    report["llm_usage"] = usage.summary()
+"""
+
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from core.cancellation import current_token
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    "enabled": True,
+    "max_resident": 2,          # large models Ollama can hold at once (OLLAMA_MAX_LOADED_MODELS / RAM)
+    "max_wait": 30.0,           # seconds a call may be held back before it is admitted anyway
+    "ps_ttl": 2.0,              # seconds to cache /api/ps
+    "swap_threshold_s": 0.5,    # load_duration above this counts as a model swap
+    "planned_keep_alive": "30m",
+    "preload": True,
+    "exempt": [],               # small models (embeddings) that never wait; embed_model is always exempt
+}
+
+
+class RequestUsage:
+    """LLM usage of one request: calls, swaps, load and queue-wait time per model, cache hits."""
+
+    def __init__(self, label: Optional[str] = None):
+        self.label = label
+        self.planned: List[str] = []
+        self._lock = threading.Lock()
+        self._models: Dict[str, Dict[str, Any]] = {}
+        self.preloads = 0
+        self.preload_s = 0.0
+        self.cache_hits: Dict[str, int] = {}
+        self.cache_saved_s = 0.0
+
+    def record(self, model: str, load_s: float, wait_s: float, swapped: bool):
+        with self._lock:
+            stats = self._models.setdefault(model, {"calls": 0, "swaps": 0, "load_s": 0.0, "wait_s": 0.0})
+            stats["calls"] += 1
+            stats["swaps"] += int(swapped)
+            stats["load_s"] += load_s
+            stats["wait_s"] += wait_s
+
+    def record_preload(self, seconds: float):
+        with self._lock:
+            self.preloads += 1
+            self.preload_s += seconds
+
+    def record_cache_hit(self, agent: Optional[str], saved_s: float):
+        with self._lock:
+            self.cache_hits[agent or "unknown"] = self.cache_hits.get(agent or "unknown", 0) + 1
+            self.cache_saved_s += saved_s
+
+    @property
+    def swaps(self) -> int:
+        with self._lock:
+            return sum(s["swaps"] for s in self._models.values())
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals and per-model breakdown, rounded for reports."""
+        with self._lock:
+            models = {
+                m: {**s, "load_s": round(s["load_s"], 2), "wait_s": round(s["wait_s"], 2)}
+                for m, s in self._models.items()
+            }
+            return {
+                "calls": sum(s["calls"] for s in models.values()),
+                "swaps": sum(s["swaps"] for s in models.values()),
+                "load_s": round(sum(s["load_s"] for s in self._models.values()), 2),
+                "queue_wait_s": round(sum(s["wait_s"] for s in self._models.values()), 2),
+                "preloads": self.preloads,
+                "preload_s": round(self.preload_s, 2),
+                "cache": {
+                    "hits": sum(self.cache_hits.values()),
+                    "saved_s": round(self.cache_saved_s, 2),
+                    "agents": dict(self.cache_hits),
+                },
+                "models": models,
+            }
+
+
+_current_usage: contextvars.ContextVar[Optional[RequestUsage]] = contextvars.ContextVar(
+    "hawk_llm_usage", default=None
+)
+_live_usages: Set[RequestUsage] = set()
+_live_lock = threading.Lock()
+
+
+@contextmanager
+def track_request(label: Optional[str] = None) -> Iterator[RequestUsage]:
+    """
+    Attribute LLM calls made in this context to one request.
+
+    Worker threads inherit the usage only when run in a copied context
+    (executor.submit(contextvars.copy_context().run, fn, ...)).
+
+    Args:
+        label: Optional request label for logs
+
+    Yields:
+        RequestUsage collecting the request's calls
+    """
+    usage = RequestUsage(label)
+    token = _current_usage.set(usage)
+    with _live_lock:
+        _live_usages.add(usage)
+    try:
+        yield usage
+    finally:
+        with _live_lock:
+            _live_usages.discard(usage)
+        _current_usage.reset(token)
+
+
+def current_usage() -> Optional[RequestUsage]:
+    """RequestUsage of the calling context, if any."""
+    return _current_usage.get()
+
+
+@dataclass
+class Lease:
+    """Admission of one call; returned to the scheduler when the call ends."""
+    model: str
+    resident: bool
+    wait_s: float
+    keep_alive: Optional[str] = None
+    usage: Optional[RequestUsage] = None
+
+
+@dataclass
+class _Ticket:
+    model: str
+    enqueued_at: float = field(default_factory=time.time)
+
+
+class ModelScheduler:
+    """Groups queued LLM calls by loaded model and accounts for model swaps."""
+
+    def __init__(self, gateway, settings: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            gateway: LLMGateway providing ps() and preload()
+            settings: model_scheduler section of settings.yaml
+        """
+        self.gateway = gateway
+        self.settings = dict(DEFAULT_SETTINGS)
+        self.settings.update(settings or {})
+        self.exempt = set(self.settings.get("exempt") or [])
+        if getattr(gateway, "embed_model", None):
+            self.exempt.add(gateway.embed_model)
+
+        self._cond = threading.Condition()
+        self._active: Dict[str, int] = {}
+        self._waiting: List[_Ticket] = []
+        self._resident: Dict[str, float] = {}  # model -> last used
+        self._preloading: Set[str] = set()
+        self._ps_checked = 0.0
+        self.counters = {"admitted": 0, "held": 0, "forced": 0, "swaps": 0, "load_s": 0.0, "preloads": 0}
+
+    # --------------------------------------------------------------- residency
+
+    def _refresh_resident(self, force: bool = False):
+        """Re-read loaded models from Ollama if the cached view is stale."""
+        if not force and time.time() - self._ps_checked < self.settings["ps_ttl"]:
+            return
+        try:
+            loaded = [m.get("name") or m.get("model") for m in self.gateway.ps()]
+        except Exception as e:
+            logger.debug(f"Could not query loaded models: {e}")
+            self._ps_checked = time.time()
+            return
+        with self._cond:
+            self._resident = {m: self._resident.get(m, time.time()) for m in loaded if m}
+            self._ps_checked = time.time()
+
+    def resident(self) -> List[str]:
+        """Models currently believed to be loaded."""
+        self._refresh_resident()
+        with self._cond:
+            return list(self._resident)
+
+    def _planned(self) -> List[str]:
+        with _live_lock:
+            usages = list(_live_usages)
+        planned = []
+        for usage in usages:
+            planned.extend(m for m in usage.planned if m not in planned)
+        return planned
+
+    # --------------------------------------------------------------- admission
+
+    def _admissible(self, ticket: _Ticket) -> bool:
+        """Whether a ticket can run now without forcing an avoidable swap. Caller holds the lock."""
+        model = ticket.model
+        if model in self.exempt or model in self._active or model in self._resident:
+            return True
+
+        busy = [m for m, n in self._active.items() if n and m not in self.exempt]
+        if len(busy) >= self.settings["max_resident"]:
+            return False
+
+        # Calls for loaded models go first; then the oldest waiting model loads
+        for other in self._waiting:
+            if other.model in self._resident or other.model in self._active:
+                return False
+        first_cold = next(t for t in self._waiting if t.model not in self.exempt)
+        return first_cold.model == model
+
+    def acquire(self, model: str) -> Lease:
+        """
+        Wait until a call for model may run.
+
+        Args:
+            model: Model the call will use
+
+        Returns:
+            Lease to pass to release() when the call ends
+        """
+        usage = current_usage()
+        if not self.settings["enabled"] or model in self.exempt:
+            return Lease(model, resident=True, wait_s=0.0, usage=usage)
+
+        self._refresh_resident()
+        ticket = _Ticket(model)
+        token = current_token()
+        unregister = token.register(self._wake) if token is not None else None
+        with self._cond:
+            self._waiting.append(ticket)
+            held = False
+            while not self._admissible(ticket):
+                if token is not None and token.cancelled:
+                    self._waiting.remove(ticket)
+                    self._cond.notify_all()
+                    unregister()
+                    token.raise_if_cancelled()
+                remaining = self.settings["max_wait"] - (time.time() - ticket.enqueued_at)
+                if remaining <= 0:
+                    self.counters["forced"] += 1
+                    logger.warning(f"Admitting {model} after {self.settings['max_wait']}s wait")
+                    break
+                held = True
+                self._cond.wait(timeout=min(remaining, self.settings["ps_ttl"]))
+            self._waiting.remove(ticket)
+            self._active[model] = self._active.get(model, 0) + 1
+            resident = model in self._resident
+            self.counters["admitted"] += 1
+            self.counters["held"] += int(held)
+            planned = self._planned()
+            self._cond.notify_all()
+        if unregister is not None:
+            unregister()
+
+        wait_s = time.time() - ticket.enqueued_at
+        if held:
+            logger.info(f"Held {model} call {wait_s:.2f}s to reuse loaded models")
+        keep_alive = self.settings["planned_keep_alive"] if model in planned else None
+        self._maybe_preload(model, planned, usage)
+        return Lease(model, resident=resident, wait_s=wait_s, keep_alive=keep_alive, usage=usage)
+
+    def _wake(self):
+        with self._cond:
+            self._cond.notify_all()
+
+    def release(self, lease: Lease, final: Optional[Dict[str, Any]] = None):
+        """
+        Return a lease and record load time from Ollama's final response chunk.
+
+        Args:
+            lease: Lease from acquire()
+            final: Final response chunk (load_duration in nanoseconds), if any
+        """
+        load_s = (final or {}).get("load_duration", 0) / 1e9
+        swapped = load_s > self.settings["swap_threshold_s"]
+        if lease.usage is not None:
+            lease.usage.record(lease.model, load_s, lease.wait_s, swapped)
+        if swapped:
+            logger.info(f"Model swap: {lease.model} took {load_s:.2f}s to load")
+
+        with self._cond:
+            if lease.model in self._active:
+                self._active[lease.model] -= 1
+                if self._active[lease.model] <= 0:
+                    del self._active[lease.model]
+            if final is not None:
+                self._resident[lease.model] = time.time()
+            self.counters["swaps"] += int(swapped)
+            self.counters["load_s"] += load_s
+            self._cond.notify_all()
+        if swapped:
+            # Loading evicted something; re-read residency on the next admission
+            self._ps_checked = 0.0
+
+    # ------------------------------------------------------------------ plans
+
+    def plan(self, models: List[str]):
+        """
+        Declare the models the current request will call next, in order.
+
+        Planned models get a longer keep_alive, and the first one that is not
+        loaded is preloaded if the resident set has room.
+
+        Args:
+            models: Upcoming models (replaces the previous plan of this request)
+        """
+        usage = current_usage()
+        if usage is None:
+            return
+        usage.planned = [m for m in dict.fromkeys(models) if m and m not in self.exempt]
+        if self.settings["enabled"]:
+            self._refresh_resident()
+            self._maybe_preload(None, usage.planned, usage)
+
+    def _maybe_preload(self, current: Optional[str], planned: List[str], usage: Optional[RequestUsage]):
+        if not (self.settings["enabled"] and self.settings["preload"]):
+            return
+        with self._cond:
+            loaded = {m for m in set(self._resident) | set(self._active) | self._preloading
+                      if m not in self.exempt}
+            if current:
+                loaded.add(current)
+            target = next((m for m in planned if m not in loaded), None)
+            if target is None or len(loaded) >= self.settings["max_resident"]:
+                return
+            self._preloading.add(target)
+        threading.Thread(target=self._preload, args=(target, usage), name="model-preload", daemon=True).start()
+
+    def _preload(self, model: str, usage: Optional[RequestUsage]):
+        start = time.time()
+        try:
+            self.gateway.preload(model, keep_alive=self.settings["planned_keep_alive"])
+            elapsed = time.time() - start
+            logger.info(f"Preloaded {model} in {elapsed:.2f}s")
+            with self._cond:
+                self._resident[model] = time.time()
+                self.counters["preloads"] += 1
+                self._cond.notify_all()
+            if usage is not None:
+                usage.record_preload(elapsed)
+        except Exception as e:
+            logger.warning(f"Preloading {model} failed: {e}")
+        finally:
+            with self._cond:
+                self._preloading.discard(model)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters plus the current active, waiting and resident models."""
+        with self._cond:
+            return {
+                **self.counters,
+                "load_s": round(self.counters["load_s"], 2),
+                "active": dict(self._active),
+                "waiting": [t.model for t in self._waiting],
+                "resident": list(self._resident),
+            }
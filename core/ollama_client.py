@@ -2,70 +2,49 @@
 Ollama client wrapper for HAWK-AI.
 Provides unified interface for language model and embedding operations.
 """
-import os
 from typing import List, Dict, Any, Optional
 import yaml
-from ollama import Client
-from langchain_ollama import OllamaLLM, OllamaEmbeddings
 from rich.console import Console
 
+from core.llm_gateway import get_gateway, get_llm
+
 console = Console()
 
 
 class OllamaClientWrapper:
-    """Wrapper for Ollama client with LangChain integration."""
+    """Wrapper exposing the shared LLM gateway with the legacy client interface."""
     
     def __init__(self, config_path: str = "config/settings.yaml"):
         """Initialize Ollama client with configuration."""
         self.config = self._load_config(config_path)
-        self.host = f"http://{self.config['ollama']['host']}:{self.config['ollama']['port']}"
-        
-        # Initialize native Ollama client
-        self.client = Client(host=self.host)
-        
-        # Initialize LangChain components
-        self.llm = OllamaLLM(
-            base_url=self.host,
-            model=self.config['ollama']['model_default'],
-            timeout=self.config['ollama'].get('timeout', 300)
-        )
         
-        self.embeddings = OllamaEmbeddings(
-            base_url=self.host,
-            model=self.config['ollama']['embed_model']
-        )
+        # All calls go through the shared, pooled gateway
+        self.gateway = get_gateway(config_path)
+        self.host = self.gateway.base_url
+        self.llm = get_llm(self.config['ollama']['model_default'])
     
     def _load_config(self, config_path: str) -> Dict[str, Any]:
         """Load configuration from YAML file."""
         with open(config_path, 'r') as f:
             return yaml.safe_load(f)
     
-    def generate(self, prompt: str, model: Optional[str] = None, **kwargs) -> str:
+    def generate(self, prompt: str, model: Optional[str] = None, agent: Optional[str] = None, **kwargs) -> str:
         """Generate text completion using Ollama."""
         model_name = model or self.config['ollama']['model_default']
         
         try:
-            response = self.client.generate(
-                model=model_name,
-                prompt=prompt,
-                **kwargs
-            )
-            return response['response']
+            return self.gateway.generate(prompt, model=model_name, agent=agent, **kwargs)
         except Exception as e:
             console.print(f"[red]Error generating response: {e}[/red]")
             raise
     
-    def chat(self, messages: List[Dict[str, str]], model: Optional[str] = None, **kwargs) -> str:
+    def chat(self, messages: List[Dict[str, str]], model: Optional[str] = None,
+             agent: Optional[str] = None, **kwargs) -> str:
         """Chat completion using Ollama."""
         model_name = model or self.config['ollama']['model_default']
         
         try:
-            response = self.client.chat(
-                model=model_name,
-                messages=messages,
-                **kwargs
-            )
-            return response['message']['content']
+            return self.gateway.chat(messages, model=model_name, agent=agent, **kwargs)
         except Exception as e:
             console.print(f"[red]Error in chat: {e}[/red]")
             raise
@@ -73,7 +52,7 @@ class OllamaClientWrapper:
     def embed(self, texts: List[str]) -> List[List[float]]:
         """Generate embeddings for texts."""
         try:
-            return self.embeddings.embed_documents(texts)
+            return self.gateway.embed(texts, model=self.config['ollama']['embed_model'])
         except Exception as e:
             console.print(f"[red]Error generating embeddings: {e}[/red]")
             raise
@@ -81,7 +60,7 @@ class OllamaClientWrapper:
     def embed_query(self, text: str) -> List[float]:
         """Generate embedding for a single query."""
         try:
-            return self.embeddings.embed_query(text)
+            return self.gateway.embed([text], model=self.config['ollama']['embed_model'])[0]
         except Exception as e:
             console.print(f"[red]Error generating query embedding: {e}[/red]")
             raise
@@ -89,8 +68,7 @@ class OllamaClientWrapper:
     def list_models(self) -> List[str]:
         """List available models."""
         try:
-            models = self.client.list()
-            return [m['name'] for m in models['models']]
+            return self.gateway.list_models()
         except Exception as e:
             console.print(f"[red]Error listing models: {e}[/red]")
             return []
@@ -9,6 +9,7 @@ from rich.console import Console
 from rich.panel import Panel
 
 from core.agent_registry import get_agent_registry, AgentType, AgentCapability
+from core.cancellation import CancellationToken, OperationCancelled, cancel_scope
 from core.local_tracking import get_tracker
 from core.vector_store import VectorStore
 from core.ollama_client import get_ollama_client
@@ -133,20 +134,36 @@ class Orchestrator:
         except Exception as e:
             console.print(f"[red]Error retrieving context: {e}[/red]")
             return []
-    
-    def execute_task_streaming(self, query: str, progress_callback=None, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+
+    @staticmethod
+    def _remaining(deadline_s: Optional[float], start_time: datetime) -> Optional[float]:
+        """Part of a request deadline left for the supervisor after classification and retrieval."""
+        if not deadline_s:
+            return None
+        return max(0.01, deadline_s - (datetime.now() - start_time).total_seconds())
+
+    def execute_task_streaming(
+        self,
+        query: str,
+        progress_callback=None,
+        context: Optional[Dict[str, Any]] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Dict[str, Any]:
         """
         Execute a task through the agent system with streaming support.
         
         Args:
             query: User query
             progress_callback: Optional callback for progress updates
-            context: Optional additional context
+            context: Optional additional context (e.g. {"session_id": ..., "deadline_s": ...})
+            cancel_token: Optional token; cancelling it aborts agent work and LLM calls
             
         Returns:
             Dictionary with execution results
         """
         start_time = datetime.now()
+        session_id = (context or {}).get("session_id")
+        deadline_s = (context or {}).get("deadline_s")
         
         console.print(Panel.fit(
             f"[bold]Task:[/bold] {query}",
@@ -175,10 +192,17 @@ class Orchestrator:
             supervisor = self.registry.get_agent(AgentType.SUPERVISOR)
             
             if supervisor:
-                result = supervisor.run(query=query, progress_callback=progress_callback)
+                result = supervisor.run(
+                    query=query,
+                    progress_callback=progress_callback,
+                    session_id=session_id,
+                    cancel_token=cancel_token,
+                    deadline_s=self._remaining(deadline_s, start_time)
+                )
             else:
                 # Fallback to direct execution
-                result = self._direct_execution(query, task_type, historical_context)
+                with cancel_scope(cancel_token):
+                    result = self._direct_execution(query, task_type, historical_context)
             
             # Calculate duration
             duration = (datetime.now() - start_time).total_seconds()
@@ -203,6 +227,17 @@ class Orchestrator:
                 "agents_used": [a.value for a in selected_agents]
             }
             
+        except OperationCancelled as e:
+            console.print(f"[yellow]Task cancelled: {e}[/yellow]")
+            self.tracker.log_event("task_cancelled", {"query": query, "reason": str(e)})
+            
+            return {
+                "status": "cancelled",
+                "query": query,
+                "error": f"Cancelled: {e}",
+                "duration": (datetime.now() - start_time).total_seconds()
+            }
+            
         except Exception as e:
             console.print(f"[red]Error executing task: {e}[/red]")
             self.tracker.log_error("orchestrator", e)
@@ -214,18 +249,26 @@ class Orchestrator:
                 "duration": (datetime.now() - start_time).total_seconds()
             }
     
-    def execute_task(self, query: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    def execute_task(
+        self,
+        query: str,
+        context: Optional[Dict[str, Any]] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Dict[str, Any]:
         """
         Execute a task through the agent system.
         
         Args:
             query: User query
-            context: Optional additional context
+            context: Optional additional context (e.g. {"session_id": ..., "deadline_s": ...})
+            cancel_token: Optional token; cancelling it aborts agent work and LLM calls
             
         Returns:
             Dictionary with execution results
         """
         start_time = datetime.now()
+        session_id = (context or {}).get("session_id")
+        deadline_s = (context or {}).get("deadline_s")
         
         console.print(Panel.fit(
             f"[bold]Task:[/bold] {query}",
@@ -254,10 +297,12 @@ class Orchestrator:
             supervisor = self.registry.get_agent(AgentType.SUPERVISOR)
             
             if supervisor:
-                result = supervisor.run(query=query)
+                result = supervisor.run(query=query, session_id=session_id, cancel_token=cancel_token,
+                                        deadline_s=self._remaining(deadline_s, start_time))
             else:
                 # Fallback to direct execution
-                result = self._direct_execution(query, task_type, historical_context)
+                with cancel_scope(cancel_token):
+                    result = self._direct_execution(query, task_type, historical_context)
             
             # Calculate duration
             duration = (datetime.now() - start_time).total_seconds()
@@ -281,6 +326,17 @@ class Orchestrator:
                 "agents_used": [a.value for a in selected_agents]
             }
             
+        except OperationCancelled as e:
+            console.print(f"[yellow]Task cancelled: {e}[/yellow]")
+            self.tracker.log_event("task_cancelled", {"query": query, "reason": str(e)})
+            
+            return {
+                "status": "cancelled",
+                "query": query,
+                "error": f"Cancelled: {e}",
+                "duration": (datetime.now() - start_time).total_seconds()
+            }
+            
         except Exception as e:
             console.print(f"[red]Error executing task: {e}[/red]")
             self.tracker.log_error("orchestrator", e)
@@ -324,7 +380,7 @@ Please provide a comprehensive response to the query."""
         
         # Generate response
         console.print("[cyan]Generating response...[/cyan]")
-        response = self.ollama_client.generate(prompt)
+        response = self.ollama_client.generate(prompt, agent="orchestrator")
         
         return response
     
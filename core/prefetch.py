@@ -0,0 +1,293 @@
+"""
+HAWK-AI Prefetch Worker
+=======================
+Background fetch-and-index of the top pages behind a web search.
+
+After SearchAgent returns snippets, the URLs of the top results are queued
+here. A single daemon thread scrapes them in one pooled batch, chunks the
+page text, embeds the chunks and appends them to the persistent web
+knowledge index, so follow-up questions can be answered from local
+retrieval instead of new searches and scrapes.
+
+Safeguards:
+- Bounded queue (jobs are dropped, not blocked on, when it is full)
+- Per-session page budget
+- Cancellation per session: jobs submitted before cancel() are skipped if
+  still queued and stop between pages if running; later searches in the
+  session prefetch normally again
+"""
+
+import logging
+import queue
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.config_loader import get_settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    "enabled": False,
+    "top_k": 3,
+    "queue_size": 32,
+    "session_page_budget": 30,
+    "session_ttl": 3600,
+    "chunk_chars": 1200,
+    "chunk_overlap": 200,
+    "max_chunks_per_page": 20,
+}
+
+
+def chunk_text(text: str, chunk_chars: int = 1200, overlap: int = 200) -> List[str]:
+    """
+    Split text into overlapping chunks, preferring sentence boundaries.
+
+    Args:
+        text: Page text
+        chunk_chars: Target chunk size in characters
+        overlap: Characters repeated at the start of the next chunk
+
+    Returns:
+        List of chunks
+    """
+    text = re.sub(r"\s+", " ", text).strip()
+    if len(text) <= chunk_chars:
+        return [text] if text else []
+
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(len(text), start + chunk_chars)
+        if end < len(text):
+            boundary = text.rfind(". ", start + chunk_chars // 2, end)
+            if boundary != -1:
+                end = boundary + 1
+        chunks.append(text[start:end].strip())
+        if end >= len(text):
+            break
+        start = max(end - overlap, start + 1)
+    return chunks
+
+
+@dataclass
+class PrefetchJob:
+    """URLs to fetch and index for one search."""
+    session_id: str
+    query: str
+    urls: List[str]
+    generation: int = 0
+    submitted_at: float = field(default_factory=time.time)
+
+
+@dataclass
+class _SessionState:
+    pages: int = 0
+    generation: int = 0
+    last_used: float = field(default_factory=time.time)
+
+
+class PrefetchWorker:
+    """Single background thread that scrapes, chunks and indexes queued pages."""
+
+    def __init__(
+        self,
+        settings: Optional[Dict[str, Any]] = None,
+        index=None,
+        scrape_fn: Optional[Callable[[List[str]], List[Dict[str, Any]]]] = None
+    ):
+        """
+        Initialize the worker (the thread starts on the first submit).
+
+        Args:
+            settings: Overrides for the prefetch section of settings.yaml
+            index: WebKnowledgeIndex to append to (defaults to the shared index)
+            scrape_fn: Batch scraper (defaults to core.web_scraper.scrape_urls)
+        """
+        self.settings = get_settings("prefetch", DEFAULT_SETTINGS)
+        if settings:
+            self.settings.update(settings)
+        self._index = index
+        self._scrape_fn = scrape_fn
+
+        self._queue: "queue.Queue[PrefetchJob]" = queue.Queue(maxsize=self.settings["queue_size"])
+        self._sessions: Dict[str, _SessionState] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.counters = {
+            "submitted": 0, "dropped": 0, "over_budget": 0, "cancelled": 0,
+            "pages": 0, "chunks": 0, "errors": 0,
+        }
+
+    @property
+    def index(self):
+        if self._index is None:
+            from core.web_index import get_web_index
+            self._index = get_web_index()
+        return self._index
+
+    def _scrape(self, urls: List[str]) -> List[Dict[str, Any]]:
+        if self._scrape_fn is None:
+            from core.web_scraper import scrape_urls
+            self._scrape_fn = scrape_urls
+        return self._scrape_fn(urls)
+
+    def _session(self, session_id: str) -> _SessionState:
+        """Get or create session state, pruning idle sessions. Caller holds the lock."""
+        now = time.time()
+        idle = [sid for sid, s in self._sessions.items() if now - s.last_used > self.settings["session_ttl"]]
+        for sid in idle:
+            del self._sessions[sid]
+        state = self._sessions.setdefault(session_id, _SessionState())
+        state.last_used = now
+        return state
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="prefetch-worker", daemon=True)
+            self._thread.start()
+
+    def submit(self, session_id: str, query: str, urls: List[str]) -> bool:
+        """
+        Queue the top result pages of a search for background indexing.
+
+        Never blocks: returns False when the queue is full or the session's
+        page budget is spent.
+
+        Args:
+            session_id: Session the search belongs to
+            query: Query that produced the URLs
+            urls: Result URLs, best first (only top_k are used)
+
+        Returns:
+            True if a job was queued
+        """
+        urls = [u for u in dict.fromkeys(urls) if u and u.startswith("http")][:self.settings["top_k"]]
+        if not urls:
+            return False
+
+        with self._lock:
+            state = self._session(session_id)
+            remaining = self.settings["session_page_budget"] - state.pages
+            if remaining <= 0:
+                self.counters["over_budget"] += 1
+                logger.info(f"Prefetch budget spent for session {session_id}")
+                return False
+            urls = urls[:remaining]
+            # Budget is charged on submit so queued jobs cannot overshoot it
+            state.pages += len(urls)
+
+            try:
+                self._queue.put_nowait(PrefetchJob(session_id, query, urls, state.generation))
+            except queue.Full:
+                state.pages -= len(urls)
+                self.counters["dropped"] += 1
+                logger.warning("Prefetch queue full; dropping job")
+                return False
+            self.counters["submitted"] += 1
+            self._ensure_started()
+        return True
+
+    def cancel(self, session_id: str):
+        """Cancel queued and running prefetch work submitted so far for a session."""
+        with self._lock:
+            self._session(session_id).generation += 1
+        logger.info(f"Prefetch cancelled for session {session_id}")
+
+    def _is_cancelled(self, job: PrefetchJob) -> bool:
+        with self._lock:
+            state = self._sessions.get(job.session_id)
+            return state is not None and state.generation != job.generation
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                job = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                self._process(job)
+            except Exception as e:
+                self.counters["errors"] += 1
+                logger.error(f"Prefetch job failed for '{job.query}': {e}")
+            finally:
+                self._queue.task_done()
+
+    def _process(self, job: PrefetchJob):
+        if self._is_cancelled(job):
+            self.counters["cancelled"] += 1
+            return
+
+        start = time.time()
+        pages = self._scrape(job.urls)
+        chunks_added = 0
+        for page in pages:
+            if self._is_cancelled(job):
+                self.counters["cancelled"] += 1
+                logger.info(f"Prefetch for session {job.session_id} cancelled mid-job")
+                return
+            if page.get("status") != "success" or not page.get("content"):
+                continue
+
+            chunks = chunk_text(
+                page["content"], self.settings["chunk_chars"], self.settings["chunk_overlap"]
+            )[:self.settings["max_chunks_per_page"]]
+            docs = [
+                {"href": f"{page['url']}#chunk-{i}", "title": page.get("title", ""), "body": chunk}
+                for i, chunk in enumerate(chunks)
+            ]
+            chunks_added += self.index.add_documents(docs, query=job.query, source="page", save=False)
+            self.counters["pages"] += 1
+
+        if chunks_added:
+            self.index.save()
+        self.counters["chunks"] += chunks_added
+        logger.info(
+            f"Prefetched {len(pages)} page(s) for '{job.query}' "
+            f"({chunks_added} new chunks) in {time.time() - start:.2f}s"
+        )
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until all queued jobs are processed (mainly for tests and CLI use)."""
+        deadline = None if timeout is None else time.time() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.time() > deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def stop(self):
+        """Stop the worker thread after the current job."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters plus queue depth and tracked sessions."""
+        with self._lock:
+            return {**self.counters, "queued": self._queue.qsize(), "sessions": len(self._sessions)}
+
+
+# Global worker instance
+_prefetch_worker = None
+_prefetch_worker_lock = threading.Lock()
+
+
+def get_prefetch_worker() -> Optional[PrefetchWorker]:
+    """Get the shared prefetch worker, or None when prefetch is disabled."""
+    global _prefetch_worker
+    with _prefetch_worker_lock:
+        if _prefetch_worker is None:
+            settings = get_settings("prefetch", DEFAULT_SETTINGS)
+            if not settings.get("enabled"):
+                return None
+            _prefetch_worker = PrefetchWorker(settings)
+        return _prefetch_worker
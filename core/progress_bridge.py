@@ -0,0 +1,190 @@
+"""
+HAWK-AI Progress Bridge
+=======================
+Non-blocking hand-off of progress events from worker threads to an
+asyncio consumer (the SSE endpoints).
+
+Agents run in threads and report through progress_callback(event_type,
+data). The bridge's callback schedules each event onto the event loop with
+loop.call_soon_threadsafe, so the consumer awaits events without ever
+blocking the loop, and other connections on the same worker keep flowing.
+
+Buffering:
+- Consecutive "synthesis_token" events coalesce into one event, so a slow
+  client receives fewer, larger chunks instead of an ever-growing backlog
+- Repeated status events (e.g. "queue_position") replace the pending one
+- The buffer is bounded: when full, non-essential events are dropped
+  (counted); tokens, revisions and terminal events are always kept
+
+The blocking work runs on a dedicated executor when one is given (the
+server passes the admission controller's pool), so long analyses cannot
+exhaust asyncio's shared default executor.
+
+Usage:
+    bridge = ProgressBridge(executor=admission.executor())
+    task = bridge.run_in_thread(orchestrator.execute_task_streaming, query,
+                                progress_callback=bridge.callback)
+    async for event in bridge:
+        ...
+    result = await task
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+from collections import deque
+from concurrent.futures import Executor
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAXSIZE = 256
+
+# Text events merged with the pending event of the same type
+COALESCE_TEXT = {"synthesis_token"}
+# Status events where only the latest value matters
+LATEST_ONLY = {"queue_position"}
+# Never dropped, even when the buffer is full
+ESSENTIAL = {"synthesis_token", "synthesis_revised", "done", "error"}
+
+
+class ProgressBridge:
+    """Bounded, coalescing event buffer fed from threads and drained by a coroutine."""
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE, loop: Optional[asyncio.AbstractEventLoop] = None,
+                 executor: Optional[Executor] = None):
+        """
+        Create a bridge bound to the running event loop.
+
+        Args:
+            maxsize: Maximum buffered events before non-essential ones are dropped
+            loop: Event loop to deliver to (defaults to the running loop)
+            executor: Executor for run_in_thread (defaults to the loop's default executor)
+        """
+        self.loop = loop or asyncio.get_running_loop()
+        self.executor = executor
+        self.maxsize = maxsize
+        self._buffer: Deque[Dict[str, Any]] = deque()
+        self._ready = asyncio.Event()
+        self._closed = False
+        self.counters = {"received": 0, "coalesced": 0, "dropped": 0, "delivered": 0}
+
+    # --------------------------------------------------------------- producer
+
+    def callback(self, event_type: str, data: Dict[str, Any]):
+        """
+        progress_callback for agents; safe to call from any thread.
+
+        Args:
+            event_type: Event type ("agent_start", "synthesis_token", ...)
+            data: Event payload
+        """
+        event = {"type": event_type, "data": data}
+        try:
+            self.loop.call_soon_threadsafe(self._deliver, event)
+        except RuntimeError:
+            # Loop already closed: the client is gone, nothing to deliver to
+            pass
+
+    def _deliver(self, event: Dict[str, Any]):
+        """Buffer an event. Runs on the event loop thread only."""
+        if self._closed:
+            return
+        self.counters["received"] += 1
+        tail = self._buffer[-1] if self._buffer else None
+
+        if tail is not None and tail["type"] == event["type"]:
+            if event["type"] in COALESCE_TEXT:
+                tail["data"] = {**tail["data"], "text": tail["data"].get("text", "") + event["data"].get("text", "")}
+                self.counters["coalesced"] += 1
+                return
+            if event["type"] in LATEST_ONLY:
+                tail["data"] = event["data"]
+                self.counters["coalesced"] += 1
+                return
+
+        if len(self._buffer) >= self.maxsize and event["type"] not in ESSENTIAL:
+            self.counters["dropped"] += 1
+            return
+
+        self._buffer.append(event)
+        self._ready.set()
+
+    def close(self, event: Optional[Dict[str, Any]] = None):
+        """
+        Mark the stream finished, optionally after a final event. Thread-safe.
+
+        Args:
+            event: Optional terminal event, e.g. {"type": "done", "data": {}}
+        """
+        def _close():
+            if event is not None:
+                self._deliver(event)
+            self._closed = True
+            self._ready.set()
+
+        try:
+            self.loop.call_soon_threadsafe(_close)
+        except RuntimeError:
+            pass
+
+    def run_in_thread(self, fn: Callable[..., Any], *args, **kwargs) -> "asyncio.Future":
+        """
+        Run a blocking function in the bridge's executor and close the bridge when it ends.
+
+        The bridge receives {"type": "done"} on success or {"type": "error"} on
+        an exception; the returned future carries the result or exception.
+
+        Args:
+            fn: Blocking function (e.g. orchestrator.execute_task_streaming)
+            *args, **kwargs: Passed to fn
+
+        Returns:
+            Future for fn's result
+        """
+        # Like asyncio.to_thread, but on our executor; context variables carry over
+        call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+        future = asyncio.ensure_future(self.loop.run_in_executor(self.executor, call))
+
+        def _finished(task: "asyncio.Future"):
+            if task.cancelled():
+                self.close({"type": "error", "data": {"error": "cancelled"}})
+            elif task.exception() is not None:
+                self.close({"type": "error", "data": {"error": str(task.exception())}})
+            else:
+                self.close({"type": "done", "data": {}})
+
+        future.add_done_callback(_finished)
+        return future
+
+    # --------------------------------------------------------------- consumer
+
+    async def get(self) -> Optional[Dict[str, Any]]:
+        """
+        Wait for the next event without blocking the loop.
+
+        Returns:
+            Next event, or None once the bridge is closed and drained
+        """
+        while not self._buffer:
+            if self._closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        self.counters["delivered"] += 1
+        return self._buffer.popleft()
+
+    def __aiter__(self) -> AsyncIterator[Dict[str, Any]]:
+        return self._iterate()
+
+    async def _iterate(self) -> AsyncIterator[Dict[str, Any]]:
+        while True:
+            event = await self.get()
+            if event is None:
+                return
+            yield event
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters plus current buffer depth."""
+        return {**self.counters, "buffered": len(self._buffer)}
@@ -0,0 +1,185 @@
+"""
+HAWK-AI Request Throttling
+==========================
+Thread-safe primitives for protecting outbound services (e.g. DuckDuckGo):
+
+- SingleFlight: concurrent callers with the same key share one in-flight call
+- TokenBucket: smooths outbound request rate with a bounded burst
+- backoff_delay / call_with_backoff: jittered exponential backoff on failures
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """One in-flight call shared by a leader and its followers."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key.
+
+    The first caller (leader) executes the function; callers arriving while it
+    runs wait and receive the same result or exception. Once the call finishes
+    the key is released, so later callers start a new call.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self.counters = {"calls": 0, "shared": 0}
+
+    def do(self, key: str, fn: Callable[..., Any], *args, **kwargs) -> Tuple[Any, bool]:
+        """
+        Run fn(*args, **kwargs) once per concurrent key.
+
+        Args:
+            key: Coalescing key (e.g. the cache key of a search)
+            fn: Function to call
+
+        Returns:
+            Tuple of (result, shared) where shared is True for followers
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.followers += 1
+                self.counters["shared"] += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.counters["calls"] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            if call.followers:
+                logger.info(f"Coalesced {call.followers} concurrent call(s) for key {key[:16]}")
+            call.done.set()
+
+    def in_flight(self) -> int:
+        """Number of keys currently executing."""
+        with self._lock:
+            return len(self._calls)
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter.
+
+    Tokens refill continuously at `rate` per second up to `capacity`; each
+    request takes one token, waiting for a refill when the bucket is empty.
+    A rate of 0 (or less) disables limiting.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Args:
+            rate: Sustained requests per second (<= 0: unlimited)
+            capacity: Maximum burst size
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Take one token, blocking until one is available.
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if a token was taken, False on timeout
+        """
+        if self.rate <= 0:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None:
+                remaining = deadline - now
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 30.0) -> float:
+    """Full-jitter exponential backoff: uniform(0, min(cap, base * 2**attempt))."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def call_with_backoff(
+    fn: Callable[[], Any],
+    max_retries: int = 3,
+    base: float = 1.0,
+    cap: float = 30.0,
+    limiter: Optional[TokenBucket] = None,
+    description: str = "call"
+) -> Any:
+    """
+    Call fn, retrying failures with jittered exponential backoff.
+
+    Every attempt (including retries) first takes a token from limiter.
+
+    Args:
+        fn: Zero-argument function
+        max_retries: Retries after the first attempt
+        base: Base backoff in seconds
+        cap: Maximum backoff in seconds
+        limiter: Optional rate limiter
+        description: Label used in log messages
+
+    Returns:
+        fn's result; the last exception is re-raised when retries are exhausted
+    """
+    for attempt in range(max_retries + 1):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            return fn()
+        except Exception as e:
+            if attempt == max_retries:
+                raise
+            delay = backoff_delay(attempt, base, cap)
+            logger.warning(f"{description} failed ({e}); retry {attempt + 1}/{max_retries} in {delay:.2f}s")
+            time.sleep(delay)
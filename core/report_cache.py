@@ -0,0 +1,335 @@
+"""
+HAWK-AI Semantic Report Cache
+=============================
+Answers repeated and near-duplicate queries from recent supervisor reports.
+
+SupervisorAgent.run saves every report to data/analysis/report_*.json. This
+module indexes those reports by query embedding, detected country and agent
+set, so a question that was just answered ("Sudan conflict escalation" vs
+"escalation of the conflict in Sudan") does not re-run the multi-minute
+pipeline.
+
+Matching:
+- Same country and same agent set (exact)
+- Cosine similarity of the query embeddings >= similarity
+- Younger than the freshness TTL of the query's intent: "news" when the
+  agent set includes a news agent (SearchAgent), "structural" otherwise
+
+Hits return the stored report marked with report["cache"] (similarity,
+source query, age). With delta_refresh, the supervisor re-runs only the
+search component of a hit and reports which sources are new.
+
+Embeddings come from the gateway's embedding model; entries made with a
+different model are ignored.
+
+CLI:
+    python core/report_cache.py --stats
+    python core/report_cache.py --rebuild     # index existing data/analysis reports
+    python core/report_cache.py --clear
+"""
+
+import json
+import logging
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.config_loader import get_settings
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).parent.parent
+
+DEFAULT_SETTINGS = {
+    "enabled": True,
+    "path": "data/analysis/report_index.sqlite",
+    "similarity": 0.92,                                  # cosine similarity for a near-duplicate
+    "ttl": {"news": 6 * 3600, "structural": 7 * 86400},  # freshness per intent (seconds)
+    "news_agents": ["search"],                           # agent sets with these are "news"
+    "delta_refresh": True,                               # re-run search on hits of news reports
+    "max_entries": 2000,
+}
+
+
+def intent_of(agents: List[str], news_agents: List[str]) -> str:
+    """
+    Freshness class of a query from its agent set.
+
+    Args:
+        agents: Agents the supervisor selected
+        news_agents: Agents whose results go stale quickly
+
+    Returns:
+        "news" or "structural"
+    """
+    return "news" if any(agent in news_agents for agent in agents) else "structural"
+
+
+class SemanticReportCache:
+    """Embedding index of recent reports, stored in SQLite and searched in memory."""
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None, embed=None):
+        """
+        Initialize from the report_cache section of settings.yaml.
+
+        Args:
+            settings: Optional settings override
+            embed: Optional function texts -> vectors (defaults to the LLM gateway);
+                must expose the model name as embed.model
+        """
+        self.settings = {**DEFAULT_SETTINGS, **(settings or get_settings("report_cache", DEFAULT_SETTINGS))}
+        self.enabled = bool(self.settings["enabled"])
+        self._embed = embed
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.counters = {"hits": 0, "misses": 0, "stores": 0, "errors": 0}
+
+    # ---------------------------------------------------------------- storage
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """SQLite index, opened on first use. Caller holds the lock."""
+        if self._conn is None:
+            path = Path(self.settings["path"])
+            if not path.is_absolute():
+                path = BASE_DIR / path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS reports (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    created_at REAL NOT NULL,
+                    query TEXT NOT NULL,
+                    country TEXT NOT NULL,
+                    agents TEXT NOT NULL,
+                    intent TEXT NOT NULL,
+                    embed_model TEXT NOT NULL,
+                    embedding BLOB NOT NULL,
+                    report_path TEXT NOT NULL
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_reports_key ON reports(country, agents)")
+        return self._conn
+
+    def _embedder(self):
+        if self._embed is None:
+            from core.llm_gateway import get_gateway
+
+            gateway = get_gateway()
+
+            def embed(texts: List[str]) -> List[List[float]]:
+                return gateway.embed(texts, agent="report_cache")
+
+            embed.model = gateway.embed_model
+            self._embed = embed
+        return self._embed
+
+    def _vector(self, query: str) -> np.ndarray:
+        vector = np.asarray(self._embedder()([" ".join(query.lower().split())])[0], dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    @staticmethod
+    def _agent_key(agents: List[str]) -> str:
+        return ",".join(sorted(set(agents)))
+
+    # ---------------------------------------------------------------- lookups
+
+    def lookup(self, query: str, country: str, agents: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        Find a fresh report for a near-duplicate query.
+
+        Args:
+            query: User query
+            country: Country detected for the query
+            agents: Agents the supervisor selected
+
+        Returns:
+            Stored report with a "cache" entry describing the hit, or None
+        """
+        if not self.enabled:
+            return None
+        intent = intent_of(agents, self.settings["news_agents"])
+        ttl = self.settings["ttl"].get(intent, 0)
+        if not ttl:
+            return None
+        try:
+            vector = self._vector(query)
+            model = self._embedder().model
+            with self._lock:
+                rows = self.conn.execute(
+                    "SELECT * FROM reports WHERE country = ? AND agents = ? AND embed_model = ? AND created_at >= ? "
+                    "ORDER BY created_at DESC",
+                    (country, self._agent_key(agents), model, time.time() - ttl),
+                ).fetchall()
+        except Exception as e:
+            self.counters["errors"] += 1
+            logger.warning(f"Report cache lookup failed: {e}")
+            return None
+
+        best, best_score = None, -1.0
+        for row in rows:
+            stored = np.frombuffer(row["embedding"], dtype=np.float32)
+            if stored.shape != vector.shape:
+                continue
+            score = float(np.dot(stored, vector))
+            if score > best_score:
+                best, best_score = row, score
+
+        if best is None or best_score < self.settings["similarity"]:
+            self.counters["misses"] += 1
+            return None
+
+        report = self._load(best)
+        if report is None:
+            self.counters["misses"] += 1
+            return None
+        self.counters["hits"] += 1
+        age = time.time() - best["created_at"]
+        report["cache"] = {
+            "hit": True,
+            "similarity": round(best_score, 4),
+            "source_query": best["query"],
+            "cached_at": best["created_at"],
+            "age_s": round(age, 1),
+            "intent": intent,
+            "ttl_s": ttl,
+            "report_path": best["report_path"],
+        }
+        logger.info(f"Report cache hit ({best_score:.3f}, {age / 60:.0f} min old) for: {query}")
+        return report
+
+    def _load(self, row: sqlite3.Row) -> Optional[Dict[str, Any]]:
+        """Read a report file back, dropping the entry if it is gone."""
+        path = Path(row["report_path"])
+        if not path.is_absolute():
+            path = BASE_DIR / path
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                report = json.load(f)
+            if report.get("query") != row["query"]:
+                raise ValueError("file now holds a different report")
+            return report
+        except (OSError, ValueError) as e:
+            logger.warning(f"Dropping report cache entry for unreadable {path}: {e}")
+            with self._lock:
+                self.conn.execute("DELETE FROM reports WHERE id = ?", (row["id"],))
+            return None
+
+    def store(self, query: str, country: str, agents: List[str], report_path: str,
+              created_at: Optional[float] = None):
+        """
+        Index a saved report.
+
+        Args:
+            query: Query the report answers
+            country: Country detected for the query
+            agents: Agents that produced it
+            report_path: Path of the saved report JSON
+            created_at: Report time (defaults to now)
+        """
+        if not self.enabled:
+            return
+        try:
+            vector = self._vector(query)
+            model = self._embedder().model
+            with self._lock:
+                self.conn.execute(
+                    "INSERT INTO reports (created_at, query, country, agents, intent, embed_model, embedding, "
+                    "report_path) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (created_at or time.time(), query, country, self._agent_key(agents),
+                     intent_of(agents, self.settings["news_agents"]), model, vector.tobytes(), str(report_path)),
+                )
+                self._prune()
+            self.counters["stores"] += 1
+        except Exception as e:
+            self.counters["errors"] += 1
+            logger.warning(f"Report cache store failed: {e}")
+
+    def _prune(self):
+        """Drop expired entries and keep at most max_entries. Caller holds the lock."""
+        longest = max(self.settings["ttl"].values(), default=0)
+        self.conn.execute("DELETE FROM reports WHERE created_at < ?", (time.time() - longest,))
+        self.conn.execute(
+            "DELETE FROM reports WHERE id NOT IN (SELECT id FROM reports ORDER BY created_at DESC LIMIT ?)",
+            (self.settings["max_entries"],),
+        )
+
+    def clear(self):
+        """Drop every index entry (report files are kept)."""
+        with self._lock:
+            self.conn.execute("DELETE FROM reports")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and index size."""
+        with self._lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return {
+            "enabled": self.enabled,
+            **self.counters,
+            "hit_rate": round(self.counters["hits"] / lookups, 3) if lookups else 0.0,
+            "entries": entries,
+        }
+
+
+# Global report cache
+_report_cache = None
+_report_cache_lock = threading.Lock()
+
+
+def get_report_cache() -> SemanticReportCache:
+    """Get or create the shared report cache."""
+    global _report_cache
+    with _report_cache_lock:
+        if _report_cache is None:
+            _report_cache = SemanticReportCache()
+        return _report_cache
+
+
+def main():
+    """CLI for inspecting, rebuilding and clearing the report index."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="HAWK-AI semantic report cache")
+    parser.add_argument("--stats", action="store_true", help="Show index statistics")
+    parser.add_argument("--rebuild", action="store_true", help="Index existing data/analysis/report_*.json")
+    parser.add_argument("--clear", action="store_true", help="Drop all index entries")
+    args = parser.parse_args()
+
+    cache = get_report_cache()
+    if args.clear:
+        cache.clear()
+        print("Report cache cleared")
+    if args.rebuild:
+        from datetime import datetime, timezone
+        from agents.supervisor_agent import SupervisorAgent
+
+        indexed = 0
+        for path in sorted((BASE_DIR / "data/analysis").glob("report_*.json")):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    report = json.load(f)
+                # Report timestamps are naive UTC
+                created = datetime.fromisoformat(report["timestamp"]).replace(tzinfo=timezone.utc).timestamp()
+                country = report.get("country") or SupervisorAgent._extract_country_from_query(report["query"])
+                cache.store(report["query"], country, report.get("agents", []), str(path), created_at=created)
+                indexed += 1
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Skipping {path.name}: {e}")
+        print(f"Indexed {indexed} reports")
+    if args.stats:
+        print(json.dumps(cache.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
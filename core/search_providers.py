@@ -0,0 +1,445 @@
+"""
+HAWK-AI Search Providers
+========================
+Pluggable backends for smart_search() / get_news().
+
+Providers:
+- duckduckgo: DuckDuckGo text and news search (internet)
+- local:      SQLite FTS5 index over ingested news/article dumps and scraped
+              pages; works offline with millisecond latency
+
+Providers are configured under `search_sources` in config/sources.yaml and
+tried in the order listed; the first enabled provider that returns results
+wins. Every provider returns web results as {title, body, href} and news as
+{url, title, body, date, source}.
+
+CLI:
+    python core/search_providers.py --ingest dumps/articles.jsonl
+    python core/search_providers.py --ingest-pages
+    python core/search_providers.py --query "Sudan ceasefire"
+    python core/search_providers.py --stats
+"""
+
+import csv
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.config_loader import get_settings
+
+try:
+    from duckduckgo_search import DDGS
+except ImportError:
+    DDGS = None
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).parent.parent
+SOURCES_PATH = "config/sources.yaml"
+
+DEFAULT_SOURCES = {
+    "duckduckgo": {"enabled": True, "region": "wt-wt", "safesearch": "moderate"},
+}
+
+
+class SearchProvider(ABC):
+    """
+    Base class for search backends; subclasses implement search() and news().
+
+    Attributes:
+        name: Provider identifier (also part of the search cache key)
+        remote: Whether calls leave the machine; remote providers are
+                cached, coalesced and rate-limited by tools_websearch
+    """
+
+    name = "base"
+    remote = True
+
+    @abstractmethod
+    def search(self, query: str, max_results: int) -> List[Dict[str, str]]:
+        """Web search returning [{title, body, href}]."""
+
+    @abstractmethod
+    def news(self, query: str, max_results: int) -> List[Dict[str, str]]:
+        """News search returning [{url, title, body, date, source}]."""
+
+
+class DuckDuckGoProvider(SearchProvider):
+    """DuckDuckGo text and news search."""
+
+    name = "duckduckgo"
+    remote = True
+
+    def __init__(self, region: str = "wt-wt", safesearch: str = "moderate", **_):
+        if DDGS is None:
+            raise RuntimeError("duckduckgo-search not installed. Run: pip install duckduckgo-search")
+        self.region = region
+        self.safesearch = safesearch
+
+    def search(self, query: str, max_results: int) -> List[Dict[str, str]]:
+        with DDGS() as ddgs:
+            search_results = ddgs.text(
+                keywords=query,
+                region=self.region,
+                safesearch=self.safesearch,
+                max_results=max_results,
+                backend="api"
+            )
+            return [
+                {
+                    'title': result.get('title', ''),
+                    'body': result.get('body', ''),
+                    'href': result.get('href', '')
+                }
+                for result in search_results
+            ]
+
+    def news(self, query: str, max_results: int) -> List[Dict[str, str]]:
+        with DDGS() as ddgs:
+            news_results = ddgs.news(
+                keywords=query,
+                region=self.region,
+                safesearch=self.safesearch,
+                max_results=max_results
+            )
+            return [
+                {
+                    'url': article.get('url', ''),
+                    'title': article.get('title', ''),
+                    'body': article.get('body', ''),
+                    'date': article.get('date', 'N/A'),
+                    'source': article.get('source', 'Unknown')
+                }
+                for article in news_results
+            ]
+
+
+# Field names accepted when ingesting dumps, in order of preference
+_BODY_FIELDS = ("body", "text", "content", "summary", "description", "snippet")
+_URL_FIELDS = ("href", "url", "link")
+_DATE_FIELDS = ("published", "date", "published_at", "timestamp")
+
+# Dropped from full-text queries so OR fallbacks do not match every document
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it",
+    "of", "on", "or", "the", "to", "was", "what", "with", "how", "why", "about",
+}
+
+
+def _first(record: Dict[str, Any], fields: Iterable[str]) -> str:
+    for field in fields:
+        value = record.get(field)
+        if value:
+            return str(value)
+    return ""
+
+
+class LocalFTSProvider(SearchProvider):
+    """
+    Full-text search over a local SQLite FTS5 index.
+
+    Documents are stored once per URL (documents without one get a content
+    hash URL) and ranked with BM25, weighting title matches above body matches.
+    """
+
+    name = "local"
+    remote = False
+
+    def __init__(self, path: str = "data/web_cache/local_search.sqlite", snippet_tokens: int = 48,
+                 index_remote_results: bool = True, **_):
+        """
+        Open or create the index.
+
+        Args:
+            path: SQLite file (relative paths are under the repo root)
+            snippet_tokens: Length of the body snippet returned per hit
+            index_remote_results: Whether tools_websearch adds results from
+                                  remote providers to this index
+        """
+        db_path = Path(path)
+        if not db_path.is_absolute():
+            db_path = BASE_DIR / db_path
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = db_path
+        self.snippet_tokens = snippet_tokens
+        self.index_remote_results = index_remote_results
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS documents (
+                    id INTEGER PRIMARY KEY,
+                    href TEXT UNIQUE NOT NULL,
+                    title TEXT NOT NULL DEFAULT '',
+                    body TEXT NOT NULL DEFAULT '',
+                    source TEXT NOT NULL DEFAULT '',
+                    published TEXT NOT NULL DEFAULT '',
+                    added_at REAL NOT NULL
+                );
+                CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+                    title, body, content='documents', content_rowid='id',
+                    tokenize='porter unicode61'
+                );
+                CREATE TRIGGER IF NOT EXISTS documents_ai AFTER INSERT ON documents BEGIN
+                    INSERT INTO documents_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+                END;
+                CREATE TRIGGER IF NOT EXISTS documents_ad AFTER DELETE ON documents BEGIN
+                    INSERT INTO documents_fts(documents_fts, rowid, title, body)
+                    VALUES ('delete', old.id, old.title, old.body);
+                END;
+                CREATE TRIGGER IF NOT EXISTS documents_au AFTER UPDATE ON documents BEGIN
+                    INSERT INTO documents_fts(documents_fts, rowid, title, body)
+                    VALUES ('delete', old.id, old.title, old.body);
+                    INSERT INTO documents_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+                END;
+                """
+            )
+        except sqlite3.OperationalError as e:
+            raise RuntimeError(f"SQLite FTS5 is not available: {e}")
+
+    @staticmethod
+    def _terms(query: str) -> List[str]:
+        """Distinct lowercase query terms, without stopwords when anything else remains."""
+        terms = list(dict.fromkeys(re.findall(r"\w+", query.lower())))
+        content_terms = [t for t in terms if t not in _STOPWORDS]
+        return content_terms or terms
+
+    def _run(self, expression: str, limit: int) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT d.title, snippet(documents_fts, 1, '', '', '…', ?) AS snippet, "
+                "d.href, d.source, d.published "
+                "FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid "
+                "WHERE documents_fts MATCH ? "
+                "ORDER BY bm25(documents_fts, 5.0, 1.0) LIMIT ?",
+                (self.snippet_tokens, expression, limit)
+            ).fetchall()
+
+    def _query(self, query: str, limit: int) -> List[tuple]:
+        """
+        Rank documents matching all terms first; top up with documents
+        matching any term only when that leaves fewer than limit hits.
+        The all-terms query touches far fewer rows, which keeps common
+        queries in the low milliseconds.
+        """
+        terms = self._terms(query)
+        if not terms:
+            return []
+        quoted = [f'"{term}"' for term in terms]
+        rows = self._run(" AND ".join(quoted), limit)
+        if len(rows) < limit and len(terms) > 1:
+            seen = {row[2] for row in rows}
+            for row in self._run(" OR ".join(quoted), limit):
+                if row[2] not in seen and len(rows) < limit:
+                    rows.append(row)
+        return rows
+
+    def search(self, query: str, max_results: int) -> List[Dict[str, str]]:
+        return [
+            {'title': title, 'body': snippet, 'href': href}
+            for title, snippet, href, _, _ in self._query(query, max_results)
+        ]
+
+    def news(self, query: str, max_results: int) -> List[Dict[str, str]]:
+        # Take a wider relevance window, then prefer the most recent dated articles
+        rows = [r for r in self._query(query, max_results * 3) if r[4]]
+        rows.sort(key=lambda r: r[4], reverse=True)
+        return [
+            {'url': href, 'title': title, 'body': snippet, 'date': published, 'source': source or 'Unknown'}
+            for title, snippet, href, source, published in rows[:max_results]
+        ]
+
+    def add_documents(self, records: Iterable[Dict[str, Any]], source: str = "") -> int:
+        """
+        Insert or update documents.
+
+        Args:
+            records: Dicts with a title and a body/text/content field, and
+                     optionally href/url, source and published/date
+            source: Default source label for records without one
+
+        Returns:
+            Number of documents written
+        """
+        now = time.time()
+        rows = []
+        for record in records:
+            title = str(record.get("title") or "")
+            body = _first(record, _BODY_FIELDS)
+            if not (title or body):
+                continue
+            href = _first(record, _URL_FIELDS)
+            if not href:
+                href = "local:" + hashlib.sha1(f"{title}\n{body}".encode("utf-8")).hexdigest()
+            rows.append((href, title, body, str(record.get("source") or source),
+                         _first(record, _DATE_FIELDS), now))
+
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO documents (href, title, body, source, published, added_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(href) DO UPDATE SET title = excluded.title, body = excluded.body, "
+                    "source = excluded.source, published = excluded.published, added_at = excluded.added_at "
+                    "WHERE documents.title != excluded.title OR documents.body != excluded.body",
+                    rows
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                # Leave the connection usable: an open transaction would break every later BEGIN
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def ingest_file(self, path: str) -> int:
+        """
+        Ingest a news/article dump (.jsonl, .json list or .csv).
+
+        Returns:
+            Number of documents written
+        """
+        file_path = Path(path)
+        suffix = file_path.suffix.lower()
+        with open(file_path, "r", encoding="utf-8") as f:
+            if suffix == ".jsonl":
+                records = [json.loads(line) for line in f if line.strip()]
+            elif suffix == ".json":
+                data = json.load(f)
+                records = data if isinstance(data, list) else data.get("articles", [])
+            elif suffix == ".csv":
+                records = list(csv.DictReader(f))
+            else:
+                raise ValueError(f"Unsupported dump format: {suffix}")
+
+        count = self.add_documents(records, source=file_path.stem)
+        logger.info(f"Ingested {count} documents from {file_path}")
+        return count
+
+    def ingest_page_cache(self) -> int:
+        """
+        Ingest pages previously fetched by the web scraper.
+
+        Returns:
+            Number of documents written
+        """
+        from core.web_scraper import get_page_cache
+
+        pages = [
+            {"href": value["page"]["url"], "title": value["page"]["title"],
+             "body": value["page"]["content"], "source": "scraped"}
+            for _, value in get_page_cache().iter_namespace("page")
+            if value.get("page", {}).get("status") == "success"
+        ]
+        count = self.add_documents(pages)
+        logger.info(f"Ingested {count} scraped pages")
+        return count
+
+    def stats(self) -> Dict[str, Any]:
+        """Document counts by source."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT source, COUNT(*) FROM documents GROUP BY source"
+            ).fetchall()
+        return {
+            "path": str(self.path),
+            "documents": sum(r[1] for r in rows),
+            "sources": {r[0] or "unknown": r[1] for r in rows},
+        }
+
+
+PROVIDERS = {
+    "duckduckgo": DuckDuckGoProvider,
+    "local": LocalFTSProvider,
+}
+
+# Global provider list (built from sources.yaml on first use)
+_providers: Optional[List[SearchProvider]] = None
+_providers_lock = threading.Lock()
+
+
+def get_search_providers() -> List[SearchProvider]:
+    """
+    Return enabled providers in the order listed under search_sources.
+
+    Providers that are unknown or fail to initialize (e.g. missing
+    dependency) are skipped with a warning.
+    """
+    global _providers
+    with _providers_lock:
+        if _providers is None:
+            sources = get_settings("search_sources", {}, path=SOURCES_PATH) or DEFAULT_SOURCES
+            providers = []
+            for name, options in sources.items():
+                options = dict(options or {})
+                if not options.pop("enabled", True):
+                    continue
+                if name not in PROVIDERS:
+                    logger.warning(f"Unknown search provider '{name}' in search_sources")
+                    continue
+                try:
+                    providers.append(PROVIDERS[name](**options))
+                except Exception as e:
+                    logger.warning(f"Search provider '{name}' unavailable: {e}")
+            if not providers:
+                logger.error("No search providers available")
+            _providers = providers
+        return _providers
+
+
+def get_local_provider() -> Optional[LocalFTSProvider]:
+    """Return the configured local provider, if enabled."""
+    for provider in get_search_providers():
+        if isinstance(provider, LocalFTSProvider):
+            return provider
+    return None
+
+
+def main():
+    """CLI for the local full-text index."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="HAWK-AI local search index")
+    parser.add_argument("--ingest", nargs="+", metavar="FILE", help="Ingest .jsonl/.json/.csv dumps")
+    parser.add_argument("--ingest-pages", action="store_true", help="Ingest pages from the scraper cache")
+    parser.add_argument("--query", type=str, help="Search the local index")
+    parser.add_argument("--stats", action="store_true", help="Show index statistics")
+    args = parser.parse_args()
+
+    options = dict(get_settings("search_sources", {}, path=SOURCES_PATH).get("local") or {})
+    options.pop("enabled", None)
+    provider = LocalFTSProvider(**options)
+
+    for path in args.ingest or []:
+        print(f"✅ {path}: {provider.ingest_file(path)} documents")
+    if args.ingest_pages:
+        print(f"✅ Scraped pages: {provider.ingest_page_cache()} documents")
+    if args.query:
+        start = time.perf_counter()
+        results = provider.search(args.query, 10)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        for i, result in enumerate(results, 1):
+            print(f"{i}. {result['title']}\n   {result['href']}\n   {result['body']}")
+        print(f"\n⏱️  {len(results)} result(s) in {elapsed_ms:.1f} ms")
+    if args.stats or not (args.ingest or args.ingest_pages or args.query):
+        print(json.dumps(provider.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,377 @@
+"""
+HAWK-AI Session Working Sets
+============================
+Per-session, in-memory working set reused by follow-up questions.
+
+A chat session usually asks several questions about the same situation
+("How has the conflict in Sudan evolved?" then "and what about the Darfur
+region?"). Without shared state every follow-up re-reads the regional ACLED
+CSV, re-clusters the events, re-queries FAISS and re-runs web searches. The
+working set of a session keeps:
+
+- "acled"     loaded ACLED DataFrames per country (years_back widest so far)
+- "clusters"  clustered events per (country, years_back, eps_km, min_samples)
+- "docs"      retrieved vector store context per (source, query, top_k)
+- "search"    web search reports per normalized query (search_ttl)
+- "turn"      prior queries, countries and compact agent outputs
+
+SupervisorAgent.run installs the session's working set with
+session_scope(session_id); sub-agents inherit it through the context and
+use current_session(). Anonymous runs (no session id, or "default") get no
+working set, so unrelated clients never share state.
+
+Memory is bounded per session (max_session_mb) and in total (max_total_mb)
+by evicting least recently used items; sessions idle for idle_ttl seconds
+are dropped.
+"""
+
+import contextvars
+import json
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from core.config_loader import get_settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    "enabled": True,
+    "idle_ttl": 1800,          # seconds of inactivity before a session is dropped
+    "max_sessions": 64,
+    "max_session_mb": 256,     # per-session working set
+    "max_total_mb": 1024,      # all sessions together
+    "max_turns": 5,            # prior turns kept for follow-ups
+    "search_ttl": 900,         # seconds a session's web search results are reused
+}
+
+ANONYMOUS_SESSIONS = (None, "", "default")
+
+
+def sizeof(value: Any) -> int:
+    """
+    Approximate memory footprint of a cached value in bytes.
+
+    Args:
+        value: DataFrame, string, container or JSON-serializable value
+
+    Returns:
+        Size estimate in bytes
+    """
+    if hasattr(value, "memory_usage"):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (str, bytes)):
+        return sys.getsizeof(value)
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(sizeof(item) for item in value)
+    try:
+        return sys.getsizeof(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return sys.getsizeof(value)
+
+
+class _Item:
+    """One cached value and its accounting."""
+
+    __slots__ = ("value", "size", "created_at")
+
+    def __init__(self, value: Any, size: int):
+        self.value = value
+        self.size = size
+        self.created_at = time.time()
+
+
+class SessionWorkingSet:
+    """Cached artifacts and prior turns of one session. State is guarded by the store's lock."""
+
+    def __init__(self, store: "SessionStore", session_id: str):
+        self.store = store
+        self.session_id = session_id
+        self.created_at = time.time()
+        self.last_used = self.created_at
+        self.items: "OrderedDict[Tuple[str, Hashable], _Item]" = OrderedDict()
+        self.bytes = 0
+        self.turns = 0
+        self.country: Optional[str] = None
+        self.counters = {"hits": 0, "misses": 0, "evicted": 0}
+
+    def get(self, kind: str, key: Hashable, max_age: Optional[float] = None) -> Any:
+        """
+        Look up a cached value.
+
+        Args:
+            kind: Artifact kind ("acled", "docs", "search", ...)
+            key: Key within the kind
+            max_age: Optional freshness limit in seconds
+
+        Returns:
+            Cached value, or None
+        """
+        with self.store._lock:
+            self.last_used = time.time()
+            item = self.items.get((kind, key))
+            if item is not None and max_age is not None and time.time() - item.created_at > max_age:
+                self._drop((kind, key))
+                item = None
+            if item is None:
+                self.counters["misses"] += 1
+                return None
+            self.items.move_to_end((kind, key))
+            self.counters["hits"] += 1
+            return item.value
+
+    def put(self, kind: str, key: Hashable, value: Any, size: Optional[int] = None):
+        """
+        Add or replace a cached value, evicting older items beyond the memory limits.
+
+        Args:
+            kind: Artifact kind
+            key: Key within the kind
+            value: Value to keep (treated as read-only by readers)
+            size: Size in bytes (estimated with sizeof() if omitted)
+        """
+        size = sizeof(value) if size is None else size
+        with self.store._lock:
+            self.last_used = time.time()
+            if (kind, key) in self.items:
+                self._drop((kind, key))
+            if size > self.store.max_session_bytes:
+                logger.info(f"Session {self.session_id}: {kind} item of {size / 1e6:.1f} MB exceeds the "
+                            "session limit, not cached")
+                return
+            while self.items and self.bytes + size > self.store.max_session_bytes:
+                self._evict_oldest()
+            self.items[(kind, key)] = _Item(value, size)
+            self.bytes += size
+            self.store._enforce_total(keep=self)
+
+    def remember(self, kind: str, key: Hashable, compute: Callable[[], Any],
+                 max_age: Optional[float] = None) -> Any:
+        """
+        Return the cached value, or compute and cache it.
+
+        compute runs outside the lock, so two concurrent misses may both compute.
+
+        Args:
+            kind: Artifact kind
+            key: Key within the kind
+            compute: Function producing the value on a miss
+            max_age: Optional freshness limit in seconds
+
+        Returns:
+            Cached or computed value
+        """
+        value = self.get(kind, key, max_age=max_age)
+        if value is None:
+            value = compute()
+            if value is not None:
+                self.put(kind, key, value)
+        return value
+
+    def values(self, kind: str) -> List[Tuple[Hashable, Any]]:
+        """(key, value) pairs of a kind, oldest first."""
+        with self.store._lock:
+            return [(key, item.value) for (k, key), item in self.items.items() if k == kind]
+
+    def record_turn(self, query: str, country: str, agents: List[str], results: Dict[str, Any], summary: str):
+        """
+        Remember a finished turn for follow-ups: its country and compact agent outputs.
+
+        Args:
+            query: Query of the turn
+            country: Country the turn analyzed
+            agents: Agents that ran
+            results: Agent results of the turn
+            summary: Synthesized brief
+        """
+        outputs = {}
+        for name in agents:
+            result = results.get(name)
+            if isinstance(result, dict) and result.get("status") == "success":
+                content = result.get("content")
+                if isinstance(content, dict):
+                    content = content.get("synthesis") or content.get("summary") or json.dumps(content, default=str)
+                outputs[name] = str(content)[:1500]
+        with self.store._lock:
+            self.turns += 1
+            self.country = country
+            turn = self.turns
+        self.put("turn", turn, {"query": query, "country": country, "agents": list(agents),
+                                "outputs": outputs, "summary": (summary or "")[:1500], "at": time.time()})
+        with self.store._lock:
+            for key, _ in self.values("turn")[:-self.store.settings["max_turns"]]:
+                self._drop(("turn", key))
+
+    def prior_turns(self) -> List[Dict[str, Any]]:
+        """Recorded turns, oldest first."""
+        return [value for _, value in self.values("turn")]
+
+    def usage(self) -> Dict[str, Any]:
+        """Size and reuse counters of this working set."""
+        with self.store._lock:
+            kinds: Dict[str, int] = {}
+            for (kind, _), item in self.items.items():
+                kinds[kind] = kinds.get(kind, 0) + 1
+            return {
+                "session_id": self.session_id,
+                "turns": self.turns,
+                "country": self.country,
+                "items": kinds,
+                "mb": round(self.bytes / 1e6, 2),
+                **self.counters,
+            }
+
+    def _drop(self, key: Tuple[str, Hashable]):
+        """Remove an item. Caller holds the lock."""
+        item = self.items.pop(key, None)
+        if item is not None:
+            self.bytes -= item.size
+
+    def _evict_oldest(self):
+        """Evict the least recently used item. Caller holds the lock."""
+        key, item = self.items.popitem(last=False)
+        self.bytes -= item.size
+        self.counters["evicted"] += 1
+        self.store.counters["evicted"] += 1
+        logger.debug(f"Session {self.session_id}: evicted {key[0]} item ({item.size / 1e6:.1f} MB)")
+
+
+class SessionStore:
+    """All sessions' working sets, with memory limits and idle expiry."""
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
+        """
+        Initialize from the session_context section of settings.yaml.
+
+        Args:
+            settings: Optional settings override
+        """
+        self.settings = {**DEFAULT_SETTINGS, **(settings or get_settings("session_context", DEFAULT_SETTINGS))}
+        self.enabled = bool(self.settings["enabled"])
+        self.max_session_bytes = int(self.settings["max_session_mb"] * 1e6)
+        self.max_total_bytes = int(self.settings["max_total_mb"] * 1e6)
+        self._lock = threading.RLock()
+        self._sessions: "OrderedDict[str, SessionWorkingSet]" = OrderedDict()
+        self.counters = {"created": 0, "expired": 0, "evicted": 0}
+
+    def get(self, session_id: Optional[str]) -> Optional[SessionWorkingSet]:
+        """
+        Working set of a session, created on first use.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            The session's working set, or None for anonymous sessions or when disabled
+        """
+        if not self.enabled or session_id in ANONYMOUS_SESSIONS:
+            return None
+        with self._lock:
+            self.expire()
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = SessionWorkingSet(self, session_id)
+                self._sessions[session_id] = session
+                self.counters["created"] += 1
+                while len(self._sessions) > self.settings["max_sessions"]:
+                    old_id, _ = self._sessions.popitem(last=False)
+                    self.counters["expired"] += 1
+                    logger.info(f"Dropped session working set {old_id} (max_sessions)")
+            self._sessions.move_to_end(session_id)
+            session.last_used = time.time()
+            return session
+
+    def drop(self, session_id: str) -> bool:
+        """Forget a session's working set; returns True if it existed."""
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def expire(self):
+        """Drop sessions idle for longer than idle_ttl."""
+        cutoff = time.time() - self.settings["idle_ttl"]
+        with self._lock:
+            for session_id in [sid for sid, s in self._sessions.items() if s.last_used < cutoff]:
+                del self._sessions[session_id]
+                self.counters["expired"] += 1
+                logger.info(f"Session working set {session_id} expired after {self.settings['idle_ttl']}s idle")
+
+    def _enforce_total(self, keep: SessionWorkingSet):
+        """Evict items of the least recently used sessions beyond max_total_mb. Caller holds the lock."""
+        total = sum(s.bytes for s in self._sessions.values())
+        for session in sorted(self._sessions.values(), key=lambda s: (s is keep, s.last_used)):
+            while session.items and total > self.max_total_bytes:
+                before = session.bytes
+                session._evict_oldest()
+                total -= before - session.bytes
+            if total <= self.max_total_bytes:
+                return
+
+    def stats(self) -> Dict[str, Any]:
+        """Session count, memory use and reuse counters."""
+        with self._lock:
+            self.expire()
+            sessions = list(self._sessions.values())
+            hits = sum(s.counters["hits"] for s in sessions)
+            misses = sum(s.counters["misses"] for s in sessions)
+            return {
+                "enabled": self.enabled,
+                "sessions": len(sessions),
+                "mb": round(sum(s.bytes for s in sessions) / 1e6, 2),
+                "max_total_mb": self.settings["max_total_mb"],
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+                **self.counters,
+            }
+
+
+# Global session store
+_session_store = None
+_session_store_lock = threading.Lock()
+
+
+def get_session_store() -> SessionStore:
+    """Get or create the shared session store."""
+    global _session_store
+    with _session_store_lock:
+        if _session_store is None:
+            _session_store = SessionStore()
+        return _session_store
+
+
+_current_session: contextvars.ContextVar[Optional[SessionWorkingSet]] = contextvars.ContextVar(
+    "hawk_session", default=None
+)
+
+
+@contextmanager
+def session_scope(session_id: Optional[str],
+                  store: Optional[SessionStore] = None) -> Iterator[Optional[SessionWorkingSet]]:
+    """
+    Install a session's working set for the work done in this context.
+
+    Args:
+        session_id: Session identifier (anonymous sessions get no working set)
+        store: Optional store (defaults to the shared one)
+
+    Yields:
+        The working set, or None
+    """
+    session = (store or get_session_store()).get(session_id)
+    if session is None:
+        yield None
+        return
+    reset = _current_session.set(session)
+    try:
+        yield session
+    finally:
+        _current_session.reset(reset)
+
+
+def current_session() -> Optional[SessionWorkingSet]:
+    """Working set installed in the calling context, if any."""
+    return _current_session.get()
@@ -29,7 +29,8 @@ def format_progress_chunk(agent_name: str, status: str, chunk_id: str = None) ->
         "geo": "🗺️",
         "redactor": "✏️",
         "supervisor": "🧠",
-        "reflection": "🤔"
+        "reflection": "🤔",
+        "queue": "⏳"
     }
     
     emoji = agent_emojis.get(agent_name.lower(), "⚙️")
@@ -173,6 +174,59 @@ def format_done_chunk(chunk_id: str = None) -> str:
     return f"data: {json.dumps(chunk)}\n\ndata: [DONE]\n\n"
 
 
+def format_job_event(event: Dict[str, Any] = None, retry_ms: int = None) -> str:
+    """
+    Format a job event as a standard SSE message with an id, for resumable streams.
+    
+    Args:
+        event: Event {"id", "type", "data"}; None produces a keep-alive comment
+        retry_ms: Optional reconnection delay hint for the client
+        
+    Returns:
+        SSE-formatted message
+    """
+    if retry_ms is not None:
+        return f"retry: {retry_ms}\n\n"
+    if event is None:
+        return ": keep-alive\n\n"
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+
+
+def describe_cache_hit(cache: Dict[str, Any]) -> str:
+    """
+    Notice shown with a report served from the semantic report cache.
+    
+    Args:
+        cache: The report's "cache" entry
+        
+    Returns:
+        One-line markdown notice
+    """
+    minutes = int(cache.get("age_s", 0) // 60)
+    notice = f"♻️ *Cached report from {minutes} min ago (similar query: \"{cache.get('source_query', '')}\")"
+    if cache.get("refreshed"):
+        notice += f"; refreshed {', '.join(cache['refreshed'])}, {len(cache.get('new_sources', []))} new sources"
+    return notice + "*\n\n"
+
+
+def describe_degradation(deadline: Dict[str, Any]) -> str:
+    """
+    Notice listing the stages a deadline forced the supervisor to skip or shorten.
+    
+    Args:
+        deadline: The report's "deadline" entry
+        
+    Returns:
+        One-line markdown notice, or "" if nothing was degraded
+    """
+    degraded = deadline.get("degraded") or []
+    if not degraded:
+        return ""
+    actions = "; ".join(f"{item['stage']}: {item['action']}" for item in degraded)
+    return f"⏱️ *Answered within {deadline.get('deadline_s'):.0f}s by degrading {actions}*\n\n" \
+        if deadline.get("deadline_s") else f"⏱️ *Degraded {actions}*\n\n"
+
+
 def extract_synthesis_from_result(result: Dict[str, Any]) -> str:
     """
     Extract the synthesis/summary text from supervisor result.
@@ -213,9 +267,54 @@ def extract_synthesis_from_result(result: Dict[str, Any]) -> str:
     return "Analysis completed. Please check the full report for details."
 
 
+def stream_agent_summaries(
+    results: Dict[str, Any],
+    chunk_id: str = None,
+    header: str = "\n**Multi-Agent Analysis Results**\n\n"
+) -> Generator[str, None, None]:
+    """
+    Stream one summary line per agent, followed by the synthesis heading.
+    
+    Args:
+        results: Agent results keyed by agent name
+        chunk_id: Optional unique ID for the chunks
+        header: Heading streamed before the agent summaries
+        
+    Yields:
+        SSE-formatted chunks
+    """
+    yield format_synthesis_chunk(header, chunk_id)
+    
+    for agent_name, agent_result in results.items():
+        if agent_name not in ["reflection", "fusion_ratio"] and isinstance(agent_result, dict):
+            yield format_synthesis_chunk(format_agent_result(agent_name, agent_result), chunk_id)
+    
+    yield format_synthesis_chunk("---\n\n**Synthesis**\n\n", chunk_id)
+
+
+def format_synthesis_revision(text: str, reason: str = "condensed", chunk_id: str = None) -> str:
+    """
+    Format a replacement for an already-streamed synthesis as an SSE chunk.
+    
+    Args:
+        text: Revised text (condensed brief or error message)
+        reason: "condensed", "deadline" or "error"
+        chunk_id: Optional unique ID for the chunk
+        
+    Returns:
+        SSE-formatted string
+    """
+    headings = {"condensed": "**Condensed brief**", "deadline": "⏱️ **Time budget reached**"}
+    heading = headings.get(reason, "⚠️ **Synthesis interrupted**")
+    return format_synthesis_chunk(f"\n\n---\n\n{heading}\n\n{text}", chunk_id)
+
+
 def stream_supervisor_result(result: Dict[str, Any]) -> Generator[str, None, None]:
     """
-    Stream supervisor result as SSE chunks.
+    Stream a completed supervisor result as SSE chunks.
+    
+    Used when the synthesis was not streamed token by token while it was
+    generated (e.g. direct execution without the supervisor).
     
     Args:
         result: Complete supervisor result dictionary
@@ -225,31 +324,19 @@ def stream_supervisor_result(result: Dict[str, Any]) -> Generator[str, None, Non
     """
     chunk_id = f"chatcmpl-{int(datetime.now().timestamp())}"
     
-    # 1. Stream agent results if available
+    # 1. Stream agent results and the synthesis heading
     if "results" in result:
-        yield format_synthesis_chunk("\n**Multi-Agent Analysis Results**\n\n", chunk_id)
-        
-        for agent_name, agent_result in result["results"].items():
-            if agent_name not in ["reflection", "fusion_ratio"]:
-                agent_summary = format_agent_result(agent_name, agent_result)
-                yield format_synthesis_chunk(agent_summary, chunk_id)
-    
-    # 2. Stream separator
-    yield format_synthesis_chunk("---\n\n**Synthesis**\n\n", chunk_id)
-    
-    # 3. Stream the synthesis
-    synthesis = extract_synthesis_from_result(result)
+        yield from stream_agent_summaries(result["results"], chunk_id)
+    else:
+        yield format_synthesis_chunk("---\n\n**Synthesis**\n\n", chunk_id)
     
-    # Stream synthesis in chunks (word by word for smooth effect)
-    words = synthesis.split()
-    for i in range(0, len(words), 3):  # Stream 3 words at a time
-        chunk_text = " ".join(words[i:i+3]) + " "
-        yield format_synthesis_chunk(chunk_text, chunk_id)
+    # 2. Stream the synthesis (already complete, so in one chunk)
+    yield format_synthesis_chunk(extract_synthesis_from_result(result), chunk_id)
     
-    # 4. Add final newline
+    # 3. Add final newline
     yield format_synthesis_chunk("\n", chunk_id)
     
-    # 5. Done signal
+    # 4. Done signal
     yield format_done_chunk(chunk_id)
 
 
@@ -268,7 +355,8 @@ def create_progress_callback(callback_queue):
         Progress callback for agent execution.
         
         Args:
-            event_type: Type of event ("agent_start", "agent_complete", "synthesis_start", etc.)
+            event_type: Type of event ("agent_start", "agent_complete", "synthesis_start",
+                        "synthesis_token", "synthesis_revised", etc.)
             data: Event data
         """
         callback_queue.put({"type": event_type, "data": data})
@@ -0,0 +1,105 @@
+"""
+HAWK-AI Stage Timeline
+======================
+Records when each part of a supervisor run started and ended, so reports
+show how much of the run overlapped.
+
+Spans are leaf activities ("agent:geo", "pack:geo", "check:geo",
+"reflection", "consistency", "synthesis", ...) with start and end offsets
+from the start of the run. summary() adds:
+
+    serial_s   sum of span durations (the run if nothing overlapped)
+    busy_s     time at least one span was active
+    overlap_s  serial_s - busy_s
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class Timeline:
+    """Thread-safe list of (name, start, end) spans of one run."""
+
+    def __init__(self, start: Optional[float] = None):
+        """
+        Start the timeline clock.
+
+        Args:
+            start: Run start (time.time()); defaults to now
+        """
+        self.start = start if start is not None else time.time()
+        self._spans: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def add(self, name: str, start: float, end: Optional[float] = None):
+        """
+        Record a span.
+
+        Args:
+            name: Span name (e.g. "agent:geo")
+            start: Start time (time.time())
+            end: End time (defaults to now)
+        """
+        end = time.time() if end is None else end
+        with self._lock:
+            self._spans.append({"stage": name, "start_s": round(start - self.start, 3),
+                                "end_s": round(end - self.start, 3)})
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Record the block as a span, also when it raises."""
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.add(name, start)
+
+    def spans(self) -> List[Dict[str, Any]]:
+        """Spans ordered by start, each with its duration_s."""
+        with self._lock:
+            spans = sorted(self._spans, key=lambda s: (s["start_s"], s["end_s"]))
+        return [{**s, "duration_s": round(s["end_s"] - s["start_s"], 3)} for s in spans]
+
+    def summary(self) -> Dict[str, Any]:
+        """Spans with serial, busy and overlapping time, for the report."""
+        spans = self.spans()
+        serial = sum(s["duration_s"] for s in spans)
+        busy, cursor = 0.0, None
+        for s in spans:
+            if cursor is None or s["start_s"] > cursor:
+                busy += s["end_s"] - s["start_s"]
+                cursor = s["end_s"]
+            elif s["end_s"] > cursor:
+                busy += s["end_s"] - cursor
+                cursor = s["end_s"]
+        return {
+            "spans": spans,
+            "serial_s": round(serial, 2),
+            "busy_s": round(busy, 2),
+            "overlap_s": round(max(0.0, serial - busy), 2),
+        }
+
+    def render(self, width: int = 50) -> str:
+        """
+        Text chart of the spans, one row per span.
+
+        Args:
+            width: Characters for the full run
+
+        Returns:
+            Multi-line chart
+        """
+        spans = self.spans()
+        if not spans:
+            return ""
+        total = max(s["end_s"] for s in spans) or 1.0
+        label = max(len(s["stage"]) for s in spans)
+        rows = []
+        for s in spans:
+            left = int(s["start_s"] / total * width)
+            length = max(1, int(round(s["duration_s"] / total * width)))
+            bar = " " * left + "█" * min(length, width - left)
+            rows.append(f"{s['stage']:<{label}} |{bar:<{width}}| {s['start_s']:6.1f}–{s['end_s']:.1f}s")
+        return "\n".join(rows)
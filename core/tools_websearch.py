@@ -4,16 +4,18 @@ HAWK-AI Web Search Tools
 Provides reliable, local-friendly web search via DuckDuckGo with caching and vectorization support.
 
 Features:
-- DuckDuckGo web search with result caching
-- Local FAISS vectorization using Ollama embeddings
+- DuckDuckGo web search with result caching (SQLite store with TTL and LRU eviction)
+- Pluggable search providers, including an offline SQLite FTS5 index (core/search_providers.py)
+- Request coalescing, token-bucket rate limiting and jittered backoff for outbound searches
+- Persistent local FAISS web knowledge index (append-only, de-duplicated, embedded via the LLM gateway)
 - CLI test mode for quick queries
 - Persistent storage under data/web_cache/ and data/vector_index/
 
 Dependencies:
-- duckduckgo-search
+- duckduckgo-search (optional when only the local provider is enabled)
 - faiss-cpu
-- langchain-ollama
 - tqdm
+- httpx (batch scraping)
 """
 
 import json
@@ -21,31 +23,28 @@ import logging
 import os
 import pickle
 import sys
-from datetime import datetime
+import threading
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple, Any
-import hashlib
 
 import numpy as np
 from tqdm import tqdm
 
-try:
-    from duckduckgo_search import DDGS
-except ImportError:
-    print("Error: duckduckgo-search not installed. Run: pip install duckduckgo-search")
-    sys.exit(1)
-
 try:
     import faiss
 except ImportError:
     print("Error: faiss not installed. Run: pip install faiss-cpu")
     sys.exit(1)
 
-try:
-    from langchain_ollama import OllamaEmbeddings
-except ImportError:
-    print("Error: langchain-ollama not installed. Run: pip install langchain-ollama")
-    sys.exit(1)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.config_loader import get_settings
+from core.llm_gateway import get_gateway
+from core.rate_limit import SingleFlight, TokenBucket, call_with_backoff
+from core.search_providers import get_local_provider, get_search_providers
+from core.web_cache import get_search_cache
+from core.web_scraper import scrape_urls
+from core.web_index import get_web_index
 
 
 # Configure logging
@@ -74,46 +73,197 @@ VECTOR_INDEX_DIR.mkdir(parents=True, exist_ok=True)
 
 # Ollama configuration
 OLLAMA_MODEL = "snowflake-arctic-embed2:568m"
-OLLAMA_BASE_URL = "http://127.0.0.1:11434"
+EMBED_BATCH_SIZE = 32
 
+# Outbound throttling for the search backend (search section of settings.yaml)
+THROTTLE_DEFAULTS = {
+    "rate_limit_per_sec": 1.0,
+    "rate_limit_burst": 3,
+    "max_retries": 2,
+    "backoff_base": 1.0,
+    "backoff_max": 20.0,
+}
 
-def _get_cache_key(query: str, max_results: int) -> str:
-    """Generate a unique cache key for a query."""
-    key_string = f"{query}_{max_results}"
-    return hashlib.md5(key_string.encode()).hexdigest()
+# Identical concurrent searches share one backend call
+_inflight_searches = SingleFlight()
+_throttle: Optional[Tuple[TokenBucket, Dict[str, Any]]] = None
+_throttle_lock = threading.Lock()
 
 
-def _load_from_cache(cache_key: str) -> Optional[List[Dict]]:
-    """Load search results from cache if available."""
-    cache_file = CACHE_DIR / f"{cache_key}.pkl"
+def embed_texts(texts: List[str], batch_size: int = EMBED_BATCH_SIZE) -> Tuple[np.ndarray, List[int]]:
+    """
+    Embed texts in batched requests.
+    
+    A failed batch is retried item by item so one bad text does not drop
+    its neighbours; texts that still fail are left out rather than padded
+    with placeholder vectors.
+    
+    Args:
+        texts: Texts to embed
+        batch_size: Number of texts per Ollama request
+    
+    Returns:
+        Tuple of (float32 embedding matrix, indices of texts that were embedded)
+    """
+    gateway = get_gateway()
+    vectors = []
+    kept = []
     
-    if cache_file.exists():
+    for start in tqdm(range(0, len(texts), batch_size), desc="Embedding batches",
+                      disable=len(texts) < 5 * batch_size):
+        batch = texts[start:start + batch_size]
         try:
-            with open(cache_file, 'rb') as f:
-                cached_data = pickle.load(f)
-                logger.info(f"Loaded results from cache: {cache_key}")
-                return cached_data
+            vectors.extend(gateway.embed(batch, model=OLLAMA_MODEL, agent="websearch"))
+            kept.extend(range(start, start + len(batch)))
         except Exception as e:
-            logger.warning(f"Failed to load cache {cache_key}: {e}")
-            return None
-    return None
+            logger.warning(f"Batch embedding failed ({e}); retrying {len(batch)} texts individually")
+            for offset, text in enumerate(batch):
+                try:
+                    vectors.append(gateway.embed([text], model=OLLAMA_MODEL, agent="websearch")[0])
+                    kept.append(start + offset)
+                except Exception as item_error:
+                    logger.error(f"Failed to embed text: {item_error}")
+    
+    if not vectors:
+        return np.empty((0, 0), dtype='float32'), []
+    return np.array(vectors, dtype='float32'), kept
+
+
+def _cosine_scores(query_vector: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """Cosine similarity between one query vector and each row of matrix."""
+    matrix_norms = np.linalg.norm(matrix, axis=1)
+    query_norm = np.linalg.norm(query_vector)
+    denom = np.maximum(matrix_norms * query_norm, 1e-12)
+    return (matrix @ query_vector) / denom
+
+
+def _get_throttle() -> Tuple[TokenBucket, Dict[str, Any]]:
+    """Return the shared search rate limiter and its settings, creating them on first use."""
+    global _throttle
+    with _throttle_lock:
+        if _throttle is None:
+            settings = get_settings("search", THROTTLE_DEFAULTS)
+            limiter = TokenBucket(settings["rate_limit_per_sec"], settings["rate_limit_burst"])
+            _throttle = (limiter, settings)
+        return _throttle
+
+
+def _coalesced_search(
+    kind: str,
+    query: str,
+    max_results: int,
+    use_cache: bool,
+    fetch,
+    backend: str
+) -> List[Dict[str, str]]:
+    """
+    Run a backend search once for all concurrent callers with the same cache key.
+    
+    The leading caller takes a rate-limiter token per attempt, retries failures
+    with jittered exponential backoff and stores the results in the cache;
+    callers arriving while it runs wait and receive copies of its results.
+    
+    Args:
+        kind: Search kind ("text" or "news"), part of the cache key
+        query: Search query
+        max_results: Maximum number of results
+        use_cache: Whether to store results in the cache
+        fetch: Zero-argument function performing the backend request
+        backend: Provider name, part of the cache key
+    
+    Returns:
+        List of result dictionaries
+    """
+    cache = get_search_cache()
+    key = cache.make_key(query, backend, max_results, kind)
+    
+    def lead():
+        limiter, settings = _get_throttle()
+        results = call_with_backoff(
+            fetch,
+            max_retries=settings["max_retries"],
+            base=settings["backoff_base"],
+            cap=settings["backoff_max"],
+            limiter=limiter,
+            description=f"{backend} {kind} search for '{query}'"
+        )
+        if use_cache and results:
+            cache.put_results(query, max_results, results, backend=backend, kind=kind)
+        return results
+    
+    results, shared = _inflight_searches.do(key, lead)
+    if shared:
+        logger.info(f"Joined in-flight {kind} search for: '{query}'")
+        return [dict(r) for r in results]
+    return results
 
 
-def _save_to_cache(cache_key: str, results: List[Dict]) -> None:
-    """Save search results to cache."""
-    cache_file = CACHE_DIR / f"{cache_key}.pkl"
+def _provider_search(kind: str, query: str, max_results: int, use_cache: bool) -> List[Dict[str, str]]:
+    """
+    Try the configured search providers in order until one returns results.
+    
+    Remote providers are cached, coalesced and rate-limited; their results
+    are also added to the local full-text index when that is enabled so the
+    same topics can be served offline later.
     
+    Args:
+        kind: "text" or "news"
+        query: Search query
+        max_results: Maximum number of results
+        use_cache: Whether to read and write the search cache
+    
+    Returns:
+        List of result dictionaries (empty if every provider failed)
+    """
+    for provider in get_search_providers():
+        fetch_fn = provider.news if kind == "news" else provider.search
+        
+        try:
+            if not provider.remote:
+                results = fetch_fn(query, max_results)
+            else:
+                if use_cache:
+                    cached = get_search_cache().get_results(query, max_results, backend=provider.name, kind=kind)
+                    if cached:
+                        logger.info(f"Loaded {len(cached)} {kind} results from cache for: '{query}'")
+                        return cached
+                results = _coalesced_search(
+                    kind, query, max_results, use_cache,
+                    lambda: fetch_fn(query, max_results),
+                    backend=provider.name
+                )
+        except Exception as e:
+            logger.warning(f"{provider.name} {kind} search failed: {e}")
+            continue
+        
+        if results:
+            logger.info(f"Retrieved {len(results)} {kind} results from {provider.name}")
+            if provider.remote:
+                _index_locally(results)
+            return results
+    
+    return []
+
+
+def _index_locally(results: List[Dict[str, str]]):
+    """Add remote search results to the local full-text index, if enabled."""
+    local = get_local_provider()
+    if local is None or not local.index_remote_results:
+        return
     try:
-        with open(cache_file, 'wb') as f:
-            pickle.dump(results, f)
-        logger.info(f"Saved {len(results)} results to cache: {cache_key}")
+        local.add_documents(results, source="search")
     except Exception as e:
-        logger.error(f"Failed to save to cache {cache_key}: {e}")
+        logger.warning(f"Failed to add results to local search index: {e}")
 
 
 def smart_search(query: str, max_results: int = 20, use_cache: bool = True) -> List[Dict[str, str]]:
     """
-    Perform a web search using DuckDuckGo with optional caching.
+    Perform a web search with optional caching.
+    
+    Providers (DuckDuckGo, local full-text index) are configured under
+    search_sources in config/sources.yaml. Concurrent calls for the same query
+    share one outbound request, which is rate-limited and retried with
+    jittered backoff.
     
     Args:
         query: Search query string
@@ -130,39 +280,8 @@ def smart_search(query: str, max_results: int = 20, use_cache: bool = True) -> L
     """
     logger.info(f"Searching for: '{query}' (max_results={max_results})")
     
-    # Check cache first
-    if use_cache:
-        cache_key = _get_cache_key(query, max_results)
-        cached_results = _load_from_cache(cache_key)
-        if cached_results:
-            return cached_results
-    
-    # Perform search
-    results = []
     try:
-        with DDGS() as ddgs:
-            search_results = ddgs.text(
-                keywords=query,
-                max_results=max_results,
-                backend="api"
-            )
-            
-            for result in search_results:
-                results.append({
-                    'title': result.get('title', ''),
-                    'body': result.get('body', ''),
-                    'href': result.get('href', '')
-                })
-        
-        logger.info(f"Retrieved {len(results)} results from DuckDuckGo")
-        
-        # Save to cache
-        if use_cache and results:
-            cache_key = _get_cache_key(query, max_results)
-            _save_to_cache(cache_key, results)
-        
-        return results
-        
+        return _provider_search("text", query, max_results, use_cache)
     except Exception as e:
         logger.error(f"Search failed: {e}")
         return []
@@ -174,7 +293,11 @@ def vectorize_results(
     index_name: str = "web_index"
 ) -> Tuple[Optional[faiss.Index], Optional[List[Dict]]]:
     """
-    Vectorize search results using Ollama embeddings and save to FAISS index.
+    Vectorize search results using Ollama embeddings and append them to the
+    persistent web knowledge index.
+    
+    Results already in the index (same URL and content, or same content under
+    another URL) are not re-embedded; their freshness timestamp is refreshed.
     
     Args:
         results: List of search result dictionaries from smart_search()
@@ -195,65 +318,20 @@ def vectorize_results(
     logger.info(f"Vectorizing {len(results)} results using {OLLAMA_MODEL}")
     
     try:
-        # Initialize embeddings
-        embeddings = OllamaEmbeddings(
-            model=OLLAMA_MODEL,
-            base_url=OLLAMA_BASE_URL
-        )
-        
-        # Prepare texts for embedding
-        texts = []
-        for result in results:
-            # Combine title and body for richer embeddings
-            text = f"{result['title']}\n{result['body']}"
-            texts.append(text)
-        
-        # Generate embeddings with progress bar
-        logger.info("Generating embeddings...")
-        embeddings_list = []
-        
-        for text in tqdm(texts, desc="Embedding documents", disable=len(texts) < 5):
-            try:
-                embedding = embeddings.embed_query(text)
-                embeddings_list.append(embedding)
-            except Exception as e:
-                logger.error(f"Failed to embed text: {e}")
-                # Use zero vector as fallback
-                embeddings_list.append([0.0] * 768)  # Assuming 768 dimensions
-        
-        # Convert to numpy array
-        embeddings_array = np.array(embeddings_list, dtype='float32')
-        dimension = embeddings_array.shape[1]
-        
-        logger.info(f"Created embeddings with dimension: {dimension}")
+        web_index = get_web_index(index_name)
+        added = web_index.add_documents(results, query=query)
         
-        # Create FAISS index
-        index = faiss.IndexFlatL2(dimension)
-        index.add(embeddings_array)
+        if web_index.index is None:
+            logger.error("No results could be embedded")
+            return None, None
         
-        logger.info(f"Added {index.ntotal} vectors to FAISS index")
+        indexed_results = [
+            r for r in results
+            if r.get('href') in web_index.url_to_id or not r.get('href')
+        ]
+        logger.info(f"Added {added} new vectors; index '{index_name}' holds {web_index.index.ntotal}")
         
-        # Save index and metadata
-        index_path = VECTOR_INDEX_DIR / f"{index_name}.faiss"
-        metadata_path = VECTOR_INDEX_DIR / f"{index_name}_metadata.pkl"
-        
-        faiss.write_index(index, str(index_path))
-        logger.info(f"Saved FAISS index to {index_path}")
-        
-        # Save metadata
-        metadata = {
-            'results': results,
-            'query': query,
-            'timestamp': datetime.now().isoformat(),
-            'dimension': dimension,
-            'num_vectors': index.ntotal
-        }
-        
-        with open(metadata_path, 'wb') as f:
-            pickle.dump(metadata, f)
-        logger.info(f"Saved metadata to {metadata_path}")
-        
-        return index, results
+        return web_index.index, indexed_results
         
     except Exception as e:
         logger.error(f"Vectorization failed: {e}")
@@ -310,40 +388,21 @@ def find_most_relevant(
         return []
     
     try:
-        embeddings = OllamaEmbeddings(
-            model=OLLAMA_MODEL,
-            base_url=OLLAMA_BASE_URL
-        )
+        # Embed query and candidates together: one round trip for small sets
+        texts = [query] + [f"{r['title']}\n{r['body']}" for r in results]
+        vectors, kept = embed_texts(texts)
         
-        # Embed query
-        query_embedding = embeddings.embed_query(query)
-        query_vector = np.array([query_embedding], dtype='float32')
+        if not kept or kept[0] != 0:
+            raise RuntimeError("query embedding failed")
         
-        # Embed all results
-        texts = [f"{r['title']}\n{r['body']}" for r in results]
-        result_embeddings = []
+        candidate_ids = [i - 1 for i in kept[1:]]
+        if not candidate_ids:
+            raise RuntimeError("no result embeddings available")
         
-        for text in texts:
-            try:
-                emb = embeddings.embed_query(text)
-                result_embeddings.append(emb)
-            except:
-                # Fallback to zero vector
-                result_embeddings.append([0.0] * len(query_embedding))
+        scores = _cosine_scores(vectors[0], vectors[1:])
+        order = np.argsort(-scores)[:min(top_k, len(candidate_ids))]
         
-        result_vectors = np.array(result_embeddings, dtype='float32')
-        
-        # Create temporary index
-        dimension = query_vector.shape[1]
-        index = faiss.IndexFlatL2(dimension)
-        index.add(result_vectors)
-        
-        # Search for top-k
-        distances, indices = index.search(query_vector, min(top_k, len(results)))
-        
-        # Return top results
-        top_results = [results[i] for i in indices[0]]
-        return top_results
+        return [results[candidate_ids[i]] for i in order]
         
     except Exception as e:
         logger.error(f"Failed to find most relevant: {e}")
@@ -365,7 +424,7 @@ def main():
     print(f"{'='*80}\n")
     
     # Perform search
-    print("🔍 Searching DuckDuckGo...")
+    print("🔍 Searching...")
     results = smart_search(query, max_results=20)
     
     if not results:
@@ -451,37 +510,20 @@ class WebSearchTool:
         
         return normalized
     
-    def get_news(self, query: str, max_results: int = 10) -> List[Dict[str, str]]:
+    def get_news(self, query: str, max_results: int = 10, use_cache: bool = True) -> List[Dict[str, str]]:
         """
-        Search for news articles (uses DuckDuckGo news).
+        Search for news articles (DuckDuckGo news or the local index, per search_sources).
         
         Args:
             query: News search query
             max_results: Maximum results to return
+            use_cache: Whether to use cached results (news entries expire quickly)
             
         Returns:
             List of news articles with url, title, body, date, source
         """
         try:
-            with DDGS() as ddgs:
-                news_results = ddgs.news(
-                    keywords=query,
-                    max_results=max_results
-                )
-                
-                results = []
-                for article in news_results:
-                    results.append({
-                        'url': article.get('url', ''),
-                        'title': article.get('title', ''),
-                        'body': article.get('body', ''),
-                        'date': article.get('date', 'N/A'),
-                        'source': article.get('source', 'Unknown')
-                    })
-                
-                logger.info(f"Retrieved {len(results)} news articles for: {query}")
-                return results
-                
+            return _provider_search("news", query, max_results, use_cache)
         except Exception as e:
             logger.error(f"News search failed: {e}")
             return []
@@ -496,49 +538,29 @@ class WebSearchTool:
         Returns:
             Dict with status, content, title, length
         """
-        try:
-            import requests
-            from bs4 import BeautifulSoup
-            
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Extract title
-            title = soup.title.string if soup.title else 'No title'
-            
-            # Remove script and style elements
-            for script in soup(['script', 'style']):
-                script.decompose()
-            
-            # Get text content
-            text = soup.get_text(separator=' ', strip=True)
-            
-            logger.info(f"Scraped {len(text)} characters from {url}")
-            
-            return {
-                'status': 'success',
-                'content': text,
-                'title': title,
-                'length': len(text),
-                'url': url
-            }
+        return self.scrape_urls([url])[0]
+    
+    def scrape_urls(self, urls: List[str]) -> List[Dict[str, Any]]:
+        """
+        Scrape several URLs concurrently over a pooled async client.
+        
+        Per-host concurrency is capped, downloads stop at a byte ceiling and
+        pages are cached by URL with ETag/Last-Modified revalidation.
+        
+        Args:
+            urls: URLs to scrape
             
+        Returns:
+            List of dicts with status, content, title, length, url (input order)
+        """
+        try:
+            return scrape_urls(urls)
         except Exception as e:
-            logger.error(f"Failed to scrape {url}: {e}")
-            return {
-                'status': 'error',
-                'error': str(e),
-                'content': '',
-                'title': '',
-                'length': 0,
-                'url': url
-            }
+            logger.error(f"Batch scrape failed: {e}")
+            return [
+                {'status': 'error', 'error': str(e), 'content': '', 'title': '', 'length': 0, 'url': url}
+                for url in urls
+            ]
 
 
 def get_websearch_tool(config_path: Optional[str] = None) -> WebSearchTool:
@@ -66,9 +66,9 @@ def example_load_index():
     
     if index:
         print(f"✅ Loaded index with {index.ntotal} vectors")
-        print(f"   Original query: {metadata.get('query', 'N/A')}")
+        print(f"   Last query: {metadata.get('query', 'N/A')}")
         print(f"   Timestamp: {metadata.get('timestamp', 'N/A')}")
-        print(f"   Number of results: {len(metadata.get('results', []))}")
+        print(f"   Number of documents: {len(metadata.get('entries', {}))}")
     else:
         print("❌ No saved index found")
 
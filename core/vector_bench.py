@@ -0,0 +1,292 @@
+"""
+Retrieval benchmark for the HAWK-AI vector store.
+Measures build time, index size, query latency, batch throughput and recall@k
+for several FAISS index configurations against exact (flat) search.
+
+Runs fully offline on CPU: vectors are either reconstructed from the saved
+index under data/vector_index/ or generated synthetically at ACLED scale.
+
+Corpora are capped at DEFAULT_MAX_VECTORS (--bench-max-vectors) so a large
+ACLED dump does not turn into gigabytes of 768-d vectors.
+
+Usage:
+    python -m core.vector_store --bench
+    python -m core.vector_store --bench --bench-corpus synthetic --bench-size 20000
+"""
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import faiss
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+
+DEFAULT_VARIANTS = ["flat", "ivf", "hnsw", "ivf_pq", "sq8"]
+REPORT_DIR = Path("data/analysis")
+DEFAULT_MAX_VECTORS = 100000   # ~300 MB of 768-d float32 vectors
+
+
+def _acled_corpus_size(acled_path: str = "historical_context/ACLED") -> int:
+    """Count ACLED rows on disk so the synthetic corpus matches production scale."""
+    total = 0
+    for csv_file in Path(acled_path).glob("*.csv"):
+        with open(csv_file, "rb") as f:
+            total += max(0, sum(1 for _ in f) - 1)
+    return total or 20000
+
+
+def synthetic_corpus(n: int, dimension: int = 768, n_clusters: int = 64, seed: int = 42) -> np.ndarray:
+    """
+    Generate a clustered, L2-normalized corpus that mimics sentence embeddings.
+
+    Args:
+        n: Number of vectors
+        dimension: Embedding dimension (768 matches all-mpnet-base-v2)
+        n_clusters: Number of topical clusters
+        seed: Random seed for reproducibility
+
+    Returns:
+        float32 array of shape (n, dimension)
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_clusters, dimension)).astype('float32')
+    assignments = rng.integers(0, n_clusters, size=n)
+    vectors = centers[assignments] + 0.6 * rng.standard_normal((n, dimension)).astype('float32')
+    vectors = np.ascontiguousarray(vectors, dtype='float32')
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def load_store_vectors(store_path: str = "data/vector_index") -> Optional[np.ndarray]:
+    """
+    Reconstruct vectors from the saved vector store index, if one exists.
+
+    Args:
+        store_path: Directory containing faiss.index
+
+    Returns:
+        float32 array of stored vectors, or None if unavailable
+    """
+    index_path = Path(store_path) / "faiss.index"
+    if not index_path.exists():
+        return None
+    index = faiss.read_index(str(index_path))
+    if index.ntotal == 0:
+        return None
+    try:
+        return index.reconstruct_n(0, index.ntotal).astype('float32')
+    except RuntimeError as e:
+        console.print(f"[yellow]Index does not support reconstruction: {e}[/yellow]")
+        return None
+
+
+def make_queries(corpus: np.ndarray, n_queries: int = 200, noise: float = 0.05, seed: int = 7) -> np.ndarray:
+    """Build a fixed query set by perturbing sampled corpus vectors."""
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(len(corpus), size=min(n_queries, len(corpus)), replace=False)
+    queries = corpus[picks] + noise * rng.standard_normal((len(picks), corpus.shape[1])).astype('float32')
+    queries = np.ascontiguousarray(queries, dtype='float32')
+    faiss.normalize_L2(queries)
+    return queries
+
+
+def _build_variant(name: str, dimension: int, n: int) -> faiss.Index:
+    """Create an untrained index for a named configuration (inner product on normalized vectors)."""
+    nlist = max(16, int(4 * np.sqrt(n)))
+    if name == "flat":
+        return faiss.IndexFlatIP(dimension)
+    if name == "ivf":
+        index = faiss.IndexIVFFlat(faiss.IndexFlatIP(dimension), dimension, nlist, faiss.METRIC_INNER_PRODUCT)
+        index.nprobe = 16
+        return index
+    if name == "hnsw":
+        index = faiss.IndexHNSWFlat(dimension, 32, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = 80
+        index.hnsw.efSearch = 64
+        return index
+    if name == "ivf_pq":
+        m = 96 if dimension % 96 == 0 else 8
+        index = faiss.IndexIVFPQ(faiss.IndexFlatIP(dimension), dimension, nlist, m, 8, faiss.METRIC_INNER_PRODUCT)
+        index.nprobe = 16
+        return index
+    if name == "sq8":
+        return faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT)
+    raise ValueError(f"Unknown index variant: {name}")
+
+
+def _timed(fn: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def _recall_at_k(found: np.ndarray, truth: np.ndarray, k: int) -> float:
+    """Fraction of exact top-k neighbours recovered, averaged over queries."""
+    hits = 0
+    for row_found, row_truth in zip(found[:, :k], truth[:, :k]):
+        hits += len(set(row_found.tolist()) & set(row_truth.tolist()))
+    return hits / float(truth.shape[0] * k)
+
+
+def benchmark_variant(
+    name: str,
+    corpus: np.ndarray,
+    queries: np.ndarray,
+    ground_truth: np.ndarray,
+    k: int = 10,
+    batch_size: int = 64,
+) -> Dict[str, Any]:
+    """
+    Build one index variant and measure it.
+
+    Returns:
+        Dictionary with build_s, index_bytes, p50/p95 latency (ms),
+        batch throughput (queries/s) and recall@k
+    """
+    n, dimension = corpus.shape
+    index = _build_variant(name, dimension, n)
+
+    def build():
+        if not index.is_trained:
+            train_size = min(n, max(256 * 40, 39 * getattr(index, 'nlist', 1)))
+            index.train(corpus[:train_size])
+        index.add(corpus)
+
+    build_s = _timed(build)
+    index_bytes = int(faiss.serialize_index(index).size)
+
+    # Single-query latency (one thread to reflect per-request cost)
+    previous_threads = faiss.omp_get_max_threads()
+    faiss.omp_set_num_threads(1)
+    latencies = []
+    try:
+        for q in queries:
+            latencies.append(_timed(lambda: index.search(q.reshape(1, -1), k)) * 1000)
+    finally:
+        faiss.omp_set_num_threads(previous_threads)
+
+    # Batch throughput
+    batch_s = 0.0
+    found = np.empty((len(queries), k), dtype='int64')
+    for i in range(0, len(queries), batch_size):
+        chunk = queries[i:i + batch_size]
+        start = time.perf_counter()
+        _, ids = index.search(chunk, k)
+        batch_s += time.perf_counter() - start
+        found[i:i + len(chunk)] = ids
+
+    return {
+        "variant": name,
+        "build_s": round(build_s, 4),
+        "index_bytes": index_bytes,
+        "latency_p50_ms": round(float(np.percentile(latencies, 50)), 4),
+        "latency_p95_ms": round(float(np.percentile(latencies, 95)), 4),
+        "batch_qps": round(len(queries) / batch_s, 1) if batch_s > 0 else None,
+        f"recall@{k}": round(_recall_at_k(found, ground_truth, k), 4),
+    }
+
+
+def run_benchmark(
+    corpus_source: str = "auto",
+    size: Optional[int] = None,
+    variants: Optional[List[str]] = None,
+    n_queries: int = 200,
+    k: int = 10,
+    output_path: Optional[str] = None,
+    max_vectors: Optional[int] = DEFAULT_MAX_VECTORS,
+) -> Dict[str, Any]:
+    """
+    Benchmark index configurations and write a JSON report.
+
+    Args:
+        corpus_source: "store" (saved index), "synthetic", or "auto" (store if present)
+        size: Corpus size for synthetic data (defaults to ACLED row count)
+        variants: Index variants to test (defaults to DEFAULT_VARIANTS)
+        n_queries: Number of fixed queries
+        k: Neighbours per query for recall@k
+        output_path: Optional report path (default: data/analysis/vector_bench_<timestamp>.json)
+        max_vectors: Cap on the corpus size (None or 0 for no cap)
+
+    Returns:
+        Report dictionary
+    """
+    variants = variants or DEFAULT_VARIANTS
+
+    corpus = None
+    source = "synthetic"
+    if corpus_source in ("auto", "store"):
+        corpus = load_store_vectors()
+        if corpus is not None:
+            source = "store"
+            faiss.normalize_L2(corpus)
+        elif corpus_source == "store":
+            raise FileNotFoundError("No saved vector index found under data/vector_index/")
+    if corpus is None:
+        n = size or _acled_corpus_size()
+        corpus = synthetic_corpus(min(n, max_vectors) if max_vectors else n)
+    elif max_vectors and corpus.shape[0] > max_vectors:
+        corpus = corpus[:max_vectors]
+
+    console.print(f"[cyan]Benchmark corpus: {source} ({corpus.shape[0]} x {corpus.shape[1]})[/cyan]")
+
+    queries = make_queries(corpus, n_queries=n_queries)
+    exact = faiss.IndexFlatIP(corpus.shape[1])
+    exact.add(corpus)
+    _, ground_truth = exact.search(queries, k)
+
+    rows = []
+    for name in variants:
+        console.print(f"[cyan]Benchmarking {name}...[/cyan]")
+        try:
+            rows.append(benchmark_variant(name, corpus, queries, ground_truth, k=k))
+        except Exception as e:
+            console.print(f"[red]Variant {name} failed: {e}[/red]")
+            rows.append({"variant": name, "error": str(e)})
+
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "corpus": {"source": source, "n_vectors": int(corpus.shape[0]), "dimension": int(corpus.shape[1])},
+        "n_queries": int(len(queries)),
+        "k": k,
+        "faiss_version": getattr(faiss, "__version__", "unknown"),
+        "threads": faiss.omp_get_max_threads(),
+        "results": rows,
+    }
+
+    if output_path is None:
+        REPORT_DIR.mkdir(parents=True, exist_ok=True)
+        output_path = str(REPORT_DIR / f"vector_bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(output_path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    _print_report(report)
+    console.print(f"[green]Benchmark report saved to {output_path}[/green]")
+    report["report_path"] = output_path
+    return report
+
+
+def _print_report(report: Dict[str, Any]):
+    """Render benchmark results as a table."""
+    k = report["k"]
+    table = Table(title=f"Vector store benchmark ({report['corpus']['source']}, n={report['corpus']['n_vectors']})")
+    for column in ["variant", "build (s)", "size (MB)", "p50 (ms)", "p95 (ms)", "batch q/s", f"recall@{k}"]:
+        table.add_column(column)
+    for row in report["results"]:
+        if "error" in row:
+            table.add_row(row["variant"], "error", row["error"][:40], "", "", "", "")
+            continue
+        table.add_row(
+            row["variant"],
+            f"{row['build_s']:.2f}",
+            f"{row['index_bytes'] / 1e6:.1f}",
+            f"{row['latency_p50_ms']:.3f}",
+            f"{row['latency_p95_ms']:.3f}",
+            str(row["batch_qps"]),
+            f"{row[f'recall@{k}']:.3f}",
+        )
+    console.print(table)
@@ -990,9 +990,34 @@ def main():
     parser.add_argument('--ingest-imf', action='store_true', help='Ingest IMF World Economic Outlook data only')
     parser.add_argument('--stats', action='store_true', help='Show index statistics')
     parser.add_argument('--query', type=str, help='Test query')
+    parser.add_argument('--bench', action='store_true', help='Benchmark index configurations (latency, recall@k, size)')
+    parser.add_argument('--bench-corpus', choices=['auto', 'store', 'synthetic'], default='auto',
+                        help='Benchmark corpus: saved index vectors or synthetic ACLED-sized data')
+    parser.add_argument('--bench-size', type=int, default=None, help='Synthetic corpus size (default: ACLED row count)')
+    parser.add_argument('--bench-variants', type=str, default=None,
+                        help='Comma-separated variants (flat,ivf,hnsw,ivf_pq,sq8)')
+    parser.add_argument('--bench-max-vectors', type=int, default=None,
+                        help='Cap on benchmark corpus size (default: 100000, 0 for no cap)')
+    parser.add_argument('--bench-queries', type=int, default=200, help='Number of benchmark queries')
+    parser.add_argument('--bench-k', type=int, default=10, help='k for recall@k')
+    parser.add_argument('--bench-output', type=str, default=None, help='Path for the JSON benchmark report')
     
     args = parser.parse_args()
     
+    if args.bench:
+        # Benchmark works on raw vectors; no embedding model needed
+        from core.vector_bench import DEFAULT_MAX_VECTORS, run_benchmark
+        run_benchmark(
+            corpus_source=args.bench_corpus,
+            size=args.bench_size,
+            variants=args.bench_variants.split(',') if args.bench_variants else None,
+            n_queries=args.bench_queries,
+            k=args.bench_k,
+            output_path=args.bench_output,
+            max_vectors=DEFAULT_MAX_VECTORS if args.bench_max_vectors is None else args.bench_max_vectors,
+        )
+        return
+    
     store = VectorStore()
     
     if args.rebuild:
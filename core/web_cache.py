@@ -0,0 +1,451 @@
+"""
+HAWK-AI Web Cache
+=================
+Single-file SQLite cache for web search results (and other JSON payloads).
+
+Features:
+- Keys derived from normalized query, backend and max_results
+- Per-entry TTL (short for news, long for reference queries)
+- LRU eviction under a byte budget
+- Optional zlib compression of large payloads
+- Hit / miss / eviction / expiration counters
+- Migration of the legacy one-pickle-per-query cache in data/web_cache/
+
+CLI:
+    python core/web_cache.py --stats
+    python core/web_cache.py --migrate
+    python core/web_cache.py --purge-expired
+"""
+
+import hashlib
+import json
+import logging
+import pickle
+import re
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.config_loader import get_settings
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).parent.parent
+LEGACY_CACHE_DIR = BASE_DIR / "data" / "web_cache"
+
+DEFAULT_SETTINGS = {
+    "path": "data/web_cache/search_cache.sqlite",
+    "max_bytes": 50 * 1024 * 1024,
+    "compress": True,
+    "compress_min_bytes": 1024,
+    "news_ttl": 3600,
+    "reference_ttl": 7 * 24 * 3600,
+    "news_keywords": ["news", "latest", "today", "breaking", "recent", "current", "update", "this week"],
+}
+
+
+class SQLiteCache:
+    """
+    Thread-safe key/value cache stored in one SQLite file.
+
+    Values are JSON-serialized, optionally compressed, and carry their own
+    expiry time. When the stored payload exceeds max_bytes, the least
+    recently accessed entries are evicted.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = DEFAULT_SETTINGS["max_bytes"],
+        compress: bool = True,
+        compress_min_bytes: int = 1024
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            path: SQLite file path (created if missing)
+            max_bytes: Byte budget for stored payloads
+            compress: Whether to zlib-compress large payloads
+            compress_min_bytes: Minimum payload size before compressing
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = int(max_bytes)
+        self.compress = compress
+        self.compress_min_bytes = compress_min_bytes
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                namespace TEXT NOT NULL DEFAULT '',
+                payload BLOB NOT NULL,
+                compressed INTEGER NOT NULL DEFAULT 0,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL,
+                last_access REAL NOT NULL,
+                meta TEXT
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_access ON entries(last_access)")
+
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "writes": 0}
+
+    def _encode(self, value: Any):
+        raw = json.dumps(value, default=str).encode("utf-8")
+        if self.compress and len(raw) >= self.compress_min_bytes:
+            return zlib.compress(raw, 6), 1
+        return raw, 0
+
+    @staticmethod
+    def _decode(payload: bytes, compressed: int) -> Any:
+        if compressed:
+            payload = zlib.decompress(payload)
+        return json.loads(payload.decode("utf-8"))
+
+    def get(self, key: str, count: bool = True) -> Optional[Any]:
+        """
+        Return the cached value for key, or None on miss or expiry.
+
+        Args:
+            key: Cache key
+            count: Whether this lookup updates the hit/miss counters
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, compressed, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.counters["misses"] += count
+                return None
+
+            payload, compressed, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.counters["expirations"] += 1
+                self.counters["misses"] += count
+                return None
+
+            self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+            self.counters["hits"] += count
+
+        try:
+            return self._decode(payload, compressed)
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache entry {key}: {e}")
+            self.delete(key)
+            return None
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[float] = None,
+        namespace: str = "",
+        meta: Optional[Dict[str, Any]] = None,
+        created_at: Optional[float] = None
+    ) -> None:
+        """
+        Store a value.
+
+        Args:
+            key: Cache key
+            value: JSON-serializable value
+            ttl: Seconds until expiry (None = never expires)
+            namespace: Logical group (e.g., 'search', 'news', 'page')
+            meta: Optional JSON-serializable metadata stored alongside
+            created_at: Override creation time (used by migrations)
+        """
+        payload, compressed = self._encode(value)
+        now = time.time()
+        created = created_at if created_at is not None else now
+        expires_at = created + ttl if ttl is not None else None
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(key, namespace, payload, compressed, size, created_at, expires_at, last_access, meta) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, namespace, payload, compressed, len(payload), created, expires_at, now,
+                 json.dumps(meta) if meta else None)
+            )
+            self.counters["writes"] += 1
+            self._enforce_budget()
+
+    def _count(self, counter: str) -> None:
+        """Increment a counter under the lock that guards the other updates."""
+        with self._lock:
+            self.counters[counter] += 1
+
+    def get_meta(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the metadata stored with key, ignoring expiry."""
+        with self._lock:
+            row = self._conn.execute("SELECT meta FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return json.loads(row[0])
+
+    def delete(self, key: str) -> None:
+        """Remove a single entry."""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def _enforce_budget(self) -> None:
+        """Evict least recently used entries until under max_bytes. Caller holds the lock."""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self._conn.execute("SELECT key, size FROM entries ORDER BY last_access ASC").fetchall()
+        evicted = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", evicted)
+        self.counters["evictions"] += len(evicted)
+        if evicted:
+            logger.info(f"Evicted {len(evicted)} cache entries to stay under {self.max_bytes} bytes")
+
+    def iter_namespace(self, namespace: str):
+        """Yield (key, value) for every unexpired entry in a namespace."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, payload, compressed FROM entries "
+                "WHERE namespace = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (namespace, time.time())
+            ).fetchall()
+        for key, payload, compressed in rows:
+            try:
+                yield key, self._decode(payload, compressed)
+            except Exception as e:
+                logger.warning(f"Skipping unreadable cache entry {key}: {e}")
+
+    def purge_expired(self) -> int:
+        """Delete all expired entries. Returns the number removed."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+            )
+            removed = cursor.rowcount
+            self.counters["expirations"] += removed
+        return removed
+
+    def clear(self) -> None:
+        """Delete every entry."""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return counters plus entry count and stored bytes per namespace."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT namespace, COUNT(*), COALESCE(SUM(size), 0) FROM entries GROUP BY namespace"
+            ).fetchall()
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return {
+            **self.counters,
+            "hit_rate": round(self.counters["hits"] / lookups, 3) if lookups else 0.0,
+            "entries": sum(r[1] for r in rows),
+            "bytes": sum(r[2] for r in rows),
+            "max_bytes": self.max_bytes,
+            "namespaces": {r[0] or "default": {"entries": r[1], "bytes": r[2]} for r in rows},
+        }
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase and collapse whitespace so trivially different queries share a key."""
+    return re.sub(r"\s+", " ", query.strip().lower())
+
+
+class SearchCache(SQLiteCache):
+    """Search-result cache with query-aware TTLs and legacy pickle fallback."""
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
+        """
+        Initialize from the web_cache section of settings.yaml.
+
+        Args:
+            settings: Optional settings override
+        """
+        self.settings = settings or get_settings("web_cache", DEFAULT_SETTINGS)
+        path = Path(self.settings["path"])
+        if not path.is_absolute():
+            path = BASE_DIR / path
+        super().__init__(
+            str(path),
+            max_bytes=self.settings["max_bytes"],
+            compress=self.settings["compress"],
+            compress_min_bytes=self.settings["compress_min_bytes"]
+        )
+
+    @staticmethod
+    def make_key(query: str, backend: str, max_results: int, kind: str = "text") -> str:
+        """Build a cache key from normalized query, backend, result count and search kind."""
+        key_string = f"{kind}|{backend}|{max_results}|{normalize_query(query)}"
+        return hashlib.sha256(key_string.encode()).hexdigest()
+
+    @staticmethod
+    def legacy_key(query: str, max_results: int) -> str:
+        """Key format used by the old pickle cache (md5 of raw query and max_results)."""
+        return "legacy:" + hashlib.md5(f"{query}_{max_results}".encode()).hexdigest()
+
+    def ttl_for(self, query: str, kind: str = "text") -> float:
+        """
+        Choose a TTL: news searches and time-sensitive queries expire quickly,
+        reference queries are kept longer.
+        """
+        if kind == "news":
+            return self.settings["news_ttl"]
+        q = normalize_query(query)
+        if any(keyword in q for keyword in self.settings["news_keywords"]):
+            return self.settings["news_ttl"]
+        return self.settings["reference_ttl"]
+
+    def get_results(
+        self,
+        query: str,
+        max_results: int,
+        backend: str = "duckduckgo",
+        kind: str = "text"
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Look up cached results, falling back to migrated legacy entries.
+
+        Returns:
+            Cached result list or None
+        """
+        key = self.make_key(query, backend, max_results, kind)
+        results = self.get(key, count=False)
+        if results is not None:
+            self._count("hits")
+            return results
+
+        if kind == "text":
+            legacy = self.legacy_key(query, max_results)
+            results = self.get(legacy, count=False)
+            if results is not None:
+                self._count("hits")
+                # Promote to the normalized key so later lookups hit directly
+                self.put_results(query, max_results, results, backend=backend, kind=kind)
+                self.delete(legacy)
+                return results
+
+        self._count("misses")
+        return None
+
+    def put_results(
+        self,
+        query: str,
+        max_results: int,
+        results: List[Dict[str, Any]],
+        backend: str = "duckduckgo",
+        kind: str = "text"
+    ) -> None:
+        """Store results under the normalized key with a query-aware TTL."""
+        key = self.make_key(query, backend, max_results, kind)
+        self.set(
+            key,
+            results,
+            ttl=self.ttl_for(query, kind),
+            namespace=kind,
+            meta={"query": query, "backend": backend, "max_results": max_results}
+        )
+
+    def migrate_legacy(self, cache_dir: Path = LEGACY_CACHE_DIR, remove: bool = False) -> int:
+        """
+        Import legacy <md5>.pkl files into the SQLite store.
+
+        The original query text is not recoverable from the pickle name, so
+        entries are stored under their legacy key and promoted on first hit.
+
+        Args:
+            cache_dir: Directory containing legacy pickle files
+            remove: Delete pickle files after successful import
+
+        Returns:
+            Number of entries imported
+        """
+        imported = 0
+        for pkl_file in sorted(Path(cache_dir).glob("*.pkl")):
+            try:
+                with open(pkl_file, "rb") as f:
+                    results = pickle.load(f)
+                if not isinstance(results, list):
+                    logger.warning(f"Skipping {pkl_file.name}: unexpected payload type {type(results).__name__}")
+                    continue
+                self.set(
+                    "legacy:" + pkl_file.stem,
+                    results,
+                    ttl=self.settings["reference_ttl"],
+                    namespace="text",
+                    meta={"legacy_file": pkl_file.name},
+                    created_at=pkl_file.stat().st_mtime
+                )
+                imported += 1
+                if remove:
+                    pkl_file.unlink()
+            except Exception as e:
+                logger.error(f"Failed to migrate {pkl_file.name}: {e}")
+
+        logger.info(f"Migrated {imported} legacy cache entries from {cache_dir}")
+        return imported
+
+
+# Global instance
+_search_cache = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> SearchCache:
+    """Get or create the global search cache."""
+    global _search_cache
+    with _search_cache_lock:
+        if _search_cache is None:
+            _search_cache = SearchCache()
+        return _search_cache
+
+
+def main():
+    """CLI for cache maintenance."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="HAWK-AI Web Search Cache")
+    parser.add_argument("--stats", action="store_true", help="Show cache statistics")
+    parser.add_argument("--migrate", action="store_true", help="Import legacy pickle cache files")
+    parser.add_argument("--remove-legacy", action="store_true", help="Delete pickle files after migration")
+    parser.add_argument("--purge-expired", action="store_true", help="Delete expired entries")
+    parser.add_argument("--clear", action="store_true", help="Delete all entries")
+    args = parser.parse_args()
+
+    cache = get_search_cache()
+
+    if args.migrate:
+        count = cache.migrate_legacy(remove=args.remove_legacy)
+        print(f"✅ Migrated {count} legacy entries")
+    if args.purge_expired:
+        print(f"🧹 Purged {cache.purge_expired()} expired entries")
+    if args.clear:
+        cache.clear()
+        print("🧹 Cache cleared")
+    if args.stats or not (args.migrate or args.purge_expired or args.clear):
+        print(json.dumps(cache.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,418 @@
+"""
+HAWK-AI Web Knowledge Index
+===========================
+Persistent, append-only FAISS index of web content seen by the search tools.
+
+Instead of rebuilding the web index for every query, new search results and
+scraped pages are appended. Entries are de-duplicated by URL and content
+hash, carry timestamps for freshness-aware search and expiry, and a
+compaction routine rebuilds the index without expired or superseded rows.
+
+Files (under data/vector_index/):
+- <name>.faiss           FAISS IndexIDMap2 over inner-product (cosine) vectors
+- <name>_metadata.pkl    entry metadata keyed by vector id
+
+CLI:
+    python core/web_index.py --stats
+    python core/web_index.py --query "Sudan ceasefire"
+    python core/web_index.py --compact
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import faiss
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.config_loader import get_settings
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).parent.parent
+VECTOR_INDEX_DIR = BASE_DIR / "data" / "vector_index"
+
+DEFAULT_SETTINGS = {
+    "enabled": True,
+    "name": "web_index",
+    "expire_after": 30 * 24 * 3600,
+    "max_entries": 50000,
+    "local_max_age": 3 * 24 * 3600,
+    "local_min_score": 0.6,
+    "local_min_results": 3,
+}
+
+EmbedFn = Callable[[List[str]], Tuple[np.ndarray, List[int]]]
+
+
+def content_hash(title: str, body: str) -> str:
+    """Stable hash of a document's text, used to detect duplicate content."""
+    normalized = " ".join(f"{title}\n{body}".split()).lower()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+class WebKnowledgeIndex:
+    """
+    Append-only vector index of web documents with de-duplication and expiry.
+
+    Documents are dicts with 'href' (or 'url'), 'title' and 'body'; vectors
+    are L2-normalized so inner-product scores are cosine similarities.
+    """
+
+    def __init__(self, name: str = "web_index", embed_fn: Optional[EmbedFn] = None,
+                 index_dir: Path = VECTOR_INDEX_DIR, max_entries: Optional[int] = None):
+        """
+        Load or create the index.
+
+        Args:
+            name: Index file stem under index_dir
+            embed_fn: Function returning (vectors, kept_indices) for a list of texts
+            index_dir: Directory holding index files
+            max_entries: Compact down to this many entries when exceeded
+        """
+        self.name = name
+        self.embed_fn = embed_fn
+        self.max_entries = max_entries
+        self.index_dir = Path(index_dir)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.index_dir / f"{name}.faiss"
+        self.metadata_path = self.index_dir / f"{name}_metadata.pkl"
+
+        self._lock = threading.RLock()
+        self.index: Optional[faiss.Index] = None
+        self.dimension: Optional[int] = None
+        self.entries: Dict[int, Dict[str, Any]] = {}
+        self.url_to_id: Dict[str, int] = {}
+        self.hash_to_id: Dict[str, int] = {}
+        self.next_id = 0
+        self.last_query: Optional[str] = None
+
+        self._load()
+
+    def _load(self):
+        if not (self.index_path.exists() and self.metadata_path.exists()):
+            logger.info(f"Starting new web knowledge index '{self.name}'")
+            return
+        try:
+            with open(self.metadata_path, "rb") as f:
+                metadata = pickle.load(f)
+            if "entries" not in metadata:
+                # Overwrite-per-query index from older versions: nothing to carry over
+                logger.warning(f"Ignoring legacy single-query index '{self.name}'")
+                return
+            self.index = faiss.read_index(str(self.index_path))
+            self.dimension = metadata["dimension"]
+            self.entries = metadata["entries"]
+            self.next_id = metadata["next_id"]
+            self.last_query = metadata.get("query")
+            for vid, entry in self.entries.items():
+                self.url_to_id[entry["url"]] = vid
+                self.hash_to_id[entry["content_hash"]] = vid
+            logger.info(f"Loaded web knowledge index '{self.name}' with {len(self.entries)} entries")
+        except Exception as e:
+            logger.error(f"Failed to load web index '{self.name}', starting fresh: {e}")
+            self.index, self.entries, self.next_id = None, {}, 0
+
+    def save(self):
+        """Persist index and metadata atomically."""
+        with self._lock:
+            if self.index is None:
+                return
+            tmp_index = self.index_path.with_suffix(".faiss.tmp")
+            tmp_meta = self.metadata_path.with_suffix(".pkl.tmp")
+            faiss.write_index(self.index, str(tmp_index))
+            with open(tmp_meta, "wb") as f:
+                pickle.dump({
+                    "entries": self.entries,
+                    "next_id": self.next_id,
+                    "dimension": self.dimension,
+                    "query": self.last_query,
+                    "timestamp": datetime.now().isoformat(),
+                    "num_vectors": self.index.ntotal,
+                }, f)
+            os.replace(tmp_index, self.index_path)
+            os.replace(tmp_meta, self.metadata_path)
+
+    def _ensure_index(self, dimension: int):
+        if self.index is None:
+            self.dimension = dimension
+            self.index = faiss.IndexIDMap2(faiss.IndexFlatIP(dimension))
+        elif dimension != self.dimension:
+            raise ValueError(f"Embedding dimension {dimension} does not match index dimension {self.dimension}")
+
+    def _remove(self, ids: List[int]):
+        """Drop entries and their vectors. Caller holds the lock."""
+        if not ids:
+            return
+        self.index.remove_ids(np.array(ids, dtype="int64"))
+        for vid in ids:
+            entry = self.entries.pop(vid, None)
+            if entry:
+                if self.url_to_id.get(entry["url"]) == vid:
+                    del self.url_to_id[entry["url"]]
+                if self.hash_to_id.get(entry["content_hash"]) == vid:
+                    del self.hash_to_id[entry["content_hash"]]
+
+    def add_documents(self, docs: List[Dict[str, Any]], query: Optional[str] = None,
+                      source: str = "search", save: bool = True) -> int:
+        """
+        Append documents, skipping duplicates.
+
+        A URL seen again with identical content only refreshes its timestamp;
+        a URL whose content changed replaces the old entry; identical content
+        under a different URL is skipped.
+
+        Args:
+            docs: Dicts with href/url, title and body
+            query: Query that produced the documents
+            source: Origin label ('search', 'page', ...)
+            save: Persist after adding
+
+        Returns:
+            Number of new vectors added
+        """
+        now = time.time()
+        fresh_docs, replaced = [], []
+
+        with self._lock:
+            for doc in docs:
+                url = doc.get("href") or doc.get("url") or ""
+                title, body = doc.get("title", ""), doc.get("body") or doc.get("snippet", "")
+                if not (title or body):
+                    continue
+                digest = content_hash(title, body)
+
+                existing = self.url_to_id.get(url) if url else None
+                if existing is not None:
+                    if self.entries[existing]["content_hash"] == digest:
+                        self.entries[existing]["seen_at"] = now
+                        continue
+                    replaced.append(existing)
+                elif digest in self.hash_to_id:
+                    self.entries[self.hash_to_id[digest]]["seen_at"] = now
+                    continue
+
+                fresh_docs.append({
+                    "url": url, "title": title, "body": body, "content_hash": digest,
+                    "query": query, "source": source, "added_at": now, "seen_at": now,
+                })
+
+        if not fresh_docs:
+            if save:
+                self.save()
+            return 0
+
+        if self.embed_fn is None:
+            raise RuntimeError("WebKnowledgeIndex has no embedding function")
+        vectors, kept = self.embed_fn([f"{d['title']}\n{d['body']}" for d in fresh_docs])
+        if not kept:
+            return 0
+        vectors = np.ascontiguousarray(vectors, dtype="float32")
+        faiss.normalize_L2(vectors)
+
+        with self._lock:
+            self._ensure_index(vectors.shape[1])
+            self._remove([vid for vid in replaced if vid in self.entries])
+
+            # Another thread (search indexing, prefetch) may have added the same
+            # URL or content while we were embedding: check again before inserting
+            added = 0
+            for row, doc_pos in enumerate(kept):
+                doc = fresh_docs[doc_pos]
+                existing = self.url_to_id.get(doc["url"]) if doc["url"] else None
+                if existing is not None:
+                    if self.entries[existing]["content_hash"] == doc["content_hash"]:
+                        self.entries[existing]["seen_at"] = now
+                        continue
+                    self._remove([existing])
+                elif doc["content_hash"] in self.hash_to_id:
+                    self.entries[self.hash_to_id[doc["content_hash"]]]["seen_at"] = now
+                    continue
+
+                vid = self.next_id
+                self.next_id += 1
+                self.index.add_with_ids(vectors[row:row + 1], np.array([vid], dtype="int64"))
+                self.entries[vid] = doc
+                if doc["url"]:
+                    self.url_to_id[doc["url"]] = vid
+                self.hash_to_id[doc["content_hash"]] = vid
+                added += 1
+            if query:
+                self.last_query = query
+            over_budget = self.max_entries is not None and len(self.entries) > self.max_entries
+
+        logger.info(f"Added {added} documents to web index '{self.name}' ({len(self.entries)} total)")
+        if over_budget:
+            self.compact(max_entries=self.max_entries)
+        elif save:
+            self.save()
+        return added
+
+    def search(self, query: str, top_k: int = 5, max_age: Optional[float] = None,
+               min_score: float = 0.0) -> List[Dict[str, Any]]:
+        """
+        Retrieve documents similar to query.
+
+        Args:
+            query: Query text
+            top_k: Maximum results
+            max_age: Only return entries seen within this many seconds
+            min_score: Minimum cosine similarity
+
+        Returns:
+            Entry dicts with added 'score' and 'age_s'
+        """
+        with self._lock:
+            if self.index is None or self.index.ntotal == 0:
+                return []
+        if self.embed_fn is None:
+            raise RuntimeError("WebKnowledgeIndex has no embedding function")
+
+        vectors, kept = self.embed_fn([query])
+        if not kept:
+            return []
+        query_vector = np.ascontiguousarray(vectors[:1], dtype="float32")
+        faiss.normalize_L2(query_vector)
+
+        now = time.time()
+        results = []
+        with self._lock:
+            search_k = min(self.index.ntotal, top_k * 4 if max_age else top_k)
+            scores, ids = self.index.search(query_vector, search_k)
+            for score, vid in zip(scores[0], ids[0]):
+                entry = self.entries.get(int(vid))
+                if entry is None or score < min_score:
+                    continue
+                age = now - entry["seen_at"]
+                if max_age is not None and age > max_age:
+                    continue
+                results.append({**entry, "score": float(score), "age_s": round(age, 1)})
+                if len(results) >= top_k:
+                    break
+        return results
+
+    def expire(self, max_age: float, save: bool = True) -> int:
+        """Remove entries not seen within max_age seconds. Returns the number removed."""
+        cutoff = time.time() - max_age
+        with self._lock:
+            stale = [vid for vid, entry in self.entries.items() if entry["seen_at"] < cutoff]
+            if self.index is not None:
+                self._remove(stale)
+        if stale:
+            logger.info(f"Expired {len(stale)} entries from web index '{self.name}'")
+            if save:
+                self.save()
+        return len(stale)
+
+    def compact(self, max_age: Optional[float] = None, max_entries: Optional[int] = None) -> Dict[str, int]:
+        """
+        Rebuild the index with contiguous ids, dropping expired entries and,
+        if over max_entries, the least recently seen ones.
+
+        Returns:
+            Dict with entries before/after and number removed
+        """
+        with self._lock:
+            before = len(self.entries)
+            if self.index is None:
+                return {"before": 0, "after": 0, "removed": 0}
+
+            live = sorted(self.entries.items(), key=lambda item: item[1]["seen_at"], reverse=True)
+            if max_age is not None:
+                cutoff = time.time() - max_age
+                live = [(vid, e) for vid, e in live if e["seen_at"] >= cutoff]
+            if max_entries is not None:
+                live = live[:max_entries]
+
+            new_index = faiss.IndexIDMap2(faiss.IndexFlatIP(self.dimension))
+            self.entries, self.url_to_id, self.hash_to_id = {}, {}, {}
+            if live:
+                vectors = np.vstack([self.index.reconstruct(int(vid)) for vid, _ in live]).astype("float32")
+                new_ids = np.arange(len(live), dtype="int64")
+                new_index.add_with_ids(vectors, new_ids)
+                for new_id, (_, entry) in zip(new_ids.tolist(), live):
+                    self.entries[new_id] = entry
+                    if entry["url"]:
+                        self.url_to_id[entry["url"]] = new_id
+                    self.hash_to_id[entry["content_hash"]] = new_id
+            self.index = new_index
+            self.next_id = len(live)
+            self.save()
+
+        stats = {"before": before, "after": len(live), "removed": before - len(live)}
+        logger.info(f"Compacted web index '{self.name}': {stats}")
+        return stats
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry counts and freshness summary."""
+        with self._lock:
+            seen = [e["seen_at"] for e in self.entries.values()]
+            return {
+                "name": self.name,
+                "entries": len(self.entries),
+                "vectors": self.index.ntotal if self.index is not None else 0,
+                "dimension": self.dimension,
+                "urls": len(self.url_to_id),
+                "oldest_age_s": round(time.time() - min(seen), 1) if seen else None,
+                "newest_age_s": round(time.time() - max(seen), 1) if seen else None,
+            }
+
+
+# Global instances by name
+_indexes: Dict[str, WebKnowledgeIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_web_index(name: Optional[str] = None) -> WebKnowledgeIndex:
+    """
+    Get or create a shared web knowledge index (embeds via Ollama).
+
+    Entries older than web_index.expire_after are dropped when the index is
+    first loaded.
+    """
+    from core.tools_websearch import embed_texts
+
+    settings = get_settings("web_index", DEFAULT_SETTINGS)
+    name = name or settings["name"]
+    with _indexes_lock:
+        if name not in _indexes:
+            index = WebKnowledgeIndex(name, embed_fn=embed_texts, max_entries=settings["max_entries"])
+            index.expire(settings["expire_after"])
+            _indexes[name] = index
+        return _indexes[name]
+
+
+def main():
+    """CLI for web index maintenance."""
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="HAWK-AI Web Knowledge Index")
+    parser.add_argument("--stats", action="store_true", help="Show index statistics")
+    parser.add_argument("--query", type=str, help="Search the local web index")
+    parser.add_argument("--compact", action="store_true", help="Drop expired entries and rebuild the index")
+    args = parser.parse_args()
+
+    settings = get_settings("web_index", DEFAULT_SETTINGS)
+    index = get_web_index(settings["name"])
+
+    if args.compact:
+        print(json.dumps(index.compact(settings["expire_after"], settings["max_entries"]), indent=2))
+    if args.query:
+        for i, hit in enumerate(index.search(args.query, top_k=5), 1):
+            print(f"{i}. [{hit['score']:.3f}] {hit['title']} ({hit['url']}, {hit['age_s']/3600:.1f}h old)")
+    if args.stats or not (args.compact or args.query):
+        print(json.dumps(index.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
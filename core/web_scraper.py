@@ -0,0 +1,371 @@
+"""
+HAWK-AI Web Scraper
+===================
+Batch page scraping on a pooled async HTTP client.
+
+Features:
+- One keep-alive connection pool per batch (httpx.AsyncClient)
+- Per-host concurrency caps so a single site is never hammered
+- Streaming download with a byte ceiling (oversized pages are truncated)
+- Fast HTML text extraction (selectolax > lxml > stdlib html.parser)
+- Page cache keyed by URL with ETag / Last-Modified revalidation
+
+Usage:
+    from core.web_scraper import scrape_urls
+    pages = scrape_urls(["https://example.org/a", "https://example.org/b"])
+
+CLI:
+    python core/web_scraper.py <url> [<url> ...]
+"""
+
+import asyncio
+import hashlib
+import logging
+import re
+import sys
+import threading
+import time
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.config_loader import get_settings
+from core.web_cache import SQLiteCache
+
+try:
+    from selectolax.parser import HTMLParser as SelectolaxParser
+except ImportError:
+    SelectolaxParser = None
+
+try:
+    import lxml.html as lxml_html
+except ImportError:
+    lxml_html = None
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).parent.parent
+
+DEFAULT_SETTINGS = {
+    "timeout": 10,
+    "max_retries": 3,
+    "headers": {"User-Agent": "HAWK-AI/1.0"},
+    "max_connections": 20,
+    "per_host_limit": 2,
+    "max_bytes": 2 * 1024 * 1024,
+    "cache_path": "data/web_cache/page_cache.sqlite",
+    "cache_max_bytes": 200 * 1024 * 1024,
+    "cache_ttl": 24 * 3600,
+}
+
+SKIPPED_TAGS = {"script", "style", "noscript", "template", "svg", "head"}
+
+
+class _StdlibTextExtractor(HTMLParser):
+    """Minimal text extractor used when neither selectolax nor lxml is installed."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self.title = ""
+        self._skip_depth = 0
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "title":
+            self._in_title = True
+        elif tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+        elif tag in SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif not self._skip_depth and data.strip():
+            self.parts.append(data.strip())
+
+
+def extract_text(html: str) -> Tuple[str, str]:
+    """
+    Extract (title, visible text) from an HTML document.
+
+    Uses the fastest available backend: selectolax, then lxml, then the
+    standard library parser.
+
+    Args:
+        html: HTML source
+
+    Returns:
+        Tuple of (title, text)
+    """
+    if SelectolaxParser is not None:
+        tree = SelectolaxParser(html)
+        title_node = tree.css_first("title")
+        title = title_node.text(strip=True) if title_node else ""
+        for node in tree.css(",".join(SKIPPED_TAGS - {"head"})):
+            node.decompose()
+        body = tree.body or tree.root
+        text = body.text(separator=" ", strip=True) if body else ""
+    elif lxml_html is not None:
+        doc = lxml_html.document_fromstring(html)
+        title_nodes = doc.xpath("//title/text()")
+        title = title_nodes[0].strip() if title_nodes else ""
+        for node in doc.xpath("//script|//style|//noscript|//template|//svg"):
+            node.drop_tree()
+        body = doc.find("body")
+        text = (body if body is not None else doc).text_content()
+    else:
+        parser = _StdlibTextExtractor()
+        parser.feed(html)
+        parser.close()
+        title = parser.title.strip()
+        text = " ".join(parser.parts)
+
+    return title or "No title", re.sub(r"\s+", " ", text).strip()
+
+
+def _error_result(url: str, error: str) -> Dict[str, Any]:
+    return {
+        'status': 'error',
+        'error': error,
+        'content': '',
+        'title': '',
+        'length': 0,
+        'url': url
+    }
+
+
+class AsyncScraper:
+    """
+    Pooled async scraper. Use as an async context manager:
+
+        async with AsyncScraper() as scraper:
+            pages = await scraper.fetch_many(urls)
+    """
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None, cache: Optional[SQLiteCache] = None):
+        """
+        Initialize the scraper.
+
+        Args:
+            settings: Overrides for the web_scraping section of sources.yaml
+            cache: Page cache (defaults to the shared page cache)
+        """
+        self.settings = get_settings("web_scraping", DEFAULT_SETTINGS, path="config/sources.yaml")
+        if settings:
+            self.settings.update(settings)
+        self.cache = cache if cache is not None else get_page_cache(self.settings)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    async def __aenter__(self):
+        limits = httpx.Limits(
+            max_connections=self.settings["max_connections"],
+            max_keepalive_connections=self.settings["max_connections"]
+        )
+        self._client = httpx.AsyncClient(
+            headers=self.settings["headers"],
+            timeout=self.settings["timeout"],
+            limits=limits,
+            follow_redirects=True
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._client.aclose()
+        self._client = None
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc.lower()
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.settings["per_host_limit"])
+        return self._host_limits[host]
+
+    @staticmethod
+    def _cache_key(url: str) -> str:
+        return "page:" + hashlib.sha256(url.encode()).hexdigest()
+
+    async def fetch(self, url: str) -> Dict[str, Any]:
+        """
+        Fetch and extract one page, honouring the cache and per-host cap.
+
+        Args:
+            url: Page URL
+
+        Returns:
+            Dict with status, content, title, length, url, cached, truncated
+        """
+        key = self._cache_key(url)
+        cached = self.cache.get(key) if self.cache is not None else None
+        headers = {}
+
+        if cached:
+            age = time.time() - cached.get("fetched_at", 0)
+            if age < self.settings["cache_ttl"]:
+                return {**cached["page"], "cached": True}
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        async with self._host_semaphore(url):
+            last_error = None
+            for attempt in range(max(1, self.settings["max_retries"])):
+                try:
+                    return await self._download(url, key, headers, cached)
+                except (httpx.TransportError, httpx.TimeoutException) as e:
+                    last_error = e
+                    await asyncio.sleep(0.25 * (2 ** attempt))
+                except Exception as e:
+                    logger.error(f"Failed to scrape {url}: {e}")
+                    return _error_result(url, str(e))
+
+        logger.error(f"Failed to scrape {url} after retries: {last_error}")
+        return _error_result(url, str(last_error))
+
+    async def _download(self, url: str, key: str, headers: Dict[str, str], cached: Optional[Dict]) -> Dict[str, Any]:
+        async with self._client.stream("GET", url, headers=headers) as response:
+            if response.status_code == 304 and cached:
+                cached["fetched_at"] = time.time()
+                self.cache.set(key, cached, namespace="page", meta={"url": url})
+                logger.info(f"Revalidated {url} (304 Not Modified)")
+                return {**cached["page"], "cached": True}
+
+            response.raise_for_status()
+
+            content_type = response.headers.get("content-type", "")
+            if content_type and "html" not in content_type and "text" not in content_type:
+                return _error_result(url, f"Unsupported content type: {content_type}")
+
+            body = bytearray()
+            truncated = False
+            async for chunk in response.aiter_bytes():
+                body.extend(chunk)
+                if len(body) >= self.settings["max_bytes"]:
+                    truncated = True
+                    del body[self.settings["max_bytes"]:]
+                    break
+
+            encoding = response.encoding or "utf-8"
+            etag = response.headers.get("etag")
+            last_modified = response.headers.get("last-modified")
+
+        html = bytes(body).decode(encoding, errors="replace")
+        title, text = await asyncio.to_thread(extract_text, html)
+
+        page = {
+            'status': 'success',
+            'content': text,
+            'title': title,
+            'length': len(text),
+            'url': url,
+            'truncated': truncated
+        }
+        logger.info(f"Scraped {len(text)} characters from {url}{' (truncated)' if truncated else ''}")
+
+        if self.cache is not None:
+            self.cache.set(
+                key,
+                {"page": page, "etag": etag, "last_modified": last_modified, "fetched_at": time.time()},
+                namespace="page",
+                meta={"url": url}
+            )
+        return {**page, "cached": False}
+
+    async def fetch_many(self, urls: List[str]) -> List[Dict[str, Any]]:
+        """
+        Fetch several pages concurrently; results keep the input order.
+
+        Args:
+            urls: Page URLs (duplicates are fetched once)
+
+        Returns:
+            List of page result dicts
+        """
+        unique = list(dict.fromkeys(urls))
+        pages = await asyncio.gather(*(self.fetch(u) for u in unique))
+        by_url = dict(zip(unique, pages))
+        return [by_url[u] for u in urls]
+
+
+# Global page cache
+_page_cache = None
+_page_cache_lock = threading.Lock()
+
+
+def get_page_cache(settings: Optional[Dict[str, Any]] = None) -> SQLiteCache:
+    """Get or create the shared page cache."""
+    global _page_cache
+    with _page_cache_lock:
+        if _page_cache is None:
+            settings = settings or get_settings("web_scraping", DEFAULT_SETTINGS, path="config/sources.yaml")
+            path = Path(settings["cache_path"])
+            if not path.is_absolute():
+                path = BASE_DIR / path
+            _page_cache = SQLiteCache(str(path), max_bytes=settings["cache_max_bytes"])
+        return _page_cache
+
+
+async def scrape_urls_async(urls: List[str], settings: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """Async entry point: scrape urls with one pooled client."""
+    async with AsyncScraper(settings) as scraper:
+        return await scraper.fetch_many(urls)
+
+
+def scrape_urls(urls: List[str], settings: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """
+    Synchronous entry point for scraping a batch of URLs.
+
+    Call it from threads without an event loop (agents, the prefetch
+    worker). Coroutines must await scrape_urls_async() instead: blocking
+    here would stall their loop for the whole batch.
+
+    Args:
+        urls: Page URLs
+        settings: Optional scraper setting overrides
+
+    Returns:
+        List of page result dicts in input order
+
+    Raises:
+        RuntimeError: Called from a running event loop
+    """
+    if not urls:
+        return []
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(scrape_urls_async(urls, settings))
+    raise RuntimeError("scrape_urls() would block the running event loop; await scrape_urls_async() instead")
+
+
+def main():
+    """CLI: scrape URLs and print a short preview of each."""
+    if len(sys.argv) < 2:
+        print("Usage: python core/web_scraper.py <url> [<url> ...]")
+        sys.exit(1)
+
+    start = time.time()
+    pages = scrape_urls(sys.argv[1:])
+    for page in pages:
+        if page['status'] == 'success':
+            flag = " (cached)" if page.get('cached') else ""
+            print(f"✅ {page['url']}{flag}: {page['title']} ({page['length']} chars)")
+            print(f"   {page['content'][:200]}...")
+        else:
+            print(f"❌ {page['url']}: {page.get('error')}")
+    print(f"\n⏱️  {len(pages)} page(s) in {time.time() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
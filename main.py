@@ -132,8 +132,8 @@ def interactive_mode():
             console.print("[dim]Type 'exit' to quit or continue querying[/dim]")
 
 
-def single_query_mode(query: str, output_file: str = None):
-    """Run HAWK-AI with a single query."""
+def single_query_mode(query: str, output_file: str = None, deadline_s: float = None):
+    """Run HAWK-AI with a single query, optionally within a deadline in seconds."""
     console.print("[cyan]Initializing HAWK-AI...[/cyan]")
     
     # Initialize system
@@ -142,7 +142,7 @@ def single_query_mode(query: str, output_file: str = None):
     
     # Execute query
     console.print(f"\n[bold cyan]Processing query:[/bold cyan] {query}\n")
-    result = orchestrator.execute_task(query)
+    result = orchestrator.execute_task(query, {"deadline_s": deadline_s})
     
     # Display result
     if result['status'] == 'success':
@@ -186,6 +186,7 @@ Examples:
   %(prog)s --chat                                  # Interactive mode
   %(prog)s "Analyze conflicts in Sudan"            # Single query
   %(prog)s "Search for latest news" -o result.txt  # Save output
+  %(prog)s "Analyze conflicts in Sudan" --deadline 90  # Answer within 90 seconds
   %(prog)s --dev                                   # Development mode
   %(prog)s --status                                # Show system status
         """
@@ -209,6 +210,13 @@ Examples:
         help='Save output to file'
     )
     
+    parser.add_argument(
+        '--deadline',
+        type=float,
+        metavar='SECONDS',
+        help='Answer within this many seconds, skipping or shortening stages if needed'
+    )
+    
     parser.add_argument(
         '--dev',
         action='store_true',
@@ -246,7 +254,7 @@ Examples:
         
         # Single query mode
         elif args.query:
-            single_query_mode(args.query, args.output)
+            single_query_mode(args.query, args.output, args.deadline)
         
         # No arguments - default to interactive
         else:
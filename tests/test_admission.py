@@ -0,0 +1,151 @@
+"""
+Test script for admission control of analysis runs.
+Worker threads stand in for supervisor runs: no Ollama required.
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.abspath('.'))
+
+from core.admission import AdmissionController, AdmissionRejected
+from core.cancellation import CancellationToken, OperationCancelled
+
+
+def _controller(**overrides):
+    settings = {"max_concurrent": 1, "max_queue": 3, "max_wait": 5, "aging_s": 0,
+                "position_interval_s": 0.05, "default_run_s": 10}
+    settings.update(overrides)
+    return AdmissionController(settings)
+
+
+def test_priority_order_and_positions():
+    """One slot: interactive requests overtake queued batch work and see their queue position."""
+    controller = _controller(max_queue=10)
+    order, positions = [], {}
+
+    def run(name, priority):
+        ticket = controller.reserve(priority)
+        with controller.slot(ticket, on_position=lambda p, eta: positions.setdefault(name, []).append((p, eta))):
+            order.append(name)
+            time.sleep(0.05)
+
+    blocker = controller.reserve("batch")
+    controller.wait(blocker)
+    threads = []
+    for name, priority in [("batch-1", "batch"), ("batch-2", "batch"), ("chat", "interactive")]:
+        threads.append(threading.Thread(target=run, args=(name, priority)))
+        threads[-1].start()
+        time.sleep(0.05)
+
+    stats = controller.stats()
+    assert stats["active"] == 1 and stats["queue_depth"] == 3
+    assert stats["queue_depth_by_priority"] == {"batch": 2, "interactive": 1}
+    controller.release(blocker)
+    for t in threads:
+        t.join(timeout=3)
+
+    assert order == ["chat", "batch-1", "batch-2"], "interactive chat runs before earlier batch jobs"
+    assert positions["chat"][0] == (1, 10), "chat jumps to the head of the queue"
+    batch_positions = [p for p, _ in positions["batch-2"]]
+    assert batch_positions[0] == 2 and 3 in batch_positions, "queued batch work moves back when chat arrives"
+    stats = controller.stats()
+    assert stats["admitted"] == 4 and stats["active"] == 0 and stats["wait_s"]["max"] > 0.05
+    assert stats["avg_run_s"] is not None
+    print(f"✅ Priority order {order}; p95 wait {stats['wait_s']['p95']:.2f}s")
+
+
+def test_rejections_and_cancellation():
+    """Full queue -> 429, overlong wait -> 503, both with Retry-After; cancelled waits leave the queue."""
+    controller = _controller(max_queue=2, max_wait=0.3)
+    running = controller.reserve("interactive")
+    controller.wait(running)
+    waiting = [controller.reserve("batch"), controller.reserve("batch")]
+    try:
+        controller.reserve("interactive")
+        assert False, "expected 429"
+    except AdmissionRejected as e:
+        assert e.status_code == 429 and e.retry_after >= 10
+
+    token = CancellationToken()
+    outcome = {}
+
+    def cancelled_wait():
+        try:
+            controller.wait(waiting[0], cancel_token=token)
+        except OperationCancelled:
+            outcome["cancelled_at"] = time.time()
+
+    worker = threading.Thread(target=cancelled_wait)
+    worker.start()
+    time.sleep(0.05)
+    start = time.time()
+    token.cancel("client disconnected")
+    worker.join(timeout=2)
+    assert outcome["cancelled_at"] - start < 0.2 and controller.stats()["queue_depth"] == 1
+
+    try:
+        controller.wait(waiting[1])
+        assert False, "expected 503"
+    except AdmissionRejected as e:
+        assert e.status_code == 503 and e.retry_after >= 1
+    controller.release(running)
+
+    stats = controller.stats()
+    assert stats["queue_depth"] == 0 and stats["active"] == 0
+    assert stats["rejected_full"] == 1 and stats["rejected_timeout"] == 1 and stats["cancelled"] == 1
+    assert _controller(enabled=False).reserve("batch").exempt
+    print("✅ 429/503 rejections and cancelled waits")
+
+
+def test_abandoned_ticket_does_not_block_queue():
+    """A ticket whose waiter never arrived is dropped when its request ends and can no longer be admitted."""
+    controller = _controller(max_wait=1)
+    orphan = controller.reserve("interactive")
+    later = controller.reserve("interactive")
+    with controller.slot(later):
+        assert controller.stats()["queue_depth"] == 1, "the orphan still holds a queue place"
+    controller.abandon(orphan)
+    assert controller.stats()["queue_depth"] == 0
+
+    try:
+        controller.wait(orphan)
+        assert False, "an abandoned ticket cannot be admitted"
+    except AdmissionRejected as e:
+        assert e.status_code == 503
+    controller.abandon(later)   # already admitted and released: no-op
+    stats = controller.stats()
+    assert stats["queue_depth"] == 0 and stats["active"] == 0 and stats["admitted"] == 1
+    print("✅ Abandoned tickets leave the queue")
+
+
+def test_unwaited_ticket_does_not_hold_the_head():
+    """A batch ticket reserved for a job still waiting on a worker thread does not block interactive requests."""
+    controller = _controller(max_concurrent=2, max_wait=1, aging_s=0.01)
+    running = controller.reserve("interactive")
+    controller.wait(running)
+    job_ticket = controller.reserve("batch")   # job queued for a hawk-job worker; nobody waits yet
+    time.sleep(0.1)                            # aged well past the interactive class
+
+    chat = controller.reserve("interactive")
+    start = time.time()
+    controller.wait(chat)
+    assert time.time() - start < 0.2, "a free slot must not wait behind an unwaited ticket"
+    assert controller.stats()["queue_depth"] == 1, "the job keeps its queue place"
+
+    controller.release(chat)
+    controller.wait(job_ticket)                # the worker picks the job up
+    assert controller.stats()["active"] == 2
+    controller.release(job_ticket)
+    controller.release(running)
+    print("✅ Unwaited tickets never block the queue head")
+
+
+if __name__ == "__main__":
+    test_priority_order_and_positions()
+    test_rejections_and_cancellation()
+    test_abandoned_ticket_does_not_block_queue()
+    test_unwaited_ticket_does_not_hold_the_head()
+    print("\nTEST PASSED: admission")
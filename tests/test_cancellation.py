@@ -0,0 +1,220 @@
+"""
+Test script for cooperative cancellation of agent work.
+Uses a slow in-process fake of Ollama's streaming API: no Ollama required.
+"""
+
+import contextvars
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import yaml
+
+sys.path.append(os.path.abspath('.'))
+
+from core.cancellation import CancellationToken, OperationCancelled, cancel_scope, check_cancelled
+from core.llm_gateway import LLMGateway
+from core.model_scheduler import ModelScheduler
+
+
+class _SlowOllama(BaseHTTPRequestHandler):
+    """Streams one token, then stalls like a long generation."""
+    protocol_version = "HTTP/1.1"
+    disconnected = threading.Event()
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for i in range(100):
+                data = (json.dumps({"response": f"t{i} ", "done": False}) + "\n").encode()
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+                time.sleep(0.5)
+        except (BrokenPipeError, ConnectionResetError):
+            _SlowOllama.disconnected.set()
+
+
+class _LoadingOllama(_SlowOllama):
+    """Sends nothing, not even headers, until the model has "loaded"."""
+    disconnected = threading.Event()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        time.sleep(1.0)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for i in range(20):
+                data = (json.dumps({"response": f"t{i} ", "done": False}) + "\n").encode()
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+                time.sleep(0.1)
+        except (BrokenPipeError, ConnectionResetError):
+            _LoadingOllama.disconnected.set()
+
+
+def _gateway(tmp, port):
+    settings = {
+        "ollama": {"host": "127.0.0.1", "port": port, "model_default": "fake:7b", "timeout": 30},
+        "model_scheduler": {"enabled": False},
+    }
+    path = Path(tmp) / "settings.yaml"
+    path.write_text(yaml.safe_dump(settings))
+    return LLMGateway(config_path=str(path))
+
+
+def test_token_and_scope():
+    """Tokens are one-shot, run abort callbacks once and propagate to worker threads via copied contexts."""
+    token = CancellationToken()
+    calls = []
+    unregister = token.register(lambda: calls.append("a"))
+    token.register(lambda: calls.append("b"))
+    unregister()
+    check_cancelled()                              # no token installed: no-op
+
+    with cancel_scope(token), ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(contextvars.copy_context().run, lambda: (token.wait(2), check_cancelled()))
+        token.cancel("client disconnected")
+        token.cancel("again")
+        try:
+            future.result(timeout=2)
+            assert False, "expected OperationCancelled in the worker"
+        except OperationCancelled as e:
+            assert str(e) == "client disconnected"
+    assert calls == ["b"] and token.reason == "client disconnected"
+    late = []
+    token.register(lambda: late.append(1))
+    assert late == [1], "callbacks registered after cancellation run immediately"
+    check_cancelled()                              # scope exited: no-op again
+    print("✅ Token semantics and context propagation")
+
+
+def test_gateway_aborts_in_flight_generation():
+    """Cancelling closes the Ollama connection mid-generation instead of waiting for the rest."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _SlowOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    _SlowOllama.disconnected.clear()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            gateway = _gateway(tmp, server.server_address[1])
+            token = CancellationToken()
+            tokens, outcome = [], {}
+
+            def run():
+                with cancel_scope(token):
+                    try:
+                        gateway.generate("long brief", agent="analyst", on_token=tokens.append)
+                    except OperationCancelled as e:
+                        outcome["cancelled"] = (str(e), time.time())
+
+            worker = threading.Thread(target=run)
+            worker.start()
+            time.sleep(0.2)
+            assert tokens == ["t0 "], "generation should be under way"
+            start = time.time()
+            token.cancel("client disconnected")
+            worker.join(timeout=3)
+            assert outcome["cancelled"][0] == "client disconnected"
+            assert outcome["cancelled"][1] - start < 0.4, "blocked read must be interrupted"
+            assert _SlowOllama.disconnected.wait(2), "Ollama should see the connection drop"
+            assert gateway.in_flight() == 0
+
+            try:
+                with cancel_scope(token):
+                    gateway.generate("never sent")
+                assert False, "expected OperationCancelled before the request"
+            except OperationCancelled:
+                pass
+            gateway.close()
+    finally:
+        server.shutdown()
+    print(f"✅ In-flight generation aborted in {outcome['cancelled'][1] - start:.2f}s")
+
+
+def test_gateway_aborts_before_first_token():
+    """Cancelling while Ollama is still loading returns at once; the connection is dropped when headers arrive."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _LoadingOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    _LoadingOllama.disconnected.clear()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            gateway = _gateway(tmp, server.server_address[1])
+            token = CancellationToken()
+            outcome = {}
+
+            def run():
+                with cancel_scope(token):
+                    try:
+                        gateway.generate("long brief", agent="analyst")
+                    except OperationCancelled as e:
+                        outcome["cancelled"] = (str(e), time.time())
+
+            worker = threading.Thread(target=run)
+            worker.start()
+            time.sleep(0.2)
+            start = time.time()
+            token.cancel("stage deadline")
+            worker.join(timeout=3)
+            assert outcome["cancelled"][0] == "stage deadline"
+            assert outcome["cancelled"][1] - start < 0.2, "cancelling must not wait for the model to load"
+            assert gateway.in_flight() == 0
+            assert _LoadingOllama.disconnected.wait(3), "the abandoned response should be closed"
+            gateway.close()
+    finally:
+        server.shutdown()
+    print(f"✅ Generation aborted before its first token in {outcome['cancelled'][1] - start:.2f}s")
+
+
+def test_scheduler_wait_is_interrupted():
+    """A call queued for a busy model slot leaves the queue as soon as its request is cancelled."""
+    class _Gateway:
+        embed_model = "embed"
+
+        def ps(self):
+            return [{"name": "model-a"}]
+
+    scheduler = ModelScheduler(_Gateway(), {"max_resident": 1, "max_wait": 10, "ps_ttl": 60, "preload": False})
+    busy = scheduler.acquire("model-a")
+    token = CancellationToken()
+    outcome = {}
+
+    def queued():
+        with cancel_scope(token):
+            try:
+                scheduler.acquire("model-b")
+            except OperationCancelled:
+                outcome["at"] = time.time()
+
+    worker = threading.Thread(target=queued)
+    worker.start()
+    time.sleep(0.1)
+    assert scheduler.stats()["waiting"] == ["model-b"]
+    start = time.time()
+    token.cancel("client disconnected")
+    worker.join(timeout=2)
+    assert outcome["at"] - start < 0.2 and scheduler.stats()["waiting"] == []
+    scheduler.release(busy, {"load_duration": 0})
+    print("✅ Scheduler wait interrupted")
+
+
+if __name__ == "__main__":
+    test_token_and_scope()
+    test_gateway_aborts_in_flight_generation()
+    test_gateway_aborts_before_first_token()
+    test_scheduler_wait_is_interrupted()
+    print("\nTEST PASSED: cancellation")
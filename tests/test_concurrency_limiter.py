@@ -0,0 +1,132 @@
+"""
+Test script for the adaptive per-model concurrency limiter.
+Simulates an Ollama server that decodes up to N requests in parallel: no Ollama required.
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.abspath('.'))
+
+from core.cancellation import CancellationToken, OperationCancelled, cancel_scope
+from core.concurrency_limiter import AdaptiveConcurrencyLimiter
+
+
+class _SimulatedModel:
+    """Per-token time stays flat up to `parallel` requests, then grows linearly (queueing)."""
+
+    def __init__(self, parallel, s_per_token=0.0005, tokens=40):
+        self.parallel = parallel
+        self.s_per_token = s_per_token
+        self.tokens = tokens
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+
+    def generate(self):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            load = self.running
+        time.sleep(self.tokens * self.s_per_token * max(1.0, load / self.parallel))
+        with self.lock:
+            self.running -= 1
+        return {"eval_count": self.tokens, "load_duration": 0}
+
+
+def _drive(limiter, model, sim, workers=10, duration=2.5):
+    stop = time.time() + duration
+
+    def worker():
+        while time.time() < stop:
+            permit = limiter.acquire(model)
+            start = time.time()
+            final = sim.generate()
+            limiter.release(permit, time.time() - start, final)
+
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def test_converges_per_model():
+    """Each model settles near its parallel capacity instead of a fixed worker count."""
+    limiter = AdaptiveConcurrencyLimiter({"initial_limit": 1, "max_limit": 10, "window": 6})
+    small, large = _SimulatedModel(parallel=4), _SimulatedModel(parallel=1)
+    runs = [threading.Thread(target=_drive, args=(limiter, "small:7b", small)),
+            threading.Thread(target=_drive, args=(limiter, "large:34b", large))]
+    for t in runs:
+        t.start()
+    for t in runs:
+        t.join()
+
+    stats = limiter.stats()["models"]
+    assert 3 <= stats["small:7b"]["limit"] <= 6, stats["small:7b"]
+    assert stats["large:34b"]["limit"] <= 2, stats["large:34b"]
+    assert large.peak <= 3, "calls beyond the limit wait instead of piling onto Ollama"
+    reasons = {d["reason"] for d in limiter.decisions}
+    assert {"probe", "plateau"} <= reasons
+    print(f"✅ Converged: small:7b -> {stats['small:7b']['limit']}, large:34b -> {stats['large:34b']['limit']}")
+
+
+def test_errors_back_off_and_waits_cancel():
+    """Overload errors halve the limit; a cancelled request stops waiting for a slot."""
+    limiter = AdaptiveConcurrencyLimiter({"initial_limit": 4, "max_wait": 5})
+    permits = [limiter.acquire("m") for _ in range(4)]
+    limiter.release(permits.pop(), 30.0, None, overloaded=True)
+    assert limiter.limit("m") == 2
+    decision = limiter.stats()["decisions"][-1]
+    assert decision["reason"] == "errors" and decision["from"] == 4 and decision["to"] == 2
+
+    token = CancellationToken()
+    outcome = {}
+
+    def waiter():
+        with cancel_scope(token):
+            try:
+                limiter.acquire("m")
+            except OperationCancelled:
+                outcome["at"] = time.time()
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    time.sleep(0.1)
+    assert limiter.stats()["models"]["m"]["waiting"] == 1
+    start = time.time()
+    token.cancel("client disconnected")
+    thread.join(timeout=2)
+    assert outcome["at"] - start < 0.2 and limiter.stats()["models"]["m"]["waiting"] == 0
+
+    for permit in permits:
+        limiter.release(permit, 1.0, None)               # aborted calls: no samples
+    assert limiter.stats()["models"]["m"]["in_flight"] == 0 and limiter.limit("m") == 2
+    print("✅ Error backoff and cancellable waits")
+
+
+def test_error_burst_cuts_once():
+    """Simultaneous failures of calls admitted at one limit halve it once; a later failure cuts again."""
+    limiter = AdaptiveConcurrencyLimiter({"initial_limit": 8})
+    permits = [limiter.acquire("m") for _ in range(8)]
+    for permit in permits[:4]:
+        limiter.release(permit, 30.0, None, overloaded=True)
+    assert limiter.limit("m") == 4, "a burst of timeouts is one overload signal"
+    stats = limiter.stats()["models"]["m"]
+    assert stats["errors"] == 4 and [d["reason"] for d in limiter.decisions] == ["errors"]
+
+    for permit in permits[4:]:
+        limiter.release(permit, 1.0, None)
+    fresh = limiter.acquire("m")
+    limiter.release(fresh, 30.0, None, overloaded=True)
+    assert limiter.limit("m") == 2, "calls admitted after the cut can cut again"
+    print("✅ Error burst halves the limit once")
+
+
+if __name__ == "__main__":
+    test_converges_per_model()
+    test_errors_back_off_and_waits_cancel()
+    test_error_burst_cuts_once()
+    print("\nTEST PASSED: concurrency limiter")
@@ -0,0 +1,122 @@
+"""
+Test script for request deadlines and per-stage budgets.
+Stub agents stand in for the LLM-backed ones: no Ollama required.
+"""
+
+import logging
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath('.'))
+
+from core.cancellation import CancellationToken, OperationCancelled, cancel_scope, check_cancelled
+from core.deadline import Deadline
+from core.model_scheduler import track_request
+
+
+def _work(seconds):
+    """Cooperative work: stops at the next check once its stage budget runs out."""
+    stop = time.time() + seconds
+    while time.time() < stop:
+        check_cancelled()
+        time.sleep(0.01)
+
+
+def test_budgets_and_stage_timeouts():
+    """Budgets share the remaining time; expired stages are absorbed, request cancellation is not."""
+    deadline = Deadline(10, {"reserve_s": 0})
+    assert abs(deadline.budget("agents") - 10 * 0.5 / 0.95) < 0.05
+    assert abs(deadline.budget("synthesis") - 10) < 0.05, "the last stage gets everything left"
+
+    with deadline.stage("agents", 0.2) as stage:
+        _work(5)
+    assert stage.timed_out and 0.15 < stage.elapsed < 0.5
+
+    request = CancellationToken()
+    try:
+        with cancel_scope(request), deadline.stage("reflection", 5):
+            request.cancel("client disconnected")
+            _work(1)
+        assert False, "request cancellation must propagate"
+    except OperationCancelled as e:
+        assert "client disconnected" in str(e)
+
+    unbounded = Deadline(None, {"default_s": None})
+    assert unbounded.budget("agents") is None and not unbounded.bounded
+    with unbounded.stage("synthesis") as stage:
+        pass
+    assert stage.token is None and not unbounded.summary()["degraded"]
+    print("✅ Stage budgets, timeouts and cancellation")
+
+
+def test_supervisor_degrades_within_deadline():
+    """Slow agents are dropped, the rerun skipped and synthesis shortened; the report says so."""
+    from agents import supervisor_agent
+    from agents.supervisor_agent import SupervisorAgent
+
+    class _Analyst:
+        model = "analyst-model"
+
+        def analyze_query(self, query):
+            _work(30)
+
+    class _Geo:
+        model = "geo-model"
+
+        def analyze_country(self, country, years_back=3):
+            _work(0.5)
+            return {"summary": f"Clusters around Khartoum in {country}"}
+
+    class _Reflection:
+        model = "reflection-model"
+
+        def evaluate_results(self, results, **kwargs):
+            _work(0.2)
+            return {"confidence": 0.5, "rerun": ["geo"]}
+
+        def evaluate_consistency(self, results, serialized=None):
+            return {"overall_stability": "Fragile"}
+
+    synthesis_models = []
+
+    def synthesize(query, results, progress_callback, prior_turns, model=None, evidence=None):
+        synthesis_models.append(model)
+        _work(30)
+
+    supervisor_agent.append_entry = lambda entry: None
+    supervisor = SupervisorAgent.__new__(SupervisorAgent)
+    supervisor.logger = logging.getLogger("test-supervisor")
+    supervisor.model = "large-model"
+    supervisor.report_cache = supervisor.search_agent = None
+    supervisor.analyst_agent, supervisor.geo_agent, supervisor.reflection_agent = _Analyst(), _Geo(), _Reflection()
+    supervisor._detect_intent = lambda query: ["analyst", "geo"]
+    supervisor._synthesize_results = synthesize
+    supervisor._save_report = lambda report: "report.json"
+
+    settings = {"reserve_s": 0.2, "min_reflection_s": 0.1, "fallback_below_s": 100,
+                "fallback_model": "small-model", "min_synthesis_s": 0.05}
+    events = []
+    start = time.time()
+    with track_request("q") as usage:
+        report = supervisor._run("Conflict in Sudan", lambda t, d: events.append((t, d)), None, usage,
+                                 Deadline(4, settings))
+    elapsed = time.time() - start
+
+    assert elapsed < 4, f"returned after {elapsed:.2f}s"
+    assert report["results"]["analyst"]["status"] == "timeout"
+    assert report["results"]["geo"]["status"] == "success"
+    actions = [item["action"] for item in report["deadline"]["degraded"]]
+    assert actions == ["dropped analyst", "skipped rerun of geo", "used small-model", "extractive brief"], actions
+    assert synthesis_models == ["small-model"]
+    assert report["summary"].startswith("Time budget exhausted") and "Khartoum" in report["summary"]
+    assert ("synthesis_revised", {"text": report["summary"], "reason": "deadline"}) in events
+    assert report["deadline"]["met"] and report["deadline"]["stages"]["agents"]["timed_out"]
+    assert not supervisor._cacheable(report), "degraded reports are not reused"
+    print(f"✅ Supervisor answered in {elapsed:.2f}s of 4s, degrading: {actions}")
+
+
+if __name__ == "__main__":
+    test_budgets_and_stage_timeouts()
+    test_supervisor_degrades_within_deadline()
+    print("\nTEST PASSED: deadline")
@@ -0,0 +1,132 @@
+"""
+Test script for persisted background analysis jobs.
+Uses a fake runner in place of the orchestrator and a throwaway SQLite store: no Ollama required.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(os.path.abspath('.'))
+
+from core.jobs import JobManager
+
+
+class _FakeRunner:
+    """Stand-in for Orchestrator.execute_task_streaming that counts its runs."""
+
+    def __init__(self, tokens=20, delay=0.01, gate=None):
+        self.tokens = tokens
+        self.delay = delay
+        self.gate = gate
+        self.runs = 0
+
+    def __call__(self, query, progress_callback=None, context=None, cancel_token=None):
+        self.runs += 1
+        progress_callback("agent_start", {"agent": "geo"})
+        progress_callback("agent_complete", {"agent": "geo", "status": "success",
+                                             "result": {"content": {"hotspots": 3}}})
+        if self.gate is not None:
+            self.gate.wait(5)
+        progress_callback("synthesis_start", {"query": query, "results": {"geo": "large payload"}})
+        for i in range(self.tokens):
+            if cancel_token is not None and cancel_token.cancelled:
+                return {"status": "cancelled", "query": query, "error": f"Cancelled: {cancel_token.reason}"}
+            progress_callback("synthesis_token", {"text": f"w{i} "})
+            time.sleep(self.delay)
+        return {"status": "success", "result": {"summary": "brief"}, "duration": 0.1}
+
+
+def _manager(tmp, runner, **overrides):
+    settings = {"path": str(Path(tmp) / "jobs.sqlite"), "max_workers": 2, "retention_hours": 72,
+                "heartbeat_s": 0.2, "token_flush_s": 0.05}
+    settings.update(overrides)
+    return JobManager(runner, settings)
+
+
+async def _collect(manager, job_id, after=0, stop_after=None):
+    events = []
+    async for event in manager.follow(job_id, after):
+        if event is None:
+            continue
+        events.append(event)
+        if stop_after and len(events) >= stop_after:
+            break
+    return events
+
+
+def test_job_lifecycle_and_resume():
+    """Jobs run once; streams replay from any event id and partial results are visible mid-run."""
+    with tempfile.TemporaryDirectory() as tmp:
+        gate = threading.Event()
+        runner = _FakeRunner(gate=gate)
+        manager = _manager(tmp, runner)
+        job_id = manager.submit("Analyze Sudan", "s1")
+
+        time.sleep(0.2)
+        job = manager.get(job_id)
+        assert job["status"] == "running"
+        assert job["partial"]["agents"]["geo"] == {"content": {"hotspots": 3}}, "completed agents visible early"
+        gate.set()
+
+        async def scenario():
+            first = await _collect(manager, job_id, stop_after=2)        # client drops after two events
+            resumed = await _collect(manager, job_id, after=first[-1]["id"])
+            replay = await _collect(manager, job_id)                     # late client gets the full log
+            return first, resumed, replay
+
+        first, resumed, replay = asyncio.run(scenario())
+        ids = [e["id"] for e in first + resumed]
+        assert ids == list(range(1, len(ids) + 1)), "resume continues exactly after Last-Event-ID"
+        assert [e["id"] for e in replay] == ids
+        assert replay[-1]["type"] == "done" and replay[-1]["data"]["status"] == "succeeded"
+
+        tokens = [e for e in replay if e["type"] == "synthesis_token"]
+        assert "".join(e["data"]["text"] for e in tokens) == "".join(f"w{i} " for i in range(20))
+        assert len(tokens) < 20, "tokens are coalesced before being stored"
+        assert "results" not in next(e for e in replay if e["type"] == "synthesis_start")["data"]
+
+        job = manager.get(job_id)
+        assert job["status"] == "succeeded" and job["result"]["result"]["summary"] == "brief"
+        assert job["partial"]["synthesis"].startswith("w0 w1")
+        assert runner.runs == 1, "reading and streaming never re-run the job"
+        manager.shutdown()
+    print("✅ Job lifecycle, partial results and resumable events")
+
+
+def test_cancel_and_restart_recovery():
+    """Cancelled jobs end with an error event; jobs cut off by a restart are marked interrupted."""
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = _manager(tmp, _FakeRunner(tokens=500, delay=0.01), max_workers=1)
+        running = manager.submit("long")
+        queued = manager.submit("queued behind it")
+        time.sleep(0.1)
+        assert manager.cancel(queued) and manager.get(queued)["status"] == "cancelled"
+        assert manager.cancel(running)
+        events = asyncio.run(_collect(manager, running))
+        assert events[-1]["type"] == "error" and events[-1]["data"]["status"] == "cancelled"
+        assert not manager.cancel(running), "finished jobs are no longer active"
+        manager.shutdown()
+
+        # Simulate a crash: a job left "running" in the store
+        stuck = manager.store.create("stuck")
+        manager.store.update(stuck, status="running", started_at=time.time())
+        manager.store.append_event(stuck, 1, "agent_start", {"agent": "geo"})
+        restarted = _manager(tmp, _FakeRunner())
+        job = restarted.get(stuck)
+        assert job["status"] == "interrupted" and job["last_event_id"] == 2
+        events = asyncio.run(_collect(restarted, stuck, after=1))
+        assert [e["type"] for e in events] == ["error"], "streams of interrupted jobs terminate"
+        assert restarted.get(running)["status"] == "cancelled", "finished jobs survive restarts"
+        restarted.shutdown()
+    print("✅ Cancellation and restart recovery")
+
+
+if __name__ == "__main__":
+    test_job_lifecycle_and_resume()
+    test_cancel_and_restart_recovery()
+    print("\nTEST PASSED: jobs")
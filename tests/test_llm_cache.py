@@ -0,0 +1,121 @@
+"""
+Test script for the exact-match LLM response cache.
+Uses throwaway SQLite files and a stub generator: no Ollama required.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(os.path.abspath('.'))
+
+from core.llm_cache import LLMResponseCache, make_key, refresh_scope
+from core.llm_gateway import LLMGateway
+from core.model_scheduler import track_request
+
+
+def _settings(tmp, **overrides):
+    settings = {
+        "enabled": True, "path": str(Path(tmp) / "llm.sqlite"), "memory_entries": 2,
+        "max_bytes": 1024 * 1024, "ttl": 60, "default_agent": False,
+        "agents": {"geo": {"enabled": True, "ttl": 1}, "analyst": True, "supervisor": False},
+    }
+    settings.update(overrides)
+    return settings
+
+
+def test_keys_tiers_and_ttl():
+    """Keys cover model, prompt and options; entries move memory -> disk -> memory and expire per agent TTL."""
+    base = {"prompt": "p", "system": None, "options": {"num_ctx": 4096}, "format": None}
+    key = make_key("generate", "m1", base)
+    assert key == make_key("generate", "m1", dict(reversed(list(base.items()))))
+    assert key != make_key("generate", "m2", base)
+    assert key != make_key("generate", "m1", {**base, "options": {"num_ctx": 8192}})
+    assert key != make_key("chat", "m1", base)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = LLMResponseCache(_settings(tmp))
+        assert cache.enabled_for("analyst") and not cache.enabled_for("supervisor")
+        assert not cache.enabled_for("redactor") and cache.enabled_for("redactor", override=True)
+
+        keys = [make_key("generate", "m1", {**base, "prompt": str(i)}) for i in range(3)]
+        for i, k in enumerate(keys):
+            cache.put(k, f"answer {i}", "analyst", elapsed_s=10.0)
+        assert cache.stats()["memory_entries"] == 2, "memory tier is LRU-bounded"
+        entry, tier = cache.get(keys[0], "analyst")
+        assert entry["text"] == "answer 0" and tier == "disk", "evicted from memory, still on disk"
+        entry, tier = cache.get(keys[2], "analyst")
+        assert entry["text"] == "answer 2" and tier == "memory"
+
+        # A fresh process only has the disk tier
+        reopened = LLMResponseCache(_settings(tmp))
+        entry, tier = reopened.get(keys[1], "analyst")
+        assert entry["text"] == "answer 1" and tier == "disk"
+        assert reopened.get(keys[1], "analyst")[1] == "memory"
+
+        geo_key = make_key("generate", "m1", {**base, "prompt": "geo"})
+        cache.put(geo_key, "geo answer", "geo")
+        assert cache.get(geo_key, "geo")[0]["text"] == "geo answer"
+        time.sleep(1.1)
+        assert cache.get(geo_key, "geo") is None, "geo entries expire after their 1s TTL"
+        assert cache.stats()["saved_s"] >= 20.0
+        print("✅ Cache keys, tiers and per-agent TTL")
+
+
+def test_gateway_serves_and_flags_hits():
+    """Repeated identical calls skip Ollama, count as hits in metrics and are flagged on the request."""
+    with tempfile.TemporaryDirectory() as tmp:
+        gateway = LLMGateway(config_path=str(Path(tmp) / "missing.yaml"))
+        gateway.cache = LLMResponseCache(_settings(tmp))
+        calls = []
+
+        def fake_stream(prompt, model=None, agent=None, **kwargs):
+            calls.append(prompt)
+            yield "fresh "
+            yield prompt
+
+        gateway.stream = fake_stream
+        with track_request("q") as usage:
+            assert gateway.generate("same prompt", model="m1", agent="analyst") == "fresh same prompt"
+            tokens = []
+            assert gateway.generate("same prompt", model="m1", agent="analyst",
+                                    on_token=tokens.append) == "fresh same prompt"
+            assert tokens == ["fresh same prompt"]
+            gateway.generate("same prompt", model="m1", agent="supervisor")
+            gateway.generate("same prompt", model="m1", agent="analyst", options={"temperature": 0.9})
+
+        assert len(calls) == 3, "only the exact repeat from an enabled agent is served from cache"
+        summary = usage.summary()["cache"]
+        assert summary["hits"] == 1 and summary["agents"] == {"analyst": 1}
+        metrics = gateway.metrics()
+        assert metrics["agents"]["analyst"]["cache_hits"] == 1
+        assert metrics["cache"]["memory_hits"] == 1
+        print("✅ Gateway cache hits flagged in metrics and request usage")
+
+
+def test_refresh_scope_bypasses_lookups():
+    """Reruns inside refresh_scope() reach Ollama again and replace the stored answer."""
+    with tempfile.TemporaryDirectory() as tmp:
+        gateway = LLMGateway(config_path=str(Path(tmp) / "missing.yaml"))
+        gateway.cache = LLMResponseCache(_settings(tmp))
+        answers = iter(["confidence 0.4", "confidence 0.9"])
+
+        def fake_stream(prompt, model=None, agent=None, **kwargs):
+            yield next(answers)
+
+        gateway.stream = fake_stream
+        assert gateway.generate("reflect", model="m1", agent="analyst") == "confidence 0.4"
+        with refresh_scope():
+            assert gateway.generate("reflect", model="m1", agent="analyst") == "confidence 0.9"
+        assert gateway.generate("reflect", model="m1", agent="analyst") == "confidence 0.9"
+        assert gateway.metrics()["agents"]["analyst"]["cache_hits"] == 1
+        print("✅ Refresh scope skips cached answers and stores fresh ones")
+
+
+if __name__ == "__main__":
+    test_keys_tiers_and_ttl()
+    test_gateway_serves_and_flags_hits()
+    test_refresh_scope_bypasses_lookups()
+    print("\nTEST PASSED: llm cache")
@@ -0,0 +1,164 @@
+"""
+Test script for the shared LLM gateway.
+Runs against a small in-process fake of the Ollama REST API: no Ollama required.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import yaml
+
+sys.path.append(os.path.abspath('.'))
+
+from core.llm_gateway import LLMGateway, LLMGatewayError
+
+
+class _FakeOllama(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests = []
+    token_delay = 0.0
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._reply(200, {"models": [{"name": "fake:7b"}, {"name": "fake:34b"}]})
+        else:
+            self._reply(200, {"models": [{"name": "fake:7b", "size_vram": 1}]})
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        _FakeOllama.requests.append((self.path, payload))
+        if payload["model"] == "missing":
+            return self._reply(404, {"error": "model 'missing' not found"})
+        if self.path == "/api/embed":
+            return self._reply(200, {"embeddings": [[float(len(t)), 1.0] for t in payload["input"]]})
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        text = payload.get("prompt") or payload["messages"][-1]["content"]
+        try:
+            for word in text.split():
+                piece = {"response": word + " "} if self.path == "/api/generate" \
+                    else {"message": {"content": word + " "}}
+                self._chunk(json.dumps({**piece, "done": False}))
+                time.sleep(_FakeOllama.token_delay)
+            self._chunk(json.dumps({"done": True, "load_duration": 2_000_000_000,
+                                    "prompt_eval_count": 5, "eval_count": len(text.split())}))
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _chunk(self, line):
+        data = (line + "\n").encode()
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+
+def _gateway(tmp, server):
+    settings = {
+        "ollama": {"host": "127.0.0.1", "port": server.server_address[1], "model_default": "fake:7b",
+                   "embed_model": "fake-embed", "timeout": 5},
+        "llm_gateway": {"max_connections": 4, "connect_timeout": 2,
+                        "defaults": {"keep_alive": "5m", "num_ctx": None},
+                        "models": {"fake:34b": {"num_ctx": 8192, "keep_alive": "30m"}}},
+    }
+    path = Path(tmp) / "settings.yaml"
+    path.write_text(yaml.safe_dump(settings))
+    return LLMGateway(config_path=str(path))
+
+
+def _serve():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_generate_chat_embed_and_config():
+    """Calls stream under the hood, apply per-model config and record metrics."""
+    server = _serve()
+    _FakeOllama.requests.clear()
+    with tempfile.TemporaryDirectory() as tmp:
+        gateway = _gateway(tmp, server)
+        tokens = []
+        assert gateway.generate("alpha beta gamma", agent="analyst", on_token=tokens.append) == "alpha beta gamma "
+        assert tokens == ["alpha ", "beta ", "gamma "]
+        assert gateway.chat([{"role": "user", "content": "hi there"}], model="fake:34b") == "hi there "
+        assert gateway.embed(["ab", "abcd"]) == [[2.0, 1.0], [4.0, 1.0]]
+        assert gateway.list_models() == ["fake:7b", "fake:34b"]
+
+        (_, gen), (_, chat), (_, emb) = _FakeOllama.requests
+        assert gen["stream"] and gen["keep_alive"] == "5m" and "options" not in gen
+        assert chat["options"] == {"num_ctx": 8192} and chat["keep_alive"] == "30m"
+        assert emb["model"] == "fake-embed"
+
+        metrics = gateway.metrics()
+        assert metrics["models"]["fake:7b"]["calls"] == 1
+        assert metrics["models"]["fake:7b"]["completion_tokens"] == 3
+        assert metrics["models"]["fake:34b"]["load_s"] == 2.0
+        assert metrics["agents"]["analyst"]["calls"] == 1 and metrics["in_flight"] == 0
+
+        try:
+            gateway.generate("x", model="missing")
+            assert False, "expected LLMGatewayError"
+        except LLMGatewayError:
+            pass
+        assert gateway.metrics()["models"]["missing"]["errors"] == 1
+        gateway.close()
+    server.shutdown()
+    print("✅ Generate, chat, embed and per-model config")
+
+
+def test_concurrency_and_early_abort():
+    """Concurrent calls share the pool and are counted in flight; closing a stream aborts it cleanly."""
+    server = _serve()
+    _FakeOllama.token_delay = 0.05
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            gateway = _gateway(tmp, server)
+            threads = [threading.Thread(target=gateway.generate, args=("one two three four",))
+                       for _ in range(4)]
+            for t in threads:
+                t.start()
+            time.sleep(0.1)
+            assert gateway.in_flight("fake:7b") >= 2
+            for t in threads:
+                t.join()
+            stats = gateway.metrics()["models"]["fake:7b"]
+            assert stats["max_in_flight"] >= 2 and stats["in_flight"] == 0 and stats["errors"] == 0
+
+            stream = gateway.stream("w " * 100)
+            assert next(stream) == "w "
+            start = time.time()
+            stream.close()
+            assert time.time() - start < 1.0, "closing the stream should not wait for the rest"
+            assert gateway.in_flight() == 0
+            assert gateway.metrics()["models"]["fake:7b"]["errors"] == 0
+            gateway.close()
+    finally:
+        _FakeOllama.token_delay = 0.0
+        server.shutdown()
+    print("✅ Concurrent calls and early stream abort")
+
+
+if __name__ == "__main__":
+    test_generate_chat_embed_and_config()
+    test_concurrency_and_early_abort()
+    print("\nTEST PASSED: llm gateway")
@@ -0,0 +1,124 @@
+"""
+Test script for the model residency scheduler.
+Uses a fake gateway for Ollama's ps/preload calls: no Ollama required.
+"""
+
+import contextvars
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.abspath('.'))
+
+from core.model_scheduler import ModelScheduler, track_request
+
+
+class _FakeGateway:
+    embed_model = "embed"
+
+    def __init__(self, loaded):
+        self.loaded = list(loaded)
+        self.preloaded = []
+
+    def ps(self):
+        return [{"name": m} for m in self.loaded]
+
+    def preload(self, model, keep_alive=None):
+        time.sleep(0.05)
+        self.preloaded.append((model, keep_alive))
+        return 0.05
+
+
+def _scheduler(loaded, **overrides):
+    settings = {"max_resident": 1, "max_wait": 5, "ps_ttl": 60, "preload": False}
+    settings.update(overrides)
+    return ModelScheduler(_FakeGateway(loaded), settings)
+
+
+def test_loaded_models_are_served_first():
+    """With one slot, queued calls for the loaded model run before a call that needs a swap."""
+    scheduler = _scheduler(["model-a"])
+    order = []
+
+    def call(model, hold=0.0):
+        lease = scheduler.acquire(model)
+        order.append(model)
+        time.sleep(hold)
+        scheduler.release(lease, {"load_duration": 0})
+
+    first = scheduler.acquire("model-a")           # model-a is generating
+    cold = threading.Thread(target=call, args=("model-b",))
+    cold.start()
+    time.sleep(0.1)
+    assert scheduler.stats()["waiting"] == ["model-b"], "cold model must wait while the slot is busy"
+
+    warm = threading.Thread(target=call, args=("model-a",))
+    warm.start()
+    warm.join(timeout=2)
+    assert order == ["model-a"], "call for the loaded model is admitted immediately"
+
+    scheduler.release(first, {"load_duration": 0})
+    cold.join(timeout=2)
+    assert order == ["model-a", "model-b"]
+    assert scheduler.stats()["held"] == 1 and scheduler.stats()["forced"] == 0
+
+    # Exempt (embedding) models never wait
+    busy = scheduler.acquire("model-c")
+    assert scheduler.acquire("embed").wait_s == 0.0
+    scheduler.release(busy)
+    print("✅ Calls grouped by loaded model")
+
+
+def test_swaps_attributed_per_request():
+    """Load time above the threshold counts as a swap for the request that paid it, across threads."""
+    scheduler = _scheduler([], max_resident=3)
+
+    def call(model, load_s):
+        lease = scheduler.acquire(model)
+        scheduler.release(lease, {"load_duration": int(load_s * 1e9)})
+
+    with track_request("q1") as usage:
+        call("model-a", 4.0)
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            pool.submit(contextvars.copy_context().run, call, "model-b", 2.5).result()
+            pool.submit(contextvars.copy_context().run, call, "model-a", 0.01).result()
+    with track_request("q2") as other:
+        call("model-a", 0.02)
+
+    summary = usage.summary()
+    assert summary["calls"] == 3 and summary["swaps"] == 2
+    assert summary["load_s"] == 6.51
+    assert summary["models"]["model-a"] == {"calls": 2, "swaps": 1, "load_s": 4.01, "wait_s": 0.0}
+    assert other.summary()["swaps"] == 0
+    assert scheduler.stats()["swaps"] == 2
+    print("✅ Swaps and load time attributed per request")
+
+
+def test_plan_preloads_and_extends_keep_alive():
+    """The next planned model is preloaded when there is room, and planned models stay loaded longer."""
+    scheduler = _scheduler(["model-a"], max_resident=2, preload=True, planned_keep_alive="45m")
+    with track_request("q") as usage:
+        scheduler.plan(["model-a", "model-b", "model-c"])
+        deadline = time.time() + 2
+        while not scheduler.gateway.preloaded and time.time() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.05)
+        assert scheduler.gateway.preloaded == [("model-b", "45m")], "only one model fits next to model-a"
+
+        lease = scheduler.acquire("model-a")
+        assert lease.resident and lease.keep_alive == "45m"
+        scheduler.release(lease, {"load_duration": 0})
+        assert "model-b" in scheduler.resident() or "model-b" in scheduler.stats()["resident"]
+
+    assert scheduler.acquire("model-a").keep_alive is None, "no plan outside a request"
+    assert usage.summary()["preloads"] == 1
+    print("✅ Planned models preloaded with extended keep_alive")
+
+
+if __name__ == "__main__":
+    test_loaded_models_are_served_first()
+    test_swaps_attributed_per_request()
+    test_plan_preloads_and_extends_keep_alive()
+    print("\nTEST PASSED: model scheduler")
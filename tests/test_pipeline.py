@@ -0,0 +1,139 @@
+"""
+Test script for the pipelined supervisor and its stage timeline.
+Stub agents stand in for the LLM-backed ones: no Ollama required.
+"""
+
+import logging
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath('.'))
+
+from core.timeline import Timeline
+
+
+def test_timeline_overlap():
+    """Overlap is the serial time of all spans minus the time any span was active."""
+    timeline = Timeline(start=100.0)
+    timeline.add("agent:geo", 100.0, 102.0)
+    timeline.add("pack:search", 101.0, 101.5)
+    timeline.add("synthesis", 103.0, 104.0)
+    summary = timeline.summary()
+    assert [s["stage"] for s in summary["spans"]] == ["agent:geo", "pack:search", "synthesis"]
+    assert summary["serial_s"] == 3.5 and summary["busy_s"] == 3.0 and summary["overlap_s"] == 0.5
+    assert len(timeline.render().splitlines()) == 3
+    print("✅ Timeline spans, busy time and overlap")
+
+
+def _supervisor(pipelined, calls):
+    from agents import supervisor_agent
+    from agents.supervisor_agent import SupervisorAgent
+
+    class _Search:
+        def intelligent_search(self, query, session_id=None):
+            time.sleep(0.1)
+            return "Title: Clashes in Darfur\nURL: https://example.org/darfur"
+
+    class _Geo:
+        model = "geo-model"
+
+        def analyze_country(self, country, years_back=3):
+            time.sleep(0.5)
+            return {"n_events": 120, "summary": f"Clusters around Khartoum in {country}"}
+
+    class _Reflection:
+        model = "reflection-model"
+
+        def evaluate_results(self, results, consistency=True, checks=None, serialized=None):
+            calls.append(("reflection", checks))
+            time.sleep(0.3)
+            reflection = {"confidence": 0.9, "rerun": []}
+            if consistency:
+                reflection["consistency_check"] = self.evaluate_consistency(results)
+            return reflection
+
+        def evaluate_consistency(self, results, serialized=None):
+            time.sleep(0.4)
+            return {"overall_stability": "Fragile"}
+
+    def synthesize(query, results, progress_callback, prior_turns, model=None, evidence=None):
+        calls.append(("synthesis", evidence))
+        time.sleep(0.3)
+        return "Brief"
+
+    supervisor_agent.append_entry = lambda entry: None
+    supervisor_agent.get_settings = lambda section, default: {**default, "pipelined": pipelined}
+    supervisor = SupervisorAgent.__new__(SupervisorAgent)
+    supervisor.logger = logging.getLogger("test-supervisor")
+    supervisor.model = "large-model"
+    supervisor.report_cache = supervisor.analyst_agent = None
+    supervisor.search_agent, supervisor.geo_agent, supervisor.reflection_agent = _Search(), _Geo(), _Reflection()
+    supervisor._detect_intent = lambda query: ["search", "geo"]
+    supervisor._synthesize_results = synthesize
+    supervisor._save_report = lambda report: "report.json"
+    return supervisor
+
+
+def test_pipelined_stages_overlap():
+    """Agents are prepared as they finish; consistency runs alongside reflection and synthesis."""
+    from agents import supervisor_agent
+    from core.deadline import Deadline
+    from core.model_scheduler import track_request
+
+    durations = {}
+    get_settings = supervisor_agent.get_settings
+    for pipelined in (False, True):
+        calls = []
+        supervisor = _supervisor(pipelined, calls)
+        start = time.time()
+        try:
+            with track_request("q") as usage:
+                report = supervisor._run("Latest news on Sudan", None, None, usage, Deadline(None, {}))
+        finally:
+            supervisor_agent.get_settings = get_settings
+        durations[pipelined] = time.time() - start
+        spans = {s["stage"]: s for s in report["timeline"]["spans"]}
+        assert report["reflection"]["consistency_check"]["overall_stability"] == "Fragile"
+
+        if not pipelined:
+            assert "consistency" not in spans and "pack:search" not in spans
+            assert spans["synthesis"]["start_s"] >= spans["reflection"]["end_s"]
+            continue
+
+        # Search is packed and checked while geo is still running
+        assert spans["check:search"]["end_s"] < spans["agent:geo"]["end_s"]
+        checks = calls[0][1]
+        assert {c["agent"]: c["evidence"] for c in checks} == {"search": 1, "geo": 120}
+        assert all(c["ok"] for c in checks)
+        assert set(calls[1][1]) == {"search", "geo"} and "Khartoum" in calls[1][1]["geo"]
+
+        # Consistency alongside reflection; synthesis starts before it ends
+        assert abs(spans["consistency"]["start_s"] - spans["reflection"]["start_s"]) < 0.1
+        assert spans["synthesis"]["start_s"] < spans["consistency"]["end_s"]
+        assert report["timeline"]["overlap_s"] >= 0.5
+        assert not report["deadline"]["degraded"]
+
+    assert durations[True] < durations[False] - 0.3, durations
+    print(f"✅ Pipelined run {durations[True]:.2f}s vs sequential {durations[False]:.2f}s")
+
+
+def test_agent_checks():
+    """Deterministic per-agent checks flag failures and missing evidence."""
+    from agents.reflection_agent import ReflectionAgent
+
+    failed = ReflectionAgent.check_agent("analyst", {"status": "timeout", "error": "stopped after 30s"})
+    assert not failed["ok"] and failed["issues"][0].startswith("timeout")
+    empty = ReflectionAgent.check_agent("geo", {"status": "success", "content": {"n_events": 0}})
+    assert empty["issues"] == ["no events"]
+    analyst = ReflectionAgent.check_agent("analyst", {"status": "success",
+                                                      "content": {"patterns": "p", "synthesis": "s"}})
+    assert analyst["ok"] and analyst["evidence"] == 2
+    print("✅ Per-agent reflection checks")
+
+
+if __name__ == "__main__":
+    test_timeline_overlap()
+    test_pipelined_stages_overlap()
+    test_agent_checks()
+    print("\nTEST PASSED: pipeline")
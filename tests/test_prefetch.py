@@ -0,0 +1,118 @@
+"""
+Test script for the background prefetch worker.
+Uses a fake scraper and a bag-of-words embedding: no network or Ollama required.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import zlib
+
+import numpy as np
+
+sys.path.append(os.path.abspath('.'))
+
+from core.prefetch import PrefetchWorker, chunk_text
+from core.web_index import WebKnowledgeIndex
+
+
+def _embed(texts):
+    vectors = np.zeros((len(texts), 64), dtype="float32")
+    for row, text in enumerate(texts):
+        for word in text.lower().split():
+            vectors[row, zlib.crc32(word.encode()) % 64] += 1.0
+    return vectors, list(range(len(texts)))
+
+
+def _page(url):
+    sentences = [f"Sentence {i} about ceasefire monitoring in Darfur." for i in range(60)]
+    return {"status": "success", "url": url, "title": f"Page {url[-1]}", "content": " ".join(sentences)}
+
+
+def _worker(tmp, scrape_fn, **overrides):
+    settings = {"top_k": 2, "queue_size": 2, "session_page_budget": 3, "chunk_chars": 400, "chunk_overlap": 50}
+    settings.update(overrides)
+    index = WebKnowledgeIndex("web", embed_fn=_embed, index_dir=tmp)
+    return PrefetchWorker(settings, index=index, scrape_fn=scrape_fn), index
+
+
+def test_chunk_text():
+    """Chunks respect the size limit, overlap and end on sentence boundaries."""
+    text = " ".join(f"Sentence number {i} ends here." for i in range(100))
+    chunks = chunk_text(text, chunk_chars=300, overlap=60)
+    assert len(chunks) > 5
+    assert all(len(c) <= 300 for c in chunks)
+    assert all(c.endswith(".") for c in chunks)
+    assert chunks[1][:20] in chunks[0], "consecutive chunks should overlap"
+    assert chunk_text("short text") == ["short text"] and chunk_text("   ") == []
+    print("✅ Text chunking")
+
+
+def test_prefetch_indexes_pages_within_budget():
+    """Top-k pages are scraped, chunked and indexed; the session budget caps total pages."""
+    scraped = []
+
+    def scrape(urls):
+        scraped.extend(urls)
+        return [_page(u) for u in urls]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        worker, index = _worker(tmp, scrape)
+        assert worker.submit("s1", "darfur ceasefire", ["https://a.org/1", "https://a.org/2", "https://a.org/3"])
+        assert worker.wait_idle(timeout=5)
+        assert scraped == ["https://a.org/1", "https://a.org/2"], "only top_k pages are fetched"
+
+        # Budget of 3 pages: one more page allowed, then nothing
+        assert worker.submit("s1", "follow-up", ["https://b.org/1", "https://b.org/2"])
+        assert not worker.submit("s1", "another", ["https://c.org/1"])
+        assert worker.wait_idle(timeout=5)
+        assert scraped[-1] == "https://b.org/1" and len(scraped) == 3
+
+        hits = index.search("darfur ceasefire monitoring", top_k=3)
+        assert hits and hits[0]["source"] == "page" and "#chunk-" in hits[0]["url"]
+        assert worker.stats()["pages"] == 3 and worker.stats()["over_budget"] == 1
+        worker.stop()
+        print("✅ Prefetch indexing within session budget")
+
+
+def test_bounded_queue_and_cancellation():
+    """A full queue drops jobs without blocking; cancel() skips queued work for that session only."""
+    release = threading.Event()
+    scraped = []
+
+    def slow_scrape(urls):
+        release.wait(5)
+        scraped.extend(urls)
+        return [_page(u) for u in urls]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        worker, _ = _worker(tmp, slow_scrape, top_k=1, session_page_budget=10)
+        assert worker.submit("s1", "q1", ["https://a.org/1"])   # picked up by the worker
+        while worker.stats()["queued"]:
+            time.sleep(0.01)
+        assert worker.submit("s1", "q2", ["https://a.org/2"])
+        assert worker.submit("s2", "q3", ["https://b.org/1"])
+        assert not worker.submit("s2", "q4", ["https://b.org/2"]), "queue of 2 should be full"
+        assert worker.stats()["dropped"] == 1
+
+        worker.cancel("s1")
+        release.set()
+        assert worker.wait_idle(timeout=5)
+        assert scraped == ["https://a.org/1", "https://b.org/1"] or scraped == ["https://b.org/1"]
+        assert worker.stats()["cancelled"] >= 1
+
+        # Later searches in a cancelled session are prefetched again
+        assert worker.submit("s1", "q5", ["https://a.org/5"])
+        assert worker.wait_idle(timeout=5)
+        assert scraped[-1] == "https://a.org/5"
+        worker.stop()
+        print("✅ Bounded queue and per-session cancellation")
+
+
+if __name__ == "__main__":
+    test_chunk_text()
+    test_prefetch_indexes_pages_within_budget()
+    test_bounded_queue_and_cancellation()
+    print("\nTEST PASSED: prefetch")
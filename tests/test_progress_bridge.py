@@ -0,0 +1,134 @@
+"""
+Test script for the thread-to-asyncio progress bridge used by the SSE endpoints.
+Worker threads stand in for the orchestrator: no Ollama required.
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath('.'))
+
+from core.admission import AdmissionController
+from core.progress_bridge import ProgressBridge
+
+
+def _fake_run(progress_callback, tokens=50, delay=0.002):
+    """Blocking stand-in for execute_task_streaming."""
+    progress_callback("agent_start", {"agent": "analyst"})
+    time.sleep(0.05)
+    progress_callback("agent_complete", {"agent": "analyst"})
+    for i in range(tokens):
+        progress_callback("synthesis_token", {"text": f"t{i} "})
+        time.sleep(delay)
+    return {"status": "success", "result": {"summary": "done"}}
+
+
+def test_coalescing_and_bounds():
+    """A lagging consumer gets merged tokens with nothing lost; the buffer drops only non-essential events."""
+    async def scenario():
+        bridge = ProgressBridge(maxsize=4)
+        task = bridge.run_in_thread(_fake_run, bridge.callback, tokens=500, delay=0.0)
+        await asyncio.sleep(0.3)                      # consumer lags behind the producer
+        events = [event async for event in bridge]
+        assert (await task)["status"] == "success"
+
+        text = "".join(e["data"]["text"] for e in events if e["type"] == "synthesis_token")
+        assert text == "".join(f"t{i} " for i in range(500)), "coalescing must not lose tokens"
+        assert len(events) < 20 and bridge.stats()["coalesced"] > 400
+        assert events[-1]["type"] == "done"
+
+        bounded = ProgressBridge(maxsize=2)
+        for i in range(5):
+            bounded._deliver({"type": "agent_start", "data": {"agent": str(i)}})
+        bounded._deliver({"type": "queue_position", "data": {"position": 3}})
+        bounded._deliver({"type": "synthesis_token", "data": {"text": "x"}})
+        bounded.close({"type": "done", "data": {}})
+        await asyncio.sleep(0)
+        kept = [event async for event in bounded]
+        assert [e["type"] for e in kept] == ["agent_start", "agent_start", "synthesis_token", "done"]
+        assert bounded.stats()["dropped"] == 4
+
+    asyncio.run(scenario())
+    print("✅ Token coalescing and bounded buffer")
+
+
+def test_errors_close_the_stream():
+    """An exception in the worker ends the stream with an error event."""
+    def failing(progress_callback):
+        progress_callback("agent_start", {"agent": "geo"})
+        raise RuntimeError("ollama unreachable")
+
+    async def scenario():
+        bridge = ProgressBridge()
+        task = bridge.run_in_thread(failing, bridge.callback)
+        events = [event async for event in bridge]
+        assert [e["type"] for e in events] == ["agent_start", "error"]
+        assert "ollama unreachable" in events[-1]["data"]["error"]
+        try:
+            await task
+            assert False, "expected the worker exception"
+        except RuntimeError:
+            pass
+
+    asyncio.run(scenario())
+    print("✅ Worker errors close the stream")
+
+
+def test_many_streams_without_head_of_line_blocking():
+    """A full admission queue of streams progresses together; the loop and default executor stay free."""
+    controller = AdmissionController()
+    capacity = controller.settings["max_concurrent"] + controller.settings["max_queue"]
+
+    async def consume(i):
+        bridge = ProgressBridge(executor=controller.executor())
+        task = bridge.run_in_thread(_fake_run, bridge.callback, tokens=20, delay=0.02)
+        first = None
+        start = time.perf_counter()
+        async for event in bridge:
+            if first is None:
+                first = time.perf_counter() - start
+        await task
+        return first, time.perf_counter() - start
+
+    async def heartbeat(stop, lags):
+        while not stop.is_set():
+            tick = time.perf_counter()
+            await asyncio.sleep(0.005)
+            lags.append(time.perf_counter() - tick - 0.005)
+
+    async def scenario():
+        stop, lags = asyncio.Event(), []
+        beat = asyncio.create_task(heartbeat(stop, lags))
+        start = time.perf_counter()
+        streams = asyncio.gather(*(consume(i) for i in range(capacity)))
+        await asyncio.sleep(0.1)
+        # Quick blocking calls (GET /jobs) still get a default-executor thread
+        tick = time.perf_counter()
+        await asyncio.to_thread(time.sleep, 0)
+        side_call = time.perf_counter() - tick
+        timings = await streams
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await beat
+        return timings, elapsed, max(lags), side_call
+
+    try:
+        timings, elapsed, max_lag, side_call = asyncio.run(scenario())
+    finally:
+        controller.shutdown()
+    first_events = sorted(t[0] for t in timings)
+    # One stream takes ~0.5s; serialized streams would take capacity times that
+    assert elapsed < 3.0, f"streams did not run concurrently ({elapsed:.2f}s)"
+    assert first_events[-1] < 0.5, "every stream should see its first event promptly"
+    assert max_lag < 0.1, f"event loop stalled for {max_lag * 1000:.0f} ms"
+    assert side_call < 0.1, f"default executor blocked for {side_call * 1000:.0f} ms"
+    print(f"✅ {capacity} concurrent streams in {elapsed:.2f}s, max loop lag {max_lag * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    test_coalescing_and_bounds()
+    test_errors_close_the_stream()
+    test_many_streams_without_head_of_line_blocking()
+    print("\nTEST PASSED: progress bridge")
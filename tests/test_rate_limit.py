@@ -0,0 +1,157 @@
+"""
+Test script for outbound request throttling.
+Covers singleflight coalescing, the token bucket and jittered backoff.
+"""
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.abspath('.'))
+
+from core.rate_limit import SingleFlight, TokenBucket, backoff_delay, call_with_backoff
+
+
+def test_singleflight_coalesces():
+    """Concurrent callers with one key trigger a single call and share its result."""
+    flight = SingleFlight()
+    calls = []
+    started = threading.Event()
+
+    def search():
+        calls.append(1)
+        started.set()
+        time.sleep(0.2)
+        return ["result"]
+
+    def caller(_):
+        return flight.do("sudan", search)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        leader = pool.submit(caller, 0)
+        started.wait()
+        followers = list(pool.map(caller, range(7)))
+
+    assert len(calls) == 1
+    assert leader.result() == (["result"], False)
+    assert all(result == ["result"] and shared for result, shared in followers)
+    assert flight.counters == {"calls": 1, "shared": 7}
+    assert flight.in_flight() == 0
+
+    # The key is released afterwards: a new call runs again
+    flight.do("sudan", search)
+    assert len(calls) == 2
+    print("✅ Singleflight coalescing")
+
+
+def test_singleflight_propagates_errors():
+    """Followers see the leader's exception; the key is then released."""
+    flight = SingleFlight()
+    started = threading.Event()
+
+    def failing():
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError("rate limited")
+
+    def caller():
+        try:
+            flight.do("k", failing)
+        except RuntimeError as e:
+            return str(e)
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        first = pool.submit(caller)
+        started.wait()
+        others = [pool.submit(caller) for _ in range(2)]
+        errors = [first.result()] + [f.result() for f in others]
+
+    assert errors == ["rate limited"] * 3
+    assert flight.in_flight() == 0
+    print("✅ Singleflight error propagation")
+
+
+def test_token_bucket():
+    """A burst is served immediately; further requests wait for refills."""
+    bucket = TokenBucket(rate=20, capacity=3)
+    start = time.monotonic()
+    for _ in range(3):
+        assert bucket.acquire()
+    assert time.monotonic() - start < 0.05
+
+    for _ in range(4):
+        bucket.acquire()
+    elapsed = time.monotonic() - start
+    assert 0.15 <= elapsed < 0.5, elapsed
+
+    empty = TokenBucket(rate=0.1, capacity=1)
+    empty.acquire()
+    assert empty.acquire(timeout=0.05) is False
+    print("✅ Token bucket rate limiting")
+
+
+def test_token_bucket_zero_rate_is_unlimited():
+    """rate 0 disables limiting instead of dividing by zero once the burst is spent."""
+    bucket = TokenBucket(rate=0, capacity=1)
+    start = time.monotonic()
+    assert all(bucket.acquire(timeout=0.05) for _ in range(5))
+    assert time.monotonic() - start < 0.05
+    print("✅ Zero-rate token bucket is unlimited")
+
+
+def test_shared_throttle_created_once():
+    """Concurrent first callers of the search throttle all get the same limiter."""
+    import core.tools_websearch as websearch
+
+    real_get_settings = websearch.get_settings
+
+    def slow_get_settings(*args, **kwargs):
+        time.sleep(0.05)
+        return real_get_settings(*args, **kwargs)
+
+    websearch._throttle = None
+    websearch.get_settings = slow_get_settings
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            throttles = list(pool.map(lambda _: websearch._get_throttle(), range(8)))
+    finally:
+        websearch.get_settings = real_get_settings
+    assert len({id(limiter) for limiter, _ in throttles}) == 1
+    print("✅ Shared search throttle created once")
+
+
+def test_backoff():
+    """Delays are jittered within the exponential envelope; retries eventually succeed."""
+    for attempt in range(6):
+        delay = backoff_delay(attempt, base=0.5, cap=4)
+        assert 0 <= delay <= min(4, 0.5 * 2 ** attempt)
+
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError("temporary")
+        return "ok"
+
+    assert call_with_backoff(flaky, max_retries=3, base=0.01, cap=0.02) == "ok"
+    assert len(attempts) == 3
+
+    try:
+        call_with_backoff(lambda: 1 / 0, max_retries=1, base=0.01)
+        assert False, "expected ZeroDivisionError"
+    except ZeroDivisionError:
+        pass
+    print("✅ Jittered backoff and retries")
+
+
+if __name__ == "__main__":
+    test_singleflight_coalesces()
+    test_singleflight_propagates_errors()
+    test_token_bucket()
+    test_token_bucket_zero_rate_is_unlimited()
+    test_shared_throttle_created_once()
+    test_backoff()
+    print("\nTEST PASSED: rate limiting")
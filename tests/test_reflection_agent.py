@@ -0,0 +1,153 @@
+"""
+Test script for ReflectionAgent prompt serialization, concurrent reflection calls and the model cascade.
+Stub LLMs stand in for Ollama: no models required.
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.abspath('.'))
+
+from agents.analyst_agent import relevance_scores
+from agents.reflection_agent import DEFAULT_SETTINGS, CascadeMetrics, ReflectionAgent
+import agents.reflection_agent as reflection_module
+
+
+class _LLM:
+    """Records prompts; answers after a fixed latency."""
+
+    def __init__(self, name, latency, answer):
+        self.name, self.latency, self.answer = name, latency, answer
+        self.prompts = []
+        self.lock = threading.Lock()
+
+    def invoke(self, prompt, **kwargs):
+        with self.lock:
+            self.prompts.append(prompt)
+        time.sleep(self.latency)
+        return json.dumps(self.answer)
+
+
+def _results():
+    return {
+        "analyst": {"type": "analyst", "status": "success",
+                    "content": {"patterns": "p" * 5_000_000, "synthesis": "Escalation in Darfur"}},
+        "geo": {"type": "geo", "status": "success",
+                "content": {"n_events": 1200, "summary": "Clusters around Khartoum"}},
+        "fusion_ratio": {"acled": 0.6, "cia": 0.4},
+    }
+
+
+def _agent(settings=None):
+    agent = ReflectionAgent.__new__(ReflectionAgent)
+    agent.model = "large-model"
+    agent.logger = logging.getLogger("test-reflection")
+    agent.settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    agent.llm = _LLM("large", 0.4, {"confidence": 0.8, "contradictions": [], "rerun": [], "summary": "ok"})
+    agent.consistency_llm = _LLM("small", 0.4, {"contradictions": [], "alignment_summary": "aligned",
+                                                "overall_stability": "Fragile"})
+    agent.cascade_model, agent.cascade_llm = None, None
+    return agent
+
+
+def test_compact_serialization():
+    """Every agent gets a share of the budget; huge texts are cut before serializing."""
+    start = time.time()
+    text = ReflectionAgent.serialize_results(_results(), 3000)
+    elapsed = time.time() - start
+    lines = text.splitlines()
+    assert [line.split(":")[0] for line in lines] == ["analyst", "geo", "fusion_ratio"]
+    assert len(text) <= 3000 + len(lines) and "Khartoum" in text
+    assert elapsed < 0.1, f"serialized in {elapsed:.3f}s"
+    print(f"✅ 5 MB of results serialized to {len(text)} chars in {elapsed * 1000:.1f} ms")
+
+
+def test_concurrent_reflection():
+    """Both prompts share one serialization and run at once, the consistency check on its own model."""
+    agent = _agent({"cascade": False})
+    start = time.time()
+    reflection = agent.evaluate_results(_results())
+    elapsed = time.time() - start
+    assert reflection["confidence"] == 0.8
+    assert reflection["consistency_check"]["overall_stability"] == "Fragile"
+    assert elapsed < 0.7, f"two 0.4s calls took {elapsed:.2f}s"
+
+    data = ReflectionAgent.serialize_results(_results(), DEFAULT_SETTINGS["prompt_chars"])
+    assert data in agent.llm.prompts[0] and data in agent.consistency_llm.prompts[0]
+
+    sequential = _agent({"concurrent": False, "cascade": False})
+    start = time.time()
+    sequential.evaluate_results(_results())
+    assert time.time() - start >= 0.8 and len(sequential.consistency_llm.prompts) == 1
+    print(f"✅ Reflection in {elapsed:.2f}s for two concurrent 0.4s calls")
+
+
+def test_cascade():
+    """Clear cases are settled by the first pass; uncertain ones escalate to the reflection model."""
+    reflection_module._cascade_metrics = CascadeMetrics()
+
+    # Reflection model seen once: its latency is the basis for the time saved
+    agent = _agent()
+    uncertain = {"geo": {"status": "success", "content": {"n_events": 10, "summary": "Few events"}}}
+    reflection = agent.evaluate_results(uncertain, consistency=False)
+    assert reflection["cascade"] == {"scorer": "deterministic", "confidence": 0.6, "escalated": True,
+                                     "first_pass_s": reflection["cascade"]["first_pass_s"]}
+    assert reflection["confidence"] == 0.8 and len(agent.llm.prompts) == 1
+
+    # Consistent, well-evidenced results never reach the reflection model
+    clear = _results()
+    clear["analyst"]["content"].update({"hypotheses": "h", "evaluation": "e", "review": "r",
+                                        "retrieval": {"documents": 8, "mean_relevance": 0.62}})
+    reflection = agent.evaluate_results(clear, consistency=False)
+    assert not reflection["cascade"]["escalated"] and reflection["confidence"] == 1.0
+    assert reflection["rerun"] == [] and len(agent.llm.prompts) == 1
+
+    # Clearly failed agents are settled too, with a rerun of the failed one
+    failed = {"analyst": {"status": "failed", "error": "model unavailable"},
+              "geo": {"status": "success", "content": {"n_events": 5, "summary": "s"}}}
+    reflection = agent.evaluate_results(failed, consistency=False)
+    assert reflection["confidence"] < 0.45 and reflection["rerun"] == ["analyst"]
+    assert len(agent.llm.prompts) == 1
+
+    # A small model as first pass
+    small = _agent({"cascade_model": "small-model"})
+    small.cascade_model = "small-model"
+    small.cascade_llm = _LLM("small", 0.05, {"confidence": 0.95, "rerun": [], "summary": "consistent"})
+    reflection = small.evaluate_results(_results(), consistency=False)
+    assert reflection["cascade"]["scorer"] == "small-model" and reflection["summary"] == "consistent"
+    assert not small.llm.prompts
+
+    stats = reflection_module.get_cascade_metrics().stats()
+    assert stats["evaluations"] == 4 and stats["escalated"] == 1 and stats["escalation_rate"] == 0.25
+    assert stats["saved_s"] > 0.9, stats
+    print(f"✅ Cascade: escalation rate {stats['escalation_rate']}, {stats['saved_s']}s of reflection saved")
+
+
+def test_negative_relevance_escalates():
+    """Poor retrieval (negative 1 - L2 scores) lowers the first pass, so the case escalates instead of settling."""
+    context = ("[1] Source: ACLED | Country: Mali | Relevance: -0.312\n"
+               "[2] Source: ACLED | Country: Mali | Relevance: -0.204\n"
+               "[3] Source: CIA_FACTS | Country: Mali | Relevance: 0.615\n")
+    scores = relevance_scores(context)
+    assert scores == [-0.312, -0.204, 0.615]
+
+    agent = _agent({"cascade": True})
+    results = {"analyst": _results()["analyst"]}
+    results["analyst"]["content"].update({"hypotheses": "h", "evaluation": "e", "review": "r", "retrieval": {
+        "documents": 8, "mean_relevance": round(sum(scores) / len(scores), 3)}})
+    reflection = agent.evaluate_results(results, consistency=False)
+    assert reflection["cascade"]["escalated"], reflection["cascade"]
+    assert 0.45 <= reflection["cascade"]["confidence"] < 0.8
+    print(f"✅ Negative relevance escalates (first pass {reflection['cascade']['confidence']})")
+
+
+if __name__ == "__main__":
+    test_compact_serialization()
+    test_concurrent_reflection()
+    test_cascade()
+    test_negative_relevance_escalates()
+    print("\nTEST PASSED: reflection agent")
@@ -0,0 +1,116 @@
+"""
+Test script for the semantic report cache.
+Uses a bag-of-words embedder and throwaway report files: no Ollama required.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(os.path.abspath('.'))
+
+from core.model_scheduler import track_request
+from core.report_cache import SemanticReportCache
+
+
+def _embed(texts):
+    vectors = []
+    for text in texts:
+        vector = [0.0] * 64
+        for word in text.replace("?", "").split():
+            vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % 64] += 1.0
+        vectors.append(vector)
+    return vectors
+
+
+_embed.model = "bow-test"
+
+
+def _cache(tmp, **overrides):
+    settings = {"path": str(Path(tmp) / "index.sqlite"), "similarity": 0.8,
+                "ttl": {"news": 2, "structural": 3600}, "delta_refresh": True}
+    settings.update(overrides)
+    return SemanticReportCache(settings, embed=_embed)
+
+
+def _save(tmp, name, query, agents, search_urls=()):
+    path = Path(tmp) / f"report_{name}.json"
+    content = "\n".join(f"   URL: {url}" for url in search_urls)
+    report = {"timestamp": "2026-01-01T00:00:00", "query": query, "agents": agents,
+              "results": {"search": {"type": "search", "content": content, "status": "success"}},
+              "summary": f"Brief for {query}", "duration_seconds": 180.0}
+    path.write_text(json.dumps(report))
+    return str(path)
+
+
+def test_matching_rules():
+    """Hits need the same country and agent set, a similar query and a fresh entry."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = _cache(tmp)
+        cache.store("Sudan conflict escalation trend", "Sudan", ["analyst"],
+                    _save(tmp, "a", "Sudan conflict escalation trend", ["analyst"]))
+        cache.store("latest news Sudan", "Sudan", ["search"], _save(tmp, "b", "latest news Sudan", ["search"]))
+
+        hit = cache.lookup("conflict escalation trend in Sudan", "Sudan", ["analyst"])
+        assert hit is not None and hit["summary"] == "Brief for Sudan conflict escalation trend"
+        assert hit["cache"]["hit"] and hit["cache"]["similarity"] >= 0.8 and hit["cache"]["intent"] == "structural"
+
+        assert cache.lookup("conflict escalation trend in Sudan", "Nigeria", ["analyst"]) is None
+        assert cache.lookup("conflict escalation trend in Sudan", "Sudan", ["analyst", "geo"]) is None
+        assert cache.lookup("Sudan refugee flows and famine", "Sudan", ["analyst"]) is None
+
+        assert cache.lookup("latest news Sudan", "Sudan", ["search"])["cache"]["intent"] == "news"
+        time.sleep(2.1)
+        assert cache.lookup("latest news Sudan", "Sudan", ["search"]) is None, "news reports expire first"
+        assert cache.lookup("Sudan conflict escalation trend", "Sudan", ["analyst"]) is not None
+
+        # A report file overwritten by another run is not served
+        _save(tmp, "a", "something else entirely", ["analyst"])
+        assert cache.lookup("Sudan conflict escalation trend", "Sudan", ["analyst"]) is None
+        assert cache.stats()["entries"] == 1
+    print("✅ Country, agent set, similarity and TTL matching")
+
+
+def test_supervisor_serves_hits_with_delta_refresh():
+    """A near-duplicate skips the pipeline, refreshes only search and is marked as a cache hit."""
+    from agents.supervisor_agent import SupervisorAgent
+
+    class _Search:
+        calls = 0
+
+        def intelligent_search(self, query, session_id=None):
+            _Search.calls += 1
+            return "1. Old\n   URL: https://a.example\n2. New\n   URL: https://b.example"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        supervisor = SupervisorAgent.__new__(SupervisorAgent)
+        supervisor.logger = logging.getLogger("test-supervisor")
+        supervisor.search_agent = _Search()
+        supervisor.report_cache = _cache(tmp, ttl={"news": 3600, "structural": 3600})
+        original = "latest news on Sudan conflict escalation"
+        supervisor.report_cache.store(original, "Sudan", ["analyst", "search"],
+                                      _save(tmp, "c", original, ["analyst", "search"], ["https://a.example"]))
+
+        events = []
+        with track_request("q") as usage:
+            report = supervisor._run("Sudan conflict escalation latest news", lambda t, d: events.append(t),
+                                     None, usage)
+
+        cache = report["cache"]
+        assert cache["source_query"] == original and cache["original_duration_seconds"] == 180.0
+        assert cache["refreshed"] == ["search"] and cache["new_sources"] == ["https://b.example"]
+        assert _Search.calls == 1 and report["summary"] == f"Brief for {original}"
+        assert events == ["report_cache_hit", "agent_start", "agent_complete"]
+        assert report["duration_seconds"] < 5
+    print("✅ Supervisor answers near-duplicates from cache with a search delta refresh")
+
+
+if __name__ == "__main__":
+    test_matching_rules()
+    test_supervisor_serves_hits_with_delta_refresh()
+    print("\nTEST PASSED: report cache")
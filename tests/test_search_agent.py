@@ -0,0 +1,131 @@
+"""
+Test script for SearchAgent query reformulation and search fan-out.
+Stub LLM and search tool stand in for Ollama and the web: no network required.
+"""
+
+import logging
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath('.'))
+
+from agents.search_agent import SEARCH_DEFAULTS, SearchAgent
+
+
+class _StubLLM:
+    """Answers reformulation prompts after a delay, counting calls."""
+
+    def __init__(self, answer="q one\nq two\nq three\nq four", delay=0.0):
+        self.answer = answer
+        self.delay = delay
+        self.calls = 0
+
+    def generate(self, prompt, agent=None):
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.answer
+
+
+class _StubSearch:
+    """Web search stand-in: results per query, optional per-query delay or failure."""
+
+    def __init__(self, results=None, delays=None, failures=()):
+        self.results = results or {}
+        self.delays = delays or {}
+        self.failures = set(failures)
+        self.queries = []
+
+    def search(self, query, max_results=10):
+        self.queries.append(query)
+        time.sleep(self.delays.get(query, 0.0))
+        if query in self.failures:
+            raise RuntimeError(f"backend down for {query}")
+        return self.results.get(query, [])[:max_results]
+
+    def get_news(self, query, max_results=10):
+        return []
+
+
+def _agent(llm=None, search_tool=None, **settings):
+    """SearchAgent without config, tracker or Ollama: only what reformulation and fan-out use."""
+    SearchAgent._reformulation_cache.clear()
+    agent = SearchAgent.__new__(SearchAgent)
+    agent.model = "stub"
+    agent.settings = {**SEARCH_DEFAULTS, **settings}
+    agent.index_settings = {"enabled": False}
+    agent.ollama_client = llm or _StubLLM()
+    agent.search_tool = search_tool or _StubSearch()
+    agent.logger = logging.getLogger("SearchAgentTest")
+    agent._prefetch_pages = lambda *args: None
+    return agent
+
+
+def _hit(url, title="t"):
+    return {"url": url, "title": title, "snippet": f"about {title}"}
+
+
+def test_reformulation_cache_miss():
+    """A miss asks the LLM once and keeps at most three queries."""
+    llm = _StubLLM()
+    agent = _agent(llm)
+    assert agent._reformulate("Sudan ceasefire") == ["q one", "q two", "q three"]
+    assert llm.calls == 1
+    print("✅ Reformulation cache miss")
+
+
+def test_reformulation_cache_hit():
+    """A repeat of the query (any casing or spacing) is served from the cache."""
+    llm = _StubLLM()
+    agent = _agent(llm)
+    agent._reformulate("Sudan ceasefire")
+    assert agent._reformulate("  sudan CEASEFIRE ") == ["q one", "q two", "q three"]
+    assert llm.calls == 1, "the repeat must not reach the LLM"
+    print("✅ Reformulation cache hit")
+
+
+def test_speculative_results_when_reformulation_times_out():
+    """The raw-query results are returned on timeout, and the late reformulation is cached for next time."""
+    llm = _StubLLM(delay=0.5)
+    search = _StubSearch({"Sahel drought": [_hit("https://a.org/1", "raw")]})
+    agent = _agent(llm, search, reformulation_timeout=0.1)
+
+    start = time.time()
+    report = agent.intelligent_search("Sahel drought")
+    assert time.time() - start < 0.4, "the agent must not wait for the slow reformulation"
+    assert "https://a.org/1" in report and search.queries == ["Sahel drought"]
+
+    time.sleep(0.6)
+    assert agent._reformulate("Sahel drought") == ["q one", "q two", "q three"]
+    assert llm.calls == 1, "the late answer was cached instead of discarded"
+    print("✅ Speculative results on reformulation timeout; late answer cached")
+
+
+def test_fan_out_per_call_timeout():
+    """Queued calls get their own time budget; a slow backend is skipped, a failing one ignored, URLs de-duplicated."""
+    search = _StubSearch(
+        results={
+            "first": [_hit("https://a.org/1"), _hit("https://a.org/2")],
+            "second": [_hit("https://a.org/2"), _hit("https://b.org/3")],
+            "slow": [_hit("https://slow.org/4")],
+        },
+        delays={"first": 0.2, "second": 0.2, "slow": 1.0},
+        failures={"broken"},
+    )
+    agent = _agent(search_tool=search, fanout_workers=1, per_call_timeout=0.3)
+
+    start = time.time()
+    results = agent._fan_out("q", ["first", "second", "broken", "slow"])
+    elapsed = time.time() - start
+    assert [r["url"] for r in results] == ["https://a.org/1", "https://a.org/2", "https://b.org/3"], \
+        "the queued second call finishes within its own budget; duplicates are dropped"
+    assert elapsed < 0.9, f"the slow call must be abandoned ({elapsed:.2f}s)"
+    print(f"✅ Fan-out with per-call timeouts in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    test_reformulation_cache_miss()
+    test_reformulation_cache_hit()
+    test_speculative_results_when_reformulation_times_out()
+    test_fan_out_per_call_timeout()
+    print("\nTEST PASSED: search agent")
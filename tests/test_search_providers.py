@@ -0,0 +1,133 @@
+"""
+Test script for the local full-text search provider.
+Builds a throwaway FTS5 index: no internet access required.
+"""
+
+import csv
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(os.path.abspath('.'))
+
+from core.search_providers import LocalFTSProvider, SearchProvider
+
+
+def _provider(tmp: str) -> LocalFTSProvider:
+    return LocalFTSProvider(path=str(Path(tmp) / "local.sqlite"))
+
+
+def test_ingest_and_search_shape():
+    """Dumps in JSONL and CSV are ingested; results use the {title, body, href} shape."""
+    with tempfile.TemporaryDirectory() as tmp:
+        jsonl = Path(tmp) / "articles.jsonl"
+        with open(jsonl, "w") as f:
+            f.write(json.dumps({"title": "Sudan ceasefire talks", "text": "Negotiators met in Jeddah.",
+                                "url": "https://news.example/1", "date": "2024-05-01"}) + "\n")
+            f.write(json.dumps({"title": "Sahel drought", "content": "Harvests failed across Niger."}) + "\n")
+        csv_path = Path(tmp) / "wire.csv"
+        with open(csv_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["title", "summary", "link", "published"])
+            writer.writeheader()
+            writer.writerow({"title": "Khartoum clashes", "summary": "Fighting resumed in Sudan's capital.",
+                             "link": "https://news.example/2", "published": "2024-06-01"})
+
+        provider = _provider(tmp)
+        assert provider.ingest_file(str(jsonl)) == 2
+        assert provider.ingest_file(str(csv_path)) == 1
+
+        results = provider.search("Sudan ceasefire", 5)
+        assert set(results[0]) == {"title", "body", "href"}
+        assert results[0]["href"] == "https://news.example/1", "title match should rank first"
+        assert any(r["href"] == "https://news.example/2" for r in results)
+        assert provider.search("?!", 5) == []
+
+        news = provider.news("Sudan", 5)
+        assert [n["date"] for n in news] == ["2024-06-01", "2024-05-01"]
+        assert set(news[0]) == {"url", "title", "body", "date", "source"}
+        print("✅ Dump ingestion and result shape")
+
+
+def test_upsert_by_url():
+    """Re-ingesting a URL updates the document instead of duplicating it."""
+    with tempfile.TemporaryDirectory() as tmp:
+        provider = _provider(tmp)
+        provider.add_documents([{"title": "Old title", "body": "first version", "href": "https://a.example/x"}])
+        provider.add_documents([{"title": "New title", "body": "second version", "href": "https://a.example/x"}])
+
+        assert provider.stats()["documents"] == 1
+        assert provider.search("first", 5) == []
+        assert provider.search("second", 5)[0]["title"] == "New title"
+        print("✅ Upsert by URL")
+
+
+def test_failed_write_rolls_back():
+    """A failing batch is rolled back and later writes still work."""
+    with tempfile.TemporaryDirectory() as tmp:
+        provider = _provider(tmp)
+        provider._conn.execute(
+            "CREATE TRIGGER reject_boom BEFORE INSERT ON documents WHEN NEW.title = 'boom' "
+            "BEGIN SELECT RAISE(ABORT, 'rejected'); END"
+        )
+        try:
+            provider.add_documents([{"title": "fine", "body": "kept?", "href": "https://a.example/1"},
+                                    {"title": "boom", "body": "fails", "href": "https://a.example/2"}])
+            assert False, "expected the trigger to abort the batch"
+        except sqlite3.IntegrityError:
+            pass
+        assert not provider._conn.in_transaction
+        assert provider.stats()["documents"] == 0, "the whole batch is rolled back"
+        assert provider.add_documents([{"title": "after", "body": "still indexing"}]) == 1
+        assert provider.search("indexing", 5)[0]["title"] == "after"
+        print("✅ Failed batches roll back")
+
+
+def test_latency():
+    """Queries over a few thousand documents return in milliseconds."""
+    with tempfile.TemporaryDirectory() as tmp:
+        provider = _provider(tmp)
+        countries = ["Sudan", "Mali", "Niger", "Yemen", "Syria", "Haiti", "Somalia", "Myanmar"]
+        provider.add_documents(
+            {"title": f"{countries[i % 8]} report {i}",
+             "body": f"Armed clashes and displacement in {countries[i % 8]} region {i}. " * 5,
+             "href": f"https://corpus.example/{i}"}
+            for i in range(5000)
+        )
+
+        provider.search("Sudan clashes", 10)  # warm up
+        start = time.perf_counter()
+        for _ in range(20):
+            results = provider.search("Sudan displacement clashes", 10)
+        avg_ms = (time.perf_counter() - start) * 1000 / 20
+        assert len(results) == 10
+        assert avg_ms < 10, f"average query took {avg_ms:.2f} ms"
+        print(f"✅ Local search latency: {avg_ms:.2f} ms/query over 5000 documents")
+
+
+def test_incomplete_provider_fails_at_construction():
+    """A provider missing news() cannot be instantiated."""
+    class SearchOnly(SearchProvider):
+        name = "search-only"
+
+        def search(self, query, max_results):
+            return []
+
+    try:
+        SearchOnly()
+        assert False, "expected TypeError for the missing news()"
+    except TypeError as e:
+        assert "news" in str(e)
+    print("✅ Incomplete providers rejected")
+
+
+if __name__ == "__main__":
+    test_ingest_and_search_shape()
+    test_upsert_by_url()
+    test_failed_write_rolls_back()
+    test_latency()
+    test_incomplete_provider_fails_at_construction()
+    print("\nTEST PASSED: search providers")
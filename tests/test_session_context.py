@@ -0,0 +1,118 @@
+"""
+Test script for per-session working sets.
+Uses synthetic ACLED frames and stub agents: no Ollama or ACLED files required.
+"""
+
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+sys.path.append(os.path.abspath('.'))
+
+import agents.analyst_agent as analyst_module
+import agents.geo_agent as geo_module
+from core.session_context import SessionStore, session_scope
+
+
+def _events(n=1000, years=5):
+    weeks = [datetime.now() - timedelta(days=365 * years * i / n) for i in range(n)]
+    return pd.DataFrame({"WEEK": weeks, "COUNTRY": "Sudan", "FATALITIES": 1,
+                         "CENTROID_LATITUDE": 15.0, "CENTROID_LONGITUDE": 30.0})
+
+
+def test_limits_and_expiry():
+    """Items are evicted LRU beyond the per-session and total limits; idle sessions expire."""
+    store = SessionStore({"max_session_mb": 0.1, "max_total_mb": 0.15, "idle_ttl": 0.3})
+    a, b = store.get("a"), store.get("b")
+    assert store.get("default") is None and store.get(None) is None, "anonymous runs share nothing"
+
+    a.put("docs", 1, "x" * 40_000)
+    a.put("docs", 2, "x" * 40_000)
+    a.get("docs", 1)
+    a.put("docs", 3, "x" * 40_000)
+    assert a.get("docs", 2) is None and a.get("docs", 1) is not None, "least recently used item goes first"
+    assert a.bytes <= store.max_session_bytes
+
+    b.put("docs", 1, "y" * 80_000)
+    assert sum(s.bytes for s in (a, b)) <= store.max_total_bytes and b.get("docs", 1) is not None
+    a.put("huge", 1, "z" * 200_000)
+    assert a.get("huge", 1) is None, "items larger than the session limit are not cached"
+
+    a.put("search", "q", "results")
+    time.sleep(0.05)
+    assert a.get("search", "q", max_age=0.01) is None
+
+    time.sleep(0.2)
+    store.get("b")
+    time.sleep(0.2)
+    stats = store.stats()
+    assert stats["sessions"] == 1 and stats["expired"] == 1 and stats["evicted"] >= 2
+    print(f"✅ Memory limits and idle expiry ({stats['evicted']} evictions)")
+
+
+def test_follow_ups_reuse_working_set():
+    """A follow-up reuses ACLED data and retrievals, and inherits the session's country."""
+    loads, retrievals = [], []
+    geo_module.load_acled_subset = lambda country, years_back: loads.append(years_back) or _events()
+    analyst_module.query_faiss = lambda query, source, top_k: retrievals.append(query) or f"[{source}] {query}"
+
+    store = SessionStore({})
+    geo = geo_module.GeoAgent.__new__(geo_module.GeoAgent)
+    geo.logger = logging.getLogger("test-geo")
+    analyst = analyst_module.AnalystAgent.__new__(analyst_module.AnalystAgent)
+
+    with session_scope("s1", store) as session:
+        wide = geo._load_events("Sudan", 5)
+        narrow = geo._load_events("Sudan", 2)
+        assert loads == [5] and len(narrow) < len(wide)
+        narrow["cluster"] = 0
+        assert "cluster" not in session.get("acled", "sudan")[1].columns, "callers get copies"
+        geo._load_events("Sudan", 10)
+        assert loads == [5, 10], "a wider window extends the cached frame"
+
+        assert analyst._retrieve("Sudan conflict", "ACLED", 5) == analyst._retrieve("sudan  conflict", "ACLED", 5)
+        assert retrievals == ["Sudan conflict"]
+    with session_scope(None, store):
+        geo._load_events("Sudan", 5)
+        assert loads == [5, 10, 5], "no session, no reuse"
+
+    # Supervisor: the follow-up continues with the first turn's country
+    from agents import supervisor_agent
+    from agents.supervisor_agent import SupervisorAgent
+    import core.session_context as session_context
+
+    session_context._session_store = store
+    supervisor_agent.append_entry = lambda entry: None
+    supervisor = SupervisorAgent.__new__(SupervisorAgent)
+    supervisor.logger = logging.getLogger("test-supervisor")
+    supervisor.model = "test-model"
+    supervisor.report_cache = supervisor.reflection_agent = None
+    supervisor.search_agent = supervisor.analyst_agent = supervisor.geo_agent = None
+    runs, priors = [], []
+    supervisor._detect_intent = lambda query: ["geo"]
+    supervisor._execute_agents_parallel = lambda query, agents, cb, sid, country, timeout=None, on_result=None: (
+        runs.append((query, country)) or {"geo": {"status": "success", "content": {"summary": f"{country} map"}}})
+    supervisor._synthesize_results = lambda query, results, cb, prior, model=None, evidence=None: (
+        priors.append(prior) or f"Brief: {query}")
+    supervisor._save_report = lambda report: "report.json"
+
+    supervisor.run("Conflict trends in Nigeria", session_id="s2")
+    report = supervisor.run("and what about the Darfur region?", session_id="s2")
+    assert runs[1] == ("and what about the Darfur region? (Nigeria)", "Nigeria")
+    assert report["country"] == "Nigeria" and report["session"]["inherited_country"]
+    assert report["session"]["turn"] == 2
+    assert priors[0] == [] and priors[1][0]["query"] == "Conflict trends in Nigeria"
+    assert priors[1][0]["outputs"]["geo"] == "Nigeria map"
+    supervisor.run("Conflict trends in Mali", session_id="s2")
+    assert runs[2][1] == "Mali", "an explicit country overrides the session's"
+    print("✅ Follow-ups reuse ACLED frames and retrievals and continue the session's country")
+
+
+if __name__ == "__main__":
+    test_limits_and_expiry()
+    test_follow_ups_reuse_working_set()
+    print("\nTEST PASSED: session context")
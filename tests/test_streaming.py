@@ -0,0 +1,97 @@
+"""
+Test script for token streaming of the supervisor synthesis.
+Uses a fake LLM that emits tokens with a delay: no Ollama required.
+"""
+
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath('.'))
+
+from core.streaming_formatter import stream_supervisor_result
+
+
+class _SlowLLM:
+    """Emits a fixed brief token by token, like GatewayLLM.invoke(on_token=...)."""
+
+    def __init__(self, tokens, delay=0.05, fail_after=None):
+        self.tokens = tokens
+        self.delay = delay
+        self.fail_after = fail_after
+
+    def invoke(self, prompt, on_token=None):
+        parts = []
+        for i, token in enumerate(self.tokens):
+            if self.fail_after is not None and i == self.fail_after:
+                raise RuntimeError("connection reset")
+            time.sleep(self.delay)
+            parts.append(token)
+            if on_token:
+                on_token(token)
+        return "".join(parts)
+
+
+def _supervisor(llm):
+    from agents.supervisor_agent import SupervisorAgent
+    import logging
+
+    supervisor = SupervisorAgent.__new__(SupervisorAgent)
+    supervisor.llm = llm
+    supervisor.redactor_agent = None
+    supervisor.logger = logging.getLogger("test-supervisor")
+    return supervisor
+
+
+def _contents(chunks):
+    return [json.loads(c[len("data: "):].split("\n\n")[0])["choices"][0]["delta"].get("content", "")
+            for c in chunks]
+
+
+def test_synthesis_tokens_stream_as_generated():
+    """The first synthesis token reaches the callback long before generation finishes."""
+    tokens = ["1. EXECUTIVE", " SUMMARY", "\n", "Clashes", " rose", " in", " Darfur."] + [" more"] * 20
+    supervisor = _supervisor(_SlowLLM(tokens))
+    events = []
+    start = time.time()
+
+    def progress(event_type, data):
+        events.append((event_type, data, time.time() - start))
+
+    synthesis = supervisor._synthesize_results("darfur", {}, progress)
+    total = time.time() - start
+
+    token_events = [e for e in events if e[0] == "synthesis_token"]
+    assert [e[1]["text"] for e in token_events] == tokens
+    assert "".join(tokens) == synthesis
+    assert token_events[0][2] < total / 5, "time to first token should be a fraction of total latency"
+    print(f"✅ Synthesis streamed: first token {token_events[0][2]:.2f}s of {total:.2f}s")
+
+
+def test_interrupted_synthesis_is_revised():
+    """A failure mid-stream sends a revision event so clients do not keep the partial brief."""
+    supervisor = _supervisor(_SlowLLM(["a", "b", "c"], delay=0.0, fail_after=2))
+    events = []
+    synthesis = supervisor._synthesize_results("q", {}, lambda t, d: events.append((t, d)))
+    assert [t for t, _ in events] == ["synthesis_token", "synthesis_token", "synthesis_revised"]
+    assert events[-1][1]["reason"] == "error" and synthesis.startswith("Synthesis unavailable")
+    print("✅ Interrupted synthesis revised")
+
+
+def test_completed_result_is_not_rechopped():
+    """A finished synthesis is sent whole rather than re-chopped into word chunks."""
+    synthesis = "Line one of the brief.\n\nLine two   keeps  its spacing."
+    chunks = list(stream_supervisor_result({"results": {"geo": {"status": "success", "content": {}}},
+                                            "summary": synthesis}))
+    contents = _contents(chunks)
+    assert synthesis in contents, "synthesis should be one chunk with whitespace preserved"
+    assert chunks[-1].endswith("data: [DONE]\n\n")
+    print("✅ Completed synthesis sent in one chunk")
+
+
+if __name__ == "__main__":
+    test_synthesis_tokens_stream_as_generated()
+    test_interrupted_synthesis_is_revised()
+    test_completed_result_is_not_rechopped()
+    print("\nTEST PASSED: streaming")
@@ -0,0 +1,124 @@
+"""
+Test script for the SQLite web search cache.
+Covers TTL expiry, LRU eviction under a byte budget, compression and
+migration of legacy pickle files.
+"""
+
+import os
+import pickle
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.append(os.path.abspath('.'))
+
+from core.web_cache import SearchCache, SQLiteCache, DEFAULT_SETTINGS
+
+
+def _make_cache(tmp_dir: str, **overrides) -> SearchCache:
+    settings = dict(DEFAULT_SETTINGS)
+    settings.update({"path": str(Path(tmp_dir) / "cache.sqlite")})
+    settings.update(overrides)
+    return SearchCache(settings)
+
+
+def test_normalized_keys_and_ttl():
+    """Queries differing only in case/whitespace share an entry; news expires sooner."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = _make_cache(tmp)
+        results = [{"title": "Sudan", "body": "Khartoum clashes", "href": "https://example.org/a"}]
+
+        cache.put_results("Sudan  Conflict", 5, results)
+        assert cache.get_results("sudan conflict", 5) == results
+        assert cache.get_results("sudan conflict", 10) is None
+        assert cache.get_results("sudan conflict", 5, backend="local") is None
+
+        assert cache.ttl_for("latest news on Sudan") == DEFAULT_SETTINGS["news_ttl"]
+        assert cache.ttl_for("Sudan GDP history") == DEFAULT_SETTINGS["reference_ttl"]
+        assert cache.ttl_for("Sudan GDP history", kind="news") == DEFAULT_SETTINGS["news_ttl"]
+
+        stats = cache.stats()
+        assert stats["hits"] == 1 and stats["misses"] == 2
+        print("✅ Normalized keys and TTL policy")
+
+
+def test_expiry_and_eviction():
+    """Expired entries miss; LRU entries are evicted once over budget."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = SQLiteCache(str(Path(tmp) / "cache.sqlite"), max_bytes=3000, compress=False)
+
+        cache.set("short", {"v": 1}, ttl=0.05)
+        time.sleep(0.1)
+        assert cache.get("short") is None
+        assert cache.counters["expirations"] == 1
+
+        blob = "x" * 900
+        cache.set("a", blob)
+        cache.set("b", blob)
+        cache.set("c", blob)
+        cache.get("a")  # a becomes most recently used
+        cache.set("d", blob)
+
+        assert cache.get("b") is None, "least recently used entry should be evicted"
+        assert cache.get("a") == blob
+        assert cache.counters["evictions"] >= 1
+        assert cache.stats()["bytes"] <= 3000
+        print("✅ Expiry and LRU eviction")
+
+
+def test_compression_roundtrip():
+    """Large payloads are compressed on disk and decoded transparently."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = SQLiteCache(str(Path(tmp) / "cache.sqlite"), compress=True, compress_min_bytes=100)
+        value = [{"body": "conflict " * 500}]
+        cache.set("big", value)
+        assert cache.get("big") == value
+        assert cache.stats()["bytes"] < len("conflict " * 500)
+        print("✅ Compression round-trip")
+
+
+def test_legacy_migration():
+    """Legacy <md5>.pkl files are imported and promoted on first lookup."""
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_dir = Path(tmp) / "legacy"
+        legacy_dir.mkdir()
+        results = [{"title": "Old", "body": "cached", "href": "https://example.org/old"}]
+        legacy_name = SearchCache.legacy_key("Sudan conflict", 5).split(":", 1)[1]
+        with open(legacy_dir / f"{legacy_name}.pkl", "wb") as f:
+            pickle.dump(results, f)
+
+        cache = _make_cache(tmp)
+        assert cache.migrate_legacy(legacy_dir) == 1
+        assert cache.get_results("Sudan conflict", 5) == results
+        # Promoted entry is now found under the normalized key
+        assert cache.get(SearchCache.make_key("sudan conflict", "duckduckgo", 5)) == results
+        print("✅ Legacy pickle migration")
+
+
+def test_concurrent_lookup_counters():
+    """Hit and miss counters stay exact under concurrent lookups."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = _make_cache(tmp)
+        cache.put_results("Sudan conflict", 5, [{"title": "Sudan"}])
+
+        def lookups(_):
+            for _ in range(100):
+                cache.get_results("sudan conflict", 5)
+                cache.get_results("mali coup", 5)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lookups, range(8)))
+        stats = cache.stats()
+        assert stats["hits"] == 800 and stats["misses"] == 800, stats
+        print("✅ Exact counters under concurrent lookups")
+
+
+if __name__ == "__main__":
+    test_normalized_keys_and_ttl()
+    test_expiry_and_eviction()
+    test_compression_roundtrip()
+    test_legacy_migration()
+    test_concurrent_lookup_counters()
+    print("\nTEST PASSED: web cache")
@@ -0,0 +1,131 @@
+"""
+Test script for the persistent web knowledge index.
+Uses a deterministic bag-of-words embedding: no Ollama required.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import zlib
+
+import numpy as np
+
+sys.path.append(os.path.abspath('.'))
+
+from core.web_index import WebKnowledgeIndex
+
+DIM = 64
+
+
+def _embed(texts):
+    """Hash each word into a fixed-size count vector."""
+    vectors = np.zeros((len(texts), DIM), dtype="float32")
+    for row, text in enumerate(texts):
+        for word in text.lower().split():
+            vectors[row, zlib.crc32(word.encode()) % DIM] += 1.0
+    return vectors, list(range(len(texts)))
+
+
+def _doc(url, title, body):
+    return {"href": url, "title": title, "body": body}
+
+
+def test_append_and_dedupe():
+    """New documents are appended; URL and content duplicates are not re-embedded."""
+    with tempfile.TemporaryDirectory() as tmp:
+        index = WebKnowledgeIndex("web", embed_fn=_embed, index_dir=tmp)
+        assert index.add_documents([
+            _doc("https://a.org/1", "Sudan ceasefire", "talks in Jeddah"),
+            _doc("https://a.org/2", "Sahel drought", "harvest failure in Niger"),
+        ], query="first") == 2
+
+        # Same URL + content, and same content under a mirror URL: nothing new
+        assert index.add_documents([
+            _doc("https://a.org/1", "Sudan ceasefire", "talks in Jeddah"),
+            _doc("https://mirror.org/1", "Sudan ceasefire", "talks in Jeddah"),
+        ]) == 0
+
+        # Changed content under a known URL replaces the old entry
+        assert index.add_documents([_doc("https://a.org/1", "Sudan ceasefire", "talks collapse")]) == 1
+        assert index.stats()["entries"] == 2
+        assert index.index.ntotal == 2
+        print("✅ Append-only growth with URL/content de-duplication")
+
+
+def test_persistence_and_search():
+    """The index survives a reload and searches rank the closest document first."""
+    with tempfile.TemporaryDirectory() as tmp:
+        index = WebKnowledgeIndex("web", embed_fn=_embed, index_dir=tmp)
+        index.add_documents([
+            _doc("https://a.org/1", "Sudan ceasefire", "talks in Jeddah"),
+            _doc("https://a.org/2", "Sahel drought", "harvest failure in Niger"),
+        ], query="first")
+        index.add_documents([_doc("https://a.org/3", "Yemen ports", "shipping attacks")], query="second")
+
+        reloaded = WebKnowledgeIndex("web", embed_fn=_embed, index_dir=tmp)
+        assert reloaded.stats()["entries"] == 3
+        hits = reloaded.search("sahel drought niger", top_k=2)
+        assert hits[0]["url"] == "https://a.org/2"
+        assert hits[0]["score"] > hits[1]["score"]
+        assert reloaded.search("sahel drought niger", min_score=0.99) == []
+        print("✅ Persistence and similarity search")
+
+
+def test_freshness_expiry_and_compaction():
+    """Stale entries are filtered by max_age, expired, and compacted away."""
+    with tempfile.TemporaryDirectory() as tmp:
+        index = WebKnowledgeIndex("web", embed_fn=_embed, index_dir=tmp)
+        index.add_documents([
+            _doc("https://a.org/old", "Old report", "sahel drought"),
+            _doc("https://a.org/new", "New report", "sahel drought update"),
+        ])
+        old_id = index.url_to_id["https://a.org/old"]
+        index.entries[old_id]["seen_at"] = time.time() - 3600
+
+        fresh = index.search("sahel drought", top_k=5, max_age=60)
+        assert [h["url"] for h in fresh] == ["https://a.org/new"]
+
+        assert index.expire(max_age=60) == 1
+        assert index.index.ntotal == 1
+
+        index.add_documents([_doc(f"https://b.org/{i}", f"Item {i}", f"body {i}") for i in range(5)])
+        stats = index.compact(max_entries=3)
+        assert stats["after"] == 3 and index.index.ntotal == 3
+        assert sorted(index.entries) == [0, 1, 2]
+        assert len(index.search("body", top_k=10)) == 3
+        print("✅ Freshness filter, expiry and compaction")
+
+
+def test_concurrent_adds_of_same_url():
+    """Two threads adding the same page while both are embedding insert it only once."""
+    barrier = threading.Barrier(2)
+
+    def slow_embed(texts):
+        barrier.wait(timeout=2)   # both threads are past the duplicate check
+        return _embed(texts)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = WebKnowledgeIndex("web", embed_fn=slow_embed, index_dir=tmp)
+        added = []
+        docs = [_doc("https://a.org/1", "Sudan ceasefire", "talks in Jeddah")]
+        threads = [threading.Thread(target=lambda: added.append(index.add_documents(docs, save=False)))
+                   for _ in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=3)
+
+        assert sorted(added) == [0, 1]
+        assert index.index.ntotal == 1 and len(index.entries) == 1
+        assert index.url_to_id["https://a.org/1"] in index.entries
+        print("✅ Concurrent adds do not duplicate vectors")
+
+
+if __name__ == "__main__":
+    test_append_and_dedupe()
+    test_persistence_and_search()
+    test_freshness_expiry_and_compaction()
+    test_concurrent_adds_of_same_url()
+    print("\nTEST PASSED: web index")
@@ -0,0 +1,173 @@
+"""
+Test script for the async batch scraper.
+Runs against a local HTTP stand-in server: no internet access required.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.append(os.path.abspath('.'))
+
+from core.web_cache import SQLiteCache
+from core.web_scraper import AsyncScraper, extract_text, scrape_urls
+
+PAGE = b"""<html><head><title>Khartoum report</title><style>p {color: red}</style></head>
+<body><script>var x = 1;</script><p>Clashes reported in   Khartoum.</p><p>Second paragraph.</p></body></html>"""
+
+
+class _StandIn(BaseHTTPRequestHandler):
+    """Serves fixed pages; tracks concurrency and conditional requests."""
+
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+    not_modified = 0
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        try:
+            if self.path.startswith("/slow"):
+                time.sleep(0.2)
+            if self.path == "/etag" and self.headers.get("If-None-Match") == '"v1"':
+                with cls.lock:
+                    cls.not_modified += 1
+                self.send_response(304)
+                self.end_headers()
+                return
+
+            body = PAGE
+            if self.path == "/big":
+                body = b"<html><body><p>" + b"word " * 100000 + b"</p></body></html>"
+            if self.path == "/missing":
+                self.send_response(404)
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            if self.path == "/etag":
+                self.send_header("ETag", '"v1"')
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+
+def _serve():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def _settings(**overrides):
+    settings = {"per_host_limit": 2, "max_bytes": 64 * 1024, "cache_ttl": 3600, "max_retries": 1, "timeout": 5}
+    settings.update(overrides)
+    return settings
+
+
+def _run(urls, cache, **overrides):
+    async def go():
+        async with AsyncScraper(_settings(**overrides), cache=cache) as scraper:
+            return await scraper.fetch_many(urls)
+    return asyncio.run(go())
+
+
+def test_extract_text():
+    """Scripts and styles are dropped and whitespace collapsed."""
+    title, text = extract_text(PAGE.decode())
+    assert title == "Khartoum report"
+    assert "var x" not in text and "color" not in text
+    assert "Clashes reported in Khartoum." in text
+    print("✅ HTML text extraction")
+
+
+def test_batch_scrape_and_byte_ceiling():
+    """Pages come back in input order; oversized bodies are truncated; errors are reported."""
+    server, base = _serve()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = SQLiteCache(str(Path(tmp) / "pages.sqlite"))
+            pages = _run([f"{base}/a", f"{base}/big", f"{base}/missing"], cache)
+
+            assert [p["url"] for p in pages] == [f"{base}/a", f"{base}/big", f"{base}/missing"]
+            assert pages[0]["status"] == "success" and pages[0]["title"] == "Khartoum report"
+            assert pages[1]["status"] == "success" and pages[1]["truncated"] is True
+            assert pages[1]["length"] < 64 * 1024
+            assert pages[2]["status"] == "error"
+
+            again = _run([f"{base}/a"], cache)
+            assert again[0]["cached"] is True
+            print("✅ Batch scrape, byte ceiling and cache hit")
+    finally:
+        server.shutdown()
+
+
+def test_per_host_limit():
+    """No more than per_host_limit requests are in flight against one host."""
+    server, base = _serve()
+    _StandIn.max_in_flight = 0
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = SQLiteCache(str(Path(tmp) / "pages.sqlite"))
+            urls = [f"{base}/slow{i}" for i in range(6)]
+            start = time.time()
+            pages = _run(urls, cache, per_host_limit=2)
+            assert all(p["status"] == "success" for p in pages)
+            assert _StandIn.max_in_flight <= 2
+            assert time.time() - start >= 0.5  # 6 slow pages, 2 at a time
+            print(f"✅ Per-host cap respected (max in flight: {_StandIn.max_in_flight})")
+    finally:
+        server.shutdown()
+
+
+def test_etag_revalidation():
+    """Stale cache entries are revalidated with If-None-Match and reused on 304."""
+    server, base = _serve()
+    _StandIn.not_modified = 0
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = SQLiteCache(str(Path(tmp) / "pages.sqlite"))
+            first = _run([f"{base}/etag"], cache, cache_ttl=0)[0]
+            second = _run([f"{base}/etag"], cache, cache_ttl=0)[0]
+            assert first["cached"] is False
+            assert second["cached"] is True and second["content"] == first["content"]
+            assert _StandIn.not_modified == 1
+            print("✅ ETag revalidation")
+    finally:
+        server.shutdown()
+
+
+def test_sync_entry_point_refuses_running_loop():
+    """scrape_urls() raises inside a coroutine instead of blocking its event loop."""
+    async def caller():
+        try:
+            scrape_urls(["http://127.0.0.1:9/never-fetched"])
+            assert False, "expected RuntimeError"
+        except RuntimeError as e:
+            assert "scrape_urls_async" in str(e)
+
+    asyncio.run(caller())
+    print("✅ Sync entry point refuses a running event loop")
+
+
+if __name__ == "__main__":
+    test_extract_text()
+    test_batch_scrape_and_byte_ceiling()
+    test_per_host_limit()
+    test_etag_revalidation()
+    test_sync_entry_point_refuses_running_loop()
+    print("\nTEST PASSED: web scraper")